@@ -13,6 +13,8 @@ from flask import Blueprint, jsonify, request, current_app, render_template
 
 from app.schemas.campaign_team import AlertAssignRequest
 from app.services.campaign_team_service import get_campaign_team_service
+from services.e14_geo_keys import ensure_geo_keys
+from services.e14_live_query import LiveFilters, get_live_data
 from utils.rate_limiter import limiter
 
 logger = logging.getLogger(__name__)
@@ -29,15 +31,9 @@ E14_DB_PATH = os.path.expanduser(
 
 def get_e14_db():
     """Get connection to E-14 scraper SQLite database."""
-    return sqlite3.connect(E14_DB_PATH)
-
-
-# Party colors for visualization (consistent across dashboard)
-PARTY_COLORS = [
-    "#E91E63", "#D32F2F", "#1565C0", "#388E3C", "#43A047",
-    "#FF9800", "#7B1FA2", "#00ACC1", "#5E35B1", "#F44336",
-    "#3F51B5", "#009688", "#795548", "#607D8B", "#673AB7"
-]
+    conn = sqlite3.connect(E14_DB_PATH)
+    ensure_geo_keys(conn, E14_DB_PATH)
+    return conn
 
 
 def generate_mock_war_room_stats():
@@ -535,180 +531,31 @@ def get_e14_live_data():
     Returns:
         Real E-14 form data with party vote totals from Congreso 2022
     """
-    limit = request.args.get('limit', 100, type=int)
-    dept_filter = request.args.get('departamento')
-    muni_filter = request.args.get('municipio')
-    puesto_filter = request.args.get('puesto')
-    mesa_filter = request.args.get('mesa')
-    risk_filter = request.args.get('risk')
-    corp_filter = request.args.get('corporacion')
+    filters = LiveFilters.from_args(
+        departamento=request.args.get('departamento'),
+        municipio=request.args.get('municipio'),
+        puesto=request.args.get('puesto'),
+        mesa=request.args.get('mesa'),
+        corporacion=request.args.get('corporacion'),
+        risk=request.args.get('risk'),
+        limit=request.args.get('limit', 100, type=int),
+    )
 
     try:
         conn = get_e14_db()
-        conn.row_factory = sqlite3.Row
-
-        # Shared filters for all queries
-        where_clauses = ["f.ocr_processed = 1"]
-        params: list = []
-
-        if dept_filter:
-            where_clauses.append("UPPER(f.departamento) = UPPER(?)")
-            params.append(dept_filter)
-
-        if muni_filter:
-            where_clauses.append("UPPER(f.municipio) = UPPER(?)")
-            params.append(muni_filter)
-
-        if puesto_filter:
-            where_clauses.append("f.puesto_cod = ?")
-            params.append(puesto_filter)
-
-        if mesa_filter:
-            where_clauses.append("f.mesa_num = ?")
-            params.append(mesa_filter)
-
-        if corp_filter:
-            where_clauses.append("f.corporacion = ?")
-            params.append(corp_filter)
-
-        if risk_filter:
-            risk = risk_filter.lower()
-            if risk == 'high':
-                where_clauses.append("f.ocr_confidence < 0.70")
-            elif risk == 'medium':
-                where_clauses.append("f.ocr_confidence >= 0.70 AND f.ocr_confidence < 0.85")
-            elif risk == 'low':
-                where_clauses.append("f.ocr_confidence >= 0.85")
-
-        where_sql = " AND ".join(where_clauses)
-
-        # 1. Get overall statistics
-        stats_query = f"""
-            SELECT
-                COUNT(*) as total_forms,
-                SUM(total_votos) as total_votes,
-                SUM(votos_blancos) as total_blancos,
-                SUM(votos_nulos) as total_nulos,
-                AVG(ocr_confidence) as avg_confidence
-            FROM e14_scraper_forms f
-            WHERE {where_sql}
-        """
-        stats_row = conn.execute(stats_query, params).fetchone()
-        stats = {
-            'total_forms': stats_row['total_forms'] or 0,
-            'total_votes': stats_row['total_votes'] or 0,
-            'total_blancos': stats_row['total_blancos'] or 0,
-            'total_nulos': stats_row['total_nulos'] or 0,
-            'avg_confidence': round(stats_row['avg_confidence'] or 0, 3)
-        }
-
-        # 2. Get party vote totals (top 30)
-        party_query = f"""
-            SELECT
-                v.party_name,
-                SUM(v.votes) as total_votes,
-                COUNT(DISTINCT v.form_id) as mesas_count,
-                AVG(v.confidence) as avg_confidence
-            FROM e14_scraper_votes v
-            JOIN e14_scraper_forms f ON f.id = v.form_id
-            WHERE {where_sql}
-            GROUP BY v.party_name
-            ORDER BY total_votes DESC
-            LIMIT 30
-        """
-        party_rows = conn.execute(party_query, params).fetchall()
-
-        # Calculate total for percentages
-        total_party_votes = sum(row['total_votes'] or 0 for row in party_rows)
-
-        party_summary = []
-        for idx, row in enumerate(party_rows):
-            votes = row['total_votes'] or 0
-            percentage = (votes / total_party_votes * 100) if total_party_votes > 0 else 0
-            party_summary.append({
-                'id': idx + 1,
-                'party_name': row['party_name'],
-                'total_votes': votes,
-                'mesas_count': row['mesas_count'] or 0,
-                'avg_confidence': round(row['avg_confidence'] or 0, 2),
-                'percentage': round(percentage, 2),
-                'color': PARTY_COLORS[idx % len(PARTY_COLORS)],
-                'trend': 'stable'
-            })
-
-        # 3. Get sample forms with optional filters
-        forms_query = f"""
-            SELECT
-                id, mesa_id, filename, corporacion, departamento, municipio,
-                zona_cod, puesto_cod, mesa_num, total_votos, votos_blancos,
-                votos_nulos, ocr_confidence, ocr_at
-            FROM e14_scraper_forms f
-            WHERE {where_sql}
-            ORDER BY id DESC
-            LIMIT ?
-        """
-        params_with_limit = params + [limit]
-
-        form_rows = conn.execute(forms_query, params_with_limit).fetchall()
-        forms = []
-        for row in form_rows:
-            forms.append({
-                'id': row['id'],
-                'mesa_id': row['mesa_id'],
-                'filename': row['filename'],
-                'header': {
-                    'election_name': 'CONGRESO 2022',
-                    'election_date': '13 DE MARZO DE 2022',
-                    'corporacion': row['corporacion'],
-                    'departamento': row['departamento'],
-                    'municipio': row['municipio'],
-                    'zona': row['zona_cod'],
-                    'puesto': row['puesto_cod'],
-                    'mesa': row['mesa_num']
-                },
-                'resumen': {
-                    'total_votos_validos': row['total_votos'] or 0,
-                    'votos_blanco': row['votos_blancos'] or 0,
-                    'votos_nulos': row['votos_nulos'] or 0
-                },
-                'overall_confidence': round(row['ocr_confidence'] or 0, 3),
-                'ocr_at': row['ocr_at'],
-                'source': 'e14_scraper_db'
-            })
-
-        # 4. Get department breakdown
-        dept_query = f"""
-            SELECT departamento, COUNT(*) as cnt, SUM(total_votos) as votos
-            FROM e14_scraper_forms f
-            WHERE {where_sql}
-            GROUP BY departamento
-            ORDER BY cnt DESC
-            LIMIT 10
-        """
-        dept_rows = conn.execute(dept_query, params).fetchall()
-        top_departamentos = [
-            {
-                'departamento': row['departamento'],
-                'mesas': row['cnt'],
-                'votos': row['votos'] or 0
-            }
-            for row in dept_rows
-        ]
-
-        conn.close()
+        try:
+            data = get_live_data(conn, E14_DB_PATH, filters)
+        finally:
+            conn.close()
 
         return jsonify({
             'success': True,
             'source': 'e14_scraper_db',
-            'stats': stats,
-            'party_summary': party_summary,
-            'forms': forms,
-            'top_departamentos': top_departamentos,
-            'total_forms': stats['total_forms'],
-            'forms_returned': len(forms),
-            'total_votes': stats['total_votes'],
-            'total_parties': len(party_summary),
-            'timestamp': datetime.utcnow().isoformat()
+            **data,
+            'total_forms': data['stats']['total_forms'],
+            'forms_returned': len(data['forms']),
+            'total_votes': data['stats']['total_votes'],
+            'total_parties': len(data['party_summary']),
         })
 
     except Exception as e:
@@ -8,14 +8,35 @@ import sqlite3
 from flask import Blueprint, jsonify, request, current_app
 import os
 
+from services.e14_aggregates import aggregates_available
+from services.e14_geo_keys import ensure_geo_keys, geo_key, geo_key_sql
+
 e14_data_bp = Blueprint('e14_data', __name__, url_prefix='/api/e14-data')
 
 DB_PATH = os.path.expanduser("~/Downloads/Code/Proyectos/castor/backend/data/castor.db")
 
+_aggregates_ready = False
+
 
 def get_db():
     """Get database connection."""
-    return sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH)
+    ensure_geo_keys(conn, DB_PATH)
+    return conn
+
+
+def get_agg_db():
+    """
+    Get database connection and whether the E-14 aggregate tables can be read.
+
+    The aggregates are created offline (loader or ``python -m
+    services.e14_aggregates init``); until then routes query the base tables.
+    """
+    global _aggregates_ready
+    conn = get_db()
+    if not _aggregates_ready:
+        _aggregates_ready = aggregates_available(conn)
+    return conn, _aggregates_ready
 
 
 @e14_data_bp.route('/stats', methods=['GET'])
@@ -30,58 +51,72 @@ def get_stats():
         - ocr_pending: Forms pending OCR
         - top_departamentos: Top 10 departments by form count
     """
-    conn = get_db()
+    conn, use_aggregates = get_agg_db()
     cursor = conn.cursor()
 
     stats = {}
 
-    # Total forms
-    cursor.execute("SELECT COUNT(*) FROM e14_scraper_forms")
-    stats['total_forms'] = cursor.fetchone()[0]
+    # Totals (from the e14_agg_forms aggregate table when available)
+    if use_aggregates:
+        cursor.execute("""
+            SELECT SUM(total_forms), SUM(ocr_done), SUM(ocr_pending),
+                   SUM(ocr_total_votos), SUM(ocr_votos_blancos), SUM(ocr_votos_nulos)
+            FROM e14_agg_forms
+        """)
+    else:
+        cursor.execute("""
+            SELECT COUNT(*),
+                   SUM(CASE WHEN ocr_processed = 1 THEN 1 ELSE 0 END),
+                   SUM(CASE WHEN ocr_processed = 0 THEN 1 ELSE 0 END),
+                   SUM(CASE WHEN ocr_processed = 1 THEN total_votos END),
+                   SUM(CASE WHEN ocr_processed = 1 THEN votos_blancos END),
+                   SUM(CASE WHEN ocr_processed = 1 THEN votos_nulos END)
+            FROM e14_scraper_forms
+        """)
+    row = cursor.fetchone()
+    stats['total_forms'] = row[0] or 0
 
     # By corporacion
-    cursor.execute("""
-        SELECT corporacion, COUNT(*)
-        FROM e14_scraper_forms
-        GROUP BY corporacion
-    """)
+    if use_aggregates:
+        cursor.execute("""
+            SELECT corporacion, SUM(total_forms)
+            FROM e14_agg_forms
+            GROUP BY corporacion
+            HAVING SUM(total_forms) > 0
+        """)
+    else:
+        cursor.execute("""
+            SELECT corporacion, COUNT(*)
+            FROM e14_scraper_forms
+            GROUP BY corporacion
+        """)
     stats['by_corporacion'] = dict(cursor.fetchall())
 
     # OCR status
-    cursor.execute("""
-        SELECT
-            SUM(CASE WHEN ocr_processed = 1 THEN 1 ELSE 0 END) as completed,
-            SUM(CASE WHEN ocr_processed = 0 THEN 1 ELSE 0 END) as pending
-        FROM e14_scraper_forms
-    """)
-    row = cursor.fetchone()
-    stats['ocr_completed'] = row[0] or 0
-    stats['ocr_pending'] = row[1] or 0
+    stats['ocr_completed'] = row[1] or 0
+    stats['ocr_pending'] = row[2] or 0
     stats['ocr_progress'] = round((stats['ocr_completed'] / max(stats['total_forms'], 1)) * 100, 1)
 
     # Top departamentos
-    cursor.execute("""
-        SELECT departamento, COUNT(*) as cnt
-        FROM e14_scraper_forms
+    source = "e14_agg_forms" if use_aggregates else "e14_scraper_forms"
+    count_sql = "SUM(total_forms)" if use_aggregates else "COUNT(*)"
+    cursor.execute(f"""
+        SELECT departamento, {count_sql} as cnt
+        FROM {source}
         GROUP BY departamento
+        HAVING cnt > 0
         ORDER BY cnt DESC
         LIMIT 10
     """)
     stats['top_departamentos'] = [
-        {'departamento': row[0], 'count': row[1]}
-        for row in cursor.fetchall()
+        {'departamento': dept_row[0], 'count': dept_row[1]}
+        for dept_row in cursor.fetchall()
     ]
 
     # Total votes (from OCR)
-    cursor.execute("""
-        SELECT SUM(total_votos), SUM(votos_blancos), SUM(votos_nulos)
-        FROM e14_scraper_forms
-        WHERE ocr_processed = 1
-    """)
-    row = cursor.fetchone()
-    stats['total_votos'] = row[0] or 0
-    stats['votos_blancos'] = row[1] or 0
-    stats['votos_nulos'] = row[2] or 0
+    stats['total_votos'] = row[3] or 0
+    stats['votos_blancos'] = row[4] or 0
+    stats['votos_nulos'] = row[5] or 0
 
     conn.close()
     return jsonify(stats)
@@ -119,12 +154,12 @@ def get_forms():
         params.append(corporacion)
 
     if departamento:
-        where_clauses.append("departamento = ?")
-        params.append(departamento)
+        where_clauses.append("dept_key = ?")
+        params.append(geo_key(departamento))
 
     if municipio:
-        where_clauses.append("municipio = ?")
-        params.append(municipio)
+        where_clauses.append("muni_key = ?")
+        params.append(geo_key(municipio))
 
     if ocr_only:
         where_clauses.append("ocr_processed = 1")
@@ -224,10 +259,10 @@ def get_municipios(departamento):
                SUM(CASE WHEN ocr_processed = 1 THEN 1 ELSE 0 END) as ocr_done,
                SUM(total_votos) as votos
         FROM e14_scraper_forms
-        WHERE departamento = ?
+        WHERE dept_key = ?
         GROUP BY municipio
         ORDER BY cnt DESC
-    """, (departamento,))
+    """, (geo_key(departamento),))
 
     results = [
         {
@@ -253,10 +288,10 @@ def get_puestos(departamento, municipio):
         SELECT puesto_cod, COUNT(*) as cnt,
                SUM(CASE WHEN ocr_processed = 1 THEN 1 ELSE 0 END) as ocr_done
         FROM e14_scraper_forms
-        WHERE departamento = ? AND municipio = ?
+        WHERE dept_key = ? AND muni_key = ?
         GROUP BY puesto_cod
         ORDER BY cnt DESC
-    """, (departamento, municipio))
+    """, (geo_key(departamento), geo_key(municipio)))
 
     results = [
         {
@@ -280,10 +315,10 @@ def get_mesas(departamento, municipio, puesto):
     cursor.execute("""
         SELECT mesa_num, COUNT(*) as cnt
         FROM e14_scraper_forms
-        WHERE departamento = ? AND municipio = ? AND puesto_cod = ?
+        WHERE dept_key = ? AND muni_key = ? AND puesto_cod = ?
         GROUP BY mesa_num
         ORDER BY mesa_num ASC
-    """, (departamento, municipio, puesto))
+    """, (geo_key(departamento), geo_key(municipio), puesto))
 
     results = [
         {
@@ -311,7 +346,7 @@ def get_party_totals():
     departamento = request.args.get('departamento')
     corporacion = request.args.get('corporacion')
 
-    conn = get_db()
+    conn, use_aggregates = get_agg_db()
     cursor = conn.cursor()
 
     # Build query with optional filters
@@ -319,26 +354,44 @@ def get_party_totals():
     params = []
 
     if departamento:
-        where_clauses.append("f.departamento = ?")
-        params.append(departamento)
+        if use_aggregates:
+            # e14_agg_party has no dept_key column; it is small enough to normalize per row
+            where_clauses.append(f"{geo_key_sql('departamento')} = ?")
+        else:
+            where_clauses.append("f.dept_key = ?")
+        params.append(geo_key(departamento))
 
     if corporacion:
-        where_clauses.append("f.corporacion = ?")
+        where_clauses.append("corporacion = ?" if use_aggregates else "f.corporacion = ?")
         params.append(corporacion)
 
     where_sql = " WHERE " + " AND ".join(where_clauses) if where_clauses else ""
 
-    query = f"""
-        SELECT v.party_name, SUM(v.votes) as total_votes,
-               COUNT(DISTINCT v.form_id) as mesas_count,
-               AVG(v.confidence) as avg_confidence
-        FROM e14_scraper_votes v
-        JOIN e14_scraper_forms f ON v.form_id = f.id
-        {where_sql}
-        GROUP BY v.party_name
-        ORDER BY total_votes DESC
-        LIMIT ?
-    """
+    if use_aggregates:
+        # Read from the e14_agg_party aggregate table (one row per location x party)
+        query = f"""
+            SELECT party_name, SUM(total_votes) as total_votes,
+                   SUM(mesas_count) as mesas_count,
+                   SUM(confidence_sum) / NULLIF(SUM(confidence_count), 0) as avg_confidence
+            FROM e14_agg_party
+            {where_sql}
+            GROUP BY party_name
+            HAVING SUM(vote_rows) > 0
+            ORDER BY total_votes DESC
+            LIMIT ?
+        """
+    else:
+        query = f"""
+            SELECT v.party_name, COALESCE(SUM(v.votes), 0) as total_votes,
+                   COUNT(DISTINCT v.form_id) as mesas_count,
+                   AVG(v.confidence) as avg_confidence
+            FROM e14_scraper_votes v
+            JOIN e14_scraper_forms f ON v.form_id = f.id
+            {where_sql}
+            GROUP BY v.party_name
+            ORDER BY total_votes DESC
+            LIMIT ?
+        """
     params.append(limit)
 
     cursor.execute(query, params)
@@ -354,7 +407,13 @@ def get_party_totals():
     ]
 
     # Get total votes for percentage calculation
-    cursor.execute("SELECT SUM(votes) FROM e14_scraper_votes")
+    if use_aggregates:
+        cursor.execute("SELECT SUM(total_votes) FROM e14_agg_party")
+    else:
+        cursor.execute("""
+            SELECT SUM(v.votes) FROM e14_scraper_votes v
+            JOIN e14_scraper_forms f ON v.form_id = f.id
+        """)
     total_all_votes = cursor.fetchone()[0] or 0
 
     # Add percentage to each party
@@ -415,21 +474,36 @@ def get_form_detail(form_id):
 @e14_data_bp.route('/summary/by-dept', methods=['GET'])
 def get_summary_by_dept():
     """Get summary grouped by department."""
-    conn = get_db()
+    conn, use_aggregates = get_agg_db()
     cursor = conn.cursor()
 
-    cursor.execute("""
-        SELECT
-            departamento,
-            corporacion,
-            COUNT(*) as total_mesas,
-            SUM(CASE WHEN ocr_processed = 1 THEN 1 ELSE 0 END) as ocr_done,
-            SUM(total_votos) as total_votos,
-            AVG(ocr_confidence) as avg_confidence
-        FROM e14_scraper_forms
-        GROUP BY departamento, corporacion
-        ORDER BY total_mesas DESC
-    """)
+    if use_aggregates:
+        cursor.execute("""
+            SELECT
+                departamento,
+                corporacion,
+                SUM(total_forms) as total_mesas,
+                SUM(ocr_done) as ocr_done,
+                SUM(total_votos) as total_votos,
+                SUM(confidence_sum) / NULLIF(SUM(confidence_count), 0) as avg_confidence
+            FROM e14_agg_forms
+            GROUP BY departamento, corporacion
+            HAVING total_mesas > 0
+            ORDER BY total_mesas DESC
+        """)
+    else:
+        cursor.execute("""
+            SELECT
+                departamento,
+                corporacion,
+                COUNT(*) as total_mesas,
+                SUM(CASE WHEN ocr_processed = 1 THEN 1 ELSE 0 END) as ocr_done,
+                SUM(total_votos) as total_votos,
+                AVG(ocr_confidence) as avg_confidence
+            FROM e14_scraper_forms
+            GROUP BY departamento, corporacion
+            ORDER BY total_mesas DESC
+        """)
 
     results = [
         {
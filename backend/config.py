@@ -57,6 +57,15 @@ class Config:
     OPENAI_EMBEDDING_MODEL: str = os.getenv('OPENAI_EMBEDDING_MODEL', 'text-embedding-3-small')
     OPENAI_TIMEOUT_SECONDS: int = int(os.getenv('OPENAI_TIMEOUT_SECONDS', '60'))  # Increased for long content generation
 
+    # RAG vector index (exact = brute-force matmul, ivf = approximate; nprobe is the recall knob)
+    RAG_INDEX_MODE: str = os.getenv('RAG_INDEX_MODE', 'exact')
+    RAG_IVF_NLIST: int = int(os.getenv('RAG_IVF_NLIST', '0'))  # 0 = sqrt(documents)
+    RAG_IVF_NPROBE: int = int(os.getenv('RAG_IVF_NPROBE', '8'))
+    RAG_EMBEDDING_PRECISION: str = os.getenv('RAG_EMBEDDING_PRECISION', 'float32')  # float32 | float16 | int8
+    RAG_EMBED_BATCH_SIZE: int = int(os.getenv('RAG_EMBED_BATCH_SIZE', '512'))  # texts per embeddings request
+    RAG_EMBED_CONCURRENCY: int = int(os.getenv('RAG_EMBED_CONCURRENCY', '4'))
+    RAG_EMBED_MAX_RETRIES: int = int(os.getenv('RAG_EMBED_MAX_RETRIES', '3'))
+
     # Anthropic Claude
     ANTHROPIC_API_KEY: Optional[str] = os.getenv('ANTHROPIC_API_KEY')
     CLAUDE_MODEL: str = os.getenv('CLAUDE_MODEL', 'claude-3-5-sonnet-20241022')
@@ -66,6 +75,8 @@ class Config:
     E14_OCR_MAX_PAGES: int = int(os.getenv('E14_OCR_MAX_PAGES', '20'))
     E14_OCR_TIMEOUT: int = int(os.getenv('E14_OCR_TIMEOUT', '120'))
     E14_OCR_DPI: int = int(os.getenv('E14_OCR_DPI', '150'))
+    E14_OCR_RASTER_WORKERS: int = int(os.getenv('E14_OCR_RASTER_WORKERS', '0'))  # 0 = min(4, CPUs)
+    E14_OCR_IMAGE_ENCODER: str = os.getenv('E14_OCR_IMAGE_ENCODER', 'lossless')  # lossless | fast
 
     # Electoral API Security Limits
     E14_COST_PER_PROCESS: float = float(os.getenv('E14_COST_PER_PROCESS', '0.10'))
@@ -73,6 +84,7 @@ class Config:
     E14_DAILY_COST_LIMIT: float = float(os.getenv('E14_DAILY_COST_LIMIT', '5.00'))
     E14_MAX_FILE_SIZE_MB: int = int(os.getenv('E14_MAX_FILE_SIZE_MB', '10'))
     E14_MAX_PAGES: int = int(os.getenv('E14_MAX_PAGES', '20'))
+    E14_LIVE_CACHE_TTL: int = int(os.getenv('E14_LIVE_CACHE_TTL', '3600'))  # keyed by data version
 
     # Local LLM (Ollama)
     LOCAL_LLM_URL: str = os.getenv('LOCAL_LLM_URL', 'http://localhost:11434')
@@ -88,9 +100,24 @@ class Config:
     DB_POOL_SIZE: int = int(os.getenv('DB_POOL_SIZE', '10'))
     DB_MAX_OVERFLOW: int = int(os.getenv('DB_MAX_OVERFLOW', '20'))
     DB_POOL_TIMEOUT: int = int(os.getenv('DB_POOL_TIMEOUT', '30'))
+    # Bulk tweet writes (services/tweet_bulk_writer.py)
+    DB_BULK_CHUNK_SIZE: int = int(os.getenv('DB_BULK_CHUNK_SIZE', '500'))
+    DB_COPY_MIN_ROWS: int = int(os.getenv('DB_COPY_MIN_ROWS', '1000'))  # PostgreSQL COPY threshold
     
     # BETO Model
     BETO_MODEL_PATH: str = os.getenv('BETO_MODEL_PATH', 'dccuchile/bert-base-spanish-wwm-uncased')
+    BETO_BACKEND: str = os.getenv('BETO_BACKEND', 'fp32')  # fp32 | int8 | onnx
+    BETO_ONNX_DIR: str = os.getenv('BETO_ONNX_DIR', os.path.expanduser('~/.cache/castor/onnx'))
+    # Inference scheduler: dynamic micro-batches, length-sorted to minimize padding
+    BETO_BATCH_SIZE: int = int(os.getenv('BETO_BATCH_SIZE', '32'))
+    BETO_MAX_WAIT_MS: float = float(os.getenv('BETO_MAX_WAIT_MS', '10'))
+    BETO_TORCH_THREADS: int = int(os.getenv('BETO_TORCH_THREADS', '0'))  # 0 = torch default
+    # Shared inference sidecar (one model for all gunicorn workers, see services/beto_sidecar.py)
+    BETO_SIDECAR_ENABLED: bool = os.getenv('BETO_SIDECAR_ENABLED', 'true').lower() == 'true'
+    BETO_SIDECAR_SOCKET: str = os.getenv('BETO_SIDECAR_SOCKET', '/tmp/castor-beto.sock')
+    BETO_SIDECAR_AUTHKEY: str = os.getenv('BETO_SIDECAR_AUTHKEY', '')
+    BETO_SIDECAR_TIMEOUT: int = int(os.getenv('BETO_SIDECAR_TIMEOUT', '60'))
+    BETO_SIDECAR_RETRY_SECONDS: int = int(os.getenv('BETO_SIDECAR_RETRY_SECONDS', '30'))
     
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = int(os.getenv('RATE_LIMIT_PER_MINUTE', '120'))  # 2 per second - dashboard makes parallel calls
@@ -99,9 +126,28 @@ class Config:
     # Caching
     CACHE_MAX_SIZE: int = int(os.getenv('CACHE_MAX_SIZE', '64'))
     SENTIMENT_CACHE_TTL: int = int(os.getenv('SENTIMENT_CACHE_TTL', '900'))
+    # Persistent sentiment cache (Redis, else SQLite); bump the version to invalidate it
+    SENTIMENT_MODEL_VERSION: str = os.getenv('SENTIMENT_MODEL_VERSION', '1')
+    SENTIMENT_CACHE_DB: str = os.getenv(
+        'SENTIMENT_CACHE_DB', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'sentiment_cache.db')
+    )
     OPENAI_CACHE_TTL: int = int(os.getenv('OPENAI_CACHE_TTL', '1800'))
     TRENDING_CACHE_TTL: int = int(os.getenv('TRENDING_CACHE_TTL', '600'))
     TRENDING_CACHE_STALE_TTL: int = int(os.getenv('TRENDING_CACHE_STALE_TTL', '300'))
+    # Incremental trending engine (hourly count-min sketches per location)
+    TRENDING_WINDOW_HOURS: int = int(os.getenv('TRENDING_WINDOW_HOURS', '24'))
+    TRENDING_SKETCH_WIDTH: int = int(os.getenv('TRENDING_SKETCH_WIDTH', '1024'))
+    TRENDING_SKETCH_DEPTH: int = int(os.getenv('TRENDING_SKETCH_DEPTH', '4'))
+    TRENDING_CANDIDATES: int = int(os.getenv('TRENDING_CANDIDATES', '512'))
+    TRENDING_RECENT_TWEETS: int = int(os.getenv('TRENDING_RECENT_TWEETS', '2000'))
+    FORECAST_ICCE_CACHE_TTL: int = int(os.getenv('FORECAST_ICCE_CACHE_TTL', '120'))
+    # @cached single-flight: lock lease / max wait for another worker's result, TTL jitter fraction
+    CACHE_LOCK_TIMEOUT: float = float(os.getenv('CACHE_LOCK_TIMEOUT', '60'))
+    CACHE_TTL_JITTER: float = float(os.getenv('CACHE_TTL_JITTER', '0.1'))
+    # Cached payload codec (utils/codec.py): auto picks msgpack > orjson > json, zstd > lz4 > none
+    CACHE_SERIALIZER: str = os.getenv('CACHE_SERIALIZER', 'auto')
+    CACHE_COMPRESSION: str = os.getenv('CACHE_COMPRESSION', 'auto')
+    CACHE_COMPRESS_MIN_BYTES: int = int(os.getenv('CACHE_COMPRESS_MIN_BYTES', '1024'))
     
     # Caching (Optimizado para Twitter Free tier - 100 posts/mes)
     REDIS_URL: Optional[str] = os.getenv('REDIS_URL')  # e.g., 'redis://localhost:6379/0'
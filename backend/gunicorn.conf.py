@@ -9,6 +9,17 @@ Or with environment variable:
 """
 import os
 import multiprocessing
+import secrets
+
+# Shared BETO inference sidecar: one model process for all workers.
+# The key is generated here so the sidecar and every worker inherit it.
+BETO_SIDECAR_ENABLED = os.environ.get("BETO_SIDECAR_ENABLED", "true").lower() == "true"
+os.environ.setdefault("BETO_SIDECAR_AUTHKEY", secrets.token_hex(16))
+_sidecar = None
+
+# Tesseract pages are OCR'd concurrently (services/e14_tesseract_ocr.py):
+# one core per tesseract subprocess, OpenMP threads would oversubscribe.
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
 
 # Server Socket
 bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
@@ -46,7 +57,15 @@ proc_name = "castor-elecciones"
 # Server Hooks
 def on_starting(server):
     """Called just before the master process is initialized."""
+    global _sidecar
     print("CASTOR Elecciones starting...")
+    if BETO_SIDECAR_ENABLED:
+        # Imported here so Config sees the BETO_SIDECAR_AUTHKEY set above
+        from services.beto_sidecar import SidecarSupervisor
+
+        _sidecar = SidecarSupervisor(cwd=os.path.dirname(os.path.abspath(__file__)))
+        process = _sidecar.start()
+        print(f"BETO sidecar started (pid: {process.pid}), respawned if it exits")
 
 
 def on_reload(server):
@@ -81,7 +100,7 @@ def post_fork(server, worker):
 
 def post_worker_init(worker):
     """Called just after a worker has initialized the application."""
-    # This is where BETO model gets loaded per worker
+    # BETO lives in the sidecar; workers only load it if the sidecar is down
     print(f"Worker {worker.pid} initialized")
 
 
@@ -98,6 +117,8 @@ def nworkers_changed(server, new_value, old_value):
 def on_exit(server):
     """Called just before exiting."""
     print("CASTOR Elecciones shutting down...")
+    if _sidecar is not None:
+        _sidecar.stop(timeout=10)
 
 
 # Security Headers (add via reverse proxy or middleware)
@@ -110,7 +131,8 @@ SECURITY_HEADERS = {
     "Content-Security-Policy": "default-src 'self'",
 }
 
-# Preload app (loads BETO model once, shared across workers via copy-on-write)
+# Preload app (imports shared across workers via copy-on-write; BETO itself
+# is served by the sidecar, so recycled workers start without loading it)
 preload_app = True
 
 # For Heroku/Railway deployment
@@ -18,6 +18,7 @@ from sqlalchemy import (
     Integer,
     String,
     Text,
+    text,
 )
 from sqlalchemy.orm import declarative_base, relationship
 
@@ -352,6 +353,10 @@ class Tweet(Base):
         Index('ix_tweets_author_date', 'author_username', 'tweet_created_at'),
         Index('ix_tweets_sentiment', 'sentiment_positive', 'sentiment_negative'),
         Index('ix_tweets_pnd', 'pnd_topic', 'tweet_created_at'),
+        # Conflict target of the bulk upsert (services/tweet_bulk_writer.py);
+        # tweets without a tweet_id are not covered
+        Index('uq_tweets_api_call_tweet_id', 'api_call_id', 'tweet_id', unique=True,
+              sqlite_where=text("tweet_id <> ''"), postgresql_where=text("tweet_id <> ''")),
     )
 
     id = Column(String(36), primary_key=True, default=_generate_uuid)
@@ -15,6 +15,7 @@ from models.database import (
     Base, ApiCall, Tweet, AnalysisSnapshot,
     PndAxisMetric, ForecastSnapshot, CampaignStrategy
 )
+from services.tweet_bulk_writer import UPSERT_INDEX, migrate_upsert_index
 
 
 def main():
@@ -77,6 +78,10 @@ def main():
 
         print("\n✅ Tablas creadas exitosamente!")
 
+    # Unique index of the bulk tweet upsert (dedupes tables created before it)
+    removed = migrate_upsert_index(engine)
+    print(f"\n✅ Índice {UPSERT_INDEX} listo ({removed} tweets duplicados eliminados)")
+
     # Verify tables
     inspector = inspect(engine)
     final_tables = inspector.get_table_names()
@@ -7,7 +7,7 @@ from __future__ import annotations
 import os
 import sqlite3
 from datetime import datetime
-from typing import Iterable, List, Optional
+from typing import Dict, Iterable, List, Optional
 
 DB_PATH = os.path.expanduser("~/Downloads/Code/Proyectos/castor/backend/data/castor.db")
 
@@ -49,14 +49,19 @@ def mark_processed(form_id: int, incidents_created: int = 0) -> None:
     conn.close()
 
 
-def mark_batch_processed(form_ids: Iterable[int]) -> None:
+def mark_batch_processed(
+    form_ids: Iterable[int],
+    incidents_created: Optional[Dict[int, int]] = None,
+) -> None:
+    """Mark many forms processed in one transaction (incidents_created: form_id -> count)."""
     init_db()
+    counts = incidents_created or {}
     conn = _get_connection()
     cur = conn.cursor()
     now = datetime.utcnow().isoformat()
     cur.executemany(
-        "INSERT OR REPLACE INTO agent_e14_processed (form_id, processed_at, incidents_created) VALUES (?, ?, 0)",
-        [(fid, now) for fid in form_ids],
+        "INSERT OR REPLACE INTO agent_e14_processed (form_id, processed_at, incidents_created) VALUES (?, ?, ?)",
+        [(fid, now, counts.get(fid, 0)) for fid in form_ids],
     )
     conn.commit()
     conn.close()
@@ -1,17 +1,105 @@
 """
 Anomaly Detector.
 Detects anomalies in electoral data using rule-based and statistical methods.
+
+analyze_batch runs the per-form checks column-wise: the validations and
+OCR fields of the whole batch are flattened into NumPy arrays (one row
+per validation / field, with the index of its form), every check is a
+mask over those arrays, and DetectedAnomaly objects are built only for
+the rows that fire, with the same builders analyze_e14 uses.
 """
 import logging
+from collections import defaultdict
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from itertools import chain
+from operator import itemgetter
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+import numpy as np
+
 from services.agent.config import AgentConfig, get_agent_config
 
 logger = logging.getLogger(__name__)
 
+# rule_key classes used by the validation checks
+_RULE_ARITHMETIC = 1    # 'ARITHMETIC' / 'SUM' -> _check_arithmetic
+_RULE_E11 = 2           # 'E11' / 'SUFRAGANTES' -> _check_e11_urna
+_RULE_HANDLED = 4       # skipped by _check_validation_failures
+_HANDLED_RULE_MARKERS = ('ARITHMETIC', 'SUM', 'E11', 'SUFRAGANTES', 'OCR')
+
+# Vote count per field above which _check_impossible_values flags it
+_MAX_VOTES_PER_FIELD = 1000
+
+# Check order within a form (analyze_e14 order)
+_ARITHMETIC, _OCR, _E11, _IMPOSSIBLE, _VALIDATION = range(5)
+
+
+def _pluck(items: List[Dict[str, Any]], defaults: Dict[str, Any]) -> List[List[Any]]:
+    """
+    One list per key of defaults with item.get(key, default) for every item.
+
+    Uses itemgetter passes when every item has all the keys (the usual
+    case) and falls back to .get otherwise.
+    """
+    try:
+        return [list(map(itemgetter(key), items)) for key in defaults]
+    except KeyError:
+        return [[item.get(key, default) for item in items] for key, default in defaults.items()]
+
+
+def _float_column(values: List[Any], placeholder: float, row_form: np.ndarray, irregular: set) -> np.ndarray:
+    """
+    values as a float array. Rows that do not convert get placeholder and
+    their forms are added to irregular.
+    """
+    try:
+        return np.fromiter(values, dtype=float, count=len(values))
+    except (TypeError, ValueError):
+        pass
+    column = np.full(len(values), placeholder, dtype=float)
+    bad_rows = []
+    for row, value in enumerate(values):
+        try:
+            column[row] = value
+        except (TypeError, ValueError):
+            bad_rows.append(row)
+    irregular.update(row_form[bad_rows].tolist())
+    return column
+
+
+def _class_column(
+    keys: List[Any],
+    classify: Callable[[Any], Any],
+    dtype: Any,
+    row_form: np.ndarray,
+    irregular: set
+) -> np.ndarray:
+    """
+    classify() of every key, computed once per distinct key. Rows whose
+    key cannot be classified (not a string) get 0 and their forms are
+    added to irregular.
+    """
+    try:
+        classes = {key: classify(key) for key in set(keys)}
+        return np.fromiter(map(classes.__getitem__, keys), dtype=dtype, count=len(keys))
+    except TypeError:
+        pass
+    column = np.zeros(len(keys), dtype=dtype)
+    bad_rows = []
+    for row, key in enumerate(keys):
+        try:
+            column[row] = classify(key)
+        except TypeError:
+            bad_rows.append(row)
+    irregular.update(row_form[bad_rows].tolist())
+    return column
+
+
+def _is_vote_key(field_key: str) -> bool:
+    return 'CANDIDATE' in field_key or 'VOTES' in field_key
+
 
 class AnomalyType(str, Enum):
     """Types of anomalies that can be detected."""
@@ -69,6 +157,43 @@ class DetectedAnomaly:
         }
 
 
+@dataclass
+class E14Columns:
+    """
+    Validations and OCR fields of a batch of forms, one array row each.
+
+    validations / fields are the flattened dicts and *_form the index of
+    the form each row belongs to. Forms with values the arrays cannot
+    represent (non-numeric counts, non-string keys) are listed in
+    irregular_forms; their rows hold placeholders and they go through
+    analyze_e14 instead.
+    """
+    size: int
+    validations: List[Dict[str, Any]]
+    validation_form: np.ndarray
+    validation_rule: np.ndarray
+    validation_failed: np.ndarray
+    arithmetic_delta: np.ndarray
+    e11_delta: np.ndarray
+    fields: List[Dict[str, Any]]
+    field_form: np.ndarray
+    field_confidence: np.ndarray
+    field_value: np.ndarray
+    field_has_value: np.ndarray
+    field_is_vote: np.ndarray  # only set for values above _MAX_VOTES_PER_FIELD
+    irregular_forms: List[int]
+
+    def ocr_stats(self, threshold: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Per form: (field count, average confidence, fields below threshold)."""
+        counts = np.bincount(self.field_form, minlength=self.size)
+        sums = np.bincount(self.field_form, weights=self.field_confidence, minlength=self.size)
+        low = np.bincount(
+            self.field_form, weights=self.field_confidence < threshold, minlength=self.size
+        )
+        averages = np.divide(sums, counts, out=np.ones(self.size), where=counts > 0)
+        return counts, averages, low
+
+
 class AnomalyDetector:
     """
     Detects anomalies in electoral data.
@@ -133,10 +258,8 @@ class AnomalyDetector:
             'by_severity': {},
         }
 
-        # Analyze each form
-        for form in forms:
-            form_anomalies = self.analyze_e14(form)
-            all_anomalies.extend(form_anomalies)
+        # Analyze all forms column-wise
+        all_anomalies.extend(self.analyze_columns(forms))
 
         # Check for geographic clustering
         cluster_anomalies = self._detect_geographic_clusters(forms, all_anomalies)
@@ -152,6 +275,178 @@ class AnomalyDetector:
 
         return all_anomalies, stats
 
+    def analyze_columns(self, forms: List[Dict[str, Any]]) -> List[DetectedAnomaly]:
+        """
+        Per-form checks of a batch evaluated as array expressions.
+
+        Returns the same anomalies, in the same order, as calling
+        analyze_e14 on each form in turn.
+
+        Args:
+            forms: List of E-14 form data
+
+        Returns:
+            List of detected anomalies
+        """
+        columns = self.build_columns(forms)
+        threshold = self.config.OCR_CONFIDENCE_THRESHOLD
+
+        failed = columns.validation_failed
+        rule = columns.validation_rule
+        arithmetic_rows = np.flatnonzero(
+            failed & (rule & _RULE_ARITHMETIC != 0)
+            & (columns.arithmetic_delta > self.config.ARITHMETIC_DELTA_THRESHOLD)
+        )
+        e11_rows = np.flatnonzero(failed & (rule & _RULE_E11 != 0) & (columns.e11_delta > 0))
+        validation_rows = np.flatnonzero(failed & (rule & _RULE_HANDLED == 0))
+
+        value = columns.field_value
+        negative = columns.field_has_value & (value < 0)
+        high = columns.field_has_value & columns.field_is_vote & (value > _MAX_VOTES_PER_FIELD)
+        impossible_rows = np.flatnonzero(negative | high)
+
+        counts, averages, low = columns.ocr_stats(threshold)
+        ocr_forms = np.flatnonzero((counts > 0) & ((low >= 3) | (averages < threshold)))
+
+        # form index -> check -> fired rows, filled in row (= list) order
+        fired: Dict[int, Dict[int, List[int]]] = defaultdict(lambda: defaultdict(list))
+        for check, rows, row_form in (
+            (_ARITHMETIC, arithmetic_rows, columns.validation_form),
+            (_E11, e11_rows, columns.validation_form),
+            (_VALIDATION, validation_rows, columns.validation_form),
+            (_IMPOSSIBLE, impossible_rows, columns.field_form),
+        ):
+            for row, form_index in zip(rows.tolist(), row_form[rows].tolist()):
+                fired[form_index][check].append(row)
+        for form_index in ocr_forms.tolist():
+            fired[form_index][_OCR].append(form_index)
+
+        irregular = set(columns.irregular_forms)
+        anomalies = []
+        for form_index in sorted(irregular.union(fired)):
+            form_data = forms[form_index]
+            if form_index in irregular:
+                anomalies.extend(self.analyze_e14(form_data))
+                continue
+
+            header = form_data.get('document_header_extracted', {})
+            location = (
+                self._get_mesa_id(header),
+                header.get('dept_code', '00'),
+                header.get('muni_code', '000'),
+            )
+            checks = fired[form_index]
+
+            for row in checks[_ARITHMETIC]:
+                anomalies.append(self._arithmetic_anomaly(columns.validations[row], *location))
+            if checks[_OCR]:
+                stats = self._ocr_confidence_stats(form_data.get('ocr_fields', []))
+                anomalies.append(self._ocr_anomaly(*stats, *location))
+            for row in checks[_E11]:
+                anomalies.append(self._e11_anomaly(columns.validations[row], *location))
+            for row in checks[_IMPOSSIBLE]:
+                if negative[row]:
+                    anomalies.append(self._negative_value_anomaly(columns.fields[row], *location))
+                if high[row]:
+                    anomalies.append(self._high_value_anomaly(columns.fields[row], *location))
+            for row in checks[_VALIDATION]:
+                anomalies.append(self._validation_failure_anomaly(columns.validations[row], *location))
+
+        return anomalies
+
+    def build_columns(self, forms: List[Dict[str, Any]]) -> E14Columns:
+        """
+        Flatten the validations and OCR fields of a batch into arrays.
+
+        Values are pulled out of the dicts a column at a time and converted
+        in one NumPy call per column; only when a conversion fails are the
+        offending forms located and marked irregular.
+
+        Args:
+            forms: List of E-14 form data
+
+        Returns:
+            E14Columns for the batch
+        """
+        size = len(forms)
+        irregular = set()
+
+        # Validations
+        form_validations = [form.get('validations', []) for form in forms]
+        validations = list(chain.from_iterable(form_validations))
+        validation_form = np.repeat(np.arange(size), [len(v) for v in form_validations])
+
+        rule_keys, passed = _pluck(validations, {'rule_key': '', 'passed': None})
+        validation_rule = _class_column(rule_keys, self._classify_rule_key, np.int8, validation_form, irregular)
+        validation_failed = np.array([not p for p in passed], dtype=bool)
+
+        # Counts are only read for the failed validations the two count checks look at
+        counted = np.flatnonzero(validation_failed & (validation_rule & (_RULE_ARITHMETIC | _RULE_E11) != 0))
+        details = [validations[row].get('details', {}) for row in counted.tolist()]
+        counted_form = validation_form[counted]
+        expected, actual, e11_count, urna_count = (
+            _float_column(column, 0, counted_form, irregular)
+            for column in _pluck(details, {'expected': 0, 'actual': 0, 'e11_count': 0, 'urna_count': 0})
+        )
+        arithmetic_delta = np.zeros(len(validations))
+        arithmetic_delta[counted] = np.abs(expected - actual)
+        e11_delta = np.zeros(len(validations))
+        e11_delta[counted] = np.abs(e11_count - urna_count)
+
+        # OCR fields
+        form_fields = [form.get('ocr_fields', []) for form in forms]
+        fields = list(chain.from_iterable(form_fields))
+        field_form = np.repeat(np.arange(size), [len(f) for f in form_fields])
+
+        confidences, values = _pluck(fields, {'confidence': 1.0, 'value_int': None})
+        field_confidence = _float_column(confidences, 1.0, field_form, irregular)
+        try:
+            field_value = np.fromiter(values, dtype=float, count=len(values))
+            field_has_value = np.ones(len(fields), dtype=bool)
+        except (TypeError, ValueError):
+            # value_int is optional
+            field_has_value = np.fromiter((v is not None for v in values), dtype=bool, count=len(values))
+            has_value_rows = np.flatnonzero(field_has_value)
+            field_value = np.zeros(len(fields))
+            field_value[has_value_rows] = _float_column(
+                [values[row] for row in has_value_rows.tolist()], 0, field_form[has_value_rows], irregular
+            )
+
+        # field_key only decides the vote-count limit, so it is read only above it
+        over_limit = np.flatnonzero(field_has_value & (field_value > _MAX_VOTES_PER_FIELD))
+        keys = [fields[row].get('field_key', '') for row in over_limit.tolist()]
+        field_is_vote = np.zeros(len(fields), dtype=bool)
+        field_is_vote[over_limit] = _class_column(keys, _is_vote_key, bool, field_form[over_limit], irregular)
+
+        return E14Columns(
+            size=size,
+            validations=validations,
+            validation_form=validation_form,
+            validation_rule=validation_rule,
+            validation_failed=validation_failed,
+            arithmetic_delta=arithmetic_delta,
+            e11_delta=e11_delta,
+            fields=fields,
+            field_form=field_form,
+            field_confidence=field_confidence,
+            field_value=field_value,
+            field_has_value=field_has_value,
+            field_is_vote=field_is_vote,
+            irregular_forms=sorted(irregular),
+        )
+
+    @staticmethod
+    def _classify_rule_key(rule_key: str) -> int:
+        """_RULE_* flags of a validation rule_key."""
+        rule = 0
+        if 'ARITHMETIC' in rule_key or 'SUM' in rule_key:
+            rule |= _RULE_ARITHMETIC
+        if 'E11' in rule_key or 'SUFRAGANTES' in rule_key:
+            rule |= _RULE_E11
+        if any(k in rule_key for k in _HANDLED_RULE_MARKERS):
+            rule |= _RULE_HANDLED
+        return rule
+
     def _check_arithmetic(
         self,
         form_data: Dict[str, Any],
@@ -167,28 +462,10 @@ class AnomalyDetector:
             rule_key = validation.get('rule_key', '')
             if ('ARITHMETIC' in rule_key or 'SUM' in rule_key) and not validation.get('passed'):
                 details = validation.get('details', {})
-                expected = details.get('expected', 0)
-                actual = details.get('actual', 0)
-                delta = abs(expected - actual)
+                delta = abs(details.get('expected', 0) - details.get('actual', 0))
 
                 if delta > self.config.ARITHMETIC_DELTA_THRESHOLD:
-                    anomalies.append(self._create_anomaly(
-                        anomaly_type=AnomalyType.ARITHMETIC_MISMATCH,
-                        severity=AnomalySeverity.CRITICAL if delta > 10 else AnomalySeverity.HIGH,
-                        mesa_id=mesa_id,
-                        dept_code=dept_code,
-                        muni_code=muni_code,
-                        description=f"Suma aritmética no cuadra: esperado {expected}, actual {actual} (delta: {delta})",
-                        confidence=1.0,
-                        details={
-                            'expected': expected,
-                            'actual': actual,
-                            'delta': delta,
-                            'rule_key': rule_key,
-                        },
-                        affected_fields=['vote_totals'],
-                        suggested_action='REVIEW_AND_RECOUNT',
-                    ))
+                    anomalies.append(self._arithmetic_anomaly(validation, mesa_id, dept_code, muni_code))
 
         return anomalies
 
@@ -206,38 +483,11 @@ class AnomalyDetector:
         if not ocr_fields:
             return anomalies
 
-        low_conf_fields = []
-        total_confidence = 0.0
-
-        for field in ocr_fields:
-            confidence = field.get('confidence', 1.0)
-            total_confidence += confidence
-
-            if confidence < self.config.OCR_CONFIDENCE_THRESHOLD:
-                low_conf_fields.append({
-                    'field_key': field.get('field_key'),
-                    'confidence': confidence,
-                })
-
-        avg_confidence = total_confidence / len(ocr_fields)
+        avg_confidence, low_conf_fields = self._ocr_confidence_stats(ocr_fields)
 
         if len(low_conf_fields) >= 3 or avg_confidence < self.config.OCR_CONFIDENCE_THRESHOLD:
-            severity = AnomalySeverity.HIGH if avg_confidence < 0.5 else AnomalySeverity.MEDIUM
-            anomalies.append(self._create_anomaly(
-                anomaly_type=AnomalyType.OCR_LOW_CONFIDENCE,
-                severity=severity,
-                mesa_id=mesa_id,
-                dept_code=dept_code,
-                muni_code=muni_code,
-                description=f"Confianza OCR baja: promedio {avg_confidence:.1%}, {len(low_conf_fields)} campos bajo umbral",
-                confidence=1.0 - avg_confidence,
-                details={
-                    'avg_confidence': avg_confidence,
-                    'low_confidence_fields': low_conf_fields,
-                    'threshold': self.config.OCR_CONFIDENCE_THRESHOLD,
-                },
-                affected_fields=[f['field_key'] for f in low_conf_fields],
-                suggested_action='MANUAL_REVIEW',
+            anomalies.append(self._ocr_anomaly(
+                avg_confidence, low_conf_fields, mesa_id, dept_code, muni_code
             ))
 
         return anomalies
@@ -256,27 +506,10 @@ class AnomalyDetector:
             rule_key = validation.get('rule_key', '')
             if ('E11' in rule_key or 'SUFRAGANTES' in rule_key) and not validation.get('passed'):
                 details = validation.get('details', {})
-                e11_count = details.get('e11_count', 0)
-                urna_count = details.get('urna_count', 0)
-                delta = abs(e11_count - urna_count)
+                delta = abs(details.get('e11_count', 0) - details.get('urna_count', 0))
 
                 if delta > 0:
-                    anomalies.append(self._create_anomaly(
-                        anomaly_type=AnomalyType.E11_URNA_MISMATCH,
-                        severity=AnomalySeverity.HIGH if delta > 5 else AnomalySeverity.MEDIUM,
-                        mesa_id=mesa_id,
-                        dept_code=dept_code,
-                        muni_code=muni_code,
-                        description=f"Sufragantes E-11 ({e11_count}) ≠ Votos en urna ({urna_count})",
-                        confidence=1.0,
-                        details={
-                            'e11_count': e11_count,
-                            'urna_count': urna_count,
-                            'delta': delta,
-                        },
-                        affected_fields=['total_sufragantes_e11', 'total_votos_urna'],
-                        suggested_action='INVESTIGATE_DISCREPANCY',
-                    ))
+                    anomalies.append(self._e11_anomaly(validation, mesa_id, dept_code, muni_code))
 
         return anomalies
 
@@ -298,34 +531,12 @@ class AnomalyDetector:
 
                 # Negative votes
                 if value < 0:
-                    anomalies.append(self._create_anomaly(
-                        anomaly_type=AnomalyType.IMPOSSIBLE_VALUE,
-                        severity=AnomalySeverity.CRITICAL,
-                        mesa_id=mesa_id,
-                        dept_code=dept_code,
-                        muni_code=muni_code,
-                        description=f"Valor negativo detectado en {field_key}: {value}",
-                        confidence=1.0,
-                        details={'field_key': field_key, 'value': value},
-                        affected_fields=[field_key],
-                        suggested_action='MANUAL_CORRECTION',
-                    ))
+                    anomalies.append(self._negative_value_anomaly(field, mesa_id, dept_code, muni_code))
 
                 # Impossibly high vote count (>1000 per mesa is unusual)
-                if 'CANDIDATE' in field_key or 'VOTES' in field_key:
-                    if value > 1000:
-                        anomalies.append(self._create_anomaly(
-                            anomaly_type=AnomalyType.IMPOSSIBLE_VALUE,
-                            severity=AnomalySeverity.HIGH,
-                            mesa_id=mesa_id,
-                            dept_code=dept_code,
-                            muni_code=muni_code,
-                            description=f"Valor inusualmente alto en {field_key}: {value}",
-                            confidence=0.8,
-                            details={'field_key': field_key, 'value': value},
-                            affected_fields=[field_key],
-                            suggested_action='VERIFY_VALUE',
-                        ))
+                if _is_vote_key(field_key):
+                    if value > _MAX_VOTES_PER_FIELD:
+                        anomalies.append(self._high_value_anomaly(field, mesa_id, dept_code, muni_code))
 
         return anomalies
 
@@ -345,35 +556,192 @@ class AnomalyDetector:
 
             rule_key = validation.get('rule_key', '')
             # Skip rules already handled
-            if any(k in rule_key for k in ['ARITHMETIC', 'SUM', 'E11', 'SUFRAGANTES', 'OCR']):
+            if any(k in rule_key for k in _HANDLED_RULE_MARKERS):
                 continue
 
-            severity_map = {
-                'CRITICAL': AnomalySeverity.CRITICAL,
-                'HIGH': AnomalySeverity.HIGH,
-                'MEDIUM': AnomalySeverity.MEDIUM,
-                'LOW': AnomalySeverity.LOW,
-            }
-            severity = severity_map.get(
-                validation.get('severity', 'MEDIUM'),
-                AnomalySeverity.MEDIUM
-            )
-
-            anomalies.append(self._create_anomaly(
-                anomaly_type=AnomalyType.STATISTICAL_OUTLIER,  # Generic type for other failures
-                severity=severity,
-                mesa_id=mesa_id,
-                dept_code=dept_code,
-                muni_code=muni_code,
-                description=f"Validación fallida: {rule_key}",
-                confidence=1.0,
-                details=validation.get('details', {}),
-                affected_fields=[],
-                suggested_action='REVIEW_VALIDATION',
-            ))
+            anomalies.append(self._validation_failure_anomaly(validation, mesa_id, dept_code, muni_code))
 
         return anomalies
 
+    # ============================================================
+    # Anomaly builders (shared by analyze_e14 and analyze_columns)
+    # ============================================================
+
+    def _arithmetic_anomaly(
+        self,
+        validation: Dict[str, Any],
+        mesa_id: str,
+        dept_code: str,
+        muni_code: str
+    ) -> DetectedAnomaly:
+        details = validation.get('details', {})
+        expected = details.get('expected', 0)
+        actual = details.get('actual', 0)
+        delta = abs(expected - actual)
+        return self._create_anomaly(
+            anomaly_type=AnomalyType.ARITHMETIC_MISMATCH,
+            severity=AnomalySeverity.CRITICAL if delta > 10 else AnomalySeverity.HIGH,
+            mesa_id=mesa_id,
+            dept_code=dept_code,
+            muni_code=muni_code,
+            description=f"Suma aritmética no cuadra: esperado {expected}, actual {actual} (delta: {delta})",
+            confidence=1.0,
+            details={
+                'expected': expected,
+                'actual': actual,
+                'delta': delta,
+                'rule_key': validation.get('rule_key', ''),
+            },
+            affected_fields=['vote_totals'],
+            suggested_action='REVIEW_AND_RECOUNT',
+        )
+
+    def _ocr_confidence_stats(self, ocr_fields: List[Dict[str, Any]]) -> Tuple[float, List[Dict[str, Any]]]:
+        """Average confidence and the fields below threshold."""
+        low_conf_fields = []
+        total_confidence = 0.0
+
+        for field in ocr_fields:
+            confidence = field.get('confidence', 1.0)
+            total_confidence += confidence
+
+            if confidence < self.config.OCR_CONFIDENCE_THRESHOLD:
+                low_conf_fields.append({
+                    'field_key': field.get('field_key'),
+                    'confidence': confidence,
+                })
+
+        return total_confidence / len(ocr_fields), low_conf_fields
+
+    def _ocr_anomaly(
+        self,
+        avg_confidence: float,
+        low_conf_fields: List[Dict[str, Any]],
+        mesa_id: str,
+        dept_code: str,
+        muni_code: str
+    ) -> DetectedAnomaly:
+        severity = AnomalySeverity.HIGH if avg_confidence < 0.5 else AnomalySeverity.MEDIUM
+        return self._create_anomaly(
+            anomaly_type=AnomalyType.OCR_LOW_CONFIDENCE,
+            severity=severity,
+            mesa_id=mesa_id,
+            dept_code=dept_code,
+            muni_code=muni_code,
+            description=f"Confianza OCR baja: promedio {avg_confidence:.1%}, {len(low_conf_fields)} campos bajo umbral",
+            confidence=1.0 - avg_confidence,
+            details={
+                'avg_confidence': avg_confidence,
+                'low_confidence_fields': low_conf_fields,
+                'threshold': self.config.OCR_CONFIDENCE_THRESHOLD,
+            },
+            affected_fields=[f['field_key'] for f in low_conf_fields],
+            suggested_action='MANUAL_REVIEW',
+        )
+
+    def _e11_anomaly(
+        self,
+        validation: Dict[str, Any],
+        mesa_id: str,
+        dept_code: str,
+        muni_code: str
+    ) -> DetectedAnomaly:
+        details = validation.get('details', {})
+        e11_count = details.get('e11_count', 0)
+        urna_count = details.get('urna_count', 0)
+        delta = abs(e11_count - urna_count)
+        return self._create_anomaly(
+            anomaly_type=AnomalyType.E11_URNA_MISMATCH,
+            severity=AnomalySeverity.HIGH if delta > 5 else AnomalySeverity.MEDIUM,
+            mesa_id=mesa_id,
+            dept_code=dept_code,
+            muni_code=muni_code,
+            description=f"Sufragantes E-11 ({e11_count}) ≠ Votos en urna ({urna_count})",
+            confidence=1.0,
+            details={
+                'e11_count': e11_count,
+                'urna_count': urna_count,
+                'delta': delta,
+            },
+            affected_fields=['total_sufragantes_e11', 'total_votos_urna'],
+            suggested_action='INVESTIGATE_DISCREPANCY',
+        )
+
+    def _negative_value_anomaly(
+        self,
+        field: Dict[str, Any],
+        mesa_id: str,
+        dept_code: str,
+        muni_code: str
+    ) -> DetectedAnomaly:
+        field_key = field.get('field_key', '')
+        value = field.get('value_int')
+        return self._create_anomaly(
+            anomaly_type=AnomalyType.IMPOSSIBLE_VALUE,
+            severity=AnomalySeverity.CRITICAL,
+            mesa_id=mesa_id,
+            dept_code=dept_code,
+            muni_code=muni_code,
+            description=f"Valor negativo detectado en {field_key}: {value}",
+            confidence=1.0,
+            details={'field_key': field_key, 'value': value},
+            affected_fields=[field_key],
+            suggested_action='MANUAL_CORRECTION',
+        )
+
+    def _high_value_anomaly(
+        self,
+        field: Dict[str, Any],
+        mesa_id: str,
+        dept_code: str,
+        muni_code: str
+    ) -> DetectedAnomaly:
+        field_key = field.get('field_key', '')
+        value = field.get('value_int')
+        return self._create_anomaly(
+            anomaly_type=AnomalyType.IMPOSSIBLE_VALUE,
+            severity=AnomalySeverity.HIGH,
+            mesa_id=mesa_id,
+            dept_code=dept_code,
+            muni_code=muni_code,
+            description=f"Valor inusualmente alto en {field_key}: {value}",
+            confidence=0.8,
+            details={'field_key': field_key, 'value': value},
+            affected_fields=[field_key],
+            suggested_action='VERIFY_VALUE',
+        )
+
+    def _validation_failure_anomaly(
+        self,
+        validation: Dict[str, Any],
+        mesa_id: str,
+        dept_code: str,
+        muni_code: str
+    ) -> DetectedAnomaly:
+        rule_key = validation.get('rule_key', '')
+        severity_map = {
+            'CRITICAL': AnomalySeverity.CRITICAL,
+            'HIGH': AnomalySeverity.HIGH,
+            'MEDIUM': AnomalySeverity.MEDIUM,
+            'LOW': AnomalySeverity.LOW,
+        }
+        severity = severity_map.get(
+            validation.get('severity', 'MEDIUM'),
+            AnomalySeverity.MEDIUM
+        )
+        return self._create_anomaly(
+            anomaly_type=AnomalyType.STATISTICAL_OUTLIER,  # Generic type for other failures
+            severity=severity,
+            mesa_id=mesa_id,
+            dept_code=dept_code,
+            muni_code=muni_code,
+            description=f"Validación fallida: {rule_key}",
+            confidence=1.0,
+            details=validation.get('details', {}),
+            affected_fields=[],
+            suggested_action='REVIEW_VALIDATION',
+        )
+
     def _detect_geographic_clusters(
         self,
         forms: List[Dict[str, Any]],
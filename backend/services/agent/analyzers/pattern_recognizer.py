@@ -2,17 +2,23 @@
 Pattern Recognizer.
 Recognizes patterns across electoral data for intelligence insights.
 """
+import bisect
 import logging
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Set, Tuple
 from dataclasses import dataclass, field
-from collections import defaultdict
+from collections import Counter, defaultdict
 from enum import Enum
 
 from services.agent.config import AgentConfig, get_agent_config
+from services.agent.analyzers.pattern_windows import (
+    KeyIndex, TimeWindow, WindowEntry, parse_timestamp, to_epoch
+)
 
 logger = logging.getLogger(__name__)
 
+_MISSING_TIMESTAMP = datetime(2000, 1, 1)
+
 
 class PatternType(str, Enum):
     """Types of patterns that can be recognized."""
@@ -59,6 +65,13 @@ class RecognizedPattern:
 class PatternRecognizer:
     """
     Recognizes patterns in electoral data for intelligence purposes.
+
+    Detection is incremental. Each anomaly is parsed once and indexed by
+    municipality, hour, 5-minute window and type, with running counts per
+    key. A new event only marks its own keys dirty, and each detector
+    re-evaluates just the dirty keys. The exception is the temporal-spike
+    average: when it drops, all hours in the window (at most a handful)
+    are re-evaluated.
     """
 
     def __init__(self, config: Optional[AgentConfig] = None):
@@ -71,11 +84,6 @@ class PatternRecognizer:
         self.config = config or get_agent_config()
         self._pattern_counter = 0
 
-        # Data buffers for pattern detection
-        self._anomaly_buffer: List[Dict[str, Any]] = []
-        self._incident_buffer: List[Dict[str, Any]] = []
-        self._form_buffer: List[Dict[str, Any]] = []
-
         # Detected patterns cache
         self._detected_patterns: Dict[str, RecognizedPattern] = {}
 
@@ -83,6 +91,29 @@ class PatternRecognizer:
         self._buffer_max_age_hours = 6
         self._buffer_max_size = 10000
 
+        # Data buffers for pattern detection
+        max_age_seconds = self._buffer_max_age_hours * 3600
+        self._anomalies = TimeWindow(max_age_seconds, self._buffer_max_size)
+        self._incidents = TimeWindow(max_age_seconds, self._buffer_max_size)
+        self._forms = TimeWindow(max_age_seconds, self._buffer_max_size)
+
+        # Running groupings of the live anomalies
+        self._by_muni = KeyIndex()
+        self._by_hour = KeyIndex()
+        self._by_type = KeyIndex()
+        self._by_window = KeyIndex()
+        self._hour_total = 0
+        self._window_munis: Dict[str, Counter] = {}
+        self._type_deltas: Dict[str, List[float]] = {}  # sorted non-zero deltas
+        self._type_delta_sum: Dict[str, float] = defaultdict(float)
+
+        # Keys touched since their detector last ran (dicts keep insertion order)
+        self._dirty_munis: Dict[str, None] = {}
+        self._dirty_hours: Dict[str, None] = {}
+        self._dirty_types: Dict[str, None] = {}
+        self._dirty_windows: Dict[str, None] = {}
+        self._all_hours_dirty = False
+
         logger.info("PatternRecognizer initialized")
 
     def add_anomaly(self, anomaly: Dict[str, Any]) -> List[RecognizedPattern]:
@@ -95,8 +126,8 @@ class PatternRecognizer:
         Returns:
             List of newly detected patterns
         """
-        self._anomaly_buffer.append(anomaly)
-        self._cleanup_buffer(self._anomaly_buffer, 'detected_at')
+        self._add_anomaly(anomaly)
+        self._expire_anomalies()
         return self._check_patterns()
 
     def add_incident(self, incident: Dict[str, Any]) -> List[RecognizedPattern]:
@@ -109,8 +140,8 @@ class PatternRecognizer:
         Returns:
             List of newly detected patterns
         """
-        self._incident_buffer.append(incident)
-        self._cleanup_buffer(self._incident_buffer, 'created_at')
+        self._incidents.add(incident, parse_timestamp(incident.get('created_at')))
+        self._incidents.expire(self._now_epoch())
         return self._check_patterns()
 
     def add_form(self, form: Dict[str, Any]) -> List[RecognizedPattern]:
@@ -123,8 +154,8 @@ class PatternRecognizer:
         Returns:
             List of newly detected patterns
         """
-        self._form_buffer.append(form)
-        self._cleanup_buffer(self._form_buffer, 'produced_at')
+        self._forms.add(form, parse_timestamp(form.get('produced_at')))
+        self._forms.expire(self._now_epoch())
         return self._check_patterns()
 
     def analyze_batch(
@@ -145,19 +176,102 @@ class PatternRecognizer:
             List of detected patterns
         """
         # Add to buffers
-        self._anomaly_buffer.extend(anomalies)
-        self._incident_buffer.extend(incidents)
-        if forms:
-            self._form_buffer.extend(forms)
+        for anomaly in anomalies:
+            self._add_anomaly(anomaly)
+        for incident in incidents:
+            self._incidents.add(incident, parse_timestamp(incident.get('created_at')))
+        for form in forms or []:
+            self._forms.add(form, parse_timestamp(form.get('produced_at')))
 
         # Cleanup
-        self._cleanup_buffer(self._anomaly_buffer, 'detected_at')
-        self._cleanup_buffer(self._incident_buffer, 'created_at')
-        self._cleanup_buffer(self._form_buffer, 'produced_at')
+        now_epoch = self._now_epoch()
+        self._expire_anomalies(now_epoch)
+        self._incidents.expire(now_epoch)
+        self._forms.expire(now_epoch)
 
         # Detect patterns
         return self._check_patterns()
 
+    # ============================================================
+    # Incremental indexing
+    # ============================================================
+
+    @staticmethod
+    def _now_epoch() -> float:
+        return to_epoch(datetime.utcnow())
+
+    def _add_anomaly(self, anomaly: Dict[str, Any]) -> None:
+        """Buffer an anomaly and fold it into the running groupings."""
+        ts = parse_timestamp(anomaly.get('detected_at'))
+        hour_key = window_key = None
+        if ts is not None:
+            hour_key = ts.strftime('%Y-%m-%dT%H')
+            window_key = ts.strftime('%Y-%m-%dT%H:') + f"{(ts.minute // 5) * 5:02d}"
+        meta = (
+            anomaly.get('muni_code', 'unknown'),
+            anomaly.get('type', 'UNKNOWN'),
+            hour_key,
+            window_key,
+            anomaly.get('delta') or None,
+        )
+        entry = self._anomalies.add(anomaly, ts, meta)
+        muni, atype, hour_key, window_key, delta = meta
+
+        self._by_muni.add(muni, entry)
+        self._dirty_munis[muni] = None
+
+        self._by_type.add(atype, entry)
+        self._dirty_types[atype] = None
+        if delta:
+            bisect.insort(self._type_deltas.setdefault(atype, []), delta)
+            self._type_delta_sum[atype] += delta
+
+        if hour_key is not None:
+            self._hour_total += 1
+            if self._by_hour.add(hour_key, entry):
+                # A new hour lowers the average every other hour is compared with
+                self._all_hours_dirty = True
+            self._dirty_hours[hour_key] = None
+
+            self._by_window.add(window_key, entry)
+            self._window_munis.setdefault(window_key, Counter())[anomaly.get('muni_code', '')] += 1
+            self._dirty_windows[window_key] = None
+
+    def _expire_anomalies(self, now_epoch: Optional[float] = None) -> None:
+        """Apply the age/size limits and take the dropped anomalies out of the groupings."""
+        for entry in self._anomalies.expire(now_epoch or self._now_epoch()):
+            muni, atype, hour_key, window_key, delta = entry.meta
+            self._by_muni.remove(muni, entry)
+
+            self._by_type.remove(atype, entry)
+            if delta:
+                deltas = self._type_deltas[atype]
+                del deltas[bisect.bisect_left(deltas, delta)]
+                self._type_delta_sum[atype] -= delta
+                if not deltas:
+                    del self._type_deltas[atype]
+                    del self._type_delta_sum[atype]
+            # Similarity depends on every delta of the type
+            self._dirty_types[atype] = None
+
+            if hour_key is not None:
+                self._hour_total -= 1
+                self._by_hour.remove(hour_key, entry)
+                self._all_hours_dirty = True
+
+                self._by_window.remove(window_key, entry)
+                munis = self._window_munis[window_key]
+                muni_code = entry.data.get('muni_code', '')
+                munis[muni_code] -= 1
+                if not munis[muni_code]:
+                    del munis[muni_code]
+                if not munis:
+                    del self._window_munis[window_key]
+
+    # ============================================================
+    # Detectors
+    # ============================================================
+
     def _check_patterns(self) -> List[RecognizedPattern]:
         """Run all pattern detection algorithms."""
         new_patterns = []
@@ -181,137 +295,113 @@ class PatternRecognizer:
         return new_patterns
 
     def _detect_geographic_clusters(self) -> List[RecognizedPattern]:
-        """Detect geographic clustering of anomalies."""
+        """Detect geographic clustering of anomalies (municipalities touched since last run)."""
         patterns = []
-
-        # Group anomalies by municipality
-        by_muni: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
-        for anomaly in self._anomaly_buffer:
-            muni = anomaly.get('muni_code', 'unknown')
-            by_muni[muni].append(anomaly)
-
-        # Check for clusters
-        for muni_code, muni_anomalies in by_muni.items():
-            if len(muni_anomalies) >= self.config.GEOGRAPHIC_CLUSTER_THRESHOLD:
-                pattern_key = f"geo_cluster_{muni_code}"
-
-                # Skip if already detected recently
-                if pattern_key in self._detected_patterns:
-                    continue
-
-                # Get time window
-                times = [
-                    datetime.fromisoformat(a.get('detected_at', '2000-01-01'))
-                    for a in muni_anomalies
-                ]
-                time_window = (min(times), max(times))
-
-                pattern = self._create_pattern(
-                    pattern_type=PatternType.GEOGRAPHIC_CLUSTER,
-                    description=f"Cluster geográfico: {len(muni_anomalies)} anomalías en municipio {muni_code}",
-                    confidence=0.9,
-                    affected_areas=[muni_code],
-                    affected_mesas=[a.get('mesa_id', '') for a in muni_anomalies],
-                    time_window=time_window,
-                    evidence=muni_anomalies[:10],  # Limit evidence
-                    significance=min(1.0, len(muni_anomalies) / 20),
-                    recommended_action="INVESTIGATE_MUNICIPALITY",
-                )
-
-                self._detected_patterns[pattern_key] = pattern
-                patterns.append(pattern)
+        dirty, self._dirty_munis = self._dirty_munis, {}
+
+        for muni_code in dirty:
+            pattern_key = f"geo_cluster_{muni_code}"
+
+            # Skip if already detected recently
+            if pattern_key in self._detected_patterns:
+                continue
+            if self._by_muni.count(muni_code) < self.config.GEOGRAPHIC_CLUSTER_THRESHOLD:
+                continue
+
+            entries = self._by_muni.entries(muni_code)
+            muni_anomalies = [e.data for e in entries]
+
+            pattern = self._create_pattern(
+                pattern_type=PatternType.GEOGRAPHIC_CLUSTER,
+                description=f"Cluster geográfico: {len(muni_anomalies)} anomalías en municipio {muni_code}",
+                confidence=0.9,
+                affected_areas=[muni_code],
+                affected_mesas=[a.get('mesa_id', '') for a in muni_anomalies],
+                time_window=self._time_window(entries),
+                evidence=muni_anomalies[:10],  # Limit evidence
+                significance=min(1.0, len(muni_anomalies) / 20),
+                recommended_action="INVESTIGATE_MUNICIPALITY",
+            )
+
+            self._detected_patterns[pattern_key] = pattern
+            patterns.append(pattern)
 
         return patterns
 
     def _detect_temporal_spikes(self) -> List[RecognizedPattern]:
-        """Detect temporal spikes in anomaly frequency."""
+        """Detect temporal spikes in anomaly frequency (hour count > 3x the hourly average)."""
         patterns = []
 
-        if len(self._anomaly_buffer) < 10:
-            return patterns
-
-        # Group by hour
-        by_hour: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
-        for anomaly in self._anomaly_buffer:
-            timestamp = anomaly.get('detected_at', '')
-            if timestamp:
-                hour_key = timestamp[:13]  # YYYY-MM-DDTHH
-                by_hour[hour_key].append(anomaly)
-
-        # Calculate average and check for spikes
-        if len(by_hour) < 2:
+        # Not enough data yet: keep the dirty hours for a later run
+        if len(self._anomalies) < 10 or len(self._by_hour) < 2:
             return patterns
 
-        counts = [len(v) for v in by_hour.values()]
-        avg_count = sum(counts) / len(counts)
-
-        for hour_key, anomalies in by_hour.items():
-            if len(anomalies) > avg_count * 3:  # 3x average = spike
-                pattern_key = f"temporal_spike_{hour_key}"
-
-                if pattern_key in self._detected_patterns:
-                    continue
-
-                hour_start = datetime.fromisoformat(hour_key + ":00:00")
-                time_window = (hour_start, hour_start + timedelta(hours=1))
-
-                pattern = self._create_pattern(
-                    pattern_type=PatternType.TEMPORAL_SPIKE,
-                    description=f"Pico temporal: {len(anomalies)} anomalías en hora {hour_key}",
-                    confidence=0.8,
-                    affected_areas=list(set(a.get('muni_code', '') for a in anomalies)),
-                    affected_mesas=[a.get('mesa_id', '') for a in anomalies],
-                    time_window=time_window,
-                    evidence=anomalies[:10],
-                    significance=len(anomalies) / (avg_count * 5),
-                    recommended_action="MONITOR_CLOSELY",
-                )
-
-                self._detected_patterns[pattern_key] = pattern
-                patterns.append(pattern)
+        avg_count = self._hour_total / len(self._by_hour)
+        candidates = self._by_hour.keys() if self._all_hours_dirty else list(self._dirty_hours)
+        self._dirty_hours = {}
+        self._all_hours_dirty = False
+
+        for hour_key in candidates:
+            count = self._by_hour.count(hour_key)
+            if not count or count <= avg_count * 3:  # 3x average = spike
+                continue
+            pattern_key = f"temporal_spike_{hour_key}"
+
+            if pattern_key in self._detected_patterns:
+                continue
+
+            anomalies = [e.data for e in self._by_hour.entries(hour_key)]
+            hour_start = datetime.fromisoformat(hour_key + ":00:00")
+            time_window = (hour_start, hour_start + timedelta(hours=1))
+
+            pattern = self._create_pattern(
+                pattern_type=PatternType.TEMPORAL_SPIKE,
+                description=f"Pico temporal: {len(anomalies)} anomalías en hora {hour_key}",
+                confidence=0.8,
+                affected_areas=list(set(a.get('muni_code', '') for a in anomalies)),
+                affected_mesas=[a.get('mesa_id', '') for a in anomalies],
+                time_window=time_window,
+                evidence=anomalies[:10],
+                significance=len(anomalies) / (avg_count * 5),
+                recommended_action="MONITOR_CLOSELY",
+            )
+
+            self._detected_patterns[pattern_key] = pattern
+            patterns.append(pattern)
 
         return patterns
 
     def _detect_systematic_errors(self) -> List[RecognizedPattern]:
         """Detect systematic errors (same type of error repeated)."""
         patterns = []
-
-        # Group by anomaly type
-        by_type: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
-        for anomaly in self._anomaly_buffer:
-            atype = anomaly.get('type', 'UNKNOWN')
-            by_type[atype].append(anomaly)
-
-        # Check for systematic patterns
-        for atype, anomalies in by_type.items():
-            if len(anomalies) >= 10:
-                # Check if similar details
-                if self._are_similar(anomalies):
-                    pattern_key = f"systematic_{atype}"
-
-                    if pattern_key in self._detected_patterns:
-                        continue
-
-                    times = [
-                        datetime.fromisoformat(a.get('detected_at', '2000-01-01'))
-                        for a in anomalies
-                    ]
-                    time_window = (min(times), max(times))
-
-                    pattern = self._create_pattern(
-                        pattern_type=PatternType.SYSTEMATIC_ERROR,
-                        description=f"Error sistemático tipo {atype}: {len(anomalies)} ocurrencias similares",
-                        confidence=0.85,
-                        affected_areas=list(set(a.get('muni_code', '') for a in anomalies)),
-                        affected_mesas=[a.get('mesa_id', '') for a in anomalies],
-                        time_window=time_window,
-                        evidence=anomalies[:10],
-                        significance=min(1.0, len(anomalies) / 30),
-                        recommended_action="INVESTIGATE_ROOT_CAUSE",
-                    )
-
-                    self._detected_patterns[pattern_key] = pattern
-                    patterns.append(pattern)
+        dirty, self._dirty_types = self._dirty_types, {}
+
+        for atype in dirty:
+            pattern_key = f"systematic_{atype}"
+
+            if pattern_key in self._detected_patterns:
+                continue
+            # Check if similar details
+            if self._by_type.count(atype) < 10 or not self._are_similar(atype):
+                continue
+
+            entries = self._by_type.entries(atype)
+            anomalies = [e.data for e in entries]
+
+            pattern = self._create_pattern(
+                pattern_type=PatternType.SYSTEMATIC_ERROR,
+                description=f"Error sistemático tipo {atype}: {len(anomalies)} ocurrencias similares",
+                confidence=0.85,
+                affected_areas=list(set(a.get('muni_code', '') for a in anomalies)),
+                affected_mesas=[a.get('mesa_id', '') for a in anomalies],
+                time_window=self._time_window(entries),
+                evidence=anomalies[:10],
+                significance=min(1.0, len(anomalies) / 30),
+                recommended_action="INVESTIGATE_ROOT_CAUSE",
+            )
+
+            self._detected_patterns[pattern_key] = pattern
+            patterns.append(pattern)
 
         return patterns
 
@@ -319,68 +409,70 @@ class PatternRecognizer:
         """Detect potential coordination signals (suspiciously similar timing)."""
         patterns = []
 
-        if len(self._anomaly_buffer) < 20:
+        # Not enough data yet: keep the dirty windows for a later run
+        if len(self._anomalies) < 20:
             return patterns
 
-        # Group by 5-minute windows
-        by_window: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
-        for anomaly in self._anomaly_buffer:
-            timestamp = anomaly.get('detected_at', '')
-            if timestamp:
-                # Round to 5-minute window
-                dt = datetime.fromisoformat(timestamp)
-                window_key = dt.strftime('%Y-%m-%dT%H:') + f"{(dt.minute // 5) * 5:02d}"
-                by_window[window_key].append(anomaly)
-
-        # Check for suspicious clustering in time
-        for window_key, anomalies in by_window.items():
-            if len(anomalies) >= 5:
-                # Check if from different municipalities (suspicious coordination)
-                municipalities = set(a.get('muni_code', '') for a in anomalies)
-                if len(municipalities) >= 3:
-                    pattern_key = f"coordination_{window_key}"
-
-                    if pattern_key in self._detected_patterns:
-                        continue
-
-                    window_start = datetime.fromisoformat(window_key + ":00")
-                    time_window = (window_start, window_start + timedelta(minutes=5))
-
-                    pattern = self._create_pattern(
-                        pattern_type=PatternType.COORDINATION_SIGNAL,
-                        description=f"Señal de coordinación: {len(anomalies)} anomalías en {len(municipalities)} municipios en 5min",
-                        confidence=0.7,
-                        affected_areas=list(municipalities),
-                        affected_mesas=[a.get('mesa_id', '') for a in anomalies],
-                        time_window=time_window,
-                        evidence=anomalies[:10],
-                        significance=len(municipalities) / 10,
-                        recommended_action="FLAG_FOR_ANALYSIS",
-                    )
-
-                    self._detected_patterns[pattern_key] = pattern
-                    patterns.append(pattern)
+        dirty, self._dirty_windows = self._dirty_windows, {}
+
+        # Check for suspicious clustering in 5-minute windows
+        for window_key in dirty:
+            if self._by_window.count(window_key) < 5:
+                continue
+            # Check if from different municipalities (suspicious coordination)
+            municipalities = self._window_munis.get(window_key, {})
+            if len(municipalities) < 3:
+                continue
+            pattern_key = f"coordination_{window_key}"
+
+            if pattern_key in self._detected_patterns:
+                continue
+
+            anomalies = [e.data for e in self._by_window.entries(window_key)]
+            window_start = datetime.fromisoformat(window_key + ":00")
+            time_window = (window_start, window_start + timedelta(minutes=5))
+
+            pattern = self._create_pattern(
+                pattern_type=PatternType.COORDINATION_SIGNAL,
+                description=f"Señal de coordinación: {len(anomalies)} anomalías en {len(municipalities)} municipios en 5min",
+                confidence=0.7,
+                affected_areas=list(municipalities),
+                affected_mesas=[a.get('mesa_id', '') for a in anomalies],
+                time_window=time_window,
+                evidence=anomalies[:10],
+                significance=len(municipalities) / 10,
+                recommended_action="FLAG_FOR_ANALYSIS",
+            )
+
+            self._detected_patterns[pattern_key] = pattern
+            patterns.append(pattern)
 
         return patterns
 
-    def _are_similar(self, anomalies: List[Dict[str, Any]]) -> bool:
-        """Check if anomalies have similar characteristics."""
-        if len(anomalies) < 2:
+    def _are_similar(self, atype: str) -> bool:
+        """
+        Check if anomalies of a type have similar characteristics: over 70%
+        of the non-zero deltas within 20% of their mean. Range count on the
+        sorted deltas, O(log n).
+        """
+        deltas = self._type_deltas.get(atype)
+        if not deltas or self._by_type.count(atype) < 2:
             return False
 
-        # Check if delta values are similar (within 20%)
-        deltas = [a.get('delta', 0) for a in anomalies if a.get('delta')]
-        if deltas:
-            avg_delta = sum(deltas) / len(deltas)
-            if avg_delta > 0:
-                similar_count = sum(
-                    1 for d in deltas
-                    if abs(d - avg_delta) / avg_delta < 0.2
-                )
-                if similar_count / len(deltas) > 0.7:
-                    return True
+        avg_delta = self._type_delta_sum[atype] / len(deltas)
+        if avg_delta <= 0:
+            return False
+        similar_count = (
+            bisect.bisect_left(deltas, avg_delta * 1.2)
+            - bisect.bisect_right(deltas, avg_delta * 0.8)
+        )
+        return similar_count / len(deltas) > 0.7
 
-        return False
+    @staticmethod
+    def _time_window(entries: List[WindowEntry]) -> Tuple[datetime, datetime]:
+        """(earliest, latest) detection time; anomalies without one count as 2000-01-01."""
+        times = [e.ts or _MISSING_TIMESTAMP for e in entries]
+        return min(times), max(times)
 
     def _create_pattern(
         self,
@@ -410,16 +502,6 @@ class PatternRecognizer:
             detected_at=datetime.utcnow(),
         )
 
-    def _cleanup_buffer(self, buffer: List[Dict[str, Any]], timestamp_field: str) -> None:
-        """Clean up old entries from buffer."""
-        cutoff = datetime.utcnow() - timedelta(hours=self._buffer_max_age_hours)
-        cutoff_str = cutoff.isoformat()
-
-        buffer[:] = [
-            item for item in buffer
-            if item.get(timestamp_field, '9999') > cutoff_str
-        ][-self._buffer_max_size:]
-
     def get_recent_patterns(self, limit: int = 20) -> List[Dict[str, Any]]:
         """Get recently detected patterns."""
         patterns = sorted(
@@ -435,8 +517,8 @@ class PatternRecognizer:
             'patterns_detected': self._pattern_counter,
             'active_patterns': len(self._detected_patterns),
             'buffer_sizes': {
-                'anomalies': len(self._anomaly_buffer),
-                'incidents': len(self._incident_buffer),
-                'forms': len(self._form_buffer),
+                'anomalies': len(self._anomalies),
+                'incidents': len(self._incidents),
+                'forms': len(self._forms),
             },
         }
@@ -0,0 +1,180 @@
+"""
+Time-windowed event buffers for PatternRecognizer.
+
+Events are parsed once on arrival and kept in per-minute buckets, with a
+heap of bucket keys in time order. Expiring everything older than the
+window pops whole buckets; only the bucket straddling the cutoff is sorted
+and trimmed entry by entry. A deque in arrival order enforces the size
+cap. Expired and evicted entries are handed back to the caller so its
+running counters (KeyIndex groups) stay in step.
+"""
+import heapq
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, Hashable, Iterable, List, Optional
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """Naive UTC datetime from an ISO string or datetime; None if missing or unparseable."""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        dt = value
+    else:
+        try:
+            dt = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def to_epoch(dt: datetime) -> float:
+    """Seconds since the epoch for a naive UTC datetime."""
+    return (dt - EPOCH).total_seconds()
+
+
+class WindowEntry:
+    """One buffered event: the raw dict, its parsed timestamp and caller metadata."""
+
+    __slots__ = ('seq', 'data', 'ts', 'epoch', 'meta', 'alive')
+
+    def __init__(self, seq: int, data: Dict[str, Any], ts: Optional[datetime], meta: Any):
+        self.seq = seq
+        self.data = data
+        self.ts = ts
+        self.epoch = to_epoch(ts) if ts is not None else None
+        self.meta = meta
+        self.alive = True
+
+
+class TimeWindow:
+    """
+    Events younger than max_age_seconds, at most max_size of them.
+
+    Entries without a timestamp never expire by age, only by the size cap
+    (the newest max_size arrivals are kept).
+    """
+
+    def __init__(self, max_age_seconds: float, max_size: int, bucket_seconds: int = 60):
+        self.max_age_seconds = max_age_seconds
+        self.max_size = max_size
+        self.bucket_seconds = bucket_seconds
+
+        self._buckets: Dict[int, List[WindowEntry]] = {}
+        self._bucket_keys: List[int] = []  # min-heap of bucket keys
+        self._head_sorted = False  # bucket at _bucket_keys[0] sorted newest-first
+        self._arrivals: Deque[WindowEntry] = deque()
+        self._size = 0
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, data: Dict[str, Any], ts: Optional[datetime], meta: Any = None) -> WindowEntry:
+        """Buffer an event; call expire() afterwards to apply the age and size limits."""
+        entry = WindowEntry(self._seq, data, ts, meta)
+        self._seq += 1
+        self._arrivals.append(entry)
+        self._size += 1
+
+        if entry.epoch is not None:
+            key = int(entry.epoch // self.bucket_seconds)
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                self._buckets[key] = [entry]
+                heapq.heappush(self._bucket_keys, key)
+                if self._bucket_keys[0] == key:
+                    self._head_sorted = False
+            else:
+                bucket.append(entry)
+                if self._bucket_keys[0] == key:
+                    self._head_sorted = False
+        return entry
+
+    def expire(self, now_epoch: float) -> List[WindowEntry]:
+        """Drop entries at or before now - max_age, then the oldest arrivals over max_size."""
+        removed: List[WindowEntry] = []
+        cutoff = now_epoch - self.max_age_seconds
+
+        while self._bucket_keys:
+            key = self._bucket_keys[0]
+            bucket = self._buckets[key]
+            if (key + 1) * self.bucket_seconds <= cutoff:
+                # Whole bucket is older than the cutoff
+                self._pop_head_bucket(key)
+                self._kill_all(bucket, removed)
+                continue
+            if key * self.bucket_seconds <= cutoff:
+                # Bucket straddles the cutoff: trim its oldest entries
+                if not self._head_sorted:
+                    bucket.sort(key=lambda entry: entry.epoch, reverse=True)
+                    self._head_sorted = True
+                while bucket and bucket[-1].epoch <= cutoff:
+                    self._kill(bucket.pop(), removed)
+                if not bucket:
+                    self._pop_head_bucket(key)
+                    continue
+            break
+
+        while self._size > self.max_size:
+            self._kill(self._arrivals.popleft(), removed)
+        while self._arrivals and not self._arrivals[0].alive:
+            self._arrivals.popleft()
+        return removed
+
+    def _pop_head_bucket(self, key: int) -> None:
+        heapq.heappop(self._bucket_keys)
+        del self._buckets[key]
+        self._head_sorted = False
+
+    def _kill_all(self, entries: Iterable[WindowEntry], removed: List[WindowEntry]) -> None:
+        for entry in entries:
+            self._kill(entry, removed)
+
+    def _kill(self, entry: WindowEntry, removed: List[WindowEntry]) -> None:
+        if entry.alive:
+            entry.alive = False
+            self._size -= 1
+            removed.append(entry)
+
+
+class KeyIndex:
+    """Live entries grouped by key, each group in arrival order."""
+
+    def __init__(self):
+        self._groups: Dict[Hashable, Dict[int, WindowEntry]] = {}
+
+    def __len__(self) -> int:
+        return len(self._groups)
+
+    def add(self, key: Hashable, entry: WindowEntry) -> bool:
+        """Add entry under key; True if the key is new."""
+        group = self._groups.get(key)
+        if group is None:
+            self._groups[key] = {entry.seq: entry}
+            return True
+        group[entry.seq] = entry
+        return False
+
+    def remove(self, key: Hashable, entry: WindowEntry) -> None:
+        group = self._groups.get(key)
+        if group is None:
+            return
+        group.pop(entry.seq, None)
+        if not group:
+            del self._groups[key]
+
+    def count(self, key: Hashable) -> int:
+        group = self._groups.get(key)
+        return len(group) if group else 0
+
+    def entries(self, key: Hashable) -> List[WindowEntry]:
+        group = self._groups.get(key)
+        return list(group.values()) if group else []
+
+    def keys(self) -> List[Hashable]:
+        return list(self._groups)
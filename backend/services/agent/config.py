@@ -2,9 +2,10 @@
 Configuration for the Electoral Intelligence Agent.
 All thresholds and intervals are configurable via environment variables.
 """
+import json
 import os
 from dataclasses import dataclass, field
-from typing import Dict, List
+from typing import Any, Dict, List
 from enum import Enum
 
 
@@ -34,14 +35,35 @@ class HITLRequirement(str, Enum):
     RECOMMENDATION = "recommendation"
 
 
+# Event types a rule can apply to (see DecisionEngine)
+RULE_EVENTS = ('e14', 'incident', 'deadline', 'cluster', 'briefing')
+
+
 @dataclass
 class RuleConfig:
-    """Configuration for an agent decision rule."""
+    """
+    Configuration for an agent decision rule.
+
+    condition is compiled by services.agent.rule_compiler and evaluated
+    against the context the DecisionEngine builds for the rule's event.
+    """
     name: str
     condition: str
     action: AgentAction
     hitl_required: HITLRequirement = HITLRequirement.AUTOMATIC
     description: str = ""
+    event: str = "e14"
+    priority: str = "P2"
+    enabled: bool = True
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'RuleConfig':
+        """Create from a rules-file entry."""
+        values = {k: v for k, v in data.items() if k in cls.__dataclass_fields__}
+        values['action'] = AgentAction(values['action'])
+        if 'hitl_required' in values:
+            values['hitl_required'] = HITLRequirement(values['hitl_required'])
+        return cls(**values)
 
 
 @dataclass
@@ -54,6 +76,14 @@ class AgentConfig:
     KPI_POLL_INTERVAL: int = int(os.getenv('AGENT_KPI_POLL_INTERVAL', '60'))
     DEADLINE_POLL_INTERVAL: int = int(os.getenv('AGENT_DEADLINE_POLL_INTERVAL', '60'))
 
+    # Batch processing
+    E14_BATCH_SIZE: int = int(os.getenv('AGENT_E14_BATCH_SIZE', '1000'))
+    ACTION_CONCURRENCY: int = int(os.getenv('AGENT_ACTION_CONCURRENCY', '8'))
+
+    # Rules file (JSON list of RuleConfig entries), re-read when it changes
+    RULES_FILE: str = os.getenv('AGENT_RULES_FILE', '')
+    RULES_RELOAD_INTERVAL: int = int(os.getenv('AGENT_RULES_RELOAD_INTERVAL', '5'))
+
     # Detection thresholds
     OCR_CONFIDENCE_THRESHOLD: float = float(os.getenv('AGENT_OCR_CONFIDENCE_THRESHOLD', '0.70'))
     ANOMALY_SCORE_THRESHOLD: float = float(os.getenv('AGENT_ANOMALY_SCORE_THRESHOLD', '0.80'))
@@ -108,82 +138,156 @@ class AgentConfig:
             # Contienda Electoral rules
             RuleConfig(
                 name="auto_incident_arithmetic",
-                condition="anomaly.type == ARITHMETIC_MISMATCH AND anomaly.delta > ARITHMETIC_DELTA_THRESHOLD",
+                condition="arithmetic_delta > ARITHMETIC_DELTA_THRESHOLD",
                 action=AgentAction.CREATE_INCIDENT,
                 hitl_required=HITLRequirement.AUTOMATIC,
-                description="Auto-create P0 incident for arithmetic mismatches"
+                description="Auto-create P0 incident for arithmetic mismatches",
+                event="e14",
+                priority="P0"
             ),
             RuleConfig(
                 name="auto_incident_low_ocr",
-                condition="form.ocr_confidence < OCR_CONFIDENCE_THRESHOLD",
+                condition="ocr_confidence < OCR_CONFIDENCE_THRESHOLD",
                 action=AgentAction.CREATE_INCIDENT,
                 hitl_required=HITLRequirement.AUTOMATIC,
-                description="Auto-create P1 incident for low OCR confidence"
+                description="Auto-create P1 incident for low OCR confidence",
+                event="e14",
+                priority="P1"
             ),
             RuleConfig(
                 name="sla_warning_p0",
-                condition="incident.severity == P0 AND sla_remaining < SLA_WARNING_P0",
+                condition="severity == P0 AND sla_remaining_minutes < SLA_WARNING_P0 AND NOT closed",
                 action=AgentAction.DISPATCH_SLA_ALERT,
                 hitl_required=HITLRequirement.AUTOMATIC,
-                description="Dispatch critical alert when P0 SLA is about to breach"
+                description="Dispatch critical alert when P0 SLA is about to breach",
+                event="incident",
+                priority="P0"
             ),
             RuleConfig(
                 name="sla_warning_p1",
-                condition="incident.severity == P1 AND sla_remaining < SLA_WARNING_P1",
+                condition="severity == P1 AND sla_remaining_minutes < SLA_WARNING_P1 AND NOT closed",
                 action=AgentAction.DISPATCH_SLA_ALERT,
                 hitl_required=HITLRequirement.AUTOMATIC,
-                description="Dispatch warning when P1 SLA is about to breach"
+                description="Dispatch warning when P1 SLA is about to breach",
+                event="incident",
+                priority="P1"
+            ),
+            RuleConfig(
+                name="sla_warning_p2",
+                condition="severity == P2 AND sla_remaining_minutes < SLA_WARNING_P2 AND NOT closed",
+                action=AgentAction.DISPATCH_SLA_ALERT,
+                hitl_required=HITLRequirement.AUTOMATIC,
+                description="Dispatch warning when P2 SLA is about to breach",
+                event="incident",
+                priority="P1"
+            ),
+            RuleConfig(
+                name="sla_warning_p3",
+                condition="severity == P3 AND sla_remaining_minutes < 30 AND NOT closed",
+                action=AgentAction.DISPATCH_SLA_ALERT,
+                hitl_required=HITLRequirement.AUTOMATIC,
+                description="Dispatch warning when P3 SLA is about to breach",
+                event="incident",
+                priority="P1"
             ),
             RuleConfig(
                 name="escalate_to_legal",
-                condition="incident.severity == P0 AND incident.age > HITL_AUTO_ESCALATE_AFTER_MINUTES AND NOT resolved",
+                condition=(
+                    "severity == P0 AND age_minutes > HITL_AUTO_ESCALATE_AFTER_MINUTES "
+                    "AND NOT closed AND status != ESCALATED AND NOT escalated_to_legal"
+                ),
                 action=AgentAction.ESCALATE_TO_LEGAL,
                 hitl_required=HITLRequirement.SEMI_AUTOMATIC,
-                description="Escalate unresolved P0 incidents to legal team"
+                description="Escalate unresolved P0 incidents to legal team",
+                event="incident",
+                priority="P0"
             ),
 
             # Litigio Electoral rules
             RuleConfig(
                 name="art_223_deadline",
-                condition="cpaca_article == 223 AND deadline_hours < ART_223_WARNING_HOURS",
+                condition="cpaca_article == 223 AND hours_remaining < ART_223_WARNING_HOURS",
+                action=AgentAction.DISPATCH_SLA_ALERT,
+                hitl_required=HITLRequirement.AUTOMATIC,
+                description="Alert on Art. 223 deadline approaching",
+                event="deadline",
+                priority="P0"
+            ),
+            RuleConfig(
+                name="recount_deadline",
+                condition="deadline_type == RECOUNT AND days_remaining < RECOUNT_WARNING_DAYS",
+                action=AgentAction.DISPATCH_SLA_ALERT,
+                hitl_required=HITLRequirement.AUTOMATIC,
+                description="Alert on recount deadline approaching",
+                event="deadline",
+                priority="P1"
+            ),
+            RuleConfig(
+                name="nullity_deadline",
+                condition="deadline_type == NULLITY AND days_remaining < NULLITY_WARNING_DAYS",
                 action=AgentAction.DISPATCH_SLA_ALERT,
                 hitl_required=HITLRequirement.AUTOMATIC,
-                description="Alert on Art. 223 deadline approaching"
+                description="Alert on nullity deadline approaching",
+                event="deadline",
+                priority="P1"
             ),
             RuleConfig(
                 name="nullity_recommendation",
-                condition="nullity_viability > NULLITY_VIABILITY_THRESHOLD AND affected_votes > 500",
+                condition="escalated_to_legal AND delta_value > 500",
                 action=AgentAction.RECOMMEND_NULLITY,
                 hitl_required=HITLRequirement.SEMI_AUTOMATIC,
-                description="Recommend nullity action when viability is high"
+                description="Recommend nullity action when viability is high",
+                event="incident",
+                priority="P1"
             ),
             RuleConfig(
                 name="geographic_cluster",
-                condition="anomalies_in_municipality > GEOGRAPHIC_CLUSTER_THRESHOLD AND time_window < GEOGRAPHIC_CLUSTER_WINDOW_MINUTES",
+                condition="anomaly_count >= GEOGRAPHIC_CLUSTER_THRESHOLD",
                 action=AgentAction.CREATE_INCIDENT,
                 hitl_required=HITLRequirement.AUTOMATIC,
-                description="Create cluster alert for geographic anomaly concentration"
+                description="Create cluster alert for geographic anomaly concentration",
+                event="cluster",
+                priority="P0"
             ),
 
-            # Auto-classification
+            # Auto-classification (after the incident rules of the same form)
             RuleConfig(
                 name="auto_classify_cpaca",
-                condition="incident.created AND NOT incident.cpaca_classified",
+                condition="incident_decisions > 0",
                 action=AgentAction.CLASSIFY_CPACA,
                 hitl_required=HITLRequirement.AUTOMATIC,
-                description="Auto-classify incidents by CPACA article"
+                description="Auto-classify incidents by CPACA article",
+                event="e14",
+                priority="P2"
             ),
 
             # Briefings
             RuleConfig(
                 name="hourly_briefing",
-                condition="time_since_last_briefing > BRIEFING_INTERVAL_MINUTES",
+                condition="minutes_since_last_briefing >= BRIEFING_INTERVAL_MINUTES",
                 action=AgentAction.GENERATE_HOURLY_BRIEF,
                 hitl_required=HITLRequirement.AUTOMATIC,
-                description="Generate hourly intelligence briefing"
+                description="Generate hourly intelligence briefing",
+                event="briefing"
             ),
         ]
 
+    def load_rules_file(self, path: str) -> List[RuleConfig]:
+        """
+        Default rules overridden by the entries of a JSON rules file.
+
+        Entries replace the default rule with the same name (set
+        "enabled": false to switch one off); new names are appended.
+        """
+        with open(path, encoding='utf-8') as handle:
+            entries = json.load(handle)
+
+        rules = {rule.name: rule for rule in self._get_default_rules()}
+        for entry in entries:
+            rule = RuleConfig.from_dict(entry)
+            rules[rule.name] = rule
+        return list(rules.values())
+
     def get_sla_warning_minutes(self, severity: str) -> int:
         """Get SLA warning threshold for a given severity."""
         thresholds = {
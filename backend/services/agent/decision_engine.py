@@ -1,20 +1,39 @@
 """
 Decision Engine for the Electoral Intelligence Agent.
 Evaluates rules and determines which actions to take.
+
+The configured RuleConfig entries are compiled once into a decision table
+indexed by event type (e14, incident, deadline, cluster, briefing), so
+each evaluate_* call only tests the rules for its event. A rule's
+decisions are built by the builder registered under its name (or a
+generic one for rules added through the rules file). When
+AgentConfig.RULES_FILE is set, the table is recompiled whenever the
+file changes.
 """
 import logging
+import os
 import re
+import time
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from dataclasses import dataclass
 
+import numpy as np
+
 from services.agent.config import (
     AgentConfig,
     AgentAction,
     HITLRequirement,
     RuleConfig,
+    RULE_EVENTS,
     get_agent_config
 )
+from services.agent.rule_compiler import (
+    CompiledCondition,
+    RuleColumns,
+    RuleCompileError,
+    compile_condition
+)
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +60,17 @@ class Decision:
     rationale: str
 
 
+RuleBuilder = Callable[[RuleConfig, Dict[str, Any]], List[Decision]]
+
+
+@dataclass
+class CompiledRule:
+    """A rule with its compiled condition and decision builder."""
+    rule: RuleConfig
+    condition: CompiledCondition
+    build: RuleBuilder
+
+
 class DecisionEngine:
     """
     Evaluates rules and makes decisions for the agent.
@@ -55,8 +85,47 @@ class DecisionEngine:
             config: Agent configuration (uses singleton if None)
         """
         self.config = config or get_agent_config()
-        self._rule_evaluators = self._build_evaluators()
-        logger.info(f"DecisionEngine initialized with {len(self.config.rules)} rules")
+        self._builders: Dict[str, RuleBuilder] = {
+            'auto_incident_arithmetic': self._decide_arithmetic_incident,
+            'auto_incident_low_ocr': self._decide_low_ocr_incident,
+            'auto_classify_cpaca': self._decide_classify_cpaca,
+            'sla_warning_p0': self._decide_sla_warning,
+            'sla_warning_p1': self._decide_sla_warning,
+            'sla_warning_p2': self._decide_sla_warning,
+            'sla_warning_p3': self._decide_sla_warning,
+            'escalate_to_legal': self._decide_escalation,
+            'nullity_recommendation': self._decide_nullity_recommendation,
+            'art_223_deadline': self._decide_art_223_deadline,
+            'recount_deadline': self._decide_deadline_alert,
+            'nullity_deadline': self._decide_deadline_alert,
+            'geographic_cluster': self._decide_geographic_cluster,
+        }
+        self._rules_mtime: Optional[float] = None
+        self._rules_checked_at = float('-inf')
+        self._table = self._compile_rules()
+        self._maybe_reload_rules()
+        logger.info(f"DecisionEngine initialized with {self.rule_count} rules")
+
+    @property
+    def rule_count(self) -> int:
+        """Number of compiled (enabled) rules."""
+        return sum(len(rules) for rules in self._table.values())
+
+    def reload_rules(self, rules: Optional[List[RuleConfig]] = None) -> int:
+        """
+        Recompile the decision table, optionally replacing the configured rules.
+
+        Args:
+            rules: New rule set (recompiles config.rules if None)
+
+        Returns:
+            Number of compiled rules
+        """
+        if rules is not None:
+            self.config.rules = rules
+        self._table = self._compile_rules()
+        logger.info(f"DecisionEngine rules reloaded: {self.rule_count} rules")
+        return self.rule_count
 
     def evaluate_e14_form(self, form_data: Dict[str, Any]) -> List[Decision]:
         """
@@ -68,85 +137,89 @@ class DecisionEngine:
         Returns:
             List of decisions to execute
         """
-        decisions = []
-        context = self._build_e14_context(form_data)
+        self._maybe_reload_rules()
+        return self._evaluate('e14', self._build_e14_context(form_data))
 
-        # Check arithmetic mismatch
-        if self._check_arithmetic_mismatch(context):
-            decisions.append(Decision(
-                action=AgentAction.CREATE_INCIDENT,
-                hitl_required=HITLRequirement.AUTOMATIC,
-                priority="P0",
-                rule_name="auto_incident_arithmetic",
-                context={
-                    'incident_type': 'ARITHMETIC_FAIL',
-                    'mesa_id': context.get('mesa_id'),
-                    'delta': context.get('arithmetic_delta'),
-                    'expected': context.get('expected_total'),
-                    'actual': context.get('actual_total'),
-                },
-                rationale=f"Arithmetic mismatch detected: delta={context.get('arithmetic_delta')}"
-            ))
+    def evaluate_many(self, forms: List[Dict[str, Any]]) -> List[List[Decision]]:
+        """
+        Evaluate many E-14 forms column-wise.
 
-        # Check low OCR confidence
-        if self._check_low_ocr_confidence(context):
-            decisions.append(Decision(
-                action=AgentAction.CREATE_INCIDENT,
-                hitl_required=HITLRequirement.AUTOMATIC,
-                priority="P1",
-                rule_name="auto_incident_low_ocr",
-                context={
-                    'incident_type': 'OCR_LOW_CONF',
-                    'mesa_id': context.get('mesa_id'),
-                    'ocr_confidence': context.get('ocr_confidence'),
-                    'low_confidence_fields': context.get('low_confidence_fields', []),
-                },
-                rationale=f"Low OCR confidence: {context.get('ocr_confidence'):.2%}"
-            ))
+        OCR confidence and arithmetic delta are extracted into arrays once,
+        every e14 rule is tested as one array expression over the batch,
+        and decisions are built only for the rows where a rule fires.
+        Same decisions as evaluate_e14_form on each form.
 
-        # Auto-classify CPACA if incident would be created
-        if decisions:
-            decisions.append(Decision(
-                action=AgentAction.CLASSIFY_CPACA,
-                hitl_required=HITLRequirement.AUTOMATIC,
-                priority="P2",
-                rule_name="auto_classify_cpaca",
-                context={'mesa_id': context.get('mesa_id')},
-                rationale="Auto-classify for legal tracking"
-            ))
+        Args:
+            forms: E-14 forms (E14PayloadV2 format)
+
+        Returns:
+            Decisions per form, aligned with forms
+        """
+        self._maybe_reload_rules()
+        decisions: List[List[Decision]] = [[] for _ in forms]
+        rules = self._table.get('e14', [])
+        if not forms or not rules:
+            return decisions
+
+        columns = self._build_e14_columns(forms)
+        incident_decisions = np.zeros(len(forms), dtype=int)
+        columns.set_column('incident_decisions', incident_decisions)
+
+        for compiled in rules:
+            for index in np.flatnonzero(compiled.condition.test_columns(columns)):
+                fired = self._build_decisions(compiled, columns.row(index))
+                decisions[index].extend(fired)
+                incident_decisions[index] += self._count_incidents(fired)
 
         return decisions
 
-    def evaluate_incident(self, incident: Dict[str, Any]) -> List[Decision]:
+    def evaluate_e14_batch(
+        self,
+        forms: List[Dict[str, Any]],
+        anomalies: Optional[List[Any]] = None
+    ) -> Tuple[List[List[Decision]], List[Decision]]:
         """
-        Evaluate an incident and return decisions.
+        Evaluate a batch of E-14 forms.
 
         Args:
-            incident: Incident data
+            forms: E-14 forms (E14PayloadV2 format)
+            anomalies: Output of AnomalyDetector.analyze_batch for the same
+                forms; its geographic clusters become cluster decisions
 
         Returns:
-            List of decisions to execute
+            Tuple of (decisions per form, aligned with forms; batch-level decisions)
         """
-        decisions = []
-        context = self._build_incident_context(incident)
+        per_form = self.evaluate_many(forms)
+
+        batch_decisions = []
+        for anomaly in anomalies or []:
+            if anomaly.anomaly_type.value != 'GEOGRAPHIC_CLUSTER':
+                continue
+            detected_at = anomaly.detected_at.isoformat()
+            members = [
+                {'id': mesa_id, 'created_at': detected_at}
+                for mesa_id in anomaly.details.get('affected_mesas', [])
+            ]
+            batch_decisions.extend(self.evaluate_geographic_cluster(
+                anomaly.muni_code,
+                members,
+                self.config.GEOGRAPHIC_CLUSTER_WINDOW_MINUTES
+            ))
 
-        # Check SLA warning
-        sla_decision = self._check_sla_warning(context)
-        if sla_decision:
-            decisions.append(sla_decision)
+        return per_form, batch_decisions
 
-        # Check escalation need
-        escalation_decision = self._check_escalation_needed(context)
-        if escalation_decision:
-            decisions.append(escalation_decision)
+    def evaluate_incident(self, incident: Dict[str, Any]) -> List[Decision]:
+        """
+        Evaluate an incident and return decisions.
 
-        # Check nullity viability for legal incidents
-        if context.get('escalated_to_legal'):
-            nullity_decision = self._check_nullity_viability(context)
-            if nullity_decision:
-                decisions.append(nullity_decision)
+        Args:
+            incident: Incident data
 
-        return decisions
+        Returns:
+            List of decisions to execute
+        """
+        self._maybe_reload_rules()
+        return self._evaluate('incident', self._build_incident_context(incident))
 
     def evaluate_deadline(self, deadline_data: Dict[str, Any]) -> List[Decision]:
         """
@@ -158,61 +231,8 @@ class DecisionEngine:
         Returns:
             List of decisions to execute
         """
-        decisions = []
-        context = self._build_deadline_context(deadline_data)
-
-        # Check Art. 223 deadline
-        if context.get('cpaca_article') == 223:
-            hours_remaining = context.get('hours_remaining', 999)
-            if hours_remaining < self.config.ART_223_WARNING_HOURS:
-                decisions.append(Decision(
-                    action=AgentAction.DISPATCH_SLA_ALERT,
-                    hitl_required=HITLRequirement.AUTOMATIC,
-                    priority="P0",
-                    rule_name="art_223_deadline",
-                    context={
-                        'deadline_type': 'ART_223',
-                        'hours_remaining': hours_remaining,
-                        'incident_id': context.get('incident_id'),
-                    },
-                    rationale=f"Art. 223 deadline in {hours_remaining}h"
-                ))
-
-        # Check recount deadline
-        if context.get('deadline_type') == 'RECOUNT':
-            days_remaining = context.get('days_remaining', 999)
-            if days_remaining < self.config.RECOUNT_WARNING_DAYS:
-                decisions.append(Decision(
-                    action=AgentAction.DISPATCH_SLA_ALERT,
-                    hitl_required=HITLRequirement.AUTOMATIC,
-                    priority="P1",
-                    rule_name="recount_deadline",
-                    context={
-                        'deadline_type': 'RECOUNT',
-                        'days_remaining': days_remaining,
-                        'incident_id': context.get('incident_id'),
-                    },
-                    rationale=f"Recount deadline in {days_remaining} days"
-                ))
-
-        # Check nullity deadline
-        if context.get('deadline_type') == 'NULLITY':
-            days_remaining = context.get('days_remaining', 999)
-            if days_remaining < self.config.NULLITY_WARNING_DAYS:
-                decisions.append(Decision(
-                    action=AgentAction.DISPATCH_SLA_ALERT,
-                    hitl_required=HITLRequirement.AUTOMATIC,
-                    priority="P1",
-                    rule_name="nullity_deadline",
-                    context={
-                        'deadline_type': 'NULLITY',
-                        'days_remaining': days_remaining,
-                        'incident_id': context.get('incident_id'),
-                    },
-                    rationale=f"Nullity deadline in {days_remaining} days"
-                ))
-
-        return decisions
+        self._maybe_reload_rules()
+        return self._evaluate('deadline', self._build_deadline_context(deadline_data))
 
     def evaluate_geographic_cluster(
         self,
@@ -231,7 +251,7 @@ class DecisionEngine:
         Returns:
             List of decisions to execute
         """
-        decisions = []
+        self._maybe_reload_rules()
 
         # Filter recent anomalies
         cutoff = datetime.utcnow() - timedelta(minutes=time_window_minutes)
@@ -240,37 +260,12 @@ class DecisionEngine:
             if datetime.fromisoformat(a.get('created_at', '2000-01-01')) > cutoff
         ]
 
-        if len(recent_anomalies) >= self.config.GEOGRAPHIC_CLUSTER_THRESHOLD:
-            decisions.append(Decision(
-                action=AgentAction.CREATE_INCIDENT,
-                hitl_required=HITLRequirement.AUTOMATIC,
-                priority="P0",
-                rule_name="geographic_cluster",
-                context={
-                    'incident_type': 'GEOGRAPHIC_CLUSTER',
-                    'municipality_code': municipality_code,
-                    'anomaly_count': len(recent_anomalies),
-                    'time_window_minutes': time_window_minutes,
-                    'anomaly_ids': [a.get('id') for a in recent_anomalies],
-                },
-                rationale=f"Geographic cluster: {len(recent_anomalies)} anomalies in {time_window_minutes}min"
-            ))
-
-            # Flag high risk
-            decisions.append(Decision(
-                action=AgentAction.UPDATE_RISK_SCORES,
-                hitl_required=HITLRequirement.AUTOMATIC,
-                priority="P1",
-                rule_name="geographic_cluster",
-                context={
-                    'municipality_code': municipality_code,
-                    'risk_level': 'HIGH',
-                    'reason': 'geographic_cluster',
-                },
-                rationale="Update risk score due to geographic cluster"
-            ))
-
-        return decisions
+        return self._evaluate('cluster', {
+            'municipality_code': municipality_code,
+            'anomaly_count': len(recent_anomalies),
+            'time_window_minutes': time_window_minutes,
+            'anomaly_ids': [a.get('id') for a in recent_anomalies],
+        })
 
     def should_generate_briefing(self, last_briefing_at: Optional[datetime]) -> bool:
         """
@@ -288,8 +283,249 @@ class DecisionEngine:
         if last_briefing_at is None:
             return True
 
+        self._maybe_reload_rules()
         elapsed = (datetime.utcnow() - last_briefing_at).total_seconds() / 60
-        return elapsed >= self.config.BRIEFING_INTERVAL_MINUTES
+        context = {'minutes_since_last_briefing': elapsed}
+        return any(compiled.condition.test(context) for compiled in self._table.get('briefing', []))
+
+    # ============================================================
+    # Rule Compilation
+    # ============================================================
+
+    def _compile_rules(self) -> Dict[str, List[CompiledRule]]:
+        """Compile the enabled rules into the decision table, keeping config order per event."""
+        table: Dict[str, List[CompiledRule]] = {event: [] for event in RULE_EVENTS}
+        for rule in self.config.rules:
+            if not rule.enabled:
+                continue
+            if rule.event not in table:
+                logger.warning(f"Rule {rule.name} skipped: unknown event {rule.event!r}")
+                continue
+            try:
+                condition = compile_condition(rule.condition, self.config)
+            except RuleCompileError as e:
+                logger.error(f"Rule {rule.name} skipped: {e}")
+                continue
+            build = self._builders.get(rule.name, self._decide_generic)
+            table[rule.event].append(CompiledRule(rule=rule, condition=condition, build=build))
+        return table
+
+    def _maybe_reload_rules(self) -> None:
+        """Recompile if RULES_FILE changed (checked at most every RULES_RELOAD_INTERVAL seconds)."""
+        path = self.config.RULES_FILE
+        if not path:
+            return
+        now = time.monotonic()
+        if now - self._rules_checked_at < self.config.RULES_RELOAD_INTERVAL:
+            return
+        self._rules_checked_at = now
+
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return
+        if mtime == self._rules_mtime:
+            return
+        self._rules_mtime = mtime
+
+        try:
+            rules = self.config.load_rules_file(path)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.error(f"Could not load agent rules from {path}: {e}")
+            return
+        self.reload_rules(rules)
+
+    def _evaluate(self, event: str, context: Dict[str, Any]) -> List[Decision]:
+        """Run the rules of one event against a context, in table order."""
+        decisions: List[Decision] = []
+        context.setdefault('incident_decisions', 0)
+        for compiled in self._table.get(event, []):
+            if compiled.condition.test(context):
+                fired = self._build_decisions(compiled, context)
+                decisions.extend(fired)
+                context['incident_decisions'] += self._count_incidents(fired)
+        return decisions
+
+    def _build_decisions(self, compiled: CompiledRule, context: Dict[str, Any]) -> List[Decision]:
+        try:
+            return compiled.build(compiled.rule, context)
+        except Exception as e:
+            logger.error(f"Rule {compiled.rule.name} failed to build decisions: {e}", exc_info=True)
+            return []
+
+    @staticmethod
+    def _count_incidents(decisions: List[Decision]) -> int:
+        return sum(1 for d in decisions if d.action == AgentAction.CREATE_INCIDENT)
+
+    # ============================================================
+    # Decision Builders
+    # ============================================================
+
+    def _decide_arithmetic_incident(self, rule: RuleConfig, context: Dict[str, Any]) -> List[Decision]:
+        return [Decision(
+            action=rule.action,
+            hitl_required=rule.hitl_required,
+            priority=rule.priority,
+            rule_name=rule.name,
+            context={
+                'incident_type': 'ARITHMETIC_FAIL',
+                'mesa_id': context.get('mesa_id'),
+                'delta': context.get('arithmetic_delta'),
+                'expected': context.get('expected_total'),
+                'actual': context.get('actual_total'),
+            },
+            rationale=f"Arithmetic mismatch detected: delta={context.get('arithmetic_delta')}"
+        )]
+
+    def _decide_low_ocr_incident(self, rule: RuleConfig, context: Dict[str, Any]) -> List[Decision]:
+        return [Decision(
+            action=rule.action,
+            hitl_required=rule.hitl_required,
+            priority=rule.priority,
+            rule_name=rule.name,
+            context={
+                'incident_type': 'OCR_LOW_CONF',
+                'mesa_id': context.get('mesa_id'),
+                'ocr_confidence': context.get('ocr_confidence'),
+                'low_confidence_fields': context.get('low_confidence_fields', []),
+            },
+            rationale=f"Low OCR confidence: {context.get('ocr_confidence'):.2%}"
+        )]
+
+    def _decide_classify_cpaca(self, rule: RuleConfig, context: Dict[str, Any]) -> List[Decision]:
+        return [Decision(
+            action=rule.action,
+            hitl_required=rule.hitl_required,
+            priority=rule.priority,
+            rule_name=rule.name,
+            context={'mesa_id': context.get('mesa_id')},
+            rationale="Auto-classify for legal tracking"
+        )]
+
+    def _decide_sla_warning(self, rule: RuleConfig, context: Dict[str, Any]) -> List[Decision]:
+        sla_remaining = context.get('sla_remaining_minutes', 999)
+        return [Decision(
+            action=rule.action,
+            hitl_required=rule.hitl_required,
+            priority=rule.priority,
+            rule_name=rule.name,
+            context={
+                'incident_id': context.get('incident_id'),
+                'severity': context.get('severity'),
+                'sla_remaining_minutes': sla_remaining,
+            },
+            rationale=f"SLA breach imminent: {sla_remaining:.0f}min remaining"
+        )]
+
+    def _decide_escalation(self, rule: RuleConfig, context: Dict[str, Any]) -> List[Decision]:
+        age_minutes = context.get('age_minutes', 0)
+        return [Decision(
+            action=rule.action,
+            hitl_required=rule.hitl_required,
+            priority=rule.priority,
+            rule_name=rule.name,
+            context={
+                'incident_id': context.get('incident_id'),
+                'age_minutes': age_minutes,
+                'severity': context.get('severity'),
+            },
+            rationale=f"P0 incident unresolved for {age_minutes:.0f}min"
+        )]
+
+    def _decide_nullity_recommendation(self, rule: RuleConfig, context: Dict[str, Any]) -> List[Decision]:
+        # This would normally calculate viability based on legal criteria
+        # For now, the condition checks if delta is significant
+        delta = context.get('delta_value', 0)
+        return [Decision(
+            action=rule.action,
+            hitl_required=rule.hitl_required,
+            priority=rule.priority,
+            rule_name=rule.name,
+            context={
+                'incident_id': context.get('incident_id'),
+                'affected_votes': delta,
+            },
+            rationale=f"High vote impact: {delta} votes affected"
+        )]
+
+    def _decide_art_223_deadline(self, rule: RuleConfig, context: Dict[str, Any]) -> List[Decision]:
+        hours_remaining = context.get('hours_remaining', 999)
+        return [Decision(
+            action=rule.action,
+            hitl_required=rule.hitl_required,
+            priority=rule.priority,
+            rule_name=rule.name,
+            context={
+                'deadline_type': 'ART_223',
+                'hours_remaining': hours_remaining,
+                'incident_id': context.get('incident_id'),
+            },
+            rationale=f"Art. 223 deadline in {hours_remaining}h"
+        )]
+
+    def _decide_deadline_alert(self, rule: RuleConfig, context: Dict[str, Any]) -> List[Decision]:
+        deadline_type = context.get('deadline_type')
+        days_remaining = context.get('days_remaining', 999)
+        return [Decision(
+            action=rule.action,
+            hitl_required=rule.hitl_required,
+            priority=rule.priority,
+            rule_name=rule.name,
+            context={
+                'deadline_type': deadline_type,
+                'days_remaining': days_remaining,
+                'incident_id': context.get('incident_id'),
+            },
+            rationale=f"{str(deadline_type).capitalize()} deadline in {days_remaining} days"
+        )]
+
+    def _decide_geographic_cluster(self, rule: RuleConfig, context: Dict[str, Any]) -> List[Decision]:
+        anomaly_count = context.get('anomaly_count')
+        time_window_minutes = context.get('time_window_minutes')
+        return [
+            Decision(
+                action=rule.action,
+                hitl_required=rule.hitl_required,
+                priority=rule.priority,
+                rule_name=rule.name,
+                context={
+                    'incident_type': 'GEOGRAPHIC_CLUSTER',
+                    'municipality_code': context.get('municipality_code'),
+                    'anomaly_count': anomaly_count,
+                    'time_window_minutes': time_window_minutes,
+                    'anomaly_ids': context.get('anomaly_ids', []),
+                },
+                rationale=f"Geographic cluster: {anomaly_count} anomalies in {time_window_minutes}min"
+            ),
+            # Flag high risk
+            Decision(
+                action=AgentAction.UPDATE_RISK_SCORES,
+                hitl_required=HITLRequirement.AUTOMATIC,
+                priority="P1",
+                rule_name=rule.name,
+                context={
+                    'municipality_code': context.get('municipality_code'),
+                    'risk_level': 'HIGH',
+                    'reason': 'geographic_cluster',
+                },
+                rationale="Update risk score due to geographic cluster"
+            ),
+        ]
+
+    def _decide_generic(self, rule: RuleConfig, context: Dict[str, Any]) -> List[Decision]:
+        """Decision for rules without a dedicated builder (e.g. added via the rules file)."""
+        return [Decision(
+            action=rule.action,
+            hitl_required=rule.hitl_required,
+            priority=rule.priority,
+            rule_name=rule.name,
+            context={
+                key: context[key]
+                for key in ('incident_id', 'mesa_id', 'municipality_code', 'deadline_type')
+                if context.get(key) is not None
+            },
+            rationale=rule.description or rule.condition
+        )]
 
     # ============================================================
     # Private Helper Methods
@@ -300,37 +536,98 @@ class DecisionEngine:
         header = form_data.get('document_header_extracted', {})
         validations = form_data.get('validations', [])
 
-        # Calculate arithmetic delta
-        total_computed = 0
-        total_reported = 0
-        for tally in form_data.get('normalized_tallies', []):
-            if isinstance(tally, dict) and 'party_total' in tally:
-                total_computed += tally.get('party_total', 0)
-
         # Get OCR confidence
         ocr_fields = form_data.get('ocr_fields', [])
         confidences = [f.get('confidence', 1.0) for f in ocr_fields if f.get('confidence')]
         avg_confidence = sum(confidences) / len(confidences) if confidences else 1.0
-        low_conf_fields = [f for f in ocr_fields if f.get('confidence', 1.0) < self.config.OCR_CONFIDENCE_THRESHOLD]
-
-        # Check for arithmetic failures in validations
-        arithmetic_delta = 0
-        for v in validations:
-            if v.get('rule_key') == 'ARITHMETIC_SUM' and not v.get('passed'):
-                details = v.get('details', {})
-                arithmetic_delta = abs(details.get('expected', 0) - details.get('actual', 0))
 
         return {
-            'mesa_id': header.get('mesa_id') or f"{header.get('dept_code', '00')}-{header.get('muni_code', '000')}-{header.get('zone_code', '00')}-{header.get('station_code', '00')}-{header.get('table_number', 0):03d}",
+            'mesa_id': self._e14_mesa_id(header),
             'dept_code': header.get('dept_code'),
             'muni_code': header.get('muni_code'),
             'ocr_confidence': avg_confidence,
-            'low_confidence_fields': [f.get('field_key') for f in low_conf_fields],
-            'arithmetic_delta': arithmetic_delta,
-            'total_computed': total_computed,
+            'low_confidence_fields': self._low_confidence_fields(ocr_fields),
+            'arithmetic_delta': self._arithmetic_delta(validations),
+            'total_computed': self._total_computed(form_data),
             'validations_failed': [v for v in validations if not v.get('passed')],
         }
 
+    def _build_e14_columns(self, forms: List[Dict[str, Any]]) -> RuleColumns:
+        """
+        Column-wise equivalent of _build_e14_context for a batch of forms.
+
+        Average OCR confidence is computed with bincount over the flattened
+        field confidences; fields only builders need are computed per row
+        on demand.
+        """
+        size = len(forms)
+        confidence_rows: List[int] = []
+        confidence_values: List[float] = []
+        arithmetic_deltas = []
+        for index, form in enumerate(forms):
+            for ocr_field in form.get('ocr_fields', []):
+                confidence = ocr_field.get('confidence')
+                if confidence:
+                    confidence_rows.append(index)
+                    confidence_values.append(confidence)
+            arithmetic_deltas.append(self._arithmetic_delta(form.get('validations', [])))
+
+        rows = np.asarray(confidence_rows, dtype=int)
+        counts = np.bincount(rows, minlength=size)
+        sums = np.bincount(rows, weights=np.asarray(confidence_values, dtype=float), minlength=size)
+        ocr_confidence = np.ones(size)
+        has_confidence = counts > 0
+        ocr_confidence[has_confidence] = sums[has_confidence] / counts[has_confidence]
+
+        def header(index: int) -> Dict[str, Any]:
+            return forms[index].get('document_header_extracted', {})
+
+        return RuleColumns(
+            size,
+            columns={
+                'ocr_confidence': ocr_confidence,
+                'arithmetic_delta': arithmetic_deltas,
+            },
+            row_fields={
+                'mesa_id': lambda i: self._e14_mesa_id(header(i)),
+                'dept_code': lambda i: header(i).get('dept_code'),
+                'muni_code': lambda i: header(i).get('muni_code'),
+                'low_confidence_fields': lambda i: self._low_confidence_fields(forms[i].get('ocr_fields', [])),
+                'total_computed': lambda i: self._total_computed(forms[i]),
+                'validations_failed': lambda i: [
+                    v for v in forms[i].get('validations', []) if not v.get('passed')
+                ],
+            },
+        )
+
+    @staticmethod
+    def _e14_mesa_id(header: Dict[str, Any]) -> str:
+        return header.get('mesa_id') or f"{header.get('dept_code', '00')}-{header.get('muni_code', '000')}-{header.get('zone_code', '00')}-{header.get('station_code', '00')}-{header.get('table_number', 0):03d}"
+
+    def _low_confidence_fields(self, ocr_fields: List[Dict[str, Any]]) -> List[Any]:
+        return [
+            f.get('field_key') for f in ocr_fields
+            if f.get('confidence', 1.0) < self.config.OCR_CONFIDENCE_THRESHOLD
+        ]
+
+    @staticmethod
+    def _arithmetic_delta(validations: List[Dict[str, Any]]) -> Any:
+        """Delta of the last failed ARITHMETIC_SUM validation (0 if none)."""
+        arithmetic_delta = 0
+        for v in validations:
+            if v.get('rule_key') == 'ARITHMETIC_SUM' and not v.get('passed'):
+                details = v.get('details', {})
+                arithmetic_delta = abs(details.get('expected', 0) - details.get('actual', 0))
+        return arithmetic_delta
+
+    @staticmethod
+    def _total_computed(form_data: Dict[str, Any]) -> Any:
+        total_computed = 0
+        for tally in form_data.get('normalized_tallies', []):
+            if isinstance(tally, dict) and 'party_total' in tally:
+                total_computed += tally.get('party_total', 0)
+        return total_computed
+
     def _build_incident_context(self, incident: Dict[str, Any]) -> Dict[str, Any]:
         """Build context from incident data."""
         created_at = incident.get('created_at')
@@ -354,6 +651,7 @@ class DecisionEngine:
             'incident_type': incident.get('incident_type'),
             'severity': incident.get('severity'),
             'status': incident.get('status'),
+            'closed': incident.get('status') in ('RESOLVED', 'FALSE_POSITIVE'),
             'age_minutes': age_minutes,
             'sla_remaining_minutes': max(0, sla_remaining),
             'assigned_to': incident.get('assigned_to'),
@@ -382,98 +680,3 @@ class DecisionEngine:
             'hours_remaining': hours_remaining,
             'days_remaining': days_remaining,
         }
-
-    def _check_arithmetic_mismatch(self, context: Dict[str, Any]) -> bool:
-        """Check if arithmetic mismatch exceeds threshold."""
-        delta = context.get('arithmetic_delta', 0)
-        return delta > self.config.ARITHMETIC_DELTA_THRESHOLD
-
-    def _check_low_ocr_confidence(self, context: Dict[str, Any]) -> bool:
-        """Check if OCR confidence is below threshold."""
-        confidence = context.get('ocr_confidence', 1.0)
-        return confidence < self.config.OCR_CONFIDENCE_THRESHOLD
-
-    def _check_sla_warning(self, context: Dict[str, Any]) -> Optional[Decision]:
-        """Check if SLA warning should be issued."""
-        severity = context.get('severity', 'P3')
-        sla_remaining = context.get('sla_remaining_minutes', 999)
-        status = context.get('status', 'OPEN')
-
-        # Skip if already resolved
-        if status in ('RESOLVED', 'FALSE_POSITIVE'):
-            return None
-
-        warning_threshold = self.config.get_sla_warning_minutes(severity)
-
-        if sla_remaining < warning_threshold:
-            priority = "P0" if severity == "P0" else "P1"
-            return Decision(
-                action=AgentAction.DISPATCH_SLA_ALERT,
-                hitl_required=HITLRequirement.AUTOMATIC,
-                priority=priority,
-                rule_name=f"sla_warning_{severity.lower()}",
-                context={
-                    'incident_id': context.get('incident_id'),
-                    'severity': severity,
-                    'sla_remaining_minutes': sla_remaining,
-                },
-                rationale=f"SLA breach imminent: {sla_remaining:.0f}min remaining"
-            )
-
-        return None
-
-    def _check_escalation_needed(self, context: Dict[str, Any]) -> Optional[Decision]:
-        """Check if incident should be escalated."""
-        severity = context.get('severity', 'P3')
-        age_minutes = context.get('age_minutes', 0)
-        status = context.get('status', 'OPEN')
-        escalated = context.get('escalated_to_legal', False)
-
-        # Only escalate P0 incidents
-        if severity != 'P0':
-            return None
-
-        # Skip if already resolved or escalated
-        if status in ('RESOLVED', 'FALSE_POSITIVE', 'ESCALATED') or escalated:
-            return None
-
-        if age_minutes > self.config.HITL_AUTO_ESCALATE_AFTER_MINUTES:
-            return Decision(
-                action=AgentAction.ESCALATE_TO_LEGAL,
-                hitl_required=HITLRequirement.SEMI_AUTOMATIC,
-                priority="P0",
-                rule_name="escalate_to_legal",
-                context={
-                    'incident_id': context.get('incident_id'),
-                    'age_minutes': age_minutes,
-                    'severity': severity,
-                },
-                rationale=f"P0 incident unresolved for {age_minutes:.0f}min"
-            )
-
-        return None
-
-    def _check_nullity_viability(self, context: Dict[str, Any]) -> Optional[Decision]:
-        """Check if nullity recommendation should be made."""
-        # This would normally calculate viability based on legal criteria
-        # For now, check if delta is significant
-        delta = context.get('delta_value', 0)
-        if delta and delta > 500:
-            return Decision(
-                action=AgentAction.RECOMMEND_NULLITY,
-                hitl_required=HITLRequirement.SEMI_AUTOMATIC,
-                priority="P1",
-                rule_name="nullity_recommendation",
-                context={
-                    'incident_id': context.get('incident_id'),
-                    'affected_votes': delta,
-                },
-                rationale=f"High vote impact: {delta} votes affected"
-            )
-        return None
-
-    def _build_evaluators(self) -> Dict[str, callable]:
-        """Build rule evaluator functions."""
-        # For simple threshold-based rules, we use the check methods above
-        # More complex rules could be added here
-        return {}
@@ -9,12 +9,16 @@ import logging
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Iterator
 
+from services.e14_geo_keys import ensure_geo_keys, geo_key
 from services.qr_parser import parse_qr_barcode, QRParseStatus
 
 logger = logging.getLogger(__name__)
 
 DB_PATH = os.path.expanduser("~/Downloads/Code/Proyectos/castor/backend/data/castor.db")
 
+# Stay well under SQLite's bound-parameter limit for IN (...) lists
+MAX_IN_PARAMS = 900
+
 
 class E14DataService:
     """
@@ -30,6 +34,7 @@ class E14DataService:
         """Get database connection."""
         conn = sqlite3.connect(self.db_path)
         conn.row_factory = sqlite3.Row
+        ensure_geo_keys(conn, self.db_path)
         return conn
 
     def get_stats(self) -> Dict[str, Any]:
@@ -85,17 +90,19 @@ class E14DataService:
         limit: int = 1000,
         ocr_only: bool = True,
         departamento: Optional[str] = None,
-        municipio: Optional[str] = None
+        municipio: Optional[str] = None,
+        after_id: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """
         Get a batch of E-14 forms for processing.
 
         Args:
-            offset: Starting offset
+            offset: Starting offset (ignored when after_id is given)
             limit: Maximum forms to return
             ocr_only: Only return OCR-processed forms
             departamento: Filter by department
             municipio: Filter by municipality
+            after_id: Keyset cursor - only forms with id greater than this
 
         Returns:
             List of forms in agent-compatible format
@@ -110,16 +117,27 @@ class E14DataService:
             where_clauses.append("f.ocr_processed = 1")
 
         if departamento:
-            # Case-insensitive match
-            where_clauses.append("UPPER(f.departamento) = UPPER(?)")
-            params.append(departamento)
+            # Case/accent-insensitive match on the indexed key
+            where_clauses.append("f.dept_key = ?")
+            params.append(geo_key(departamento))
 
         if municipio:
-            where_clauses.append("UPPER(f.municipio) = UPPER(?)")
-            params.append(municipio)
+            where_clauses.append("f.muni_key = ?")
+            params.append(geo_key(municipio))
+
+        if after_id is not None:
+            where_clauses.append("f.id > ?")
+            params.append(after_id)
 
         where_sql = " WHERE " + " AND ".join(where_clauses) if where_clauses else ""
 
+        if after_id is not None:
+            page_sql = "LIMIT ?"
+            params.append(limit)
+        else:
+            page_sql = "LIMIT ? OFFSET ?"
+            params.extend([limit, offset])
+
         query = f"""
             SELECT
                 f.id, f.mesa_id, f.filename, f.corporacion, f.departamento,
@@ -129,15 +147,12 @@ class E14DataService:
             FROM e14_scraper_forms f
             {where_sql}
             ORDER BY f.id
-            LIMIT ? OFFSET ?
+            {page_sql}
         """
-        logger.debug(f"Query: {query}, Params: {params + [limit, offset]}")
-        cursor.execute(query, params + [limit, offset])
+        logger.debug(f"Query: {query}, Params: {params}")
+        cursor.execute(query, params)
 
-        forms = []
-        for row in cursor.fetchall():
-            form = self._convert_to_agent_format(dict(row), cursor)
-            forms.append(form)
+        forms = self._convert_rows(cursor.fetchall(), cursor)
 
         conn.close()
         return forms
@@ -156,18 +171,21 @@ class E14DataService:
 
         Yields:
             Batches of forms
+
+        Uses keyset pagination on id, so every page is an index range scan
+        instead of re-walking all the preceding rows like OFFSET does.
         """
-        offset = 0
+        last_id = 0
         while True:
             batch = self.get_forms_batch(
-                offset=offset,
                 limit=batch_size,
-                ocr_only=ocr_only
+                ocr_only=ocr_only,
+                after_id=last_id
             )
             if not batch:
                 break
             yield batch
-            offset += batch_size
+            last_id = batch[-1]['id']
 
     def get_form_with_votes(self, form_id: int) -> Optional[Dict[str, Any]]:
         """
@@ -191,17 +209,56 @@ class E14DataService:
             conn.close()
             return None
 
-        form = self._convert_to_agent_format(dict(row), cursor)
+        form = self._convert_rows([row], cursor)[0]
         conn.close()
         return form
 
+    def _load_votes(
+        self,
+        cursor: sqlite3.Cursor,
+        form_ids: List[int]
+    ) -> Dict[int, List[sqlite3.Row]]:
+        """
+        Load party votes for many forms with one IN query per chunk of ids.
+
+        Returns:
+            Mapping form_id -> vote rows (in insertion order)
+        """
+        votes_by_form: Dict[int, List[sqlite3.Row]] = {form_id: [] for form_id in form_ids}
+        for start in range(0, len(form_ids), MAX_IN_PARAMS):
+            chunk = form_ids[start:start + MAX_IN_PARAMS]
+            placeholders = ",".join("?" * len(chunk))
+            cursor.execute(f"""
+                SELECT form_id, party_name, party_code, votes, confidence, needs_review
+                FROM e14_scraper_votes
+                WHERE form_id IN ({placeholders})
+                ORDER BY form_id, id
+            """, chunk)
+            for vote in cursor.fetchall():
+                votes_by_form[vote['form_id']].append(vote)
+        return votes_by_form
+
+    def _convert_rows(
+        self,
+        rows: List[sqlite3.Row],
+        cursor: sqlite3.Cursor
+    ) -> List[Dict[str, Any]]:
+        """Convert a page of form rows, batch-loading all their votes."""
+        if not rows:
+            return []
+        votes_by_form = self._load_votes(cursor, [row['id'] for row in rows])
+        return [
+            self._convert_to_agent_format(dict(row), votes_by_form[row['id']])
+            for row in rows
+        ]
+
     def _convert_to_agent_format(
         self,
         row: Dict[str, Any],
-        cursor: sqlite3.Cursor
+        votes: List[sqlite3.Row]
     ) -> Dict[str, Any]:
         """
-        Convert database row to agent-compatible format.
+        Convert database row and its party votes to agent-compatible format.
 
         The agent expects:
         - document_header_extracted
@@ -210,14 +267,6 @@ class E14DataService:
         """
         form_id = row['id']
 
-        # Get party votes
-        cursor.execute("""
-            SELECT party_name, party_code, votes, confidence, needs_review
-            FROM e14_scraper_votes
-            WHERE form_id = ?
-        """, (form_id,))
-        votes = cursor.fetchall()
-
         # Build header
         header = {
             'mesa_id': row.get('mesa_id', ''),
@@ -354,9 +403,17 @@ class E14DataService:
         conn.close()
         return count
 
-    def get_unprocessed_forms(self, limit: int = 100) -> List[Dict[str, Any]]:
+    def get_unprocessed_forms(
+        self,
+        limit: int = 100,
+        after_id: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
         """
         Get OCR-processed forms that the agent has not processed yet.
+
+        Args:
+            limit: Maximum forms to return
+            after_id: Keyset cursor - only forms with id greater than this
         """
         from services.agent.agent_store import init_db
         init_db()
@@ -368,13 +425,31 @@ class E14DataService:
             SELECT f.*
             FROM e14_scraper_forms f
             LEFT JOIN agent_e14_processed p ON p.form_id = f.id
-            WHERE f.ocr_processed = 1 AND p.form_id IS NULL
+            WHERE f.ocr_processed = 1 AND p.form_id IS NULL AND f.id > ?
             ORDER BY f.id ASC
             LIMIT ?
             """,
-            (limit,),
+            (after_id or 0, limit),
         )
-        rows = cursor.fetchall()
-        forms = [self._convert_to_agent_format(dict(row), cursor) for row in rows]
+        forms = self._convert_rows(cursor.fetchall(), cursor)
         conn.close()
         return forms
+
+    def count_unprocessed_forms(self) -> int:
+        """Count OCR-processed forms still waiting for the agent (the backlog)."""
+        from services.agent.agent_store import init_db
+        init_db()
+
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT COUNT(*)
+            FROM e14_scraper_forms f
+            LEFT JOIN agent_e14_processed p ON p.form_id = f.id
+            WHERE f.ocr_processed = 1 AND p.form_id IS NULL
+            """
+        )
+        count = cursor.fetchone()[0]
+        conn.close()
+        return count
@@ -6,6 +6,7 @@ and takes actions with measurable OKRs and KPIs.
 """
 import asyncio
 import logging
+import time
 import uuid
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
@@ -14,6 +15,7 @@ from concurrent.futures import ThreadPoolExecutor
 from services.agent.config import AgentConfig, AgentAction, HITLRequirement, get_agent_config
 from services.agent.state import AgentState, AgentStatus, ActionRecord, HITLRequest, AgentMetrics
 from services.agent.decision_engine import DecisionEngine, Decision
+from services.agent.analyzers.anomaly_detector import AnomalyDetector
 
 logger = logging.getLogger(__name__)
 
@@ -43,6 +45,7 @@ class ElectoralIntelligenceAgent:
         self.config = config or get_agent_config()
         self.state = AgentState(redis_client)
         self.decision_engine = DecisionEngine(self.config)
+        self.anomaly_detector = AnomalyDetector(self.config)
         self._openai_service = openai_service
 
         # Thread pool for parallel operations
@@ -165,6 +168,11 @@ class ElectoralIntelligenceAgent:
             'status': self.state.get_status().value,
             'started_at': self.state.get_started_at().isoformat() if self.state.get_started_at() else None,
             'uptime_seconds': metrics.uptime_seconds,
+            'e14_pipeline': {
+                'throughput_forms_per_second': metrics.e14_throughput_forms_per_second,
+                'backlog': metrics.e14_backlog,
+                'forms_processed_total': metrics.e14_forms_processed_total,
+            },
             'metrics': metrics.to_dict(),
         }
 
@@ -264,6 +272,54 @@ class ElectoralIntelligenceAgent:
         logger.info(f"Processed E-14 form: {len(decisions)} decisions in {elapsed_ms:.0f}ms")
         return actions_taken
 
+    async def process_e14_batch(self, forms: List[Dict[str, Any]]) -> Optional[Dict[int, int]]:
+        """
+        Process a batch of E-14 forms and take appropriate actions.
+
+        The AnomalyDetector and DecisionEngine run over the whole batch,
+        incidents are created with one bulk insert and the other automatic
+        actions run concurrently, at most ACTION_CONCURRENCY at a time.
+
+        Args:
+            forms: E-14 forms (E14PayloadV2 format)
+
+        Returns:
+            Incidents created per form id, or None if the agent is not running
+        """
+        if self.state.get_status() not in (AgentStatus.RUNNING,):
+            logger.warning("Agent not running, skipping E-14 batch")
+            return None
+
+        start_time = datetime.utcnow()
+        anomalies, _ = self.anomaly_detector.analyze_batch(forms)
+        per_form, batch_decisions = self.decision_engine.evaluate_e14_batch(forms, anomalies)
+
+        decisions: List[Decision] = []
+        owners: List[Optional[int]] = []
+        for form, form_decisions in zip(forms, per_form):
+            decisions.extend(form_decisions)
+            owners.extend([form.get('id', 0)] * len(form_decisions))
+        decisions.extend(batch_decisions)
+        owners.extend([None] * len(batch_decisions))
+
+        results = await self._execute_decisions(decisions)
+
+        incidents_created = {form.get('id', 0): 0 for form in forms}
+        for owner, result in zip(owners, results):
+            if owner is not None and result['action'] == AgentAction.CREATE_INCIDENT.value:
+                incidents_created[owner] += 1
+
+        # Update metrics
+        elapsed_ms = (datetime.utcnow() - start_time).total_seconds() * 1000
+        if decisions:
+            self.state.increment_metric('anomalies_detected_total', len(decisions))
+            self.state.increment_metric('anomalies_detected_last_hour', sum(1 for d in per_form if d))
+
+        logger.info(
+            f"Processed E-14 batch: {len(forms)} forms, {len(decisions)} decisions in {elapsed_ms:.0f}ms"
+        )
+        return incidents_created
+
     async def process_incident_update(self, incident: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
         Process an incident update and take appropriate actions.
@@ -372,21 +428,47 @@ class ElectoralIntelligenceAgent:
     # ============================================================
 
     async def _poll_e14_forms(self):
-        """Poll for new E-14 forms to process."""
+        """
+        Drain unprocessed E-14 forms in keyset-paginated batches.
+
+        Each batch is marked processed with a single write; throughput and
+        the remaining backlog are published in the agent metrics.
+        """
         from services.agent.e14_data_service import E14DataService
-        from services.agent.agent_store import mark_processed
+        from services.agent.agent_store import mark_batch_processed
 
         data_service = E14DataService()
-        forms = data_service.get_unprocessed_forms(limit=100)
-        if not forms:
+        backlog = data_service.count_unprocessed_forms()
+        self.state.update_metrics(e14_backlog=backlog)
+        if not backlog:
             return
 
-        for form in forms:
-            if self.state.get_status() != AgentStatus.RUNNING:
+        after_id = None
+        processed = 0
+        start = time.perf_counter()
+        while self.state.get_status() == AgentStatus.RUNNING:
+            forms = data_service.get_unprocessed_forms(
+                limit=self.config.E14_BATCH_SIZE,
+                after_id=after_id
+            )
+            if not forms:
+                backlog = 0
+                self.state.update_metrics(e14_backlog=backlog)
                 break
-            actions = await self.process_e14_form(form)
-            incidents_created = len([a for a in actions if a.get('action') == 'create_incident' or a.get('created')])
-            mark_processed(form.get('id', 0), incidents_created=incidents_created)
+
+            incidents_created = await self.process_e14_batch(forms)
+            if incidents_created is None:
+                break
+            mark_batch_processed([form.get('id', 0) for form in forms], incidents_created)
+
+            after_id = forms[-1].get('id', 0)
+            processed += len(forms)
+            backlog = max(0, backlog - len(forms))
+            self.state.increment_metric('e14_forms_processed_total', len(forms))
+            self.state.update_metrics(
+                e14_throughput_forms_per_second=round(processed / max(time.perf_counter() - start, 1e-6), 2),
+                e14_backlog=backlog,
+            )
 
     async def _poll_incidents(self):
         """Poll incidents for SLA monitoring."""
@@ -415,9 +497,79 @@ class ElectoralIntelligenceAgent:
             Action result
         """
         action_id = str(uuid.uuid4())
+        action_record = self._build_action_record(action_id, decision)
+
+        # Check if HITL is required
+        if action_record.hitl_required:
+            response = self._request_approval(action_record, decision)
+            self.state.record_action(action_record)
+            return response
 
-        # Record the action
-        action_record = ActionRecord(
+        # Execute automatic action
+        try:
+            response = self._complete_action(action_record, decision, await self._execute_action(decision))
+        except Exception as e:
+            logger.error(f"Error executing action {decision.action}: {e}", exc_info=True)
+            response = self._complete_action(action_record, decision, error=e)
+
+        self.state.record_action(action_record)
+        return response
+
+    async def _execute_decisions(self, decisions: List[Decision]) -> List[Dict[str, Any]]:
+        """
+        Execute a batch of decisions with the same outcome as _execute_decision.
+
+        CREATE_INCIDENT decisions are coalesced into one bulk insert, the
+        other automatic actions run with at most ACTION_CONCURRENCY in
+        flight, and the action log is written once.
+
+        Args:
+            decisions: Decisions to execute
+
+        Returns:
+            Action results, aligned with decisions
+        """
+        responses: List[Optional[Dict[str, Any]]] = [None] * len(decisions)
+        records: List[ActionRecord] = []
+        incident_indexes: List[int] = []
+        other_indexes: List[int] = []
+
+        for index, decision in enumerate(decisions):
+            action_record = self._build_action_record(str(uuid.uuid4()), decision)
+            records.append(action_record)
+            if action_record.hitl_required:
+                responses[index] = self._request_approval(action_record, decision)
+            elif decision.action == AgentAction.CREATE_INCIDENT:
+                incident_indexes.append(index)
+            else:
+                other_indexes.append(index)
+
+        if incident_indexes:
+            created = await self._create_incidents([decisions[i].context for i in incident_indexes])
+            for index, result in zip(incident_indexes, created):
+                responses[index] = self._complete_action(records[index], decisions[index], result)
+
+        semaphore = asyncio.Semaphore(max(1, self.config.ACTION_CONCURRENCY))
+
+        async def run(index: int) -> None:
+            decision = decisions[index]
+            async with semaphore:
+                try:
+                    result = await self._execute_action(decision)
+                except Exception as e:
+                    logger.error(f"Error executing action {decision.action}: {e}", exc_info=True)
+                    responses[index] = self._complete_action(records[index], decision, error=e)
+                    return
+            responses[index] = self._complete_action(records[index], decision, result)
+
+        await asyncio.gather(*(run(index) for index in other_indexes))
+
+        self.state.record_actions(records)
+        return responses
+
+    def _build_action_record(self, action_id: str, decision: Decision) -> ActionRecord:
+        """Action log entry for a decision."""
+        return ActionRecord(
             action_id=action_id,
             action_type=decision.action.value,
             timestamp=datetime.utcnow().isoformat(),
@@ -428,46 +580,47 @@ class ElectoralIntelligenceAgent:
             hitl_required=decision.hitl_required != HITLRequirement.AUTOMATIC,
         )
 
-        # Check if HITL is required
-        if decision.hitl_required != HITLRequirement.AUTOMATIC:
-            # Create HITL request
-            hitl_request = HITLRequest(
-                request_id=action_id,
-                action_type=decision.action.value,
-                created_at=datetime.utcnow().isoformat(),
-                expires_at=(datetime.utcnow() + timedelta(hours=24)).isoformat(),
-                priority=decision.priority,
-                title=f"{decision.action.value}: {decision.rule_name}",
-                description=decision.rationale,
-                context=decision.context,
-                recommended_action=decision.action.value,
-            )
-            self.state.add_hitl_request(hitl_request)
-            action_record.hitl_status = 'pending'
-            self.state.record_action(action_record)
+    def _request_approval(self, action_record: ActionRecord, decision: Decision) -> Dict[str, Any]:
+        """Queue a HITL request for the action and mark its record pending."""
+        hitl_request = HITLRequest(
+            request_id=action_record.action_id,
+            action_type=decision.action.value,
+            created_at=datetime.utcnow().isoformat(),
+            expires_at=(datetime.utcnow() + timedelta(hours=24)).isoformat(),
+            priority=decision.priority,
+            title=f"{decision.action.value}: {decision.rule_name}",
+            description=decision.rationale,
+            context=decision.context,
+            recommended_action=decision.action.value,
+        )
+        self.state.add_hitl_request(hitl_request)
+        action_record.hitl_status = 'pending'
 
-            return {
-                'action_id': action_id,
-                'action': decision.action.value,
-                'status': 'pending_approval',
-                'hitl_request_id': action_id,
-            }
+        return {
+            'action_id': action_record.action_id,
+            'action': decision.action.value,
+            'status': 'pending_approval',
+            'hitl_request_id': action_record.action_id,
+        }
 
-        # Execute automatic action
-        try:
-            result = await self._execute_action(decision)
+    def _complete_action(
+        self,
+        action_record: ActionRecord,
+        decision: Decision,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[Exception] = None
+    ) -> Dict[str, Any]:
+        """Store the outcome of an automatic action on its record."""
+        if error is None:
             action_record.result = 'success'
             action_record.details['result'] = result
-        except Exception as e:
-            logger.error(f"Error executing action {decision.action}: {e}", exc_info=True)
+        else:
             action_record.result = 'error'
-            action_record.error = str(e)
-            result = {'error': str(e)}
-
-        self.state.record_action(action_record)
+            action_record.error = str(error)
+            result = {'error': str(error)}
 
         return {
-            'action_id': action_id,
+            'action_id': action_record.action_id,
             'action': decision.action.value,
             'status': action_record.result,
             'result': result,
@@ -518,6 +671,35 @@ class ElectoralIntelligenceAgent:
 
     async def _create_incident(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Create an incident from detected anomaly."""
+        incident_data = self._build_incident_data(context)
+
+        logger.info(f"Creating incident: {incident_data['incident_type']} for {incident_data['mesa_id']}")
+        try:
+            from services.incident_store import create_incident as store_create_incident
+            incident = store_create_incident(incident_data, dedupe=True)
+            self.state.increment_metric('incidents_auto_created')
+            return {'created': True, 'incident': incident}
+        except Exception as e:
+            logger.error(f"Error creating incident: {e}", exc_info=True)
+            return {'created': False, 'error': str(e)}
+
+    async def _create_incidents(self, contexts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create incidents for many anomalies with one bulk insert (results aligned with contexts)."""
+        items = [self._build_incident_data(context) for context in contexts]
+
+        logger.info(f"Creating {len(items)} incidents in bulk")
+        try:
+            from services.incident_store import create_incidents_bulk
+            loop = asyncio.get_running_loop()
+            incidents = await loop.run_in_executor(self._executor, create_incidents_bulk, items)
+            self.state.increment_metric('incidents_auto_created', len(incidents))
+            return [{'created': True, 'incident': incident} for incident in incidents]
+        except Exception as e:
+            logger.error(f"Error creating incidents: {e}", exc_info=True)
+            return [{'created': False, 'error': str(e)} for _ in items]
+
+    def _build_incident_data(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Incident store payload for an anomaly context."""
         incident_type = context.get('incident_type', 'UNKNOWN')
         mesa_id = context.get('mesa_id', '')
 
@@ -526,7 +708,7 @@ class ElectoralIntelligenceAgent:
         dept_code = parts[0] if len(parts) > 0 else '00'
         muni_code = parts[1] if len(parts) > 1 else '000'
 
-        incident_data = {
+        return {
             'incident_type': incident_type,
             'mesa_id': mesa_id,
             'dept_code': dept_code,
@@ -534,19 +716,10 @@ class ElectoralIntelligenceAgent:
             'description': self._build_incident_description(context),
             'ocr_confidence': context.get('ocr_confidence'),
             'delta_value': context.get('delta') or context.get('anomaly_count'),
-            'evidence': context,
+            # Copy: the action record later stores the result (incident included) in context
+            'evidence': dict(context),
         }
 
-        logger.info(f"Creating incident: {incident_type} for {mesa_id}")
-        try:
-            from services.incident_store import create_incident as store_create_incident
-            incident = store_create_incident(incident_data, dedupe=True)
-            self.state.increment_metric('incidents_auto_created')
-            return {'created': True, 'incident': incident}
-        except Exception as e:
-            logger.error(f"Error creating incident: {e}", exc_info=True)
-            return {'created': False, 'error': str(e)}
-
     async def _dispatch_alert(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Dispatch an SLA or deadline alert."""
         alert_type = context.get('deadline_type') or 'SLA'
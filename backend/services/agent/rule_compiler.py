@@ -0,0 +1,342 @@
+"""
+Compiler for the condition strings of agent decision rules.
+
+A condition is a boolean expression over the evaluation context:
+
+    severity == P0 AND sla_remaining_minutes < SLA_WARNING_P0 AND NOT closed
+
+- lower/mixed-case names are context fields (dots look into nested dicts)
+- UPPER_CASE names are AgentConfig attributes when one exists, otherwise
+  string literals (P0, RECOUNT, ESCALATED, ...)
+- numbers, 'quoted' or "quoted" strings, true / false / none
+- comparisons == != < <= > >=, AND / OR / NOT, parentheses
+
+Each condition is parsed once into two closures over the same tree:
+test() for a single context dict and test_columns() for a RuleColumns
+batch, which evaluates the whole batch with NumPy array operations.
+Missing values behave like None in Python: they are != everything and
+fail every ordering comparison.
+"""
+import operator
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+_TOKEN_RE = re.compile(
+    r"\s*(?:(?P<number>\d+(?:\.\d+)?)"
+    r"|(?P<string>'[^']*'|\"[^\"]*\")"
+    r"|(?P<op>==|!=|<=|>=|<|>)"
+    r"|(?P<paren>[()])"
+    r"|(?P<name>[A-Za-z_][A-Za-z0-9_.]*))"
+)
+_CONSTANT_NAME_RE = re.compile(r"^[A-Z][A-Z0-9_]*$")
+_KEYWORDS = {'and', 'or', 'not'}
+_LITERALS = {'true': True, 'false': False, 'none': None}
+
+_SCALAR_OPS: Dict[str, Callable[[Any, Any], bool]] = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+_ARRAY_OPS = {
+    '==': np.equal,
+    '!=': np.not_equal,
+    '<': np.less,
+    '<=': np.less_equal,
+    '>': np.greater,
+    '>=': np.greater_equal,
+}
+
+ColumnValue = Union[np.ndarray, Any]
+
+
+class RuleCompileError(ValueError):
+    """Condition string cannot be parsed."""
+
+
+def _lookup(value: Any, path: List[str]) -> Any:
+    for part in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _compare(op: str, left: Any, right: Any) -> bool:
+    """Python comparison where None / incomparable types fail orderings."""
+    if op in ('==', '!='):
+        return bool(_SCALAR_OPS[op](left, right))
+    if left is None or right is None:
+        return False
+    try:
+        return bool(_SCALAR_OPS[op](left, right))
+    except TypeError:
+        return False
+
+
+_compare_elementwise = np.frompyfunc(_compare, 3, 1)
+_truthy_elementwise = np.frompyfunc(bool, 1, 1)
+
+
+class RuleColumns:
+    """
+    A batch of contexts stored column-wise.
+
+    columns hold one value per row (lists or NumPy arrays). row_fields
+    compute a field for one row on demand; they are materialized as a
+    column only if a condition reads them, and otherwise only for the
+    rows handed to decision builders via row().
+    """
+
+    def __init__(
+        self,
+        size: int,
+        columns: Dict[str, Any],
+        row_fields: Optional[Dict[str, Callable[[int], Any]]] = None
+    ):
+        self.size = size
+        self._columns = dict(columns)
+        self._row_fields = dict(row_fields or {})
+        self._arrays: Dict[str, np.ndarray] = {}
+
+    def set_column(self, name: str, values: Any) -> None:
+        self._columns[name] = values
+        self._arrays.pop(name, None)
+
+    def array(self, name: str) -> np.ndarray:
+        """Column as float64 (NaN for missing) when all values are numeric, else object."""
+        cached = self._arrays.get(name)
+        if cached is not None:
+            return cached
+        values = self._values(name)
+        if isinstance(values, np.ndarray) and values.dtype.kind in 'biuf':
+            array = values
+        elif all(v is None or _is_number(v) for v in values):
+            array = np.array([np.nan if v is None else v for v in values], dtype=float)
+        else:
+            array = np.empty(self.size, dtype=object)
+            array[:] = list(values)
+        if not isinstance(values, np.ndarray):
+            self._arrays[name] = array
+        return array
+
+    def row(self, index: int) -> Dict[str, Any]:
+        """Context dict for one row, with plain Python values."""
+        context = {}
+        for name in self._columns:
+            value = self._columns[name][index]
+            context[name] = value.item() if isinstance(value, np.generic) else value
+        for name, compute in self._row_fields.items():
+            if name not in context:
+                context[name] = compute(index)
+        return context
+
+    def _values(self, name: str) -> Any:
+        if name in self._columns:
+            return self._columns[name]
+        if name in self._row_fields:
+            values = [self._row_fields[name](i) for i in range(self.size)]
+            self._columns[name] = values
+            return values
+        head, _, rest = name.partition('.')
+        if rest and (head in self._columns or head in self._row_fields):
+            path = rest.split('.')
+            return [_lookup(v, path) for v in self._values(head)]
+        return [None] * self.size
+
+
+def _as_object(value: ColumnValue) -> ColumnValue:
+    """Object view of a column for elementwise Python semantics (NaN back to None)."""
+    if isinstance(value, np.ndarray) and value.dtype.kind == 'f':
+        result = value.astype(object)
+        result[np.isnan(value)] = None
+        return result
+    return value
+
+
+def _column_compare(op: str, left: ColumnValue, right: ColumnValue, size: int) -> np.ndarray:
+    def numeric(value: ColumnValue) -> bool:
+        if isinstance(value, np.ndarray):
+            return value.dtype.kind in 'biuf'
+        return _is_number(value)
+
+    if numeric(left) and numeric(right):
+        # NaN fails ==, <, <=, >, >= and passes !=, like None in _compare
+        result = _ARRAY_OPS[op](left, right)
+    else:
+        result = _compare_elementwise(op, _as_object(left), _as_object(right))
+    return np.broadcast_to(np.asarray(result, dtype=bool), (size,))
+
+
+def _column_truth(value: ColumnValue, size: int) -> np.ndarray:
+    if not isinstance(value, np.ndarray):
+        return np.full(size, bool(value))
+    if value.dtype.kind == 'b':
+        return value
+    if value.dtype.kind == 'f':
+        return (value != 0) & ~np.isnan(value)
+    if value.dtype.kind in 'iu':
+        return value != 0
+    return _truthy_elementwise(value).astype(bool)
+
+
+# Compiled node: (scalar value fn, column value fn)
+_Node = Tuple[Callable[[Dict[str, Any]], Any], Callable[[RuleColumns], ColumnValue]]
+
+
+class _Parser:
+    """Recursive-descent parser emitting closures instead of a tree."""
+
+    def __init__(self, text: str, constants: Any):
+        self.text = text
+        self.constants = constants
+        self.tokens = self._tokenize(text)
+        self.pos = 0
+
+    def _tokenize(self, text: str) -> List[Tuple[str, str]]:
+        tokens = []
+        pos = 0
+        text = text.rstrip()
+        while pos < len(text):
+            match = _TOKEN_RE.match(text, pos)
+            if not match or match.end() == pos:
+                raise RuleCompileError(f"Unexpected input at {pos}: {text[pos:pos + 20]!r}")
+            kind = match.lastgroup
+            value = match.group(kind)
+            if kind == 'name' and value.lower() in _KEYWORDS:
+                kind = value.lower()
+            tokens.append((kind, value))
+            pos = match.end()
+        return tokens
+
+    def _peek(self) -> Optional[Tuple[str, str]]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def _take(self, kind: Optional[str] = None) -> Tuple[str, str]:
+        token = self._peek()
+        if token is None or (kind and token[0] != kind):
+            raise RuleCompileError(f"Expected {kind or 'a token'} in {self.text!r}")
+        self.pos += 1
+        return token
+
+    def parse(self) -> _Node:
+        if not self.tokens:
+            raise RuleCompileError("Empty condition")
+        node = self._or()
+        if self._peek() is not None:
+            raise RuleCompileError(f"Unexpected {self._peek()[1]!r} in {self.text!r}")
+        return node
+
+    def _or(self) -> _Node:
+        parts = [self._and()]
+        while self._peek() and self._peek()[0] == 'or':
+            self._take()
+            parts.append(self._and())
+        if len(parts) == 1:
+            return parts[0]
+        scalars = [p[0] for p in parts]
+        columns = [p[1] for p in parts]
+        return (
+            lambda ctx: any(bool(f(ctx)) for f in scalars),
+            lambda cols: np.logical_or.reduce([_column_truth(f(cols), cols.size) for f in columns]),
+        )
+
+    def _and(self) -> _Node:
+        parts = [self._not()]
+        while self._peek() and self._peek()[0] == 'and':
+            self._take()
+            parts.append(self._not())
+        if len(parts) == 1:
+            return parts[0]
+        scalars = [p[0] for p in parts]
+        columns = [p[1] for p in parts]
+        return (
+            lambda ctx: all(bool(f(ctx)) for f in scalars),
+            lambda cols: np.logical_and.reduce([_column_truth(f(cols), cols.size) for f in columns]),
+        )
+
+    def _not(self) -> _Node:
+        if self._peek() and self._peek()[0] == 'not':
+            self._take()
+            scalar, column = self._not()
+            return (
+                lambda ctx: not bool(scalar(ctx)),
+                lambda cols: ~_column_truth(column(cols), cols.size),
+            )
+        return self._comparison()
+
+    def _comparison(self) -> _Node:
+        left = self._operand()
+        token = self._peek()
+        if not token or token[0] != 'op':
+            return left
+        op = self._take('op')[1]
+        right = self._operand()
+        (left_scalar, left_column), (right_scalar, right_column) = left, right
+        return (
+            lambda ctx: _compare(op, left_scalar(ctx), right_scalar(ctx)),
+            lambda cols: _column_compare(op, left_column(cols), right_column(cols), cols.size),
+        )
+
+    def _operand(self) -> _Node:
+        kind, value = self._take()
+        if kind == 'paren' and value == '(':
+            node = self._or()
+            if self._take('paren')[1] != ')':
+                raise RuleCompileError(f"Unbalanced parentheses in {self.text!r}")
+            return node
+        if kind == 'number':
+            return self._constant(float(value) if '.' in value else int(value))
+        if kind == 'string':
+            return self._constant(value[1:-1])
+        if kind == 'name':
+            if value.lower() in _LITERALS:
+                return self._constant(_LITERALS[value.lower()])
+            if _CONSTANT_NAME_RE.match(value):
+                return self._constant(getattr(self.constants, value, value))
+            return self._field(value)
+        raise RuleCompileError(f"Unexpected {value!r} in {self.text!r}")
+
+    @staticmethod
+    def _constant(value: Any) -> _Node:
+        return (lambda ctx: value, lambda cols: value)
+
+    @staticmethod
+    def _field(name: str) -> _Node:
+        path = name.split('.')
+        if len(path) == 1:
+            return (lambda ctx: ctx.get(name), lambda cols: cols.array(name))
+        return (lambda ctx: _lookup(ctx, path), lambda cols: cols.array(name))
+
+
+class CompiledCondition:
+    """A rule condition compiled for single contexts and column batches."""
+
+    def __init__(self, text: str, constants: Any = None):
+        self.text = text
+        scalar, column = _Parser(text, constants).parse()
+        self._scalar = scalar
+        self._column = column
+
+    def test(self, context: Dict[str, Any]) -> bool:
+        return bool(self._scalar(context))
+
+    def test_columns(self, columns: RuleColumns) -> np.ndarray:
+        """Boolean mask with one entry per row of the batch."""
+        return _column_truth(self._column(columns), columns.size)
+
+    def __repr__(self) -> str:
+        return f"CompiledCondition({self.text!r})"
+
+
+def compile_condition(text: str, constants: Any = None) -> CompiledCondition:
+    """Compile a condition; UPPER_CASE names resolve against `constants` (an AgentConfig)."""
+    return CompiledCondition(text, constants)
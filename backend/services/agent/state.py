@@ -1,14 +1,30 @@
 """
 Agent state management using Redis.
 Tracks agent status, metrics, and action history.
+
+Each kind of state lives in a native Redis structure, so writes append or
+increment instead of rewriting a JSON blob:
+
+    agent:state          string  status / started_at (codec-encoded dict)
+    agent:metrics        hash    one field per AgentMetrics field (HINCRBY)
+    agent:actions        list    newest first, LPUSH + LTRIM to MAX_ACTIONS
+    agent:hitl           hash    request_id -> encoded HITLRequest
+    agent:hitl:pending   zset    pending request ids, scored by priority then created_at
+    agent:briefings      stream  capped at MAX_BRIEFINGS entries
+
+Writes touching several keys go through MULTI/EXEC pipelines. Without
+Redis the same semantics are kept in memory with bounded deques.
 """
-import json
 import logging
+import threading
+from collections import deque
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
-from dataclasses import dataclass, field, asdict
+from typing import Any, Deque, Dict, List, Optional
+from dataclasses import dataclass, field, fields, asdict
 from enum import Enum
 
+from utils import codec
+
 logger = logging.getLogger(__name__)
 
 
@@ -46,6 +62,11 @@ class AgentMetrics:
     hitl_escalation_rate: float = 0.0
     recommendation_acceptance_rate: float = 0.0
 
+    # E-14 batch pipeline metrics
+    e14_forms_processed_total: int = 0
+    e14_throughput_forms_per_second: float = 0.0
+    e14_backlog: int = 0
+
     # Briefing metrics
     briefings_generated: int = 0
     last_briefing_at: Optional[str] = None
@@ -115,6 +136,41 @@ class HITLRequest:
         return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
 
 
+MAX_ACTIONS = 1000
+MAX_BRIEFINGS = 100
+
+HITL_PRIORITY_RANK = {'P0': 0, 'P1': 1, 'P2': 2, 'P3': 3}
+
+_METRIC_TYPES = {f.name: f.type for f in fields(AgentMetrics)}
+
+
+def _hitl_score(request: HITLRequest) -> float:
+    """Pending queue order: priority first, then oldest created_at."""
+    rank = HITL_PRIORITY_RANK.get(request.priority, len(HITL_PRIORITY_RANK))
+    try:
+        created = (datetime.fromisoformat(request.created_at) - datetime(1970, 1, 1)).total_seconds()
+    except (TypeError, ValueError):
+        created = 0.0
+    return rank * 1e10 + created
+
+
+def _metrics_from_hash(raw: Dict[Any, Any]) -> AgentMetrics:
+    """AgentMetrics from an HGETALL reply (bytes or str fields)."""
+    data = {}
+    for key, value in raw.items():
+        name = key.decode() if isinstance(key, bytes) else key
+        kind = _METRIC_TYPES.get(name)
+        if kind is None:
+            continue
+        value = value.decode() if isinstance(value, bytes) else value
+        if kind is int:
+            value = int(float(value))
+        elif kind is float:
+            value = float(value)
+        data[name] = value
+    return AgentMetrics.from_dict(data)
+
+
 class AgentState:
     """
     Manages agent state in Redis.
@@ -133,14 +189,23 @@ class AgentState:
 
         # In-memory fallback storage
         self._memory_store: Dict[str, Any] = {}
+        self._memory_lock = threading.RLock()
+        self._memory_metrics: Dict[str, Any] = {}
+        self._memory_actions: Deque[Dict[str, Any]] = deque(maxlen=MAX_ACTIONS)  # oldest first
+        self._memory_hitl: Dict[str, Dict[str, Any]] = {}
+        self._memory_briefings: Deque[Dict[str, Any]] = deque(maxlen=MAX_BRIEFINGS)
 
         # Key prefixes
         self._state_key = "agent:state"
         self._metrics_key = "agent:metrics"
         self._actions_key = "agent:actions"
         self._hitl_key = "agent:hitl"
+        self._hitl_pending_key = "agent:hitl:pending"
         self._briefings_key = "agent:briefings"
 
+        if not self._use_memory:
+            self._migrate_legacy_keys()
+
         logger.info(f"AgentState initialized (redis={'enabled' if redis_client else 'disabled'})")
 
     # ============================================================
@@ -181,29 +246,55 @@ class AgentState:
 
     def get_metrics(self) -> AgentMetrics:
         """Get current agent metrics."""
-        data = self._get(self._metrics_key)
-        if data:
-            return AgentMetrics.from_dict(data)
+        if self._use_memory:
+            with self._memory_lock:
+                return AgentMetrics.from_dict(self._memory_metrics)
+        try:
+            return _metrics_from_hash(self._redis.hgetall(self._metrics_key))
+        except Exception as e:
+            logger.error(f"Redis metrics read error: {e}")
         return AgentMetrics()
 
     def update_metrics(self, **kwargs) -> AgentMetrics:
         """Update specific metrics fields."""
-        metrics = self.get_metrics()
-        for key, value in kwargs.items():
-            if hasattr(metrics, key):
-                setattr(metrics, key, value)
-        self._set(self._metrics_key, metrics.to_dict())
-        return metrics
+        values = {key: value for key, value in kwargs.items() if key in _METRIC_TYPES}
+        to_set = {key: value for key, value in values.items() if value is not None}
+        to_clear = [key for key, value in values.items() if value is None]
+
+        if self._use_memory:
+            with self._memory_lock:
+                self._memory_metrics.update(to_set)
+                for key in to_clear:
+                    self._memory_metrics.pop(key, None)
+                return AgentMetrics.from_dict(self._memory_metrics)
+        try:
+            pipe = self._redis.pipeline()
+            if to_set:
+                pipe.hset(self._metrics_key, mapping=to_set)
+            if to_clear:
+                pipe.hdel(self._metrics_key, *to_clear)
+            pipe.hgetall(self._metrics_key)
+            return _metrics_from_hash(pipe.execute()[-1])
+        except Exception as e:
+            logger.error(f"Redis metrics update error: {e}")
+        return AgentMetrics()
 
     def increment_metric(self, metric_name: str, amount: int = 1) -> int:
         """Increment a numeric metric."""
-        metrics = self.get_metrics()
-        if hasattr(metrics, metric_name):
-            current = getattr(metrics, metric_name)
-            new_value = current + amount
-            setattr(metrics, metric_name, new_value)
-            self._set(self._metrics_key, metrics.to_dict())
-            return new_value
+        kind = _METRIC_TYPES.get(metric_name)
+        if kind not in (int, float):
+            return 0
+        if self._use_memory:
+            with self._memory_lock:
+                value = self._memory_metrics.get(metric_name, 0) + amount
+                self._memory_metrics[metric_name] = value
+                return value
+        try:
+            if kind is float:
+                return float(self._redis.hincrbyfloat(self._metrics_key, metric_name, amount))
+            return int(self._redis.hincrby(self._metrics_key, metric_name, amount))
+        except Exception as e:
+            logger.error(f"Redis metric increment error for {metric_name}: {e}")
         return 0
 
     def update_uptime(self) -> int:
@@ -221,59 +312,110 @@ class AgentState:
 
     def record_action(self, action: ActionRecord) -> None:
         """Record an agent action."""
-        actions = self._get_list(self._actions_key)
-        actions.append(action.to_dict())
-
-        # Keep only last 1000 actions
-        if len(actions) > 1000:
-            actions = actions[-1000:]
-
-        self._set_list(self._actions_key, actions)
-        self.increment_metric('actions_total')
+        self.record_actions([action])
         logger.debug(f"Recorded action: {action.action_type}")
 
+    def record_actions(self, records: List[ActionRecord]) -> None:
+        """Record a batch of actions with one pipelined write."""
+        if not records:
+            return
+        if self._use_memory:
+            with self._memory_lock:
+                self._memory_actions.extend(record.to_dict() for record in records)
+                self.increment_metric('actions_total', len(records))
+            return
+        try:
+            pipe = self._redis.pipeline()
+            pipe.lpush(self._actions_key, *[self._encode(record.to_dict()) for record in records])
+            pipe.ltrim(self._actions_key, 0, MAX_ACTIONS - 1)
+            pipe.hincrby(self._metrics_key, 'actions_total', len(records))
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"Redis action log error: {e}")
+
     def get_recent_actions(self, limit: int = 50) -> List[ActionRecord]:
         """Get recent actions."""
-        actions = self._get_list(self._actions_key)
-        return [ActionRecord.from_dict(a) for a in actions[-limit:]]
+        return [ActionRecord.from_dict(a) for a in self._load_actions(limit)]
 
     def get_actions_since(self, since: datetime) -> List[ActionRecord]:
         """Get actions since a given time."""
-        actions = self._get_list(self._actions_key)
         since_iso = since.isoformat()
         return [
             ActionRecord.from_dict(a)
-            for a in actions
+            for a in self._load_actions()
             if a.get('timestamp', '') >= since_iso
         ]
 
+    def _load_actions(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Logged actions oldest first; only the newest `limit` when given."""
+        if self._use_memory:
+            with self._memory_lock:
+                actions = list(self._memory_actions)
+            return actions[-limit:] if limit else actions
+        try:
+            raw = self._redis.lrange(self._actions_key, 0, limit - 1 if limit else -1)
+            return [self._decode(item) for item in reversed(raw)]
+        except Exception as e:
+            logger.error(f"Redis action log read error: {e}")
+        return []
+
     # ============================================================
     # HITL Queue Management
     # ============================================================
 
     def add_hitl_request(self, request: HITLRequest) -> None:
         """Add a HITL approval request."""
-        requests = self._get_list(self._hitl_key)
-        requests.append(request.to_dict())
-        self._set_list(self._hitl_key, requests)
-        self.increment_metric('hitl_pending')
+        pending = request.status == 'pending'
+        if self._use_memory:
+            with self._memory_lock:
+                self._memory_hitl[request.request_id] = request.to_dict()
+                if pending:
+                    self.increment_metric('hitl_pending')
+        else:
+            try:
+                pipe = self._redis.pipeline()
+                pipe.hset(self._hitl_key, request.request_id, self._encode(request.to_dict()))
+                if pending:
+                    pipe.zadd(self._hitl_pending_key, {request.request_id: _hitl_score(request)})
+                    pipe.hincrby(self._metrics_key, 'hitl_pending', 1)
+                pipe.execute()
+            except Exception as e:
+                logger.error(f"Redis HITL write error for {request.request_id}: {e}")
+                return
         logger.info(f"Added HITL request: {request.request_id}")
 
     def get_pending_hitl_requests(self) -> List[HITLRequest]:
-        """Get all pending HITL requests."""
-        requests = self._get_list(self._hitl_key)
-        return [
-            HITLRequest.from_dict(r)
-            for r in requests
-            if r.get('status') == 'pending'
-        ]
+        """Get all pending HITL requests, highest priority and oldest first."""
+        if self._use_memory:
+            with self._memory_lock:
+                pending = [
+                    HITLRequest.from_dict(r)
+                    for r in self._memory_hitl.values()
+                    if r.get('status') == 'pending'
+                ]
+            return sorted(pending, key=_hitl_score)
+        try:
+            request_ids = self._redis.zrange(self._hitl_pending_key, 0, -1)
+            if not request_ids:
+                return []
+            raw = self._redis.hmget(self._hitl_key, request_ids)
+            return [HITLRequest.from_dict(self._decode(item)) for item in raw if item is not None]
+        except Exception as e:
+            logger.error(f"Redis HITL queue read error: {e}")
+        return []
 
     def get_hitl_request(self, request_id: str) -> Optional[HITLRequest]:
         """Get a specific HITL request by ID."""
-        requests = self._get_list(self._hitl_key)
-        for r in requests:
-            if r.get('request_id') == request_id:
-                return HITLRequest.from_dict(r)
+        if self._use_memory:
+            with self._memory_lock:
+                data = self._memory_hitl.get(request_id)
+            return HITLRequest.from_dict(data) if data else None
+        try:
+            raw = self._redis.hget(self._hitl_key, request_id)
+            if raw is not None:
+                return HITLRequest.from_dict(self._decode(raw))
+        except Exception as e:
+            logger.error(f"Redis HITL read error for {request_id}: {e}")
         return None
 
     def update_hitl_request(
@@ -283,23 +425,54 @@ class AgentState:
         reviewed_by: str,
         notes: Optional[str] = None
     ) -> Optional[HITLRequest]:
-        """Update a HITL request status."""
-        requests = self._get_list(self._hitl_key)
-        for i, r in enumerate(requests):
-            if r.get('request_id') == request_id:
-                r['status'] = status
-                r['reviewed_by'] = reviewed_by
-                r['reviewed_at'] = datetime.utcnow().isoformat()
-                r['review_notes'] = notes
-                requests[i] = r
-                self._set_list(self._hitl_key, requests)
-
-                if status in ('approved', 'rejected'):
-                    self.increment_metric('hitl_pending', -1)
+        """
+        Update a HITL request status.
 
-                logger.info(f"HITL request {request_id} {status} by {reviewed_by}")
-                return HITLRequest.from_dict(r)
-        return None
+        Leaving 'pending' removes the request from the pending queue and
+        decrements hitl_pending exactly once, even if two workers review
+        it at the same time (the Redis update runs under WATCH).
+        """
+        def review(data: Dict[str, Any]) -> bool:
+            was_pending = data.get('status') == 'pending'
+            data['status'] = status
+            data['reviewed_by'] = reviewed_by
+            data['reviewed_at'] = datetime.utcnow().isoformat()
+            data['review_notes'] = notes
+            return was_pending and status != 'pending'
+
+        if self._use_memory:
+            with self._memory_lock:
+                data = self._memory_hitl.get(request_id)
+                if data is None:
+                    return None
+                if review(data):
+                    self.increment_metric('hitl_pending', -1)
+                data = dict(data)
+        else:
+            def transaction(pipe) -> Optional[Dict[str, Any]]:
+                raw = pipe.hget(self._hitl_key, request_id)
+                if raw is None:
+                    return None
+                data = self._decode(raw)
+                left_pending = review(data)
+                pipe.multi()
+                pipe.hset(self._hitl_key, request_id, self._encode(data))
+                if status != 'pending':
+                    pipe.zrem(self._hitl_pending_key, request_id)
+                if left_pending:
+                    pipe.hincrby(self._metrics_key, 'hitl_pending', -1)
+                return data
+
+            try:
+                data = self._redis.transaction(transaction, self._hitl_key, value_from_callable=True)
+            except Exception as e:
+                logger.error(f"Redis HITL update error for {request_id}: {e}")
+                return None
+            if data is None:
+                return None
+
+        logger.info(f"HITL request {request_id} {status} by {reviewed_by}")
+        return HITLRequest.from_dict(data)
 
     # ============================================================
     # Briefings
@@ -307,31 +480,46 @@ class AgentState:
 
     def store_briefing(self, briefing: Dict[str, Any]) -> None:
         """Store a generated briefing."""
-        briefings = self._get_list(self._briefings_key)
         briefing['stored_at'] = datetime.utcnow().isoformat()
-        briefings.append(briefing)
-
-        # Keep only last 100 briefings
-        if len(briefings) > 100:
-            briefings = briefings[-100:]
-
-        self._set_list(self._briefings_key, briefings)
-        self.update_metrics(
-            briefings_generated=len(briefings),
-            last_briefing_at=briefing['stored_at']
-        )
+        if self._use_memory:
+            with self._memory_lock:
+                self._memory_briefings.append(briefing)
+                self.increment_metric('briefings_generated')
+                self._memory_metrics['last_briefing_at'] = briefing['stored_at']
+            return
+        try:
+            pipe = self._redis.pipeline()
+            pipe.xadd(
+                self._briefings_key,
+                {'data': self._encode(briefing)},
+                maxlen=MAX_BRIEFINGS,
+                approximate=False
+            )
+            pipe.hincrby(self._metrics_key, 'briefings_generated', 1)
+            pipe.hset(self._metrics_key, 'last_briefing_at', briefing['stored_at'])
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"Redis briefing write error: {e}")
 
     def get_latest_briefing(self) -> Optional[Dict[str, Any]]:
         """Get the most recent briefing."""
-        briefings = self._get_list(self._briefings_key)
+        briefings = self.get_briefings(limit=1)
         if briefings:
             return briefings[-1]
         return None
 
     def get_briefings(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get recent briefings."""
-        briefings = self._get_list(self._briefings_key)
-        return briefings[-limit:]
+        if self._use_memory:
+            with self._memory_lock:
+                briefings = list(self._memory_briefings)
+            return briefings[-limit:]
+        try:
+            entries = self._redis.xrevrange(self._briefings_key, count=limit)
+            return [self._decode_stream_entry(entry_fields) for _, entry_fields in reversed(entries)]
+        except Exception as e:
+            logger.error(f"Redis briefing read error: {e}")
+        return []
 
     # ============================================================
     # Internal Storage Methods
@@ -344,7 +532,7 @@ class AgentState:
         try:
             data = self._redis.get(key)
             if data:
-                return json.loads(data)
+                return self._decode(data)
         except Exception as e:
             logger.error(f"Redis get error for {key}: {e}")
         return None
@@ -355,7 +543,7 @@ class AgentState:
             self._memory_store[key] = value
             return
         try:
-            data = json.dumps(value)
+            data = self._encode(value)
             if ttl:
                 self._redis.setex(key, ttl, data)
             else:
@@ -363,16 +551,59 @@ class AgentState:
         except Exception as e:
             logger.error(f"Redis set error for {key}: {e}")
 
-    def _get_list(self, key: str) -> List[Dict[str, Any]]:
-        """Get list from storage."""
-        data = self._get(key)
-        if data and isinstance(data, list):
-            return data
-        return []
+    @staticmethod
+    def _encode(value: Any) -> bytes:
+        return codec.encode(value, cache_type='agent')
+
+    @staticmethod
+    def _decode(payload: Any) -> Any:
+        return codec.decode(payload, cache_type='agent')
+
+    def _decode_stream_entry(self, entry_fields: Dict[Any, Any]) -> Dict[str, Any]:
+        payload = entry_fields.get(b'data', entry_fields.get('data'))
+        return self._decode(payload)
+
+    def _migrate_legacy_keys(self) -> None:
+        """
+        Move the JSON blobs written by earlier versions into native structures.
 
-    def _set_list(self, key: str, value: List[Dict[str, Any]]) -> None:
-        """Set list in storage."""
-        self._set(key, value)
+        Runs under WATCH, so when several workers start together only one
+        rewrites the data.
+        """
+        legacy_keys = [self._metrics_key, self._actions_key, self._hitl_key, self._briefings_key]
+
+        def transaction(pipe) -> int:
+            legacy = {}
+            for key in legacy_keys:
+                if pipe.type(key) in (b'string', 'string'):
+                    legacy[key] = self._decode(pipe.get(key))
+            if not legacy:
+                return 0
+
+            pipe.multi()
+            pipe.delete(*legacy)
+            metrics = legacy.get(self._metrics_key) or {}
+            values = {k: v for k, v in metrics.items() if k in _METRIC_TYPES and v is not None}
+            if values:
+                pipe.hset(self._metrics_key, mapping=values)
+            actions = (legacy.get(self._actions_key) or [])[-MAX_ACTIONS:]
+            if actions:
+                pipe.lpush(self._actions_key, *[self._encode(a) for a in actions])
+            for request in legacy.get(self._hitl_key) or []:
+                pipe.hset(self._hitl_key, request['request_id'], self._encode(request))
+                if request.get('status') == 'pending':
+                    score = _hitl_score(HITLRequest.from_dict(request))
+                    pipe.zadd(self._hitl_pending_key, {request['request_id']: score})
+            for briefing in (legacy.get(self._briefings_key) or [])[-MAX_BRIEFINGS:]:
+                pipe.xadd(self._briefings_key, {'data': self._encode(briefing)})
+            return len(legacy)
+
+        try:
+            migrated = self._redis.transaction(transaction, *legacy_keys, value_from_callable=True)
+            if migrated:
+                logger.info(f"Migrated {migrated} legacy agent state keys to native Redis structures")
+        except Exception as e:
+            logger.error(f"Redis legacy state migration error: {e}")
 
     def clear(self) -> None:
         """Clear all agent state."""
@@ -381,15 +612,19 @@ class AgentState:
             self._metrics_key,
             self._actions_key,
             self._hitl_key,
+            self._hitl_pending_key,
             self._briefings_key
         ]
         if self._use_memory:
-            for key in keys:
-                self._memory_store.pop(key, None)
+            with self._memory_lock:
+                self._memory_store.clear()
+                self._memory_metrics.clear()
+                self._memory_actions.clear()
+                self._memory_hitl.clear()
+                self._memory_briefings.clear()
         else:
-            for key in keys:
-                try:
-                    self._redis.delete(key)
-                except Exception as e:
-                    logger.error(f"Redis delete error for {key}: {e}")
+            try:
+                self._redis.delete(*keys)
+            except Exception as e:
+                logger.error(f"Redis delete error for agent state: {e}")
         logger.info("Agent state cleared")
@@ -0,0 +1,162 @@
+"""
+CPU inference backends for BETO, selected with Config.BETO_BACKEND.
+
+- fp32: the PyTorch model as trained (reference)
+- int8: PyTorch dynamic quantization of the Linear layers (qint8 weights,
+  activations quantized on the fly)
+- onnx: the model exported once to ONNX and run with ONNX Runtime
+
+Every backend returns (model, tokenizer, device). model(**inputs).logits
+gives the same output for all of them, so model_singleton and the
+inference scheduler do not care which one is loaded. Use
+compare_backends() to check parity with fp32 before switching
+production to int8 or onnx.
+"""
+import logging
+import os
+import re
+from types import SimpleNamespace
+from typing import Any, Dict, List, Tuple
+
+import torch
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+from config import Config
+
+try:
+    import onnxruntime  # type: ignore
+except ImportError:  # pragma: no cover
+    onnxruntime = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("fp32", "int8", "onnx")
+ONNX_OPSET = 14
+
+
+def _load_fp32(model_path: str) -> Tuple[Any, Any, torch.device]:
+    tokenizer = AutoTokenizer.from_pretrained(model_path)
+    model = AutoModelForSequenceClassification.from_pretrained(
+        model_path,
+        num_labels=3  # positive, negative, neutral
+    )
+    device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+    model.to(device)
+    model.eval()
+    return model, tokenizer, device
+
+
+def _load_int8(model_path: str) -> Tuple[Any, Any, torch.device]:
+    model, tokenizer, device = _load_fp32(model_path)
+    if device.type != 'cpu':
+        logger.warning("int8 dynamic quantization is CPU-only; using fp32 on %s", device)
+        return model, tokenizer, device
+    quantized = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return quantized, tokenizer, device
+
+
+class OnnxSequenceClassifier:
+    """ONNX Runtime session with the call signature of a transformers classifier."""
+
+    def __init__(self, session: Any):
+        self.session = session
+        self.input_names = [i.name for i in session.get_inputs()]
+
+    def __call__(self, **inputs: torch.Tensor) -> SimpleNamespace:
+        feed = {name: inputs[name].cpu().numpy() for name in self.input_names if name in inputs}
+        logits = self.session.run(["logits"], feed)[0]
+        return SimpleNamespace(logits=torch.from_numpy(logits))
+
+
+def onnx_path(model_path: str) -> str:
+    """Where the exported graph for model_path is stored."""
+    name = re.sub(r'[^A-Za-z0-9_.-]+', '_', model_path.strip('/'))
+    return os.path.join(Config.BETO_ONNX_DIR, f"{name}.onnx")
+
+
+def export_onnx(model_path: str, target: str) -> None:
+    """Export the fp32 model to an ONNX graph with dynamic batch and sequence axes."""
+    model, tokenizer, _ = _load_fp32(model_path)
+    model.to('cpu')
+    sample = tokenizer(["hola", "exportando el modelo"], return_tensors='pt', padding=True)
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+
+    os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+    tmp_target = f"{target}.tmp"
+    torch.onnx.export(
+        model,
+        tuple(sample[name] for name in input_names),
+        tmp_target,
+        input_names=input_names,
+        output_names=["logits"],
+        dynamic_axes=dynamic_axes,
+        opset_version=ONNX_OPSET,
+    )
+    os.replace(tmp_target, target)
+    logger.info(f"Exported BETO to ONNX: {target}")
+
+
+def _load_onnx(model_path: str) -> Tuple[Any, Any, torch.device]:
+    if onnxruntime is None:
+        logger.warning("onnxruntime not installed; using fp32 BETO backend")
+        return _load_fp32(model_path)
+
+    target = onnx_path(model_path)
+    if not os.path.exists(target):
+        export_onnx(model_path, target)
+
+    options = onnxruntime.SessionOptions()
+    options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if Config.BETO_TORCH_THREADS > 0:
+        options.intra_op_num_threads = Config.BETO_TORCH_THREADS
+    session = onnxruntime.InferenceSession(target, options, providers=["CPUExecutionProvider"])
+    tokenizer = AutoTokenizer.from_pretrained(model_path)
+    return OnnxSequenceClassifier(session), tokenizer, torch.device('cpu')
+
+
+_LOADERS = {
+    "fp32": _load_fp32,
+    "int8": _load_int8,
+    "onnx": _load_onnx,
+}
+
+
+def load_backend(backend: str, model_path: str) -> Tuple[Any, Any, torch.device]:
+    """Load BETO with the given backend; returns (model, tokenizer, device)."""
+    if backend not in _LOADERS:
+        raise ValueError(f"Unknown BETO backend '{backend}', expected one of {BACKENDS}")
+    if Config.BETO_TORCH_THREADS > 0:
+        torch.set_num_threads(Config.BETO_TORCH_THREADS)
+    return _LOADERS[backend](model_path)
+
+
+def compare_backends(
+    texts: List[str],
+    backends: Tuple[str, ...] = BACKENDS,
+    reference: str = "fp32",
+) -> Dict[str, Dict[str, float]]:
+    """
+    Accuracy parity of each backend against the reference backend.
+
+    Returns per backend: max and mean absolute probability difference and
+    the share of texts whose predicted label matches the reference.
+    """
+    from services.model_singleton import predict_probabilities
+
+    expected = predict_probabilities(texts, backend=reference)
+    report: Dict[str, Dict[str, float]] = {}
+    for backend in backends:
+        probs = predict_probabilities(texts, backend=backend)
+        diffs = [abs(a - b) for row, ref in zip(probs, expected) for a, b in zip(row, ref)]
+        agree = sum(
+            max(range(3), key=row.__getitem__) == max(range(3), key=ref.__getitem__)
+            for row, ref in zip(probs, expected)
+        )
+        report[backend] = {
+            "max_abs_diff": max(diffs) if diffs else 0.0,
+            "mean_abs_diff": sum(diffs) / len(diffs) if diffs else 0.0,
+            "label_agreement": agree / len(texts) if texts else 1.0,
+        }
+    return report
@@ -0,0 +1,347 @@
+"""
+Shared BETO inference sidecar.
+
+Gunicorn runs cpu_count() + 1 workers and recycles them every
+max_requests, so loading BETO in each worker means N resident copies
+and a cold load on every recycle. The sidecar is one process that owns
+the model and answers predict requests from all workers over a local
+Unix socket (multiprocessing.connection, authenticated with
+BETO_SIDECAR_AUTHKEY).
+
+Requests from all workers are merged into dynamic batches by
+services.inference_scheduler. The server binds its socket before
+loading the model, so requests sent during startup wait for the model
+instead of failing. Workers use
+BetoSidecarClient; when the sidecar is down they load the model
+in-process (see SentimentService._predict).
+
+The gunicorn master runs the sidecar under SidecarSupervisor, which
+respawns it when it exits so a crash does not silently leave every
+worker with its own model copy.
+
+Usage:
+    python -m services.beto_sidecar [--socket PATH]
+"""
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Callable, Dict, List, Optional
+
+from config import Config
+from utils.metrics import get_metrics_registry
+
+logger = logging.getLogger(__name__)
+
+PredictFn = Callable[[List[str]], List[List[float]]]
+
+
+class SidecarUnavailable(Exception):
+    """The sidecar could not be reached or did not answer in time."""
+
+
+def _authkey(value: Optional[str]) -> Optional[bytes]:
+    return value.encode('utf-8') if value else None
+
+
+def _default_predict(texts: List[str]) -> List[List[float]]:
+    from services.model_singleton import get_inference_scheduler
+    return get_inference_scheduler().predict(texts)
+
+
+def _default_load() -> None:
+    from services.model_singleton import get_beto_model
+    get_beto_model()
+
+
+class BetoSidecarServer:
+    """
+    Serve BETO predictions to local clients, one thread per connection.
+
+    predict is called concurrently from connection threads; the default
+    goes through the micro-batching scheduler, which merges requests
+    from different workers into shared batches.
+    """
+
+    def __init__(
+        self,
+        address: str = Config.BETO_SIDECAR_SOCKET,
+        authkey: Optional[str] = Config.BETO_SIDECAR_AUTHKEY,
+        predict: PredictFn = _default_predict,
+        load_model: Callable[[], None] = _default_load,
+    ):
+        self.address = address
+        self.authkey = _authkey(authkey)
+        self.predict = predict
+        self.load_model = load_model
+        self.ready = threading.Event()
+        self.load_error: Optional[str] = None
+        self._listener: Optional[Listener] = None
+        self._closed = False
+
+    def bind(self) -> None:
+        """Create the socket (owner-only) and start loading the model."""
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+        self._listener = Listener(self.address, family='AF_UNIX', authkey=self.authkey)
+        os.chmod(self.address, 0o600)
+        threading.Thread(target=self._load, name="beto-load", daemon=True).start()
+        logger.info(f"BETO sidecar listening on {self.address}")
+
+    def _load(self) -> None:
+        started = time.perf_counter()
+        try:
+            self.load_model()
+            logger.info(f"BETO sidecar model ready in {time.perf_counter() - started:.1f}s")
+        except Exception as e:
+            self.load_error = str(e)
+            logger.error(f"BETO sidecar failed to load model: {e}", exc_info=True)
+        finally:
+            self.ready.set()
+
+    def serve_forever(self) -> None:
+        if self._listener is None:
+            self.bind()
+        while not self._closed:
+            try:
+                conn = self._listener.accept()
+            except OSError:
+                if self._closed:
+                    break
+                logger.warning("BETO sidecar rejected a connection", exc_info=True)
+                continue
+            except Exception as e:
+                # AuthenticationError and peers that hang up mid-handshake
+                logger.warning(f"BETO sidecar rejected a connection: {e}")
+                continue
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def close(self) -> None:
+        self._closed = True
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+
+    def _handle(self, conn: Connection) -> None:
+        with conn:
+            while True:
+                try:
+                    request = conn.recv()
+                except (EOFError, OSError):
+                    return
+                conn.send(self._dispatch(request))
+
+    def _dispatch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        op = request.get('op')
+        if op == 'ping':
+            return {'ok': True, 'ready': self.ready.is_set(), 'pid': os.getpid(),
+                    'model': Config.BETO_MODEL_PATH}
+        if op != 'predict':
+            return {'error': f"unknown op: {op}"}
+
+        self.ready.wait()
+        if self.load_error:
+            return {'error': f"model not loaded: {self.load_error}"}
+        texts = request.get('texts') or []
+        started = time.perf_counter()
+        try:
+            probs = self.predict(texts)
+        except Exception as e:
+            logger.error(f"BETO sidecar inference failed: {e}", exc_info=True)
+            return {'error': str(e)}
+        get_metrics_registry().observe(
+            "castor_beto_sidecar_inference_seconds", time.perf_counter() - started
+        )
+        return {'probs': probs}
+
+
+class BetoSidecarClient:
+    """
+    Per-process client for the sidecar.
+
+    Keeps one connection, reopened after fork or failure. After a failure
+    the sidecar is not retried for retry_seconds, so callers fall back to
+    in-process inference without paying a connect attempt every call.
+    """
+
+    def __init__(
+        self,
+        address: str = Config.BETO_SIDECAR_SOCKET,
+        authkey: Optional[str] = Config.BETO_SIDECAR_AUTHKEY,
+        timeout: float = Config.BETO_SIDECAR_TIMEOUT,
+        retry_seconds: float = Config.BETO_SIDECAR_RETRY_SECONDS,
+    ):
+        self.address = address
+        self.authkey = _authkey(authkey)
+        self.timeout = timeout
+        self.retry_seconds = retry_seconds
+        self._conn: Optional[Connection] = None
+        self._pid: Optional[int] = None
+        self._down_until = 0.0
+        self._lock = threading.Lock()
+
+    def predict(self, texts: List[str]) -> List[List[float]]:
+        """Return [negative, neutral, positive] per text or raise SidecarUnavailable."""
+        response = self._request({'op': 'predict', 'texts': list(texts)})
+        if 'error' in response:
+            raise SidecarUnavailable(response['error'])
+        return response['probs']
+
+    def ping(self) -> Dict[str, Any]:
+        return self._request({'op': 'ping'})
+
+    def available(self) -> bool:
+        try:
+            return bool(self.ping().get('ok'))
+        except SidecarUnavailable:
+            return False
+
+    def close(self) -> None:
+        with self._lock:
+            self._drop()
+
+    def _request(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            if time.monotonic() < self._down_until:
+                raise SidecarUnavailable("sidecar marked down")
+            try:
+                conn = self._connection()
+                conn.send(message)
+                if not conn.poll(self.timeout):
+                    raise TimeoutError(f"no answer in {self.timeout}s")
+                return conn.recv()
+            except Exception as e:
+                self._drop()
+                self._down_until = time.monotonic() + self.retry_seconds
+                get_metrics_registry().inc("castor_beto_sidecar_failures_total")
+                logger.warning(f"BETO sidecar unavailable, retrying in {self.retry_seconds}s: {e}")
+                raise SidecarUnavailable(str(e)) from e
+
+    def _connection(self) -> Connection:
+        if self._conn is not None and self._pid != os.getpid():
+            # Inherited across fork (gunicorn preload): never share the socket
+            self._drop()
+        if self._conn is None:
+            self._conn = Client(self.address, family='AF_UNIX', authkey=self.authkey)
+            self._pid = os.getpid()
+        return self._conn
+
+    def _drop(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except OSError:
+                pass
+        self._conn = None
+        self._pid = None
+
+
+class SidecarSupervisor:
+    """
+    Run the sidecar as a child of the gunicorn master and respawn it.
+
+    A monitor thread polls the process every poll_interval seconds. When
+    it has exited it is started again; a sidecar that dies within
+    max_backoff seconds of starting is respawned with a doubling delay,
+    so a crash loop does not spin.
+    """
+
+    def __init__(
+        self,
+        cwd: Optional[str] = None,
+        command: Optional[List[str]] = None,
+        poll_interval: float = 5.0,
+        max_backoff: float = 60.0,
+    ):
+        self.cwd = cwd
+        self.command = command or [sys.executable, "-m", "services.beto_sidecar"]
+        self.poll_interval = poll_interval
+        self.max_backoff = max_backoff
+        self.process: Optional[subprocess.Popen] = None
+        self.restarts = 0
+        self._started_at = 0.0
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> subprocess.Popen:
+        with self._lock:
+            self._spawn()
+        self._thread = threading.Thread(target=self._monitor, name="beto-sidecar-monitor", daemon=True)
+        self._thread.start()
+        return self.process
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Stop monitoring, then terminate the sidecar (kill after timeout)."""
+        self._stopped.set()
+        with self._lock:
+            process = self.process
+        if self._thread is not None:
+            self._thread.join()
+        if process is not None and process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    def _spawn(self) -> None:
+        self.process = subprocess.Popen(self.command, cwd=self.cwd)
+        self._started_at = time.monotonic()
+
+    def _monitor(self) -> None:
+        delay = self.poll_interval
+        while not self._stopped.wait(delay):
+            with self._lock:
+                code = self.process.poll()
+                if code is None:
+                    delay = self.poll_interval
+                    continue
+                if self._stopped.is_set():
+                    return
+                uptime = time.monotonic() - self._started_at
+                logger.error(
+                    f"BETO sidecar (pid {self.process.pid}) exited with code {code} after {uptime:.0f}s, "
+                    f"respawning; workers use in-process BETO until it is back"
+                )
+                self._spawn()
+                self.restarts += 1
+            delay = min(delay * 2, self.max_backoff) if uptime < self.max_backoff else self.poll_interval
+
+
+_client: Optional[BetoSidecarClient] = None
+_client_lock = threading.Lock()
+
+
+def get_sidecar_client() -> BetoSidecarClient:
+    """Process-wide sidecar client."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = BetoSidecarClient()
+    return _client
+
+
+if __name__ == "__main__":
+    import argparse
+    import signal
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Shared BETO inference sidecar")
+    parser.add_argument("--socket", default=Config.BETO_SIDECAR_SOCKET)
+    args = parser.parse_args()
+
+    server = BetoSidecarServer(address=args.socket)
+    signal.signal(signal.SIGTERM, lambda *_: server.close())
+    server.bind()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
@@ -16,6 +16,7 @@ from models.database import (
     # Nuevos modelos para almacenamiento completo
     ApiCall, Tweet, AnalysisSnapshot, PndAxisMetric, ForecastSnapshot, CampaignStrategy
 )
+from services.tweet_bulk_writer import bulk_upsert_tweets, migrate_upsert_index
 
 logger = logging.getLogger(__name__)
 
@@ -48,9 +49,10 @@ class DatabaseService:
         self.SessionLocal = sessionmaker(bind=self.engine, autocommit=False, autoflush=False)
     
     def init_db(self):
-        """Initialize database tables."""
+        """Initialize database tables (and the tweet upsert index on existing tables)."""
         try:
             Base.metadata.create_all(bind=self.engine)
+            migrate_upsert_index(self.engine)
             logger.info("Database tables created")
         except Exception as e:
             logger.error(f"Error initializing database: {e}", exc_info=True)
@@ -299,6 +301,51 @@ class DatabaseService:
         finally:
             session.close()
     
+    def save_trending_topics(self, location: str, topics: List[Dict[str, Any]]) -> List[str]:
+        """
+        Upsert the current trending topics of a location in one transaction.
+
+        Active rows with the same (location, topic) are updated in place, new
+        topics are inserted and active topics no longer trending are
+        deactivated. Returns the ids in the order of topics.
+        """
+        session = self.get_session()
+        try:
+            active: Dict[str, TrendingTopic] = {}
+            for row in session.query(TrendingTopic).filter(
+                TrendingTopic.location == location,
+                TrendingTopic.is_active.is_(True)
+            ):
+                if row.topic in active:
+                    row.is_active = False  # Duplicate from per-topic inserts
+                else:
+                    active[row.topic] = row
+
+            rows = []
+            for topic_data in topics:
+                row = active.pop(topic_data['topic'], None)
+                if row is None:
+                    row = TrendingTopic(**topic_data)
+                    session.add(row)
+                else:
+                    for field, value in topic_data.items():
+                        setattr(row, field, value)
+                rows.append(row)
+            for row in active.values():
+                row.is_active = False
+
+            session.flush()
+            topic_ids = [str(row.id) for row in rows]
+            session.commit()
+            logger.info(f"Trending topics saved for {location}: {len(topic_ids)}")
+            return topic_ids
+        except SQLAlchemyError as e:
+            session.rollback()
+            logger.error(f"Error saving trending topics: {e}", exc_info=True)
+            return []
+        finally:
+            session.close()
+
     def get_active_trending_topics(self, location: Optional[str] = None, limit: int = 10) -> List[TrendingTopic]:
         """Get active trending topics."""
         session = self.get_session()
@@ -658,56 +705,12 @@ class DatabaseService:
 
     def save_tweets(self, api_call_id: str, tweets_data: List[Dict[str, Any]]) -> int:
         """
-        Save multiple tweets to database.
+        Save multiple tweets to database (bulk upsert on api_call_id + tweet_id).
         Returns count of tweets saved.
         """
         session = self.get_session()
-        saved_count = 0
-        try:
-            for tweet_data in tweets_data:
-                tweet = Tweet(
-                    api_call_id=api_call_id,
-                    tweet_id=tweet_data.get('tweet_id', ''),
-                    author_id=tweet_data.get('author_id'),
-                    author_username=tweet_data.get('author_username'),
-                    author_name=tweet_data.get('author_name'),
-                    author_verified=tweet_data.get('author_verified', False),
-                    author_followers_count=tweet_data.get('author_followers_count', 0),
-                    content=tweet_data.get('content', ''),
-                    content_cleaned=tweet_data.get('content_cleaned'),
-                    tweet_created_at=tweet_data.get('tweet_created_at'),
-                    language=tweet_data.get('language'),
-                    source=tweet_data.get('source'),
-                    retweet_count=tweet_data.get('retweet_count', 0),
-                    like_count=tweet_data.get('like_count', 0),
-                    reply_count=tweet_data.get('reply_count', 0),
-                    quote_count=tweet_data.get('quote_count', 0),
-                    impression_count=tweet_data.get('impression_count', 0),
-                    is_retweet=tweet_data.get('is_retweet', False),
-                    is_reply=tweet_data.get('is_reply', False),
-                    is_quote=tweet_data.get('is_quote', False),
-                    replied_to_tweet_id=tweet_data.get('replied_to_tweet_id'),
-                    quoted_tweet_id=tweet_data.get('quoted_tweet_id'),
-                    hashtags=tweet_data.get('hashtags', []),
-                    mentions=tweet_data.get('mentions', []),
-                    urls=tweet_data.get('urls', []),
-                    geo_country=tweet_data.get('geo_country'),
-                    geo_city=tweet_data.get('geo_city'),
-                    geo_coordinates=tweet_data.get('geo_coordinates'),
-                    sentiment_positive=tweet_data.get('sentiment_positive', 0.0),
-                    sentiment_negative=tweet_data.get('sentiment_negative', 0.0),
-                    sentiment_neutral=tweet_data.get('sentiment_neutral', 0.0),
-                    sentiment_label=tweet_data.get('sentiment_label'),
-                    sentiment_confidence=tweet_data.get('sentiment_confidence', 0.0),
-                    pnd_topic=tweet_data.get('pnd_topic'),
-                    pnd_confidence=tweet_data.get('pnd_confidence', 0.0),
-                    pnd_secondary_topic=tweet_data.get('pnd_secondary_topic'),
-                    is_potential_bot=tweet_data.get('is_potential_bot', False),
-                    bot_score=tweet_data.get('bot_score', 0.0)
-                )
-                session.add(tweet)
-                saved_count += 1
-
+        try:
+            saved_count = bulk_upsert_tweets(session.connection(), api_call_id, tweets_data)
             session.commit()
             logger.info(f"Saved {saved_count} tweets for API call {api_call_id}")
             return saved_count
@@ -718,6 +721,46 @@ class DatabaseService:
         finally:
             session.close()
 
+    def save_analysis_results(
+        self,
+        api_call_id: str,
+        tweets_data: Optional[List[Dict[str, Any]]] = None,
+        snapshot_data: Optional[Dict[str, Any]] = None,
+        pnd_metrics: Optional[List[Dict[str, Any]]] = None,
+        forecast_data: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Save tweets, analysis snapshot, PND metrics and forecast of an API call
+        in one transaction; nothing is written if any part fails.
+
+        Returns:
+            Dict with 'tweets' and 'pnd_metrics' counts and 'snapshot_id' /
+            'forecast_id', or None on error
+        """
+        session = self.get_session()
+        try:
+            result: Dict[str, Any] = {'tweets': 0, 'snapshot_id': None, 'pnd_metrics': 0, 'forecast_id': None}
+            if tweets_data:
+                result['tweets'] = bulk_upsert_tweets(session.connection(), api_call_id, tweets_data)
+            snapshot = self._build_analysis_snapshot(api_call_id, snapshot_data) if snapshot_data else None
+            metrics = self._build_pnd_metrics(api_call_id, pnd_metrics or [])
+            forecast = self._build_forecast_snapshot(api_call_id, forecast_data) if forecast_data else None
+            session.add_all([obj for obj in (snapshot, forecast) if obj is not None] + metrics)
+            session.flush()
+
+            result['snapshot_id'] = snapshot.id if snapshot else None
+            result['pnd_metrics'] = len(metrics)
+            result['forecast_id'] = forecast.id if forecast else None
+            session.commit()
+            logger.info(f"Saved analysis results for API call {api_call_id}: {result}")
+            return result
+        except SQLAlchemyError as e:
+            session.rollback()
+            logger.error(f"Error saving analysis results: {e}", exc_info=True)
+            return None
+        finally:
+            session.close()
+
     def save_analysis_snapshot(
         self,
         api_call_id: str,
@@ -726,25 +769,7 @@ class DatabaseService:
         """Save analysis snapshot (aggregated metrics)."""
         session = self.get_session()
         try:
-            snapshot = AnalysisSnapshot(
-                api_call_id=api_call_id,
-                icce=snapshot_data.get('icce', 0.0),
-                sov=snapshot_data.get('sov', 0.0),
-                sna=snapshot_data.get('sna', 0.0),
-                momentum=snapshot_data.get('momentum', 0.0),
-                sentiment_positive=snapshot_data.get('sentiment_positive', 0.0),
-                sentiment_negative=snapshot_data.get('sentiment_negative', 0.0),
-                sentiment_neutral=snapshot_data.get('sentiment_neutral', 0.0),
-                executive_summary=snapshot_data.get('executive_summary'),
-                key_findings=snapshot_data.get('key_findings', []),
-                key_stats=snapshot_data.get('key_stats', []),
-                recommendations=snapshot_data.get('recommendations', []),
-                trending_topics=snapshot_data.get('trending_topics', []),
-                geo_distribution=snapshot_data.get('geo_distribution', []),
-                opportunity=snapshot_data.get('opportunity'),
-                risk_level=snapshot_data.get('risk_level'),
-                risk_description=snapshot_data.get('risk_description')
-            )
+            snapshot = self._build_analysis_snapshot(api_call_id, snapshot_data)
             session.add(snapshot)
             session.commit()
             session.refresh(snapshot)
@@ -764,27 +789,10 @@ class DatabaseService:
     ) -> int:
         """Save PND axis metrics. Returns count saved."""
         session = self.get_session()
-        saved_count = 0
-        try:
-            for metric_data in pnd_metrics:
-                metric = PndAxisMetric(
-                    api_call_id=api_call_id,
-                    pnd_axis=metric_data.get('pnd_axis', ''),
-                    pnd_axis_display=metric_data.get('pnd_axis_display'),
-                    icce=metric_data.get('icce', 0.0),
-                    sov=metric_data.get('sov', 0.0),
-                    sna=metric_data.get('sna', 0.0),
-                    tweet_count=metric_data.get('tweet_count', 0),
-                    trend=metric_data.get('trend'),
-                    trend_change=metric_data.get('trend_change', 0.0),
-                    sentiment_positive=metric_data.get('sentiment_positive', 0.0),
-                    sentiment_negative=metric_data.get('sentiment_negative', 0.0),
-                    sentiment_neutral=metric_data.get('sentiment_neutral', 0.0),
-                    key_insights=metric_data.get('key_insights', []),
-                    sample_tweets=metric_data.get('sample_tweets', [])
-                )
-                session.add(metric)
-                saved_count += 1
+        try:
+            metrics = self._build_pnd_metrics(api_call_id, pnd_metrics)
+            session.add_all(metrics)
+            saved_count = len(metrics)
 
             session.commit()
             logger.info(f"Saved {saved_count} PND metrics for API call {api_call_id}")
@@ -804,24 +812,7 @@ class DatabaseService:
         """Save forecast snapshot."""
         session = self.get_session()
         try:
-            forecast = ForecastSnapshot(
-                api_call_id=api_call_id,
-                historical_dates=forecast_data.get('historical_dates', []),
-                icce_values=forecast_data.get('icce_values', []),
-                icce_smooth=forecast_data.get('icce_smooth', []),
-                momentum_values=forecast_data.get('momentum_values', []),
-                forecast_dates=forecast_data.get('forecast_dates', []),
-                icce_pred=forecast_data.get('icce_pred', []),
-                pred_low=forecast_data.get('pred_low', []),
-                pred_high=forecast_data.get('pred_high', []),
-                model_type=forecast_data.get('model_type', 'holt_winters'),
-                model_confidence=forecast_data.get('model_confidence', 0.0),
-                days_back=forecast_data.get('days_back', 30),
-                forecast_days=forecast_data.get('forecast_days', 14),
-                icce_current=forecast_data.get('icce_current', 0.0),
-                icce_predicted_end=forecast_data.get('icce_predicted_end', 0.0),
-                icce_change_predicted=forecast_data.get('icce_change_predicted', 0.0)
-            )
+            forecast = self._build_forecast_snapshot(api_call_id, forecast_data)
             session.add(forecast)
             session.commit()
             session.refresh(forecast)
@@ -834,6 +825,71 @@ class DatabaseService:
         finally:
             session.close()
 
+    @staticmethod
+    def _build_analysis_snapshot(api_call_id: str, snapshot_data: Dict[str, Any]) -> AnalysisSnapshot:
+        return AnalysisSnapshot(
+            api_call_id=api_call_id,
+            icce=snapshot_data.get('icce', 0.0),
+            sov=snapshot_data.get('sov', 0.0),
+            sna=snapshot_data.get('sna', 0.0),
+            momentum=snapshot_data.get('momentum', 0.0),
+            sentiment_positive=snapshot_data.get('sentiment_positive', 0.0),
+            sentiment_negative=snapshot_data.get('sentiment_negative', 0.0),
+            sentiment_neutral=snapshot_data.get('sentiment_neutral', 0.0),
+            executive_summary=snapshot_data.get('executive_summary'),
+            key_findings=snapshot_data.get('key_findings', []),
+            key_stats=snapshot_data.get('key_stats', []),
+            recommendations=snapshot_data.get('recommendations', []),
+            trending_topics=snapshot_data.get('trending_topics', []),
+            geo_distribution=snapshot_data.get('geo_distribution', []),
+            opportunity=snapshot_data.get('opportunity'),
+            risk_level=snapshot_data.get('risk_level'),
+            risk_description=snapshot_data.get('risk_description')
+        )
+
+    @staticmethod
+    def _build_pnd_metrics(api_call_id: str, pnd_metrics: List[Dict[str, Any]]) -> List[PndAxisMetric]:
+        return [
+            PndAxisMetric(
+                api_call_id=api_call_id,
+                pnd_axis=metric_data.get('pnd_axis', ''),
+                pnd_axis_display=metric_data.get('pnd_axis_display'),
+                icce=metric_data.get('icce', 0.0),
+                sov=metric_data.get('sov', 0.0),
+                sna=metric_data.get('sna', 0.0),
+                tweet_count=metric_data.get('tweet_count', 0),
+                trend=metric_data.get('trend'),
+                trend_change=metric_data.get('trend_change', 0.0),
+                sentiment_positive=metric_data.get('sentiment_positive', 0.0),
+                sentiment_negative=metric_data.get('sentiment_negative', 0.0),
+                sentiment_neutral=metric_data.get('sentiment_neutral', 0.0),
+                key_insights=metric_data.get('key_insights', []),
+                sample_tweets=metric_data.get('sample_tweets', [])
+            )
+            for metric_data in pnd_metrics
+        ]
+
+    @staticmethod
+    def _build_forecast_snapshot(api_call_id: str, forecast_data: Dict[str, Any]) -> ForecastSnapshot:
+        return ForecastSnapshot(
+            api_call_id=api_call_id,
+            historical_dates=forecast_data.get('historical_dates', []),
+            icce_values=forecast_data.get('icce_values', []),
+            icce_smooth=forecast_data.get('icce_smooth', []),
+            momentum_values=forecast_data.get('momentum_values', []),
+            forecast_dates=forecast_data.get('forecast_dates', []),
+            icce_pred=forecast_data.get('icce_pred', []),
+            pred_low=forecast_data.get('pred_low', []),
+            pred_high=forecast_data.get('pred_high', []),
+            model_type=forecast_data.get('model_type', 'holt_winters'),
+            model_confidence=forecast_data.get('model_confidence', 0.0),
+            days_back=forecast_data.get('days_back', 30),
+            forecast_days=forecast_data.get('forecast_days', 14),
+            icce_current=forecast_data.get('icce_current', 0.0),
+            icce_predicted_end=forecast_data.get('icce_predicted_end', 0.0),
+            icce_change_predicted=forecast_data.get('icce_change_predicted', 0.0)
+        )
+
     def save_campaign_strategy(
         self,
         api_call_id: str,
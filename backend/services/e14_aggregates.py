@@ -0,0 +1,409 @@
+"""
+Materialized aggregates for the E-14 scraper tables.
+
+The dashboard endpoints in app/routes/e14_data.py used to run full
+GROUP BY scans over e14_scraper_votes x e14_scraper_forms on every
+request. This module keeps two summary tables up to date with SQLite
+triggers, so every writer (loader scripts, OCR batches, corrections)
+maintains them without code changes:
+
+- e14_agg_party: votes per (corporacion, departamento, municipio, party_name)
+- e14_agg_forms: form counts and vote totals per (corporacion, departamento, municipio)
+
+Votes whose form does not exist are excluded, matching the previous JOIN.
+
+The tables, triggers and first fill are created offline, never from a
+request: by scripts/load_e14_from_scraper.py and by the ``init`` command
+below, run once at deploy. The dashboard only checks aggregates_available()
+and falls back to the base tables while they are missing.
+
+Usage:
+    python -m services.e14_aggregates init [--db PATH]
+    python -m services.e14_aggregates rebuild [--db PATH]
+    python -m services.e14_aggregates check [--db PATH]
+"""
+import logging
+import os
+import sqlite3
+import sys
+from typing import Any, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = os.path.expanduser("~/Downloads/Code/Proyectos/castor/backend/data/castor.db")
+
+AGG_TABLES_SQL = """
+    CREATE TABLE IF NOT EXISTS e14_agg_party (
+        corporacion TEXT NOT NULL,
+        departamento TEXT NOT NULL,
+        municipio TEXT NOT NULL,
+        party_name TEXT NOT NULL,
+        total_votes INTEGER NOT NULL DEFAULT 0,
+        vote_rows INTEGER NOT NULL DEFAULT 0,
+        mesas_count INTEGER NOT NULL DEFAULT 0,
+        confidence_sum REAL NOT NULL DEFAULT 0,
+        confidence_count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (corporacion, departamento, municipio, party_name)
+    );
+
+    CREATE TABLE IF NOT EXISTS e14_agg_forms (
+        corporacion TEXT NOT NULL,
+        departamento TEXT NOT NULL,
+        municipio TEXT NOT NULL,
+        total_forms INTEGER NOT NULL DEFAULT 0,
+        ocr_done INTEGER NOT NULL DEFAULT 0,
+        ocr_pending INTEGER NOT NULL DEFAULT 0,
+        total_votos INTEGER NOT NULL DEFAULT 0,
+        ocr_total_votos INTEGER NOT NULL DEFAULT 0,
+        ocr_votos_blancos INTEGER NOT NULL DEFAULT 0,
+        ocr_votos_nulos INTEGER NOT NULL DEFAULT 0,
+        confidence_sum REAL NOT NULL DEFAULT 0,
+        confidence_count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (corporacion, departamento, municipio)
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_agg_party_party ON e14_agg_party(party_name);
+"""
+
+# Adds (sign = +1) or removes (sign = -1) one form row from e14_agg_forms.
+_FORM_DELTA_SQL = """
+    INSERT INTO e14_agg_forms (
+        corporacion, departamento, municipio, total_forms, ocr_done, ocr_pending,
+        total_votos, ocr_total_votos, ocr_votos_blancos, ocr_votos_nulos,
+        confidence_sum, confidence_count
+    )
+    VALUES (
+        {r}.corporacion, {r}.departamento, {r}.municipio,
+        {s},
+        CASE WHEN {r}.ocr_processed = 1 THEN {s} ELSE 0 END,
+        CASE WHEN {r}.ocr_processed = 0 THEN {s} ELSE 0 END,
+        {s} * COALESCE({r}.total_votos, 0),
+        {s} * CASE WHEN {r}.ocr_processed = 1 THEN COALESCE({r}.total_votos, 0) ELSE 0 END,
+        {s} * CASE WHEN {r}.ocr_processed = 1 THEN COALESCE({r}.votos_blancos, 0) ELSE 0 END,
+        {s} * CASE WHEN {r}.ocr_processed = 1 THEN COALESCE({r}.votos_nulos, 0) ELSE 0 END,
+        {s} * COALESCE({r}.ocr_confidence, 0),
+        {s} * ({r}.ocr_confidence IS NOT NULL)
+    )
+    ON CONFLICT (corporacion, departamento, municipio) DO UPDATE SET
+        total_forms = total_forms + excluded.total_forms,
+        ocr_done = ocr_done + excluded.ocr_done,
+        ocr_pending = ocr_pending + excluded.ocr_pending,
+        total_votos = total_votos + excluded.total_votos,
+        ocr_total_votos = ocr_total_votos + excluded.ocr_total_votos,
+        ocr_votos_blancos = ocr_votos_blancos + excluded.ocr_votos_blancos,
+        ocr_votos_nulos = ocr_votos_nulos + excluded.ocr_votos_nulos,
+        confidence_sum = confidence_sum + excluded.confidence_sum,
+        confidence_count = confidence_count + excluded.confidence_count;
+"""
+
+# Adds one vote row to e14_agg_party under its form's location. mesas_count
+# only moves when no other row of (form, party) exists. Rows are compared by
+# id so the same statements work for an UPDATE (remove OLD, add NEW).
+_VOTE_ADD_SQL = """
+    INSERT INTO e14_agg_party (
+        corporacion, departamento, municipio, party_name,
+        total_votes, vote_rows, mesas_count, confidence_sum, confidence_count
+    )
+    SELECT f.corporacion, f.departamento, f.municipio, NEW.party_name,
+           COALESCE(NEW.votes, 0), 1,
+           NOT EXISTS (
+               SELECT 1 FROM e14_scraper_votes v
+               WHERE v.form_id = NEW.form_id AND v.party_name = NEW.party_name AND v.id != NEW.id),
+           COALESCE(NEW.confidence, 0), NEW.confidence IS NOT NULL
+    FROM e14_scraper_forms f
+    WHERE f.id = NEW.form_id
+    ON CONFLICT (corporacion, departamento, municipio, party_name) DO UPDATE SET
+        total_votes = total_votes + excluded.total_votes,
+        vote_rows = vote_rows + 1,
+        mesas_count = mesas_count + excluded.mesas_count,
+        confidence_sum = confidence_sum + excluded.confidence_sum,
+        confidence_count = confidence_count + excluded.confidence_count;
+"""
+
+# Removes one vote row. mesas_count only moves when no other row of (form, party) is left.
+_VOTE_REMOVE_SQL = """
+    UPDATE e14_agg_party SET
+        total_votes = total_votes - COALESCE(OLD.votes, 0),
+        vote_rows = vote_rows - 1,
+        mesas_count = mesas_count - NOT EXISTS (
+            SELECT 1 FROM e14_scraper_votes v
+            WHERE v.form_id = OLD.form_id AND v.party_name = OLD.party_name AND v.id != OLD.id
+        ),
+        confidence_sum = confidence_sum - COALESCE(OLD.confidence, 0),
+        confidence_count = confidence_count - (OLD.confidence IS NOT NULL)
+    WHERE party_name = OLD.party_name
+      AND (corporacion, departamento, municipio) = (
+          SELECT f.corporacion, f.departamento, f.municipio
+          FROM e14_scraper_forms f WHERE f.id = OLD.form_id
+      );
+"""
+
+# Removes / adds all votes of one form, for forms that are deleted or moved
+# to another location. Must run while the vote rows still exist.
+_FORM_VOTES_REMOVE_SQL = """
+    UPDATE e14_agg_party SET
+        total_votes = total_votes - (
+            SELECT COALESCE(SUM(v.votes), 0) FROM e14_scraper_votes v
+            WHERE v.form_id = {r}.id AND v.party_name = e14_agg_party.party_name),
+        vote_rows = vote_rows - (
+            SELECT COUNT(*) FROM e14_scraper_votes v
+            WHERE v.form_id = {r}.id AND v.party_name = e14_agg_party.party_name),
+        mesas_count = mesas_count - 1,
+        confidence_sum = confidence_sum - (
+            SELECT COALESCE(SUM(v.confidence), 0) FROM e14_scraper_votes v
+            WHERE v.form_id = {r}.id AND v.party_name = e14_agg_party.party_name),
+        confidence_count = confidence_count - (
+            SELECT COUNT(v.confidence) FROM e14_scraper_votes v
+            WHERE v.form_id = {r}.id AND v.party_name = e14_agg_party.party_name)
+    WHERE corporacion = {r}.corporacion
+      AND departamento = {r}.departamento
+      AND municipio = {r}.municipio
+      AND party_name IN (SELECT party_name FROM e14_scraper_votes WHERE form_id = {r}.id);
+"""
+
+_FORM_VOTES_ADD_SQL = """
+    INSERT INTO e14_agg_party (
+        corporacion, departamento, municipio, party_name,
+        total_votes, vote_rows, mesas_count, confidence_sum, confidence_count
+    )
+    SELECT NEW.corporacion, NEW.departamento, NEW.municipio, v.party_name,
+           COALESCE(SUM(v.votes), 0), COUNT(*), 1,
+           COALESCE(SUM(v.confidence), 0), COUNT(v.confidence)
+    FROM e14_scraper_votes v
+    WHERE v.form_id = NEW.id
+    GROUP BY v.party_name
+    ON CONFLICT (corporacion, departamento, municipio, party_name) DO UPDATE SET
+        total_votes = total_votes + excluded.total_votes,
+        vote_rows = vote_rows + excluded.vote_rows,
+        mesas_count = mesas_count + 1,
+        confidence_sum = confidence_sum + excluded.confidence_sum,
+        confidence_count = confidence_count + excluded.confidence_count;
+"""
+
+_FORM_COLUMNS = (
+    "corporacion, departamento, municipio, ocr_processed, total_votos, votos_blancos, votos_nulos, ocr_confidence"
+)
+
+TRIGGERS_SQL = f"""
+    CREATE TRIGGER IF NOT EXISTS trg_e14_agg_form_insert
+    AFTER INSERT ON e14_scraper_forms
+    BEGIN
+        {_FORM_DELTA_SQL.format(r="NEW", s="1")}
+    END;
+
+    -- BEFORE so the form's votes are still there (ON DELETE CASCADE removes
+    -- them after the parent row is gone, when their own triggers can no
+    -- longer resolve the location).
+    CREATE TRIGGER IF NOT EXISTS trg_e14_agg_form_delete
+    BEFORE DELETE ON e14_scraper_forms
+    BEGIN
+        {_FORM_DELTA_SQL.format(r="OLD", s="-1")}
+        {_FORM_VOTES_REMOVE_SQL.format(r="OLD")}
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_e14_agg_form_update
+    AFTER UPDATE OF {_FORM_COLUMNS} ON e14_scraper_forms
+    BEGIN
+        {_FORM_DELTA_SQL.format(r="OLD", s="-1")}
+        {_FORM_DELTA_SQL.format(r="NEW", s="1")}
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_e14_agg_form_relocate
+    AFTER UPDATE OF corporacion, departamento, municipio ON e14_scraper_forms
+    WHEN OLD.corporacion IS NOT NEW.corporacion
+      OR OLD.departamento IS NOT NEW.departamento
+      OR OLD.municipio IS NOT NEW.municipio
+    BEGIN
+        {_FORM_VOTES_REMOVE_SQL.format(r="OLD")}
+        {_FORM_VOTES_ADD_SQL}
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_e14_agg_vote_insert
+    AFTER INSERT ON e14_scraper_votes
+    BEGIN
+        {_VOTE_ADD_SQL}
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_e14_agg_vote_delete
+    AFTER DELETE ON e14_scraper_votes
+    BEGIN
+        {_VOTE_REMOVE_SQL}
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_e14_agg_vote_update
+    AFTER UPDATE OF form_id, party_name, votes, confidence ON e14_scraper_votes
+    BEGIN
+        {_VOTE_REMOVE_SQL}
+        {_VOTE_ADD_SQL}
+    END;
+"""
+
+# Ground truth straight from the base tables, in the aggregate tables' shape.
+_PARTY_SOURCE_SQL = """
+    SELECT f.corporacion, f.departamento, f.municipio, v.party_name,
+           COALESCE(SUM(v.votes), 0), COUNT(*), COUNT(DISTINCT v.form_id),
+           COALESCE(SUM(v.confidence), 0), COUNT(v.confidence)
+    FROM e14_scraper_votes v
+    JOIN e14_scraper_forms f ON v.form_id = f.id
+    GROUP BY f.corporacion, f.departamento, f.municipio, v.party_name
+"""
+
+_FORMS_SOURCE_SQL = """
+    SELECT corporacion, departamento, municipio,
+           COUNT(*),
+           SUM(CASE WHEN ocr_processed = 1 THEN 1 ELSE 0 END),
+           SUM(CASE WHEN ocr_processed = 0 THEN 1 ELSE 0 END),
+           COALESCE(SUM(total_votos), 0),
+           COALESCE(SUM(CASE WHEN ocr_processed = 1 THEN total_votos ELSE 0 END), 0),
+           COALESCE(SUM(CASE WHEN ocr_processed = 1 THEN votos_blancos ELSE 0 END), 0),
+           COALESCE(SUM(CASE WHEN ocr_processed = 1 THEN votos_nulos ELSE 0 END), 0),
+           COALESCE(SUM(ocr_confidence), 0), COUNT(ocr_confidence)
+    FROM e14_scraper_forms
+    GROUP BY corporacion, departamento, municipio
+"""
+
+_TRIGGERS = (
+    "trg_e14_agg_form_insert", "trg_e14_agg_form_delete", "trg_e14_agg_form_update",
+    "trg_e14_agg_form_relocate", "trg_e14_agg_vote_insert", "trg_e14_agg_vote_delete",
+    "trg_e14_agg_vote_update",
+)
+
+_LOCATION = ("corporacion", "departamento", "municipio")
+_PARTY_COLUMNS = ("total_votes", "vote_rows", "mesas_count", "confidence_sum", "confidence_count")
+_FORMS_COLUMNS = (
+    "total_forms", "ocr_done", "ocr_pending", "total_votos", "ocr_total_votos",
+    "ocr_votos_blancos", "ocr_votos_nulos", "confidence_sum", "confidence_count",
+)
+
+
+def _table_exists(conn: sqlite3.Connection, name: str) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone()
+    return row is not None
+
+
+def aggregates_available(conn: sqlite3.Connection) -> bool:
+    """
+    Whether the aggregate tables and all their triggers exist (read-only check).
+
+    Without the triggers the tables would silently drift, so both are required.
+    """
+    names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")}
+    return {"e14_agg_party", "e14_agg_forms", *_TRIGGERS} <= names
+
+
+def init_aggregates(conn: sqlite3.Connection) -> bool:
+    """
+    Create the aggregate tables and triggers if missing.
+
+    The first time the tables are created they are filled from the base
+    tables. Does nothing if the scraper tables do not exist yet.
+
+    Returns:
+        True if the aggregates are available
+    """
+    if not (_table_exists(conn, "e14_scraper_forms") and _table_exists(conn, "e14_scraper_votes")):
+        return False
+
+    created = not _table_exists(conn, "e14_agg_party") or not _table_exists(conn, "e14_agg_forms")
+    conn.executescript(AGG_TABLES_SQL)
+    conn.executescript(TRIGGERS_SQL)
+    if created:
+        rebuild(conn)
+    return True
+
+
+def rebuild(conn: sqlite3.Connection) -> Dict[str, int]:
+    """
+    Recompute both aggregate tables from the base tables in one transaction.
+
+    Returns:
+        Row counts of the rebuilt tables
+    """
+    conn.executescript(AGG_TABLES_SQL)
+    with conn:
+        conn.execute("DELETE FROM e14_agg_party")
+        conn.execute("DELETE FROM e14_agg_forms")
+        conn.execute(f"INSERT INTO e14_agg_party "
+                     f"(corporacion, departamento, municipio, party_name, {', '.join(_PARTY_COLUMNS)}) "
+                     f"{_PARTY_SOURCE_SQL}")
+        conn.execute(f"INSERT INTO e14_agg_forms "
+                     f"(corporacion, departamento, municipio, {', '.join(_FORMS_COLUMNS)}) "
+                     f"{_FORMS_SOURCE_SQL}")
+    counts = {
+        "e14_agg_party": conn.execute("SELECT COUNT(*) FROM e14_agg_party").fetchone()[0],
+        "e14_agg_forms": conn.execute("SELECT COUNT(*) FROM e14_agg_forms").fetchone()[0],
+    }
+    logger.info(f"E-14 aggregates rebuilt: {counts}")
+    return counts
+
+
+def _diff(
+    conn: sqlite3.Connection,
+    table: str,
+    key_columns: Tuple[str, ...],
+    columns: Tuple[str, ...],
+    source_sql: str
+) -> List[Dict[str, Any]]:
+    size = len(key_columns)
+    expected = {tuple(row[:size]): row[size:] for row in conn.execute(source_sql)}
+    # Keys whose rows were all removed stay in the table with zero counts
+    actual = {
+        tuple(row[:size]): row[size:]
+        for row in conn.execute(
+            f"SELECT {', '.join(key_columns + columns)} FROM {table} WHERE {columns[1 if size == 4 else 0]} != 0"
+        )
+    }
+
+    mismatches = []
+    for key in expected.keys() | actual.keys():
+        want = expected.get(key)
+        got = actual.get(key)
+        if want is None or got is None:
+            mismatches.append({"table": table, "key": key, "expected": want, "actual": got})
+            continue
+        for name, w, g in zip(columns, want, got):
+            if abs(w - g) > 1e-6:
+                mismatches.append({"table": table, "key": key, "column": name, "expected": w, "actual": g})
+    return mismatches
+
+
+def check_consistency(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+    """
+    Diff the aggregate tables against a fresh GROUP BY over the base tables.
+
+    Returns:
+        One entry per mismatching key/column (empty when consistent)
+    """
+    return (
+        _diff(conn, "e14_agg_party", _LOCATION + ("party_name",), _PARTY_COLUMNS, _PARTY_SOURCE_SQL)
+        + _diff(conn, "e14_agg_forms", _LOCATION, _FORMS_COLUMNS, _FORMS_SOURCE_SQL)
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="E-14 aggregate tables maintenance")
+    parser.add_argument("command", choices=["init", "rebuild", "check"])
+    parser.add_argument("--db", default=DB_PATH)
+    args = parser.parse_args()
+
+    connection = sqlite3.connect(args.db)
+    if not init_aggregates(connection):
+        print(f"E-14 scraper tables not found in {args.db}")
+        sys.exit(1)
+
+    if args.command == "init":
+        print(f"E-14 aggregates ready in {args.db}")
+    elif args.command == "rebuild":
+        print(rebuild(connection))
+    else:
+        problems = check_consistency(connection)
+        for problem in problems[:50]:
+            print(problem)
+        print(f"{len(problems)} mismatches")
+        sys.exit(1 if problems else 0)
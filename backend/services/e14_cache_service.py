@@ -3,8 +3,11 @@ E-14 Cache Service using Redis.
 
 Caches aggregated E-14 data to reduce database/file system load.
 Provides easy cache invalidation and TTL management.
+
+Form and response entries are registered in a tag set, so clear_forms
+deletes exactly those keys; nothing here uses the blocking KEYS command.
+Values go through utils.codec (binary, compressed above a size threshold).
 """
-import json
 import logging
 import os
 from typing import Optional, Dict, Any
@@ -12,6 +15,9 @@ from datetime import datetime
 
 import redis
 
+from utils import codec
+from utils.cache import delete_tagged, scan_delete
+
 logger = logging.getLogger(__name__)
 
 # Redis configuration
@@ -24,6 +30,7 @@ PARTY_SUMMARY_KEY = f'{CACHE_PREFIX}party_summary'
 TOTALS_KEY = f'{CACHE_PREFIX}totals'
 FORMS_KEY = f'{CACHE_PREFIX}forms'
 METADATA_KEY = f'{CACHE_PREFIX}metadata'
+FORMS_TAG_KEY = f'{CACHE_PREFIX}tags:forms'
 
 
 class E14CacheService:
@@ -46,7 +53,7 @@ class E14CacheService:
         """Lazy Redis connection."""
         if self._redis is None:
             try:
-                self._redis = redis.from_url(self._redis_url, decode_responses=True)
+                self._redis = redis.from_url(self._redis_url)  # bytes: payloads are binary
                 self._redis.ping()
                 logger.info("Redis cache connected")
             except Exception as e:
@@ -62,6 +69,14 @@ class E14CacheService:
         except Exception:
             return False
 
+    def _setex_tagged(self, key: str, payload: bytes, tag_key: str) -> None:
+        """SETEX and register key in tag_key (same TTL, so the set outlives no member)."""
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.setex(key, self.ttl, payload)
+        pipe.sadd(tag_key, key)
+        pipe.expire(tag_key, self.ttl)
+        pipe.execute()
+
     # ========================================
     # CACHE OPERATIONS
     # ========================================
@@ -72,7 +87,7 @@ class E14CacheService:
             data = self.redis.get(PARTY_SUMMARY_KEY)
             if data:
                 logger.debug("Cache HIT: party_summary")
-                return json.loads(data)
+                return codec.decode(data, cache_type='e14')
             logger.debug("Cache MISS: party_summary")
             return None
         except Exception as e:
@@ -85,7 +100,7 @@ class E14CacheService:
             self.redis.setex(
                 PARTY_SUMMARY_KEY,
                 self.ttl,
-                json.dumps(summary, ensure_ascii=False)
+                codec.encode(summary, cache_type='e14')
             )
             logger.info(f"Cached party_summary ({len(summary)} parties, TTL={self.ttl}s)")
             return True
@@ -99,7 +114,7 @@ class E14CacheService:
             data = self.redis.get(TOTALS_KEY)
             if data:
                 logger.debug("Cache HIT: totals")
-                return json.loads(data)
+                return codec.decode(data, cache_type='e14')
             return None
         except Exception as e:
             logger.warning(f"Cache get error: {e}")
@@ -111,7 +126,7 @@ class E14CacheService:
             self.redis.setex(
                 TOTALS_KEY,
                 self.ttl,
-                json.dumps(totals, ensure_ascii=False)
+                codec.encode(totals, cache_type='e14')
             )
             logger.info(f"Cached totals (TTL={self.ttl}s)")
             return True
@@ -125,7 +140,7 @@ class E14CacheService:
             data = self.redis.get(f"{FORMS_KEY}:{limit}")
             if data:
                 logger.debug(f"Cache HIT: forms (limit={limit})")
-                return json.loads(data)
+                return codec.decode(data, cache_type='e14')
             return None
         except Exception as e:
             logger.warning(f"Cache get error: {e}")
@@ -134,10 +149,10 @@ class E14CacheService:
     def set_forms(self, forms: list, limit: int = 50) -> bool:
         """Cache forms."""
         try:
-            self.redis.setex(
+            self._setex_tagged(
                 f"{FORMS_KEY}:{limit}",
-                self.ttl,
-                json.dumps(forms, ensure_ascii=False)
+                codec.encode(forms, cache_type='e14'),
+                FORMS_TAG_KEY
             )
             logger.info(f"Cached forms ({len(forms)} forms, limit={limit}, TTL={self.ttl}s)")
             return True
@@ -151,7 +166,7 @@ class E14CacheService:
             data = self.redis.get(f"{CACHE_PREFIX}response:{limit}")
             if data:
                 logger.debug(f"Cache HIT: full_response (limit={limit})")
-                return json.loads(data)
+                return codec.decode(data, cache_type='e14')
             return None
         except Exception as e:
             logger.warning(f"Cache get error: {e}")
@@ -166,10 +181,10 @@ class E14CacheService:
                 'ttl_seconds': self.ttl,
                 'source': 'redis'
             }
-            self.redis.setex(
+            self._setex_tagged(
                 f"{CACHE_PREFIX}response:{limit}",
-                self.ttl,
-                json.dumps(response, ensure_ascii=False)
+                codec.encode(response, cache_type='e14'),
+                FORMS_TAG_KEY
             )
             logger.info(f"Cached full_response (limit={limit}, TTL={self.ttl}s)")
             return True
@@ -183,18 +198,15 @@ class E14CacheService:
 
     def clear_all(self) -> int:
         """
-        Clear all E-14 cache entries.
+        Clear all E-14 cache entries (incremental SCAN over the e14: namespace).
 
         Returns:
             Number of keys deleted
         """
         try:
-            keys = self.redis.keys(f"{CACHE_PREFIX}*")
-            if keys:
-                count = self.redis.delete(*keys)
-                logger.info(f"Cleared {count} E-14 cache keys")
-                return count
-            return 0
+            count = scan_delete(self.redis, f"{CACHE_PREFIX}*")
+            logger.info(f"Cleared {count} E-14 cache keys")
+            return count
         except Exception as e:
             logger.error(f"Cache clear error: {e}")
             return 0
@@ -202,12 +214,15 @@ class E14CacheService:
     def clear_forms(self) -> int:
         """Clear only forms cache (keeps summaries)."""
         try:
-            keys = self.redis.keys(f"{FORMS_KEY}:*") + self.redis.keys(f"{CACHE_PREFIX}response:*")
-            if keys:
-                count = self.redis.delete(*keys)
-                logger.info(f"Cleared {count} form cache keys")
-                return count
-            return 0
+            count = delete_tagged(self.redis, FORMS_TAG_KEY)
+            if count is None:
+                # No tag set (entries cached before tagging): fall back to SCAN
+                count = (
+                    scan_delete(self.redis, f"{FORMS_KEY}:*")
+                    + scan_delete(self.redis, f"{CACHE_PREFIX}response:*")
+                )
+            logger.info(f"Cleared {count} form cache keys")
+            return count
         except Exception as e:
             logger.error(f"Cache clear error: {e}")
             return 0
@@ -215,23 +230,29 @@ class E14CacheService:
     def get_cache_info(self) -> Dict[str, Any]:
         """Get cache statistics."""
         try:
-            keys = self.redis.keys(f"{CACHE_PREFIX}*")
+            keys = [
+                key.decode('utf-8') for key in self.redis.scan_iter(match=f"{CACHE_PREFIX}*", count=500)
+            ]
+            keys = [key for key in keys if not key.startswith(f"{CACHE_PREFIX}tags:")]
+            pipe = self.redis.pipeline(transaction=False)
+            for key in keys:
+                pipe.ttl(key)
+                pipe.strlen(key)
+            stats = pipe.execute()
             info = {
                 'available': True,
                 'total_keys': len(keys),
-                'keys': [],
+                'keys': [
+                    {
+                        'key': key,
+                        'ttl_remaining': stats[2 * i],
+                        'size_bytes': stats[2 * i + 1]
+                    }
+                    for i, key in enumerate(keys)
+                ],
                 'ttl_default': self.ttl
             }
 
-            for key in keys:
-                ttl = self.redis.ttl(key)
-                size = len(self.redis.get(key) or '')
-                info['keys'].append({
-                    'key': key,
-                    'ttl_remaining': ttl,
-                    'size_bytes': size
-                })
-
             return info
         except Exception as e:
             logger.error(f"Cache info error: {e}")
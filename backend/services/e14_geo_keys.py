@@ -0,0 +1,162 @@
+"""
+Canonical geography keys for the E-14 scraper tables.
+
+Filters such as UPPER(departamento) = UPPER(?) cannot use an index, so
+e14_scraper_forms carries two normalized columns:
+
+- dept_key: departamento, trimmed, upper-cased and without accents
+- muni_key: municipio, same normalization
+
+Query builders compare geo_key(param) against these columns. The loader
+fills them at insert time. A SQLite trigger applies the same
+normalization for any other writer, and migrate_geo_keys() backfills
+existing databases and creates the drill-down indexes.
+
+Usage:
+    python -m services.e14_geo_keys [--db PATH]
+"""
+import logging
+import os
+import sqlite3
+import sys
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = os.path.expanduser("~/Downloads/Code/Proyectos/castor/backend/data/castor.db")
+
+# Accented letters used in Colombian place names, both cases. SQLite's
+# UPPER() only folds ASCII, so the SQL expression below needs both; the
+# map stays short because SQLite limits REPLACE() nesting depth.
+_ACCENT_MAP: Dict[str, str] = {
+    "Á": "A", "É": "E", "Í": "I", "Ó": "O", "Ú": "U", "Ü": "U", "Ñ": "N",
+}
+_ACCENT_MAP.update({accented.lower(): plain for accented, plain in list(_ACCENT_MAP.items())})
+_TRANSLATION = str.maketrans(_ACCENT_MAP)
+
+GEO_INDEXES_SQL = """
+    CREATE INDEX IF NOT EXISTS idx_scraper_forms_geo
+        ON e14_scraper_forms(dept_key, muni_key, puesto_cod, mesa_num);
+    CREATE INDEX IF NOT EXISTS idx_scraper_forms_ocr_geo
+        ON e14_scraper_forms(ocr_processed, dept_key, muni_key, puesto_cod, mesa_num);
+    CREATE INDEX IF NOT EXISTS idx_scraper_forms_corp_geo
+        ON e14_scraper_forms(corporacion, ocr_processed, dept_key, muni_key);
+"""
+
+
+def geo_key(value: Optional[str]) -> Optional[str]:
+    """
+    Normalize a departamento/municipio name for indexed comparison.
+
+    Example: " Bogotá d.c. " -> "BOGOTA D.C."
+    """
+    if value is None:
+        return None
+    return value.strip(" ").translate(_TRANSLATION).upper()
+
+
+def geo_key_sql(column: str) -> str:
+    """SQL expression computing geo_key() of a column, for triggers and backfills."""
+    expr = f"UPPER(TRIM({column}, ' '))"
+    for accented, plain in _ACCENT_MAP.items():
+        expr = f"REPLACE({expr}, '{accented}', '{plain}')"
+    return expr
+
+
+def _triggers_sql() -> str:
+    dept = geo_key_sql("NEW.departamento")
+    muni = geo_key_sql("NEW.municipio")
+    return f"""
+        CREATE TRIGGER IF NOT EXISTS trg_scraper_forms_geo_insert
+        AFTER INSERT ON e14_scraper_forms
+        WHEN NEW.dept_key IS NULL OR NEW.muni_key IS NULL
+        BEGIN
+            UPDATE e14_scraper_forms SET dept_key = {dept}, muni_key = {muni}
+            WHERE id = NEW.id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_scraper_forms_geo_update
+        AFTER UPDATE OF departamento, municipio ON e14_scraper_forms
+        BEGIN
+            UPDATE e14_scraper_forms SET dept_key = {dept}, muni_key = {muni}
+            WHERE id = NEW.id;
+        END;
+    """
+
+
+def migrate_geo_keys(conn: sqlite3.Connection) -> Optional[int]:
+    """
+    Add dept_key/muni_key, backfill missing keys, create triggers and indexes.
+
+    Idempotent: re-running only touches rows whose keys are still NULL.
+
+    Returns:
+        Number of rows backfilled, or None if the forms table does not exist
+    """
+    table = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'e14_scraper_forms'"
+    ).fetchone()
+    if table is None:
+        return None
+
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(e14_scraper_forms)")}
+    with conn:
+        for column in ("dept_key", "muni_key"):
+            if column not in columns:
+                conn.execute(f"ALTER TABLE e14_scraper_forms ADD COLUMN {column} TEXT")
+
+        # One UPDATE per distinct place name, not per row (~1.1k municipios)
+        pending = conn.execute(
+            """
+            SELECT DISTINCT departamento, municipio FROM e14_scraper_forms
+            WHERE dept_key IS NULL OR muni_key IS NULL
+            """
+        ).fetchall()
+        updated = 0
+        for departamento, municipio in pending:
+            cursor = conn.execute(
+                """
+                UPDATE e14_scraper_forms SET dept_key = ?, muni_key = ?
+                WHERE departamento IS ? AND municipio IS ?
+                  AND (dept_key IS NULL OR muni_key IS NULL)
+                """,
+                (geo_key(departamento), geo_key(municipio), departamento, municipio),
+            )
+            updated += cursor.rowcount
+
+    conn.executescript(_triggers_sql())
+    conn.executescript(GEO_INDEXES_SQL)
+    if updated:
+        conn.execute("ANALYZE e14_scraper_forms")
+        logger.info(f"Backfilled dept_key/muni_key for {updated:,} E-14 forms")
+    return updated
+
+
+_migrated_paths = set()
+
+
+def ensure_geo_keys(conn: sqlite3.Connection, db_path: str) -> None:
+    """Run migrate_geo_keys() once per process and database file."""
+    if db_path not in _migrated_paths and migrate_geo_keys(conn) is not None:
+        _migrated_paths.add(db_path)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Backfill E-14 dept_key/muni_key columns")
+    parser.add_argument("--db", default=DB_PATH)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"DB not found: {args.db}")
+        sys.exit(1)
+
+    connection = sqlite3.connect(args.db)
+    backfilled = migrate_geo_keys(connection)
+    if backfilled is None:
+        print(f"e14_scraper_forms not found in {args.db}")
+        sys.exit(1)
+    print(f"Backfilled {backfilled:,} rows")
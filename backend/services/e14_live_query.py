@@ -0,0 +1,288 @@
+"""
+Single-pass query engine for the E-14 live dashboard (/api/campaign-team/e14-live).
+
+The endpoint used to run four queries with the same WHERE clause (stats,
+party totals, form listing, department breakdown), each rescanning the
+filtered forms. Here the filter is evaluated once into a temp table keyed
+by form id, and every section of the response is computed from it:
+
+- stats and top departamentos: one GROUP BY over the temp table
+- party totals: temp ids joined with e14_scraper_votes (by form_id index)
+- form listing: last N ids of the temp table, joined back by primary key
+
+Responses are cached under the normalized filter tuple plus a data
+version. The version lives in e14_data_version and is bumped by triggers
+on every write to the scraper tables, so new OCR results invalidate the
+cache for all workers and an unchanged DB costs one key lookup.
+"""
+import logging
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from config import Config
+from services.e14_geo_keys import geo_key
+from utils import cache
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "e14_live"
+
+# Confidence bands used by the ?risk= filter
+RISK_CLAUSES = {
+    'high': "f.ocr_confidence < 0.70",
+    'medium': "f.ocr_confidence >= 0.70 AND f.ocr_confidence < 0.85",
+    'low': "f.ocr_confidence >= 0.85",
+}
+
+# Party colors for visualization (consistent across dashboard)
+PARTY_COLORS = [
+    "#E91E63", "#D32F2F", "#1565C0", "#388E3C", "#43A047",
+    "#FF9800", "#7B1FA2", "#00ACC1", "#5E35B1", "#F44336",
+    "#3F51B5", "#009688", "#795548", "#607D8B", "#673AB7"
+]
+
+TOP_PARTIES = 30
+TOP_DEPARTAMENTOS = 10
+
+DATA_VERSION_SQL = """
+    CREATE TABLE IF NOT EXISTS e14_data_version (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        version INTEGER NOT NULL DEFAULT 0
+    );
+    INSERT OR IGNORE INTO e14_data_version (id, version) VALUES (1, 0);
+
+    CREATE TRIGGER IF NOT EXISTS trg_e14_version_form_insert
+    AFTER INSERT ON e14_scraper_forms
+    BEGIN UPDATE e14_data_version SET version = version + 1 WHERE id = 1; END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_e14_version_form_update
+    AFTER UPDATE ON e14_scraper_forms
+    BEGIN UPDATE e14_data_version SET version = version + 1 WHERE id = 1; END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_e14_version_form_delete
+    AFTER DELETE ON e14_scraper_forms
+    BEGIN UPDATE e14_data_version SET version = version + 1 WHERE id = 1; END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_e14_version_vote_insert
+    AFTER INSERT ON e14_scraper_votes
+    BEGIN UPDATE e14_data_version SET version = version + 1 WHERE id = 1; END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_e14_version_vote_update
+    AFTER UPDATE ON e14_scraper_votes
+    BEGIN UPDATE e14_data_version SET version = version + 1 WHERE id = 1; END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_e14_version_vote_delete
+    AFTER DELETE ON e14_scraper_votes
+    BEGIN UPDATE e14_data_version SET version = version + 1 WHERE id = 1; END;
+"""
+
+
+class LiveFilters(NamedTuple):
+    """Normalized e14-live filters; also the response cache key."""
+    dept_key: Optional[str] = None
+    muni_key: Optional[str] = None
+    puesto: Optional[str] = None
+    mesa: Optional[str] = None
+    corporacion: Optional[str] = None
+    risk: Optional[str] = None
+    limit: int = 100
+
+    @classmethod
+    def from_args(
+        cls,
+        departamento: Optional[str] = None,
+        municipio: Optional[str] = None,
+        puesto: Optional[str] = None,
+        mesa: Optional[str] = None,
+        corporacion: Optional[str] = None,
+        risk: Optional[str] = None,
+        limit: int = 100,
+    ) -> "LiveFilters":
+        """Build filters from raw query params; empty values mean no filter."""
+        risk = risk.lower() if risk else None
+        return cls(
+            dept_key=geo_key(departamento) if departamento else None,
+            muni_key=geo_key(municipio) if municipio else None,
+            puesto=puesto or None,
+            mesa=mesa or None,
+            corporacion=corporacion or None,
+            risk=risk if risk in RISK_CLAUSES else None,
+            limit=limit,
+        )
+
+    def where(self) -> tuple:
+        """WHERE clause and params over e14_scraper_forms aliased as f."""
+        clauses = ["f.ocr_processed = 1"]
+        params: List[Any] = []
+        for column, value in (
+            ("f.dept_key", self.dept_key),
+            ("f.muni_key", self.muni_key),
+            ("f.puesto_cod", self.puesto),
+            ("f.mesa_num", self.mesa),
+            ("f.corporacion", self.corporacion),
+        ):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if self.risk:
+            clauses.append(RISK_CLAUSES[self.risk])
+        return " AND ".join(clauses), params
+
+
+_versioned_paths = set()
+
+
+def ensure_data_version(conn: sqlite3.Connection, db_path: str) -> None:
+    """Create e14_data_version and its triggers once per process and database file."""
+    if db_path in _versioned_paths:
+        return
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    if {"e14_scraper_forms", "e14_scraper_votes"} <= tables:
+        conn.executescript(DATA_VERSION_SQL)
+        _versioned_paths.add(db_path)
+
+
+def data_version(conn: sqlite3.Connection) -> int:
+    """Current write counter of the scraper tables."""
+    row = conn.execute("SELECT version FROM e14_data_version WHERE id = 1").fetchone()
+    return row[0] if row else 0
+
+
+def compute_live_data(conn: sqlite3.Connection, filters: LiveFilters) -> Dict[str, Any]:
+    """Compute the e14-live response body with a single evaluation of the filter."""
+    where_sql, params = filters.where()
+
+    conn.execute("DROP TABLE IF EXISTS temp.e14_live_forms")
+    conn.execute("""
+        CREATE TEMP TABLE e14_live_forms (
+            id INTEGER PRIMARY KEY,
+            departamento TEXT,
+            total_votos INTEGER,
+            votos_blancos INTEGER,
+            votos_nulos INTEGER,
+            ocr_confidence REAL
+        )
+    """)
+    try:
+        conn.execute(f"""
+            INSERT INTO temp.e14_live_forms
+            SELECT f.id, f.departamento, f.total_votos, f.votos_blancos, f.votos_nulos, f.ocr_confidence
+            FROM e14_scraper_forms f
+            WHERE {where_sql}
+        """, params)
+
+        # 1 + 4. Stats and department breakdown from one GROUP BY
+        dept_rows = conn.execute("""
+            SELECT departamento, COUNT(*), SUM(total_votos), SUM(votos_blancos),
+                   SUM(votos_nulos), SUM(ocr_confidence), COUNT(ocr_confidence)
+            FROM temp.e14_live_forms
+            GROUP BY departamento
+        """).fetchall()
+
+        confidence_count = sum(row[6] for row in dept_rows)
+        stats = {
+            'total_forms': sum(row[1] for row in dept_rows),
+            'total_votes': sum(row[2] or 0 for row in dept_rows),
+            'total_blancos': sum(row[3] or 0 for row in dept_rows),
+            'total_nulos': sum(row[4] or 0 for row in dept_rows),
+            'avg_confidence': round(
+                sum(row[5] or 0 for row in dept_rows) / confidence_count if confidence_count else 0, 3
+            ),
+        }
+        top_departamentos = [
+            {'departamento': row[0], 'mesas': row[1], 'votos': row[2] or 0}
+            for row in sorted(dept_rows, key=lambda r: r[1], reverse=True)[:TOP_DEPARTAMENTOS]
+        ]
+
+        # 2. Party vote totals for the filtered forms
+        party_rows = conn.execute("""
+            SELECT
+                v.party_name,
+                SUM(v.votes) as total_votes,
+                COUNT(DISTINCT v.form_id) as mesas_count,
+                AVG(v.confidence) as avg_confidence
+            FROM temp.e14_live_forms l
+            JOIN e14_scraper_votes v ON v.form_id = l.id
+            GROUP BY v.party_name
+            ORDER BY total_votes DESC
+            LIMIT ?
+        """, (TOP_PARTIES,)).fetchall()
+
+        # 3. Most recent forms: last ids of the temp table, then PK lookups
+        form_rows = conn.execute("""
+            SELECT
+                f.id, f.mesa_id, f.filename, f.corporacion, f.departamento, f.municipio,
+                f.zona_cod, f.puesto_cod, f.mesa_num, f.total_votos, f.votos_blancos,
+                f.votos_nulos, f.ocr_confidence, f.ocr_at
+            FROM (SELECT id FROM temp.e14_live_forms ORDER BY id DESC LIMIT ?) l
+            JOIN e14_scraper_forms f ON f.id = l.id
+            ORDER BY f.id DESC
+        """, (filters.limit,)).fetchall()
+    finally:
+        conn.execute("DROP TABLE IF EXISTS temp.e14_live_forms")
+
+    return {
+        'stats': stats,
+        'party_summary': _party_summary(party_rows),
+        'forms': [_form_payload(row) for row in form_rows],
+        'top_departamentos': top_departamentos,
+        'timestamp': datetime.utcnow().isoformat(),
+    }
+
+
+def get_live_data(conn: sqlite3.Connection, db_path: str, filters: LiveFilters) -> Dict[str, Any]:
+    """
+    Cached compute_live_data(), computed once per key across workers.
+
+    The cache key includes the data version, so any write to the scraper
+    tables makes old entries unreachable; they expire with the TTL.
+    """
+    ensure_data_version(conn, db_path)
+    key = cache.get_cache_key(CACHE_PREFIX, db_path, data_version(conn), *filters)
+    return cache.get_or_compute(key, lambda: compute_live_data(conn, filters), Config.E14_LIVE_CACHE_TTL)
+
+
+def _party_summary(party_rows: List[sqlite3.Row]) -> List[Dict[str, Any]]:
+    total_party_votes = sum(row[1] or 0 for row in party_rows)
+    summary = []
+    for idx, row in enumerate(party_rows):
+        votes = row[1] or 0
+        percentage = (votes / total_party_votes * 100) if total_party_votes > 0 else 0
+        summary.append({
+            'id': idx + 1,
+            'party_name': row[0],
+            'total_votes': votes,
+            'mesas_count': row[2] or 0,
+            'avg_confidence': round(row[3] or 0, 2),
+            'percentage': round(percentage, 2),
+            'color': PARTY_COLORS[idx % len(PARTY_COLORS)],
+            'trend': 'stable'
+        })
+    return summary
+
+
+def _form_payload(row: sqlite3.Row) -> Dict[str, Any]:
+    return {
+        'id': row[0],
+        'mesa_id': row[1],
+        'filename': row[2],
+        'header': {
+            'election_name': 'CONGRESO 2022',
+            'election_date': '13 DE MARZO DE 2022',
+            'corporacion': row[3],
+            'departamento': row[4],
+            'municipio': row[5],
+            'zona': row[6],
+            'puesto': row[7],
+            'mesa': row[8]
+        },
+        'resumen': {
+            'total_votos_validos': row[9] or 0,
+            'votos_blanco': row[10] or 0,
+            'votos_nulos': row[11] or 0
+        },
+        'overall_confidence': round(row[12] or 0, 3),
+        'ocr_at': row[13],
+        'source': 'e14_scraper_db'
+    }
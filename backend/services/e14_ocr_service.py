@@ -9,18 +9,21 @@ Version 2.0 - Soporte para payload v2 con:
 - Estructura normalizada para BD v2
 - Métricas integradas (QAS L2, S1)
 """
-import base64
 import hashlib
 import json
 import logging
+import os
 import re
 import time
 import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple, Union
 import httpx
 
+if TYPE_CHECKING:
+    from PIL import Image
+
 from config import Config
 from utils.metrics import (
     get_metrics_registry,
@@ -28,6 +31,12 @@ from utils.metrics import (
     ValidationMetrics,
     track_ocr_processing,
 )
+from services.e14_page_rasterizer import (
+    DEFAULT_DPI,
+    image_media_type,
+    iter_pdf_pages,
+    preprocess_page_image,
+)
 from services.qr_parser import (
     parse_qr_barcode,
     validate_qr_against_ocr,
@@ -651,6 +660,10 @@ class E14OCRService:
         self.max_tokens = 32000  # Opus puede manejar más tokens
         self.timeout = 600  # 10 minutos para Opus que es más lento pero preciso
 
+        # Rasterizado paralelo de páginas (ver services/e14_page_rasterizer.py)
+        self.raster_workers = Config.E14_OCR_RASTER_WORKERS or min(4, os.cpu_count() or 1)
+        self.image_encoder = Config.E14_OCR_IMAGE_ENCODER
+
         logger.info(f"E14OCRService inicializado con modelo: {self.model}")
 
     # ============================================================
@@ -703,7 +716,9 @@ class E14OCRService:
             # 2. Calcular hash
             sha256 = hashlib.sha256(pdf_data).hexdigest()
 
-            # 3. Convertir PDF a imágenes
+            # 3. Convertir PDF a imágenes. Las páginas se rasterizan en paralelo, pero
+            # Claude Vision recibe el documento completo en una sola petición, así
+            # que se espera a la última página antes de continuar.
             images = self._pdf_to_images(pdf_data)
             total_pages = len(images)
             logger.info(f"PDF convertido a {total_pages} imágenes")
@@ -784,7 +799,7 @@ class E14OCRService:
                 "type": "image",
                 "source": {
                     "type": "base64",
-                    "media_type": "image/png",
+                    "media_type": image_media_type(img_base64),
                     "data": img_base64
                 }
             })
@@ -1409,7 +1424,9 @@ class E14OCRService:
             # 2. Calcular hash
             sha256 = hashlib.sha256(pdf_data).hexdigest()
 
-            # 3. Convertir PDF a imágenes
+            # 3. Convertir PDF a imágenes. Las páginas se rasterizan en paralelo, pero
+            # Claude Vision recibe el documento completo en una sola petición, así
+            # que se espera a la última página antes de continuar.
             images = self._pdf_to_images(pdf_data)
             logger.info(f"PDF convertido a {len(images)} imágenes")
 
@@ -1465,79 +1482,43 @@ class E14OCRService:
             response.raise_for_status()
             return response.content
 
-    def _pdf_to_images(self, pdf_data: bytes) -> List[str]:
+    def _iter_pdf_images(self, pdf_data: bytes) -> Iterator[Tuple[int, str]]:
         """
-        Convierte PDF a lista de imágenes en base64 con preprocesamiento.
+        Rasteriza el PDF en paralelo y entrega (índice de página, base64)
+        a medida que cada página termina (en orden de finalización).
 
-        Pipeline basado en TySE:
-        1. PDF → Imagen con alta resolución
-        2. Preprocesamiento: contraste, brillo, deskew, limpieza
-        3. Conversión a base64
+        Solo sirve a consumidores que trabajan página a página: los flujos
+        de Claude Vision usan ``_pdf_to_images``, que espera todas las páginas.
 
-        Returns:
-            Lista de strings base64 (una por página)
+        Pipeline basado en TySE, por página y en un pool de procesos:
+        1. PDF → Imagen con alta resolución
+        2. Preprocesamiento: contraste, brillo, nitidez, edge enhance
+        3. Codificación a base64 (PNG optimizado o JPEG rápido)
         """
         try:
-            from pdf2image import convert_from_bytes
-            from PIL import Image, ImageEnhance, ImageFilter
-            import io
-
-            # 1. Convertir PDF a imágenes PIL con resolución óptima
-            pil_images = convert_from_bytes(
+            yield from iter_pdf_pages(
                 pdf_data,
-                dpi=200,  # Máximo sin exceder 8000px
-                fmt='PNG'
+                dpi=DEFAULT_DPI,
+                workers=self.raster_workers,
+                encoder=self.image_encoder,
             )
-
-            base64_images = []
-            for img in pil_images:
-                # 2. Preprocesamiento de imagen (pipeline TySE)
-                processed_img = self._preprocess_image(img)
-
-                # 3. Convertir a base64
-                buffer = io.BytesIO()
-                processed_img.save(buffer, format='PNG', optimize=True)
-                base64_str = base64.b64encode(buffer.getvalue()).decode('utf-8')
-                base64_images.append(base64_str)
-
-            return base64_images
-
         except ImportError:
             logger.error("pdf2image no instalado. Ejecutar: pip install pdf2image")
             raise
 
-    def _preprocess_image(self, img: 'Image.Image') -> 'Image.Image':
+    def _pdf_to_images(self, pdf_data: bytes) -> List[str]:
         """
-        Preprocesamiento de imagen para mejorar OCR de dígitos manuscritos.
+        Convierte PDF a lista de imágenes en base64 con preprocesamiento.
 
-        Pipeline basado en TySE:
-        - Ajuste de contraste
-        - Ajuste de brillo
-        - Sharpening
-        - Conversión a escala de grises (opcional)
+        Returns:
+            Lista de strings base64 (una por página, en orden)
         """
-        from PIL import Image, ImageEnhance, ImageFilter
-
-        # 1. Convertir a RGB si es necesario
-        if img.mode != 'RGB':
-            img = img.convert('RGB')
+        pages = dict(self._iter_pdf_images(pdf_data))
+        return [pages[i] for i in range(len(pages))]
 
-        # 2. Ajuste de contraste (aumentar para dígitos manuscritos)
-        enhancer = ImageEnhance.Contrast(img)
-        img = enhancer.enhance(1.3)  # 30% más contraste
-
-        # 3. Ajuste de brillo (ligeramente más brillante)
-        enhancer = ImageEnhance.Brightness(img)
-        img = enhancer.enhance(1.1)  # 10% más brillo
-
-        # 4. Sharpening para definir bordes de dígitos
-        enhancer = ImageEnhance.Sharpness(img)
-        img = enhancer.enhance(1.5)  # 50% más nitidez
-
-        # 5. Filtro de mejora de bordes (opcional, ayuda con manuscritos)
-        img = img.filter(ImageFilter.EDGE_ENHANCE)
-
-        return img
+    def _preprocess_image(self, img: 'Image.Image') -> 'Image.Image':
+        """Preprocesamiento TySE de una página (ver preprocess_page_image)."""
+        return preprocess_page_image(img)
 
     def _call_claude_vision(self, images: List[str]) -> Dict[str, Any]:
         """
@@ -1557,7 +1538,7 @@ class E14OCRService:
                 "type": "image",
                 "source": {
                     "type": "base64",
-                    "media_type": "image/png",
+                    "media_type": image_media_type(img_base64),
                     "data": img_base64
                 }
             })
@@ -0,0 +1,225 @@
+"""
+Rasterizado paralelo de páginas E-14.
+
+Convierte un PDF en imágenes base64 listas para Claude Vision repartiendo
+rasterizado + preprocesamiento + codificación entre un pool de procesos.
+Las páginas se entregan a medida que terminan (``iter_pdf_pages``), de modo
+que el consumidor puede empezar con la página 1 mientras las siguientes
+siguen renderizándose.
+
+Codificadores:
+- ``lossless``: PNG con ``optimize=True`` (payload mínimo, encode lento)
+- ``fast``: JPEG calidad 90 (encode ~10x más rápido, con pérdida)
+"""
+import atexit
+import base64
+import io
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DPI = 200  # Máximo sin exceder 8000px
+ENCODERS = ("lossless", "fast")
+
+_PNG_PREFIX = "iVBOR"
+_JPEG_PREFIX = "/9j/"
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def preprocess_page_image(img):
+    """
+    Preprocesamiento de imagen para mejorar OCR de dígitos manuscritos.
+
+    Pipeline basado en TySE:
+    - Contraste +30% (dígitos más definidos)
+    - Brillo +10% (fondo más claro)
+    - Nitidez +50% (bordes más nítidos)
+    - Edge enhance (definir trazos)
+    """
+    from PIL import ImageEnhance, ImageFilter
+
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+
+    img = ImageEnhance.Contrast(img).enhance(1.3)
+    img = ImageEnhance.Brightness(img).enhance(1.1)
+    img = ImageEnhance.Sharpness(img).enhance(1.5)
+    return img.filter(ImageFilter.EDGE_ENHANCE)
+
+
+def encode_page_image(img, encoder: str = "lossless") -> str:
+    """Codifica una imagen PIL a base64 con el codificador indicado."""
+    buffer = io.BytesIO()
+    if encoder == "fast":
+        img.save(buffer, format='JPEG', quality=90)
+    else:
+        img.save(buffer, format='PNG', optimize=True)
+    return base64.b64encode(buffer.getvalue()).decode('utf-8')
+
+
+def image_media_type(image_base64: str) -> str:
+    """Media type de una imagen base64 producida por ``encode_page_image``."""
+    if image_base64.startswith(_JPEG_PREFIX):
+        return "image/jpeg"
+    return "image/png"
+
+
+def _render_page(
+    pdf_path: Optional[str],
+    pdf_data: Optional[bytes],
+    page_number: int,
+    dpi: int,
+    encoder: str
+) -> Tuple[int, str, Dict[str, float]]:
+    """Rasteriza, preprocesa y codifica una página (se ejecuta en un worker)."""
+    from pdf2image import convert_from_bytes, convert_from_path
+
+    timings: Dict[str, float] = {}
+
+    start = time.perf_counter()
+    kwargs = dict(dpi=dpi, fmt='PNG', first_page=page_number, last_page=page_number)
+    if pdf_path:
+        images = convert_from_path(pdf_path, **kwargs)
+    else:
+        images = convert_from_bytes(pdf_data, **kwargs)
+    timings["rasterize"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    processed = preprocess_page_image(images[0])
+    timings["preprocess"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    encoded = encode_page_image(processed, encoder)
+    timings["encode"] = time.perf_counter() - start
+
+    return page_number, encoded, timings
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """Pool de procesos compartido; se recrea si cambia el número de workers."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=workers)
+            _pool_workers = workers
+            logger.info(f"Pool de rasterizado E-14 iniciado con {workers} workers")
+        return _pool
+
+
+def shutdown_pool() -> None:
+    """Detiene el pool de rasterizado (se registra con atexit)."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+            _pool = None
+            _pool_workers = 0
+
+
+atexit.register(shutdown_pool)
+
+
+def count_pdf_pages(pdf_data: bytes) -> int:
+    """Número de páginas del PDF (vía pdfinfo)."""
+    from pdf2image import pdfinfo_from_bytes
+
+    return int(pdfinfo_from_bytes(pdf_data)["Pages"])
+
+
+def _track_timings(timings: Dict[str, float], encoder: str) -> None:
+    from utils.metrics import OCRMetrics
+
+    for stage, seconds in timings.items():
+        OCRMetrics.track_page_stage(stage, seconds, encoder)
+
+
+def iter_pdf_pages(
+    pdf_data: bytes,
+    dpi: int = DEFAULT_DPI,
+    workers: int = 1,
+    encoder: str = "lossless",
+    max_pages: Optional[int] = None
+) -> Iterator[Tuple[int, str]]:
+    """
+    Rasteriza un PDF y entrega (índice de página 0-based, imagen base64)
+    en orden de finalización.
+
+    Con ``workers <= 1`` o un PDF de una sola página todo se ejecuta en el
+    proceso actual. En otro caso el PDF se escribe una vez a disco y cada
+    worker renderiza su página con ``first_page``/``last_page``.
+
+    Args:
+        pdf_data: Bytes del PDF
+        dpi: Resolución de rasterizado
+        workers: Procesos de rasterizado
+        encoder: ``lossless`` (PNG optimizado) o ``fast`` (JPEG)
+        max_pages: Límite de páginas a renderizar
+
+    Raises:
+        ValueError: Si el codificador no es válido
+    """
+    if encoder not in ENCODERS:
+        raise ValueError(f"Codificador de imagen inválido: {encoder} (opciones: {', '.join(ENCODERS)})")
+
+    start = time.perf_counter()
+    total_pages = count_pdf_pages(pdf_data)
+    if max_pages:
+        total_pages = min(total_pages, max_pages)
+    workers = max(1, min(workers, total_pages))
+
+    if workers == 1:
+        for page_number in range(1, total_pages + 1):
+            _, encoded, timings = _render_page(None, pdf_data, page_number, dpi, encoder)
+            _track_timings(timings, encoder)
+            yield page_number - 1, encoded
+        _track_timings({"total": time.perf_counter() - start}, encoder)
+        return
+
+    fd, pdf_path = tempfile.mkstemp(suffix=".pdf", prefix="e14_")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(pdf_data)
+
+        pool = _get_pool(workers)
+        pending = {
+            pool.submit(_render_page, pdf_path, None, page_number, dpi, encoder)
+            for page_number in range(1, total_pages + 1)
+        }
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    page_number, encoded, timings = future.result()
+                    _track_timings(timings, encoder)
+                    yield page_number - 1, encoded
+        finally:
+            for future in pending:
+                future.cancel()
+            # Las páginas ya enviadas deben terminar antes de borrar el archivo
+            wait(pending)
+        _track_timings({"total": time.perf_counter() - start}, encoder)
+    finally:
+        os.unlink(pdf_path)
+
+
+def pdf_to_images(
+    pdf_data: bytes,
+    dpi: int = DEFAULT_DPI,
+    workers: int = 1,
+    encoder: str = "lossless",
+    max_pages: Optional[int] = None
+) -> List[str]:
+    """Versión bloqueante de ``iter_pdf_pages``: lista base64 en orden de página."""
+    pages: Dict[int, str] = dict(iter_pdf_pages(pdf_data, dpi, workers, encoder, max_pages))
+    return [pages[i] for i in range(len(pages))]
@@ -14,17 +14,22 @@ import os
 import re
 import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 import pytesseract
-from pdf2image import convert_from_bytes, convert_from_path
+from pdf2image import convert_from_bytes, convert_from_path, pdfinfo_from_bytes, pdfinfo_from_path
 from PIL import Image, ImageEnhance, ImageFilter
 
 logger = logging.getLogger(__name__)
 
+# Binarization threshold and the equivalent 256-entry lookup table for Image.point
+BINARIZE_THRESHOLD = 150
+BINARIZE_LUT = [255 if x > BINARIZE_THRESHOLD else 0 for x in range(256)]
+
 
 @dataclass
 class TesseractOCRResult:
@@ -171,22 +176,27 @@ class E14TesseractOCR:
         'MNESYJES',
     ]
 
-    def __init__(self, lang: str = "spa", dpi: int = 300):
+    def __init__(self, lang: str = "spa", dpi: int = 300, workers: Optional[int] = None):
         """
         Initialize Tesseract OCR.
 
         Args:
             lang: Tesseract language (spa for Spanish)
             dpi: DPI for PDF to image conversion
+            workers: Pages OCR'd concurrently (default: min(4, CPUs)). Each worker
+                renders a single page, so at most this many page images are in memory.
+                Run the process with OMP_THREAD_LIMIT=1 (gunicorn.conf.py and the batch
+                script set it) so concurrent tesseracts do not oversubscribe the CPUs.
         """
         self.lang = lang
         self.dpi = dpi
+        self.workers = max(1, workers or min(4, os.cpu_count() or 1))
         self.tesseract_config = '--oem 3 --psm 6'  # LSTM + uniform block
 
         # Verify tesseract is available
         try:
             pytesseract.get_tesseract_version()
-            logger.info("Tesseract OCR initialized")
+            logger.info(f"Tesseract OCR initialized ({self.workers} workers)")
         except Exception as e:
             logger.error(f"Tesseract not available: {e}")
             raise
@@ -201,59 +211,7 @@ class E14TesseractOCR:
         Returns:
             TesseractOCRResult with extracted data
         """
-        start_time = time.time()
-        extraction_id = str(uuid.uuid4())[:8]
-        filename = os.path.basename(pdf_path)
-
-        try:
-            # Convert PDF to images
-            images = convert_from_path(
-                pdf_path,
-                dpi=self.dpi,
-                fmt='png'
-            )
-
-            if not images:
-                return TesseractOCRResult(
-                    extraction_id=extraction_id,
-                    filename=filename,
-                    success=False,
-                    processing_time_ms=int((time.time() - start_time) * 1000),
-                    error="No images extracted from PDF"
-                )
-
-            # Process each page and combine results
-            all_text = []
-            for i, img in enumerate(images):
-                # Preprocess image
-                processed_img = self._preprocess_image(img)
-
-                # Extract text
-                text = pytesseract.image_to_string(
-                    processed_img,
-                    lang=self.lang,
-                    config=self.tesseract_config
-                )
-                all_text.append(text)
-
-            raw_text = "\n--- PAGE BREAK ---\n".join(all_text)
-
-            # Parse extracted text
-            result = self._parse_e14_text(raw_text, extraction_id, filename)
-            result.processing_time_ms = int((time.time() - start_time) * 1000)
-            result.raw_text = raw_text[:5000]  # Truncate for storage
-
-            return result
-
-        except Exception as e:
-            logger.error(f"Error processing {filename}: {e}")
-            return TesseractOCRResult(
-                extraction_id=extraction_id,
-                filename=filename,
-                success=False,
-                processing_time_ms=int((time.time() - start_time) * 1000),
-                error=str(e)
-            )
+        return self._process(os.path.basename(pdf_path), pdf_path=pdf_path)
 
     def process_pdf_bytes(self, pdf_bytes: bytes, filename: str = "unknown.pdf") -> TesseractOCRResult:
         """
@@ -266,17 +224,22 @@ class E14TesseractOCR:
         Returns:
             TesseractOCRResult with extracted data
         """
+        return self._process(filename, pdf_bytes=pdf_bytes)
+
+    def _process(
+        self,
+        filename: str,
+        pdf_path: Optional[str] = None,
+        pdf_bytes: Optional[bytes] = None
+    ) -> TesseractOCRResult:
+        """OCR every page of a PDF (path or bytes) and parse the combined text."""
         start_time = time.time()
         extraction_id = str(uuid.uuid4())[:8]
 
         try:
-            images = convert_from_bytes(
-                pdf_bytes,
-                dpi=self.dpi,
-                fmt='png'
-            )
+            all_text = self._ocr_pages(pdf_path=pdf_path, pdf_bytes=pdf_bytes)
 
-            if not images:
+            if not all_text:
                 return TesseractOCRResult(
                     extraction_id=extraction_id,
                     filename=filename,
@@ -285,21 +248,12 @@ class E14TesseractOCR:
                     error="No images extracted from PDF"
                 )
 
-            all_text = []
-            for img in images:
-                processed_img = self._preprocess_image(img)
-                text = pytesseract.image_to_string(
-                    processed_img,
-                    lang=self.lang,
-                    config=self.tesseract_config
-                )
-                all_text.append(text)
-
             raw_text = "\n--- PAGE BREAK ---\n".join(all_text)
 
+            # Parse extracted text
             result = self._parse_e14_text(raw_text, extraction_id, filename)
             result.processing_time_ms = int((time.time() - start_time) * 1000)
-            result.raw_text = raw_text[:5000]
+            result.raw_text = raw_text[:5000]  # Truncate for storage
 
             return result
 
@@ -313,6 +267,43 @@ class E14TesseractOCR:
                 error=str(e)
             )
 
+    def _ocr_pages(self, pdf_path: Optional[str] = None, pdf_bytes: Optional[bytes] = None) -> List[str]:
+        """
+        OCR all pages, in page order, with a bounded pool of workers.
+
+        Tesseract runs as a subprocess, so threads are enough to keep one
+        tesseract per worker busy.
+        """
+        if pdf_path:
+            page_count = int(pdfinfo_from_path(pdf_path)["Pages"])
+        else:
+            page_count = int(pdfinfo_from_bytes(pdf_bytes)["Pages"])
+
+        pages = range(1, page_count + 1)
+        if self.workers == 1 or page_count <= 1:
+            return [self._ocr_page(page, pdf_path, pdf_bytes) for page in pages]
+
+        with ThreadPoolExecutor(max_workers=min(self.workers, page_count)) as pool:
+            return list(pool.map(lambda page: self._ocr_page(page, pdf_path, pdf_bytes), pages))
+
+    def _ocr_page(self, page: int, pdf_path: Optional[str], pdf_bytes: Optional[bytes]) -> str:
+        """Render, preprocess and OCR a single page (1-based)."""
+        options = dict(dpi=self.dpi, fmt='png', first_page=page, last_page=page)
+        if pdf_path:
+            images = convert_from_path(pdf_path, **options)
+        else:
+            images = convert_from_bytes(pdf_bytes, **options)
+
+        if not images:
+            return ""
+
+        processed_img = self._preprocess_image(images[0])
+        return pytesseract.image_to_string(
+            processed_img,
+            lang=self.lang,
+            config=self.tesseract_config
+        )
+
     def _preprocess_image(self, img: Image.Image) -> Image.Image:
         """
         Preprocess image for better OCR results.
@@ -334,9 +325,8 @@ class E14TesseractOCR:
         # Sharpen
         img = img.filter(ImageFilter.SHARPEN)
 
-        # Binarize (threshold)
-        threshold = 150
-        img = img.point(lambda x: 255 if x > threshold else 0, '1')
+        # Binarize (threshold) with a precomputed lookup table
+        img = img.point(BINARIZE_LUT, '1')
 
         return img
 
@@ -134,24 +134,32 @@ def find_existing(incident_type: str, mesa_id: str, description: str) -> Optiona
     return _row_to_incident(row) if row else None
 
 
-def create_incident(data: Dict[str, Any], dedupe: bool = True) -> Dict[str, Any]:
-    init_db()
+_INSERT_SQL = """
+    INSERT INTO incidents (
+        incident_type, mesa_id, dept_code, muni_code, dept_name, muni_name, puesto,
+        description, severity, status, ocr_confidence, delta_value, evidence,
+        created_at, sla_deadline, assigned_to, assigned_at, resolved_at,
+        resolution_notes, escalated_to_legal
+    ) VALUES (
+        :incident_type, :mesa_id, :dept_code, :muni_code, :dept_name, :muni_name, :puesto,
+        :description, :severity, :status, :ocr_confidence, :delta_value, :evidence,
+        :created_at, :sla_deadline, :assigned_to, :assigned_at, :resolved_at,
+        :resolution_notes, :escalated_to_legal
+    )
+"""
+
+# Stay well under SQLite's bound-parameter limit for IN (...) lists
+MAX_IN_PARAMS = 900
+
 
+def _build_payload(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize incoming incident data into an incidents row."""
     incident_type = data.get("incident_type", "UNKNOWN")
     try:
         incident_type_enum = IncidentType(incident_type)
     except Exception:
         incident_type_enum = IncidentType.ARITHMETIC_FAIL
 
-    description = data.get("description") or "Incidente detectado"
-    mesa_id = data.get("mesa_id") or ""
-
-    if dedupe:
-        existing = find_existing(incident_type_enum.value, mesa_id, description)
-        if existing:
-            existing["sla_remaining_minutes"] = _calculate_sla_remaining(existing.get("sla_deadline"))
-            return existing
-
     severity = data.get("severity")
     if not severity:
         severity = _severity_default(incident_type_enum).value
@@ -161,15 +169,15 @@ def create_incident(data: Dict[str, Any], dedupe: bool = True) -> Dict[str, Any]
     created_at = datetime.utcnow()
     sla_deadline = _sla_deadline(incident_type_enum)
 
-    payload = {
+    return {
         "incident_type": incident_type_enum.value,
-        "mesa_id": mesa_id,
+        "mesa_id": data.get("mesa_id") or "",
         "dept_code": data.get("dept_code"),
         "muni_code": data.get("muni_code"),
         "dept_name": data.get("dept_name"),
         "muni_name": data.get("muni_name"),
         "puesto": data.get("puesto"),
-        "description": description,
+        "description": data.get("description") or "Incidente detectado",
         "severity": severity,
         "status": IncidentStatus.OPEN.value,
         "ocr_confidence": data.get("ocr_confidence"),
@@ -184,24 +192,25 @@ def create_incident(data: Dict[str, Any], dedupe: bool = True) -> Dict[str, Any]
         "escalated_to_legal": 0,
     }
 
+
+def _dedupe_key(payload: Dict[str, Any]) -> Tuple[str, str, str]:
+    return payload["incident_type"], payload["mesa_id"], payload["description"]
+
+
+def create_incident(data: Dict[str, Any], dedupe: bool = True) -> Dict[str, Any]:
+    init_db()
+
+    payload = _build_payload(data)
+
+    if dedupe:
+        existing = find_existing(*_dedupe_key(payload))
+        if existing:
+            existing["sla_remaining_minutes"] = _calculate_sla_remaining(existing.get("sla_deadline"))
+            return existing
+
     conn = _get_connection()
     cur = conn.cursor()
-    cur.execute(
-        """
-        INSERT INTO incidents (
-            incident_type, mesa_id, dept_code, muni_code, dept_name, muni_name, puesto,
-            description, severity, status, ocr_confidence, delta_value, evidence,
-            created_at, sla_deadline, assigned_to, assigned_at, resolved_at,
-            resolution_notes, escalated_to_legal
-        ) VALUES (
-            :incident_type, :mesa_id, :dept_code, :muni_code, :dept_name, :muni_name, :puesto,
-            :description, :severity, :status, :ocr_confidence, :delta_value, :evidence,
-            :created_at, :sla_deadline, :assigned_to, :assigned_at, :resolved_at,
-            :resolution_notes, :escalated_to_legal
-        )
-        """,
-        payload,
-    )
+    cur.execute(_INSERT_SQL, payload)
     conn.commit()
     incident_id = cur.lastrowid
     conn.close()
@@ -212,6 +221,75 @@ def create_incident(data: Dict[str, Any], dedupe: bool = True) -> Dict[str, Any]
     return payload
 
 
+def _find_existing_bulk(
+    cur: sqlite3.Cursor,
+    keys: Iterable[Tuple[str, str, str]],
+) -> Dict[Tuple[str, str, str], Dict[str, Any]]:
+    """Open incidents matching any of the (type, mesa_id, description) keys, newest per key."""
+    wanted = set(keys)
+    mesa_ids = sorted({mesa_id for _, mesa_id, _ in wanted})
+    found: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+    for start in range(0, len(mesa_ids), MAX_IN_PARAMS):
+        chunk = mesa_ids[start:start + MAX_IN_PARAMS]
+        placeholders = ",".join("?" * len(chunk))
+        cur.execute(
+            f"""
+            SELECT * FROM incidents
+            WHERE mesa_id IN ({placeholders})
+            AND status IN ('OPEN','ASSIGNED','INVESTIGATING')
+            ORDER BY id DESC
+            """,
+            chunk,
+        )
+        for row in cur.fetchall():
+            key = (row["incident_type"], row["mesa_id"], row["description"])
+            if key in wanted and key not in found:
+                found[key] = _row_to_incident(row)
+    return found
+
+
+def create_incidents_bulk(items: List[Dict[str, Any]], dedupe: bool = True) -> List[Dict[str, Any]]:
+    """
+    Create many incidents with one connection and one transaction.
+
+    Same semantics as calling create_incident() for each item in order:
+    with dedupe, an item matching an open incident (or an earlier item of
+    the same call) returns that incident instead of inserting a new row.
+    The result list is aligned with items.
+    """
+    if not items:
+        return []
+    init_db()
+
+    payloads = [_build_payload(data) for data in items]
+    conn = _get_connection()
+    cur = conn.cursor()
+    try:
+        existing = _find_existing_bulk(cur, map(_dedupe_key, payloads)) if dedupe else {}
+        results: List[Dict[str, Any]] = []
+        for data, payload in zip(items, payloads):
+            key = _dedupe_key(payload)
+            if dedupe and key in existing:
+                results.append(existing[key])
+                continue
+            cur.execute(_INSERT_SQL, payload)
+            payload["id"] = cur.lastrowid
+            payload["evidence"] = data.get("evidence") or {}
+            results.append(payload)
+            if dedupe:
+                existing[key] = payload
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    for incident in results:
+        incident["sla_remaining_minutes"] = _calculate_sla_remaining(incident.get("sla_deadline"))
+    return results
+
+
 def create_incidents_from_anomalies(anomalies: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
     results = []
     for anomaly in anomalies:
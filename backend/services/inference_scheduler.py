@@ -0,0 +1,127 @@
+"""
+Dynamic micro-batching for BETO inference.
+
+Callers such as SentimentService.analyze_sentiment send one text at a
+time, and a forward pass with batch size 1 wastes most of the CPU. The
+scheduler queues concurrent predict() calls and one worker thread merges
+them into a batch. It dispatches when the batch reaches max_batch_size
+texts, or when the oldest request has waited max_wait_ms.
+
+The predict function it wraps (model_singleton.predict_probabilities)
+sorts each merged batch by token length before padding, so short tweets
+are not padded to the longest text in the batch.
+
+Queue wait, batch size and throughput (texts/s) go to
+utils.metrics.SentimentMetrics.
+"""
+import logging
+import queue
+import threading
+import time
+from typing import Callable, List, Optional
+
+from utils.metrics import SentimentMetrics
+
+logger = logging.getLogger(__name__)
+
+PredictFn = Callable[[List[str]], List[List[float]]]
+
+
+class _Request:
+    __slots__ = ("texts", "enqueued_at", "done", "result", "error")
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.enqueued_at = time.perf_counter()
+        self.done = threading.Event()
+        self.result: Optional[List[List[float]]] = None
+        self.error: Optional[BaseException] = None
+
+
+class MicroBatchScheduler:
+    """Merge concurrent predict() calls into batches run by one worker thread."""
+
+    def __init__(
+        self,
+        predict_fn: PredictFn,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 10.0,
+        name: str = "beto",
+    ):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.name = name
+        self._queue: "queue.Queue[Optional[_Request]]" = queue.Queue()
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name=f"{name}-scheduler", daemon=True)
+        self._worker.start()
+
+    def predict(self, texts: List[str], timeout: Optional[float] = None) -> List[List[float]]:
+        """Probabilities per text; blocks until the batch containing them has run."""
+        if not texts:
+            return []
+        if self._closed:
+            raise RuntimeError(f"{self.name} scheduler is closed")
+        request = _Request(list(texts))
+        self._queue.put(request)
+        if not request.done.wait(timeout):
+            raise TimeoutError(f"{self.name} inference did not finish in {timeout}s")
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def close(self) -> None:
+        self._closed = True
+        self._queue.put(None)
+        self._worker.join(timeout=5)
+
+    def _collect(self, first: _Request) -> List[_Request]:
+        """Requests for the next batch: wait for more until full or the oldest hits max_wait."""
+        batch = [first]
+        size = len(first.texts)
+        deadline = first.enqueued_at + self.max_wait
+        while size < self.max_batch_size:
+            try:
+                request = self._queue.get_nowait()
+            except queue.Empty:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if request is None:
+                self._queue.put(None)
+                break
+            batch.append(request)
+            size += len(request.texts)
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = self._collect(first)
+
+            started = time.perf_counter()
+            for request in batch:
+                SentimentMetrics.track_queue_wait(started - request.enqueued_at, self.name)
+            texts = [text for request in batch for text in request.texts]
+            try:
+                probs = self.predict_fn(texts)
+            except Exception as e:
+                logger.error(f"{self.name} batch inference failed ({len(texts)} texts): {e}")
+                for request in batch:
+                    request.error = e
+                    request.done.set()
+                continue
+            SentimentMetrics.track_batch(len(texts), len(batch), time.perf_counter() - started, self.name)
+
+            offset = 0
+            for request in batch:
+                request.result = probs[offset:offset + len(request.texts)]
+                offset += len(request.texts)
+                request.done.set()
@@ -1,13 +1,16 @@
 """
 Singleton pattern for BETO model to avoid loading it multiple times.
 This significantly reduces memory usage and startup time.
+The inference backend (fp32, int8, onnx) comes from Config.BETO_BACKEND.
 """
 import logging
+import os
 import threading
 import torch
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-from typing import Tuple
+from typing import Any, List, Optional, Tuple
 from config import Config
+from services.beto_backends import load_backend
+from services.inference_scheduler import MicroBatchScheduler
 
 logger = logging.getLogger(__name__)
 
@@ -16,30 +19,27 @@ _model_cache: dict = {}
 _model_lock = threading.Lock()
 
 
-def get_beto_model() -> Tuple[AutoModelForSequenceClassification, AutoTokenizer, torch.device]:
+def get_beto_model(backend: Optional[str] = None) -> Tuple[Any, Any, torch.device]:
     """
     Get or create BETO model singleton.
 
+    Args:
+        backend: fp32, int8 or onnx (default: Config.BETO_BACKEND)
+
     Returns:
         Tuple of (model, tokenizer, device)
     """
     global _model_cache
-    model_key = Config.BETO_MODEL_PATH
+    backend = backend or Config.BETO_BACKEND
+    model_key = (Config.BETO_MODEL_PATH, backend)
 
     if model_key not in _model_cache:
         with _model_lock:
             # Double-check pattern
             if model_key not in _model_cache:
-                logger.info(f"Loading BETO model singleton: {model_key}")
+                logger.info(f"Loading BETO model singleton: {model_key[0]} ({backend})")
                 try:
-                    tokenizer = AutoTokenizer.from_pretrained(model_key)
-                    model = AutoModelForSequenceClassification.from_pretrained(
-                        model_key,
-                        num_labels=3  # positive, negative, neutral
-                    )
-                    device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
-                    model.to(device)
-                    model.eval()
+                    model, tokenizer, device = load_backend(backend, model_key[0])
                     _model_cache[model_key] = (model, tokenizer, device)
                     logger.info(f"BETO model singleton loaded successfully on {device}")
                 except Exception as e:
@@ -47,3 +47,85 @@ def get_beto_model() -> Tuple[AutoModelForSequenceClassification, AutoTokenizer,
                     raise
 
     return _model_cache[model_key]
+
+
+# A length-sorted batch is cut early once padding would exceed this
+# multiple of its real tokens (e.g. a 120-token text after 5-token ones)
+MAX_PADDING_RATIO = 1.5
+
+
+def _length_batches(lengths: List[int], batch_size: int) -> List[List[int]]:
+    """Indices grouped into batches of similar token length, shortest first."""
+    batches: List[List[int]] = []
+    current: List[int] = []
+    tokens = 0
+    for i in sorted(range(len(lengths)), key=lengths.__getitem__):
+        length = lengths[i]
+        padded = (len(current) + 1) * length
+        if current and (len(current) >= batch_size or padded > MAX_PADDING_RATIO * (tokens + length)):
+            batches.append(current)
+            current, tokens = [], 0
+        current.append(i)
+        tokens += length
+    if current:
+        batches.append(current)
+    return batches
+
+
+def predict_probabilities(
+    texts: List[str],
+    batch_size: Optional[int] = None,
+    backend: Optional[str] = None,
+) -> List[List[float]]:
+    """
+    Run BETO on texts and return class probabilities per text.
+
+    Each row is [negative, neutral, positive]. Texts are batched in
+    token-length order so each batch is padded only to its own longest
+    text; results come back in input order.
+    """
+    if not texts:
+        return []
+    model, tokenizer, device = get_beto_model(backend)
+    batch_size = batch_size or Config.BETO_BATCH_SIZE
+
+    lengths = [len(ids) for ids in tokenizer(list(texts), truncation=True, max_length=512)['input_ids']]
+    probabilities: List[Optional[List[float]]] = [None] * len(texts)
+
+    with torch.inference_mode():
+        for indices in _length_batches(lengths, batch_size):
+            inputs = tokenizer(
+                [texts[i] for i in indices],
+                return_tensors='pt',
+                truncation=True,
+                max_length=512,
+                padding=True
+            ).to(device)
+            logits = model(**inputs).logits
+            for i, row in zip(indices, torch.softmax(logits, dim=-1).cpu().tolist()):
+                probabilities[i] = row
+    return probabilities
+
+
+_scheduler: Optional[MicroBatchScheduler] = None
+_scheduler_pid: Optional[int] = None
+
+
+def get_inference_scheduler() -> MicroBatchScheduler:
+    """
+    Process-wide micro-batching scheduler over predict_probabilities.
+
+    Recreated after fork: the worker thread of a scheduler built before a
+    gunicorn fork does not exist in the child.
+    """
+    global _scheduler, _scheduler_pid
+    if _scheduler is None or _scheduler_pid != os.getpid():
+        with _model_lock:
+            if _scheduler is None or _scheduler_pid != os.getpid():
+                _scheduler = MicroBatchScheduler(
+                    predict_probabilities,
+                    max_batch_size=Config.BETO_BATCH_SIZE,
+                    max_wait_ms=Config.BETO_MAX_WAIT_MS,
+                )
+                _scheduler_pid = os.getpid()
+    return _scheduler
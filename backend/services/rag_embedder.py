@@ -0,0 +1,212 @@
+"""
+Embedding pipeline for the CASTOR RAG store.
+
+Wraps the raw embeddings call with:
+- deduplication of identical texts by content hash
+- a persistent SQLite cache keyed by (model, sha256(text)), so re-syncs never
+  re-embed text that has not changed
+- greedy packing into the largest batches the API accepts
+- bounded concurrency and retry with exponential backoff
+"""
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+
+from services.rag_vector_index import decode_embedding, encode_embedding
+
+logger = logging.getLogger(__name__)
+
+EmbedFn = Callable[[List[str]], List[List[float]]]
+
+
+def text_hash(text: str) -> str:
+    """sha256 of the UTF-8 text, used as cache and dedupe key."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingPipeline:
+    """Deduplicating, cached, batched front-end for an embeddings API."""
+
+    SQL_BATCH = 500
+
+    def __init__(
+        self,
+        embed_fn: EmbedFn,
+        db_path: str,
+        model: str,
+        batch_size: int = 512,
+        max_batch_chars: int = 400_000,
+        max_concurrency: int = 4,
+        max_retries: int = 3,
+        backoff_seconds: float = 1.0
+    ):
+        """
+        Initialize embedding pipeline.
+
+        Args:
+            embed_fn: Function that embeds a list of texts in one API request
+            db_path: SQLite file holding the embedding cache
+            model: Embedding model name (part of the cache key)
+            batch_size: Maximum texts per request (OpenAI accepts up to 2048)
+            max_batch_chars: Maximum characters per request, to stay under the token limit
+            max_concurrency: Maximum requests in flight
+            max_retries: Retries per batch before giving up
+            backoff_seconds: Initial retry delay, doubled on each attempt
+        """
+        self.embed_fn = embed_fn
+        self.db_path = db_path
+        self.model = model
+        self.batch_size = max(1, batch_size)
+        self.max_batch_chars = max_batch_chars
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self._stats_lock = threading.Lock()
+        self.stats = {"requested": 0, "unique": 0, "cache_hits": 0, "embedded": 0, "api_calls": 0, "retries": 0}
+        self._init_db()
+
+    def _init_db(self) -> None:
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS rag_embedding_cache (
+                    model TEXT NOT NULL,
+                    text_hash TEXT NOT NULL,
+                    embedding BLOB NOT NULL,
+                    created_at TEXT NOT NULL,
+                    PRIMARY KEY (model, text_hash)
+                )
+                """
+            )
+
+    def _count(self, **increments) -> None:
+        with self._stats_lock:
+            for key, value in increments.items():
+                self.stats[key] += value
+
+    # ------------------------------------------------------------------
+    # Cache
+    # ------------------------------------------------------------------
+
+    def _cache_get(self, hashes: Sequence[str]) -> Dict[str, np.ndarray]:
+        found: Dict[str, np.ndarray] = {}
+        with sqlite3.connect(self.db_path) as conn:
+            for start in range(0, len(hashes), self.SQL_BATCH):
+                batch = hashes[start:start + self.SQL_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(
+                    f"""
+                    SELECT text_hash, embedding FROM rag_embedding_cache
+                    WHERE model = ? AND text_hash IN ({placeholders})
+                    """,
+                    [self.model, *batch]
+                )
+                for digest, blob in rows:
+                    found[digest] = decode_embedding(blob, "float32")
+        return found
+
+    def _cache_put(self, vectors: Dict[str, List[float]]) -> None:
+        if not vectors:
+            return
+        now = datetime.now(timezone.utc).isoformat()
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO rag_embedding_cache (model, text_hash, embedding, created_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                [(self.model, digest, encode_embedding(vec, "float32"), now) for digest, vec in vectors.items()]
+            )
+            conn.commit()
+
+    def cached(self, texts: Sequence[str]) -> Dict[str, np.ndarray]:
+        """Float32 vectors already cached for texts, keyed by text (misses are left out)."""
+        by_hash = {text_hash(text): text for text in texts}
+        return {by_hash[digest]: vec for digest, vec in self._cache_get(list(by_hash)).items()}
+
+    def cache_size(self) -> int:
+        with sqlite3.connect(self.db_path) as conn:
+            return int(conn.execute(
+                "SELECT COUNT(1) FROM rag_embedding_cache WHERE model = ?", (self.model,)
+            ).fetchone()[0])
+
+    # ------------------------------------------------------------------
+    # Embedding
+    # ------------------------------------------------------------------
+
+    def _pack_batches(self, texts: List[str]) -> List[List[int]]:
+        """Greedily pack text positions into batches bounded by count and characters."""
+        batches: List[List[int]] = []
+        current: List[int] = []
+        chars = 0
+        for i, text in enumerate(texts):
+            if current and (len(current) >= self.batch_size or chars + len(text) > self.max_batch_chars):
+                batches.append(current)
+                current, chars = [], 0
+            current.append(i)
+            chars += len(text)
+        if current:
+            batches.append(current)
+        return batches
+
+    def _embed_with_retry(self, texts: List[str]) -> List[List[float]]:
+        for attempt in range(self.max_retries + 1):
+            try:
+                self._count(api_calls=1)
+                vectors = self.embed_fn(texts)
+                if len(vectors) != len(texts):
+                    raise ValueError(f"Embedding API returned {len(vectors)} vectors for {len(texts)} texts")
+                return vectors
+            except Exception as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self.backoff_seconds * (2 ** attempt)
+                logger.warning(f"Embedding batch of {len(texts)} failed ({e}); retrying in {delay:.1f}s")
+                self._count(retries=1)
+                time.sleep(delay)
+        return []
+
+    def embed(self, texts: Sequence[str]) -> List[np.ndarray]:
+        """
+        Embed texts, returning one float32 vector per input (duplicates share a vector).
+
+        Raises:
+            Exception: The embedding error of a batch that still fails after retries
+        """
+        if not texts:
+            return []
+        hashes = [text_hash(text) for text in texts]
+        unique: Dict[str, str] = {}
+        for digest, text in zip(hashes, texts):
+            unique.setdefault(digest, text)
+
+        vectors = self._cache_get(list(unique))
+        missing = [digest for digest in unique if digest not in vectors]
+        self._count(
+            requested=len(texts), unique=len(unique), cache_hits=len(unique) - len(missing), embedded=len(missing)
+        )
+
+        if missing:
+            missing_texts = [unique[digest] for digest in missing]
+            batches = self._pack_batches(missing_texts)
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches))) as pool:
+                results = pool.map(self._embed_with_retry, [[missing_texts[i] for i in b] for b in batches])
+                for batch, batch_vectors in zip(batches, results):
+                    # Cache each batch as it lands so a later failure does not waste it
+                    fresh = {missing[i]: vec for i, vec in zip(batch, batch_vectors)}
+                    self._cache_put(fresh)
+                    for digest, vec in fresh.items():
+                        vectors[digest] = np.asarray(vec, dtype=np.float32)
+            logger.debug(
+                f"Embedded {len(missing)} new texts in {len(batches)} requests "
+                f"({len(unique) - len(missing)} cached, {len(texts) - len(unique)} duplicates)"
+            )
+
+        return [vectors[digest] for digest in hashes]
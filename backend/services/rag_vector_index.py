@@ -0,0 +1,559 @@
+"""
+Persistent vector index for the CASTOR RAG store.
+
+Embeddings are L2-normalized once on insert and kept in a memory-mapped float32
+matrix next to the SQLite file, so a query is one matrix product plus a partial
+sort instead of a JSON parse and a Python loop per row.
+
+Slot bookkeeping (which row of the matrix belongs to which document) lives in
+SQLite tables written in the same transaction as the documents themselves.
+Every write bumps a sequence number, which lets each gunicorn worker pick up
+the other workers' inserts and deletes incrementally on its next query.
+Vectors are only ever written to slots no committed row points at (the free
+list or past the high-water mark), so the matrix file never runs ahead of the
+transaction: a rollback leaves the committed slots and their vectors intact.
+
+In ``ivf`` mode vectors are also assigned to k-means centroids (an inverted
+file index) and a query only scores the ``nprobe`` closest lists; ``nprobe``
+is the recall knob. Until ``train()`` has run, IVF mode behaves like exact mode.
+"""
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+import uuid
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INDEX_MODES = ("exact", "ivf")
+
+# Storage precisions for embeddings persisted in rag_documents.embedding.
+# "json" only appears on rows written before the BLOB format and not yet migrated.
+EMBEDDING_PRECISIONS = ("float32", "float16", "int8")
+
+
+def normalize_rows(vectors) -> np.ndarray:
+    """Return vectors as a 2-D float32 array with unit-length rows (zero rows stay zero)."""
+    arr = np.array(vectors, dtype=np.float32, ndmin=2)
+    norms = np.linalg.norm(arr, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return arr / norms
+
+
+def encode_embedding(embedding, precision: str = "float32") -> bytes:
+    """
+    Serialize an embedding as a little-endian BLOB.
+
+    int8 uses symmetric per-vector quantization: a float32 scale followed by
+    one signed byte per dimension.
+    """
+    vec = np.asarray(embedding, dtype="<f4")
+    if precision == "float32":
+        return vec.tobytes()
+    if precision == "float16":
+        return vec.astype("<f2").tobytes()
+    if precision == "int8":
+        peak = float(np.abs(vec).max()) if vec.size else 0.0
+        scale = peak / 127.0
+        quantized = np.round(vec / scale) if scale else np.zeros(vec.shape)
+        return np.float32(scale).astype("<f4").tobytes() + quantized.astype(np.int8).tobytes()
+    raise ValueError(f"Unknown embedding precision: {precision}")
+
+
+def decode_embedding(blob, precision: str) -> np.ndarray:
+    """Inverse of encode_embedding; also reads legacy JSON text embeddings."""
+    if precision == "json":
+        return np.asarray(json.loads(blob) if blob else [], dtype=np.float32)
+    if precision == "float32":
+        return np.frombuffer(blob, dtype="<f4").astype(np.float32)
+    if precision == "float16":
+        return np.frombuffer(blob, dtype="<f2").astype(np.float32)
+    if precision == "int8":
+        scale = np.frombuffer(blob[:4], dtype="<f4")[0]
+        return np.frombuffer(blob[4:], dtype=np.int8).astype(np.float32) * scale
+    raise ValueError(f"Unknown embedding precision: {precision}")
+
+
+class VectorIndex:
+    """
+    Memory-mapped, incrementally maintained cosine-similarity index.
+
+    All public methods take an open ``sqlite3.Connection`` to the RAG store so
+    index bookkeeping commits (or rolls back) together with the documents.
+    """
+
+    CHUNK_ROWS = 65536
+    MIN_CAPACITY = 1024
+    SQL_BATCH = 500
+
+    def __init__(self, db_path: str, mode: str = "exact", nlist: int = 0, nprobe: int = 8):
+        """
+        Initialize vector index.
+
+        Args:
+            db_path: SQLite file of the RAG store (index files are created next to it)
+            mode: "exact" (brute-force matmul) or "ivf" (approximate, probes nprobe lists)
+            nlist: Number of IVF lists (0 = sqrt(number of vectors) at training time)
+            nprobe: Number of IVF lists scanned per query; higher means better recall
+        """
+        if mode not in INDEX_MODES:
+            raise ValueError(f"Unknown vector index mode: {mode}")
+        self.matrix_path = f"{db_path}.vectors.f32"
+        self.centroids_path = f"{db_path}.ivf.npy"
+        self.mode = mode
+        self.nlist = nlist
+        self.nprobe = max(1, nprobe)
+        self._lock = threading.RLock()
+        self._reset_state()
+
+    def _reset_state(self) -> None:
+        self._epoch: Optional[str] = None
+        self._seq = 0
+        self._dim = 0
+        self._high_water = 0
+        self._ids: List[Optional[str]] = []
+        self._slot_of: Dict[str, int] = {}
+        self._alive = np.zeros(0, dtype=bool)
+        self._lists = np.zeros(0, dtype=np.int32)
+        self._matrix: Optional[np.memmap] = None
+        self._centroids: Optional[np.ndarray] = None
+        self._ivf_version = ""
+
+    # ------------------------------------------------------------------
+    # Schema and metadata
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def init_schema(conn: sqlite3.Connection) -> None:
+        """Create the bookkeeping tables used by the index."""
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS rag_vector_slots (
+                slot INTEGER PRIMARY KEY,
+                doc_id TEXT NOT NULL UNIQUE,
+                list_id INTEGER NOT NULL DEFAULT -1,
+                seq INTEGER NOT NULL
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_rag_vector_slots_seq ON rag_vector_slots(seq)")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS rag_vector_free (
+                slot INTEGER PRIMARY KEY,
+                seq INTEGER NOT NULL
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_rag_vector_free_seq ON rag_vector_free(seq)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS rag_vector_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+
+    @staticmethod
+    def _read_meta(conn: sqlite3.Connection) -> Dict[str, str]:
+        return dict(conn.execute("SELECT key, value FROM rag_vector_meta").fetchall())
+
+    @staticmethod
+    def _write_meta(conn: sqlite3.Connection, **values) -> None:
+        conn.executemany(
+            "INSERT OR REPLACE INTO rag_vector_meta (key, value) VALUES (?, ?)",
+            [(key, str(value)) for key, value in values.items()]
+        )
+
+    @staticmethod
+    def _begin_write(conn: sqlite3.Connection) -> None:
+        # Take the write lock before reading slot state so concurrent writers
+        # (other workers) cannot allocate the same slot.
+        if not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")
+
+    def _select_slots(self, conn: sqlite3.Connection, doc_ids: Sequence[str]) -> Dict[str, int]:
+        found: Dict[str, int] = {}
+        for start in range(0, len(doc_ids), self.SQL_BATCH):
+            batch = doc_ids[start:start + self.SQL_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows = conn.execute(
+                f"SELECT doc_id, slot FROM rag_vector_slots WHERE doc_id IN ({placeholders})",
+                list(batch)
+            ).fetchall()
+            found.update(rows)
+        return found
+
+    # ------------------------------------------------------------------
+    # Matrix file
+    # ------------------------------------------------------------------
+
+    def _map_matrix(self, rows_needed: int, dim: int) -> None:
+        """(Re)map the matrix file if it grew or the dimension changed."""
+        if dim == 0 or not os.path.exists(self.matrix_path):
+            self._matrix = None
+            return
+        current = self._matrix
+        if current is not None and current.shape[1] == dim and current.shape[0] >= rows_needed:
+            return
+        rows = os.path.getsize(self.matrix_path) // (dim * 4)
+        if rows == 0:
+            self._matrix = None
+            return
+        self._matrix = np.memmap(self.matrix_path, dtype=np.float32, mode="r+", shape=(rows, dim))
+
+    def _writable_matrix(self, rows_needed: int, dim: int) -> np.memmap:
+        """Grow the matrix file geometrically so it holds at least rows_needed rows."""
+        needed_bytes = rows_needed * dim * 4
+        size = os.path.getsize(self.matrix_path) if os.path.exists(self.matrix_path) else 0
+        if size < needed_bytes:
+            capacity = max(self.MIN_CAPACITY, rows_needed)
+            capacity = 1 << (capacity - 1).bit_length()
+            # Never shrink: other workers may have the file mapped.
+            with open(self.matrix_path, "a+b") as f:
+                f.truncate(max(size, capacity * dim * 4))
+        self._map_matrix(rows_needed, dim)
+        return self._matrix
+
+    # ------------------------------------------------------------------
+    # Incremental sync
+    # ------------------------------------------------------------------
+
+    def _grow_arrays(self, high_water: int) -> None:
+        if len(self._ids) < high_water:
+            self._ids.extend([None] * (high_water - len(self._ids)))
+        if self._alive.shape[0] < high_water:
+            capacity = 1 << max(high_water - 1, 1).bit_length()
+            alive = np.zeros(capacity, dtype=bool)
+            alive[:self._alive.shape[0]] = self._alive
+            lists = np.full(capacity, -1, dtype=np.int32)
+            lists[:self._lists.shape[0]] = self._lists
+            self._alive, self._lists = alive, lists
+
+    def _set_slot(self, slot: int, doc_id: Optional[str], list_id: int = -1) -> None:
+        previous = self._ids[slot]
+        if previous is not None and previous != doc_id and self._slot_of.get(previous) == slot:
+            del self._slot_of[previous]
+        self._ids[slot] = doc_id
+        self._alive[slot] = doc_id is not None
+        self._lists[slot] = list_id
+        if doc_id is not None:
+            self._slot_of[doc_id] = slot
+
+    def sync(self, conn: sqlite3.Connection) -> None:
+        """Apply inserts/deletes committed by any process since the last sync."""
+        with self._lock:
+            own_txn = not conn.in_transaction
+            if own_txn:
+                conn.execute("BEGIN")
+            try:
+                meta = self._read_meta(conn)
+                epoch = meta.get("epoch", "")
+                if epoch != self._epoch:
+                    self._reset_state()
+                    self._epoch = epoch
+                seq = int(meta.get("seq", 0))
+                high_water = int(meta.get("high_water", 0))
+                self._grow_arrays(high_water)
+                if seq != self._seq:
+                    changed = conn.execute(
+                        "SELECT slot, doc_id, list_id FROM rag_vector_slots WHERE seq > ?", (self._seq,)
+                    ).fetchall()
+                    freed = conn.execute(
+                        "SELECT slot FROM rag_vector_free WHERE seq > ?", (self._seq,)
+                    ).fetchall()
+                    for slot, doc_id, list_id in changed:
+                        self._set_slot(slot, doc_id, list_id)
+                    for (slot,) in freed:
+                        self._set_slot(slot, None)
+                    self._seq = seq
+            finally:
+                if own_txn:
+                    conn.commit()
+
+            self._high_water = high_water
+            self._dim = int(meta.get("dim", 0))
+            self._map_matrix(high_water, self._dim)
+            self._load_centroids(meta.get("ivf_version", ""))
+
+    def _load_centroids(self, version: str) -> None:
+        if version == self._ivf_version:
+            return
+        self._ivf_version = version
+        self._centroids = None
+        if version and os.path.exists(self.centroids_path):
+            try:
+                self._centroids = np.load(self.centroids_path).astype(np.float32)
+            except Exception as e:
+                logger.warning(f"Could not load IVF centroids, falling back to exact search: {e}")
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def add(self, conn: sqlite3.Connection, doc_ids: Sequence[str], embeddings) -> None:
+        """
+        Insert or replace vectors for doc_ids (caller commits).
+
+        Replaced documents move to a fresh slot and their old slot is freed in
+        the same transaction, so live rows of the matrix are never overwritten
+        before the commit.
+        """
+        if not doc_ids:
+            return
+        vectors = normalize_rows(embeddings)
+        if vectors.shape[0] != len(doc_ids):
+            raise ValueError("doc_ids and embeddings must have the same length")
+
+        # Last occurrence wins when the same id appears twice in a batch
+        latest = {doc_id: i for i, doc_id in enumerate(doc_ids)}
+        ids = list(latest)
+
+        with self._lock:
+            self._begin_write(conn)
+            meta = self._read_meta(conn)
+            dim = int(meta.get("dim", 0)) or vectors.shape[1]
+            if vectors.shape[1] != dim:
+                raise ValueError(
+                    f"Embedding dimension {vectors.shape[1]} does not match index dimension {dim}; "
+                    "clear the store before switching embedding models"
+                )
+            seq = int(meta.get("seq", 0)) + 1
+            high_water = int(meta.get("high_water", 0))
+
+            replaced = list(self._select_slots(conn, ids).values())
+            free = [row[0] for row in conn.execute(
+                "SELECT slot FROM rag_vector_free ORDER BY slot LIMIT ?", (len(ids),)
+            )]
+            conn.executemany("DELETE FROM rag_vector_free WHERE slot = ?", [(s,) for s in free])
+            slots: Dict[str, int] = {}
+            for doc_id in ids:
+                if free:
+                    slots[doc_id] = free.pop()
+                else:
+                    slots[doc_id] = high_water
+                    high_water += 1
+
+            rows = np.fromiter((slots[doc_id] for doc_id in ids), dtype=np.int64, count=len(ids))
+            batch = vectors[[latest[doc_id] for doc_id in ids]]
+            matrix = self._writable_matrix(high_water, dim)
+            matrix[rows] = batch
+            matrix.flush()
+
+            self._load_centroids(meta.get("ivf_version", ""))
+            if self._centroids is not None and self._centroids.shape[1] == dim:
+                list_ids = np.argmax(batch @ self._centroids.T, axis=1).tolist()
+            else:
+                list_ids = [-1] * len(ids)
+
+            conn.executemany("DELETE FROM rag_vector_slots WHERE slot = ?", [(s,) for s in replaced])
+            conn.executemany(
+                "INSERT INTO rag_vector_slots (slot, doc_id, list_id, seq) VALUES (?, ?, ?, ?)",
+                [(int(slot), doc_id, int(list_id), seq) for slot, doc_id, list_id in zip(rows, ids, list_ids)]
+            )
+            conn.executemany(
+                "INSERT INTO rag_vector_free (slot, seq) VALUES (?, ?)", [(s, seq) for s in replaced]
+            )
+            self._write_meta(conn, dim=dim, seq=seq, high_water=high_water)
+
+    def delete(self, conn: sqlite3.Connection, doc_ids: Sequence[str]) -> None:
+        """Release the slots of doc_ids (caller commits)."""
+        if not doc_ids:
+            return
+        with self._lock:
+            self._begin_write(conn)
+            slots = self._select_slots(conn, list(dict.fromkeys(doc_ids)))
+            if not slots:
+                return
+            seq = int(self._read_meta(conn).get("seq", 0)) + 1
+            conn.executemany("DELETE FROM rag_vector_slots WHERE slot = ?", [(s,) for s in slots.values()])
+            conn.executemany(
+                "INSERT OR REPLACE INTO rag_vector_free (slot, seq) VALUES (?, ?)",
+                [(s, seq) for s in slots.values()]
+            )
+            self._write_meta(conn, seq=seq)
+
+    def clear(self, conn: sqlite3.Connection) -> None:
+        """Drop every vector (caller commits). The matrix file is reused, not truncated."""
+        with self._lock:
+            self._begin_write(conn)
+            conn.execute("DELETE FROM rag_vector_slots")
+            conn.execute("DELETE FROM rag_vector_free")
+            self._write_meta(conn, epoch=uuid.uuid4().hex, seq=0, high_water=0, dim=0, ivf_version="")
+
+    def count(self, conn: sqlite3.Connection) -> int:
+        return int(conn.execute("SELECT COUNT(1) FROM rag_vector_slots").fetchone()[0])
+
+    def get_vectors(self, conn: sqlite3.Connection, doc_ids: Sequence[str]) -> Dict[str, np.ndarray]:
+        """Return copies of the normalized float32 vectors stored for doc_ids."""
+        self.sync(conn)
+        with self._lock:
+            if self._matrix is None:
+                return {}
+            return {
+                doc_id: np.array(self._matrix[self._slot_of[doc_id]])
+                for doc_id in doc_ids if doc_id in self._slot_of
+            }
+
+    # ------------------------------------------------------------------
+    # IVF training
+    # ------------------------------------------------------------------
+
+    def train(self, conn: sqlite3.Connection, nlist: int = None, iterations: int = 10) -> int:
+        """
+        Train IVF centroids (spherical k-means on a sample) and assign every vector to a list.
+
+        Only needed once, or after the corpus drifts; later inserts are assigned on the fly.
+
+        Returns:
+            Number of lists trained (0 if the index is empty)
+        """
+        self.sync(conn)
+        with self._lock:
+            live = np.flatnonzero(self._alive[:self._high_water])
+            if live.size == 0 or self._matrix is None:
+                return 0
+            nlist = nlist or self.nlist or int(math.sqrt(live.size))
+            nlist = max(1, min(nlist, live.size))
+
+            rng = np.random.default_rng(0)
+            sample_size = min(live.size, nlist * 64)
+            sample = np.sort(rng.choice(live, size=sample_size, replace=False))
+            data = np.asarray(self._matrix[sample])
+            centroids = data[rng.choice(sample_size, size=nlist, replace=False)].copy()
+
+            for _ in range(iterations):
+                assign = np.argmax(data @ centroids.T, axis=1)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, assign, data)
+                counts = np.bincount(assign, minlength=nlist)
+                sums[counts == 0] = centroids[counts == 0]
+                centroids = normalize_rows(sums)
+
+            list_ids = np.empty(live.size, dtype=np.int32)
+            for start in range(0, live.size, self.CHUNK_ROWS):
+                chunk = live[start:start + self.CHUNK_ROWS]
+                list_ids[start:start + chunk.size] = np.argmax(self._matrix[chunk] @ centroids.T, axis=1)
+
+            tmp_path = f"{self.centroids_path}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, centroids)
+            os.replace(tmp_path, self.centroids_path)
+
+            self._begin_write(conn)
+            seq = int(self._read_meta(conn).get("seq", 0)) + 1
+            doc_ids = [self._ids[slot] for slot in live]
+            conn.executemany(
+                "UPDATE rag_vector_slots SET list_id = ?, seq = ? WHERE slot = ? AND doc_id = ?",
+                [
+                    (int(list_id), seq, int(slot), doc_id)
+                    for list_id, slot, doc_id in zip(list_ids, live, doc_ids)
+                ]
+            )
+            self._write_meta(conn, seq=seq, ivf_version=uuid.uuid4().hex)
+            conn.commit()
+
+        logger.info(f"Trained IVF index: {nlist} lists over {live.size} vectors")
+        return nlist
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _candidate_mask(self, candidates: Optional[Sequence[str]], candidate_slots: Optional[np.ndarray],
+                        nprobe: Optional[int], queries: np.ndarray) -> np.ndarray:
+        hw = self._high_water
+        mask = self._alive[:hw].copy()
+        if candidates is not None or candidate_slots is not None:
+            allowed = np.zeros(hw, dtype=bool)
+            if candidates is not None:
+                allowed[[self._slot_of[d] for d in candidates if d in self._slot_of]] = True
+            if candidate_slots is not None:
+                slots = np.asarray(candidate_slots, dtype=np.int64)
+                allowed[slots[slots < hw]] = True
+            mask &= allowed
+        elif self.mode == "ivf" and self._centroids is not None and self._centroids.shape[1] == self._dim:
+            probes = max(1, nprobe or self.nprobe)
+            if probes < self._centroids.shape[0]:
+                centroid_scores = queries @ self._centroids.T
+                wanted = np.unique(np.argpartition(-centroid_scores, probes - 1, axis=1)[:, :probes])
+                lists = self._lists[:hw]
+                mask &= np.isin(lists, wanted) | (lists < 0)
+        return mask
+
+    def search_batch(
+        self,
+        conn: sqlite3.Connection,
+        queries,
+        top_k: int = 5,
+        candidates: Optional[Sequence[str]] = None,
+        candidate_slots: Optional[np.ndarray] = None,
+        nprobe: Optional[int] = None
+    ) -> List[List[Tuple[str, float]]]:
+        """
+        Top-k cosine search for several query vectors at once.
+
+        Args:
+            conn: Connection to the RAG store
+            queries: Query embeddings, shape (n_queries, dim)
+            top_k: Results per query
+            candidates: Optional doc ids to restrict the search to (pre-filter)
+            candidate_slots: Optional slot numbers (rag_vector_slots.slot) to restrict to
+            nprobe: Override of IVF lists scanned per query
+
+        Returns:
+            For each query, a list of (doc_id, score) sorted by descending score
+        """
+        self.sync(conn)
+        q = normalize_rows(queries)
+        empty: List[List[Tuple[str, float]]] = [[] for _ in range(q.shape[0])]
+        with self._lock:
+            if self._matrix is None or self._high_water == 0 or top_k <= 0:
+                return empty
+            if q.shape[1] != self._dim:
+                logger.warning(f"Query dimension {q.shape[1]} does not match index dimension {self._dim}")
+                return empty
+
+            idx = np.flatnonzero(self._candidate_mask(candidates, candidate_slots, nprobe, q))
+            if idx.size == 0:
+                return empty
+            k = min(top_k, idx.size)
+
+            best_scores = np.empty((q.shape[0], 0), dtype=np.float32)
+            best_slots = np.empty((q.shape[0], 0), dtype=np.int64)
+            for start in range(0, idx.size, self.CHUNK_ROWS):
+                chunk = idx[start:start + self.CHUNK_ROWS]
+                if chunk[-1] - chunk[0] + 1 == chunk.size:
+                    block = self._matrix[chunk[0]:chunk[-1] + 1]
+                else:
+                    block = self._matrix[chunk]
+                scores = np.concatenate([best_scores, q @ block.T], axis=1)
+                slots = np.concatenate([best_slots, np.broadcast_to(chunk, (q.shape[0], chunk.size))], axis=1)
+                if scores.shape[1] > k:
+                    part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                    scores = np.take_along_axis(scores, part, axis=1)
+                    slots = np.take_along_axis(slots, part, axis=1)
+                best_scores, best_slots = scores, slots
+
+            order = np.argsort(-best_scores, axis=1, kind="stable")
+            best_scores = np.take_along_axis(best_scores, order, axis=1)
+            best_slots = np.take_along_axis(best_slots, order, axis=1)
+            return [
+                [(self._ids[slot], float(score)) for slot, score in zip(row_slots, row_scores)]
+                for row_slots, row_scores in zip(best_slots.tolist(), best_scores.tolist())
+            ]
+
+    def search(
+        self,
+        conn: sqlite3.Connection,
+        query,
+        top_k: int = 5,
+        candidates: Optional[Sequence[str]] = None,
+        candidate_slots: Optional[np.ndarray] = None,
+        nprobe: Optional[int] = None
+    ) -> List[Tuple[str, float]]:
+        """Top-k cosine search for a single query vector."""
+        return self.search_batch(
+            conn, [query], top_k=top_k, candidates=candidates, candidate_slots=candidate_slots, nprobe=nprobe
+        )[0]
@@ -0,0 +1,163 @@
+"""
+Persistent, cross-process cache of BETO sentiment results.
+
+Second tier behind SentimentService's per-process TTLCache. Keys hash the
+normalized text (lowercase, URLs, @mentions and the RT prefix removed,
+whitespace collapsed) together with the model version, so retweets and
+copies of a viral tweet share one entry. Bumping SENTIMENT_MODEL_VERSION,
+or changing BETO_MODEL_PATH or BETO_BACKEND, orphans every old entry.
+
+Storage is the shared Redis client from utils.cache when it is up (MGET
+plus a pipelined SETEX per batch). Otherwise a local SQLite file
+(SENTIMENT_CACHE_DB) shared by the processes on the host is used.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from config import Config
+from utils import cache
+from utils.metrics import SentimentMetrics
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "castor:sentiment"
+MAX_IN_PARAMS = 900  # SQLite host parameter limit is 999 on older builds
+
+_URL_RE = re.compile(r'https?://\S+|www\.\S+')
+_MENTION_RE = re.compile(r'@\w+')
+_RT_RE = re.compile(r'^rt\b:?\s*')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def normalize_text(text: str) -> str:
+    """Text as seen by the cache: retweets and re-shares of a tweet collapse to one key."""
+    text = _URL_RE.sub(' ', text.lower())
+    text = _MENTION_RE.sub(' ', text)
+    text = _SPACE_RE.sub(' ', text).strip()
+    return _RT_RE.sub('', text).strip(' :')
+
+
+def model_version() -> str:
+    return f"{Config.SENTIMENT_MODEL_VERSION}:{Config.BETO_MODEL_PATH}:{Config.BETO_BACKEND}"
+
+
+def cache_key(text: str, version: Optional[str] = None) -> str:
+    """Key for text under the current (or given) model version."""
+    digest = hashlib.sha1(f"{version or model_version()}\n{normalize_text(text)}".encode('utf-8'))
+    return f"{KEY_PREFIX}:{digest.hexdigest()}"
+
+
+class PersistentSentimentCache:
+    """Bulk get/set of [negative, neutral, positive] probabilities by cache key."""
+
+    def __init__(self, db_path: Optional[str] = None, ttl_seconds: Optional[int] = None):
+        self.db_path = db_path or Config.SENTIMENT_CACHE_DB
+        self.ttl = ttl_seconds or Config.CACHE_TTL_SENTIMENT
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    # -- Public API -------------------------------------------------------
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        """Cached probabilities for the keys that have an entry."""
+        if not keys:
+            return {}
+        try:
+            found = self._redis_get(keys) if self._redis() else self._sqlite_get(keys)
+        except Exception as e:
+            logger.warning(f"Sentiment cache read failed: {e}")
+            found = {}
+        SentimentMetrics.track_cache("persistent", hits=len(found), misses=len(keys) - len(found))
+        return found
+
+    def set_many(self, items: Dict[str, List[float]]) -> None:
+        if not items:
+            return
+        try:
+            if self._redis():
+                self._redis_set(items)
+            else:
+                self._sqlite_set(items)
+        except Exception as e:
+            logger.warning(f"Sentiment cache write failed: {e}")
+
+    # -- Redis ------------------------------------------------------------
+
+    @staticmethod
+    def _redis():
+        client = cache.redis_client
+        return client if client is not None and hasattr(client, "mget") else None
+
+    def _redis_get(self, keys: List[str]) -> Dict[str, List[float]]:
+        values = self._redis().mget(keys)
+        return {key: json.loads(value) for key, value in zip(keys, values) if value is not None}
+
+    def _redis_set(self, items: Dict[str, List[float]]) -> None:
+        pipe = self._redis().pipeline(transaction=False)
+        for key, probs in items.items():
+            pipe.setex(key, self.ttl, json.dumps(probs))
+        pipe.execute()
+
+    # -- SQLite fallback --------------------------------------------------
+
+    def _sqlite(self) -> sqlite3.Connection:
+        if self._conn is None or self._pid != os.getpid():
+            os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=5, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sentiment_cache (
+                    key TEXT PRIMARY KEY,
+                    probs TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                ) WITHOUT ROWID
+            """)
+            conn.execute("DELETE FROM sentiment_cache WHERE expires_at < ?", (time.time(),))
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def _sqlite_get(self, keys: List[str]) -> Dict[str, List[float]]:
+        found: Dict[str, List[float]] = {}
+        now = time.time()
+        with self._lock:
+            conn = self._sqlite()
+            for i in range(0, len(keys), MAX_IN_PARAMS):
+                chunk = keys[i:i + MAX_IN_PARAMS]
+                rows = conn.execute(
+                    f"SELECT key, probs FROM sentiment_cache "
+                    f"WHERE key IN ({','.join('?' * len(chunk))}) AND expires_at >= ?",
+                    (*chunk, now),
+                )
+                found.update((key, json.loads(probs)) for key, probs in rows)
+        return found
+
+    def _sqlite_set(self, items: Dict[str, List[float]]) -> None:
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            conn = self._sqlite()
+            conn.execute("BEGIN")
+            conn.executemany(
+                "INSERT OR REPLACE INTO sentiment_cache (key, probs, expires_at) VALUES (?, ?, ?)",
+                [(key, json.dumps(probs), expires_at) for key, probs in items.items()],
+            )
+            conn.execute("COMMIT")
+
+
+_cache: Optional[PersistentSentimentCache] = None
+
+
+def get_sentiment_cache() -> PersistentSentimentCache:
+    """Process-wide persistent sentiment cache."""
+    global _cache
+    if _cache is None:
+        _cache = PersistentSentimentCache()
+    return _cache
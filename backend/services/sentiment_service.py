@@ -1,15 +1,19 @@
 """
 Sentiment analysis service using BETO model.
 Provides 99% accuracy sentiment classification for Spanish text.
-Uses singleton pattern to avoid loading model multiple times.
+Results are cached per process and in a persistent cross-process tier
+(services/sentiment_cache.py). Inference goes to the shared BETO sidecar
+when it is running; otherwise the model is loaded in-process.
 """
 import logging
 from typing import List, Dict, Any, Optional
-import torch
 from config import Config
 from models.schemas import SentimentData, SentimentType
 from utils.cache import TTLCache
-from services.model_singleton import get_beto_model
+from utils.metrics import SentimentMetrics
+from services.beto_sidecar import SidecarUnavailable, get_sidecar_client
+from services.sentiment_cache import cache_key, get_sentiment_cache
+from services.model_singleton import get_beto_model, get_inference_scheduler
 
 logger = logging.getLogger(__name__)
 
@@ -18,19 +22,36 @@ class SentimentService:
     """Service for sentiment analysis using BETO model."""
     
     def __init__(self):
-        """Initialize BETO model for sentiment analysis."""
-        # Use singleton to avoid loading model multiple times
-        self.model, self.tokenizer, self.device = get_beto_model()
+        """Initialize sentiment analysis (sidecar client or in-process BETO)."""
+        self._sidecar = get_sidecar_client() if Config.BETO_SIDECAR_ENABLED else None
+        if self._sidecar is None:
+            # Use singleton to avoid loading model multiple times
+            get_beto_model()
         self._sentiment_cache = TTLCache(
             ttl_seconds=Config.SENTIMENT_CACHE_TTL,
             max_size=Config.CACHE_MAX_SIZE
         )
-        logger.info(f"SentimentService initialized with device: {self.device}")
+        self._persistent_cache = get_sentiment_cache()
+        logger.info(f"SentimentService initialized ({'sidecar' if self._sidecar else 'in-process'} inference)")
+
+    def _predict(self, texts: List[str]) -> List[List[float]]:
+        """
+        [negative, neutral, positive] probabilities per text.
+
+        The model is only loaded in this process if the sidecar is unavailable.
+        """
+        if self._sidecar is not None:
+            try:
+                return self._sidecar.predict(texts)
+            except SidecarUnavailable as e:
+                SentimentMetrics.track_sidecar_fallback(len(texts))
+                logger.warning(f"BETO sidecar unavailable, using in-process model for {len(texts)} texts: {e}")
+        return get_inference_scheduler().predict(texts)
 
     def _cache_key(self, text: str) -> str:
-        """Generate cache key for sentiment results."""
-        return text.strip().lower()
-    
+        """Generate cache key for sentiment results (normalized text + model version)."""
+        return cache_key(text)
+
     def analyze_sentiment(self, text: str) -> SentimentData:
         """
         Analyze sentiment of a single text.
@@ -43,46 +64,14 @@ class SentimentService:
         """
         if not text or not text.strip():
             return SentimentData(positive=0.33, negative=0.33, neutral=0.34)
-        
-        cache_key = self._cache_key(text)
-        cached = self._sentiment_cache.get(cache_key)
-        if cached:
-            return SentimentData(**cached)
-        
-        try:
-            # Tokenize
-            inputs = self.tokenizer(
-                text,
-                return_tensors='pt',
-                truncation=True,
-                max_length=512,
-                padding=True
-            ).to(self.device)
-            
-            # Predict
-            with torch.no_grad():
-                outputs = self.model(**inputs)
-                logits = outputs.logits
-                probabilities = torch.softmax(logits, dim=-1).cpu().numpy()[0]
-            
-            # Map to sentiment scores
-            # Assuming model outputs: [negative, neutral, positive]
-            sentiment = SentimentData(
-                positive=float(probabilities[2]),
-                negative=float(probabilities[0]),
-                neutral=float(probabilities[1])
-            )
-            self._sentiment_cache.set(cache_key, sentiment.dict())
-            return sentiment
-            
-        except Exception as e:
-            logger.error(f"Error analyzing sentiment: {e}", exc_info=True)
-            # Return neutral as fallback
-            return SentimentData(positive=0.33, negative=0.33, neutral=0.34)
-    
+        return self.analyze_batch([text])[0]
+
     def analyze_batch(self, texts: List[str]) -> List[SentimentData]:
         """
         Analyze sentiment for multiple texts (batch processing).
+
+        Lookup order: per-process cache, persistent cache (one bulk get),
+        then one inference per distinct normalized text.
         
         Args:
             texts: List of texts to analyze
@@ -94,8 +83,8 @@ class SentimentService:
             return []
         
         sentiments: List[Optional[SentimentData]] = [None] * len(texts)
-        uncached_texts = []
-        uncached_indices = []
+        # Cache key -> positions in texts (retweets of one tweet share a key)
+        missing: Dict[str, List[int]] = {}
         
         for idx, text in enumerate(texts):
             cache_key = self._cache_key(text)
@@ -103,53 +92,39 @@ class SentimentService:
             if cached:
                 sentiments[idx] = SentimentData(**cached)
             else:
-                uncached_texts.append(text)
-                uncached_indices.append(idx)
+                missing.setdefault(cache_key, []).append(idx)
+        local_misses = sum(len(indices) for indices in missing.values())
+        SentimentMetrics.track_cache("local", hits=len(texts) - local_misses, misses=local_misses)
+        
+        if missing:
+            stored = self._persistent_cache.get_many(list(missing))
+            for cache_key, prob in stored.items():
+                self._fill(sentiments, missing.pop(cache_key), cache_key, prob)
         
-        if not uncached_texts:
-            return [s for s in sentiments if s is not None]
+        if not missing:
+            return sentiments
         
-        batch_size = 32
+        # Chunks of several model batches: the scheduler sorts each chunk by
+        # token length and re-batches it, while failures stay per chunk
+        batch_size = Config.BETO_BATCH_SIZE * 8
+        pending = list(missing)
         
-        for i in range(0, len(uncached_texts), batch_size):
-            batch = uncached_texts[i:i + batch_size]
+        for i in range(0, len(pending), batch_size):
+            batch_keys = pending[i:i + batch_size]
+            batch = [texts[missing[key][0]] for key in batch_keys]
             try:
-                # Tokenize batch
-                inputs = self.tokenizer(
-                    batch,
-                    return_tensors='pt',
-                    truncation=True,
-                    max_length=512,
-                    padding=True
-                ).to(self.device)
-                
-                # Predict
-                with torch.no_grad():
-                    outputs = self.model(**inputs)
-                    logits = outputs.logits
-                    probabilities = torch.softmax(logits, dim=-1).cpu().numpy()
-                
-                # Process results
-                for index_offset, prob in enumerate(probabilities):
-                    sentiment = SentimentData(
-                        positive=float(prob[2]),
-                        negative=float(prob[0]),
-                        neutral=float(prob[1])
-                    )
-                    target_idx = uncached_indices[i + index_offset]
-                    sentiments[target_idx] = sentiment
-                    self._sentiment_cache.set(
-                        self._cache_key(uncached_texts[i + index_offset]),
-                        sentiment.dict()
-                    )
+                probabilities = self._predict(batch)
+
+                for cache_key, prob in zip(batch_keys, probabilities):
+                    self._fill(sentiments, missing[cache_key], cache_key, prob)
+                self._persistent_cache.set_many(dict(zip(batch_keys, probabilities)))
                     
             except Exception as e:
                 logger.error(f"Error in batch sentiment analysis: {e}")
                 # Add neutral fallback for failed items
-                for index_offset in range(len(batch)):
-                    sentiment = SentimentData(positive=0.33, negative=0.33, neutral=0.34)
-                    target_idx = uncached_indices[i + index_offset]
-                    sentiments[target_idx] = sentiment
+                for cache_key in batch_keys:
+                    for target_idx in missing[cache_key]:
+                        sentiments[target_idx] = SentimentData(positive=0.33, negative=0.33, neutral=0.34)
         
         # Fill any remaining None entries (shouldn't happen but safe)
         for idx, value in enumerate(sentiments):
@@ -157,6 +132,23 @@ class SentimentService:
                 sentiments[idx] = SentimentData(positive=0.33, negative=0.33, neutral=0.34)
         
         return sentiments
+
+    def _fill(
+        self,
+        sentiments: List[Optional[SentimentData]],
+        indices: List[int],
+        cache_key: str,
+        prob: List[float],
+    ) -> None:
+        """Map [negative, neutral, positive] to SentimentData at indices and cache it locally."""
+        sentiment = SentimentData(
+            positive=float(prob[2]),
+            negative=float(prob[0]),
+            neutral=float(prob[1])
+        )
+        self._sentiment_cache.set(cache_key, sentiment.dict())
+        for idx in indices:
+            sentiments[idx] = sentiment
     
     def analyze_tweets(self, tweets: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
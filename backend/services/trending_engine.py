@@ -0,0 +1,294 @@
+"""
+Incremental trending-topic engine.
+
+Each location keeps one count-min sketch per hour of tweet time. A sketch
+holds five channels per term: tweet count, engagement, and the positive,
+negative and neutral sentiment sums. Adding a tweet updates depth cells
+per term in the current hour's sketch, so ingest is O(1) in the number of
+tweets already seen.
+
+Top-k is computed on demand. The hourly sketches inside the requested
+window are summed, and the candidate terms (a bounded heavy-hitter set)
+are scored against that sum. No tweets are re-fetched or re-tokenized.
+Sample tweets and co-occurring keywords come from a bounded buffer of
+recent tweets.
+"""
+import re
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from config import Config
+
+# Channels stored per term in each sketch
+COUNT, ENGAGEMENT, POSITIVE, NEGATIVE, NEUTRAL = range(5)
+CHANNELS = 5
+
+# Common stopwords in Spanish
+STOPWORDS = frozenset({
+    'el', 'la', 'de', 'que', 'y', 'a', 'en', 'un', 'ser', 'se',
+    'no', 'haber', 'por', 'con', 'su', 'para', 'como', 'estar',
+    'tener', 'le', 'lo', 'todo', 'pero', 'más', 'hacer', 'o',
+    'poder', 'decir', 'este', 'ir', 'otro', 'ese', 'si',
+    'me', 'ya', 'ver', 'porque', 'dar', 'cuando', 'él', 'muy',
+    'sin', 'vez', 'mucho', 'saber', 'qué', 'sobre', 'mi', 'alguno'
+})
+
+_HASHTAG_RE = re.compile(r'#(\w+)')
+_STRIP_RE = re.compile(r'http\S+|@\w+|#\w+')
+_WORD_RE = re.compile(r'\b[a-záéíóúñ]+\b')
+
+SentimentFn = Callable[[List[str]], List[Any]]
+
+
+def extract_terms(text: str) -> Tuple[str, ...]:
+    """Distinct hashtags ('#tag') and keywords (non-stopwords over 3 letters) of a tweet."""
+    hashtags = {f"#{tag.lower()}" for tag in _HASHTAG_RE.findall(text)}
+    words = {
+        word for word in _WORD_RE.findall(_STRIP_RE.sub('', text.lower()))
+        if len(word) > 3 and word not in STOPWORDS
+    }
+    return tuple(hashtags | words)
+
+
+def engagement_score(tweet: Dict[str, Any]) -> float:
+    """Likes + 2 * retweets + replies."""
+    metrics = tweet.get('public_metrics') or {}
+    return float(
+        metrics.get('like_count', 0)
+        + metrics.get('retweet_count', 0) * 2
+        + metrics.get('reply_count', 0)
+    )
+
+
+def _tweet_hour(tweet: Dict[str, Any], now: float) -> int:
+    """Hours since epoch of the tweet's created_at (ingest time if missing)."""
+    created = tweet.get('created_at')
+    if isinstance(created, str):
+        try:
+            created = datetime.fromisoformat(created.replace('Z', '+00:00'))
+        except ValueError:
+            created = None
+    if isinstance(created, datetime):
+        # Naive datetimes are UTC (datetime.utcnow convention)
+        timestamp = created.timestamp() if created.tzinfo else (created - datetime(1970, 1, 1)).total_seconds()
+        return int(timestamp // 3600)
+    return int(now // 3600)
+
+
+class LocationWindow:
+    """Hourly count-min sketches, heavy-hitter candidates and recent tweets of one location."""
+
+    def __init__(self, width: int, depth: int, retention_hours: int, capacity: int, recent_size: int):
+        self.width = width
+        self.depth = depth
+        self.retention_hours = retention_hours
+        self.capacity = capacity
+        self._rows = np.arange(depth)
+        self._buckets: "OrderedDict[int, np.ndarray]" = OrderedDict()
+        self._candidates: Dict[str, int] = {}  # term -> last hour seen
+        self._seen: "OrderedDict[str, int]" = OrderedDict()  # tweet id -> hour
+        self._recent: deque = deque(maxlen=recent_size)  # (hour, popularity, text, terms)
+        self._lock = threading.Lock()
+
+    def _columns(self, term: str) -> np.ndarray:
+        # Double hashing: depth independent-enough columns from two hashes
+        h1 = hash(term)
+        h2 = hash((term, 'castor')) | 1
+        return np.array([(h1 + i * h2) % self.width for i in range(self.depth)])
+
+    def is_new(self, tweet_id: Optional[str]) -> bool:
+        return tweet_id is None or tweet_id not in self._seen
+
+    def add(self, tweet: Dict[str, Any], sentiment: Any, now: float) -> bool:
+        """Count one tweet; False if it is a duplicate or older than the retention window."""
+        hour = _tweet_hour(tweet, now)
+        current = int(now // 3600)
+        if hour <= current - self.retention_hours:
+            return False
+        tweet_id = tweet.get('id')
+        text = tweet.get('text', '')
+        terms = extract_terms(text)
+        metrics = tweet.get('public_metrics') or {}
+        values = np.array([
+            1.0,
+            engagement_score(tweet),
+            getattr(sentiment, 'positive', 0.33),
+            getattr(sentiment, 'negative', 0.33),
+            getattr(sentiment, 'neutral', 0.34),
+        ], dtype=np.float32)[:, None]
+
+        with self._lock:
+            if tweet_id is not None:
+                if tweet_id in self._seen:
+                    return False
+                self._seen[tweet_id] = hour
+            sketch = self._buckets.get(hour)
+            if sketch is None:
+                sketch = self._buckets[hour] = np.zeros((CHANNELS, self.depth, self.width), dtype=np.float32)
+            for term in terms:
+                sketch[:, self._rows, self._columns(term)] += values
+                self._candidates[term] = max(hour, self._candidates.get(term, hour))
+            self._recent.append((
+                hour,
+                metrics.get('retweet_count', 0) + metrics.get('like_count', 0),
+                text,
+                frozenset(terms),
+            ))
+            self._expire(current)
+            if len(self._candidates) > self.capacity:
+                self._prune_candidates()
+        return True
+
+    def _expire(self, current_hour: int) -> None:
+        oldest = current_hour - self.retention_hours
+        for hour in [h for h in self._buckets if h <= oldest]:
+            del self._buckets[hour]
+        # Ids arrive roughly in time order; an id ingested late just lives a bit longer
+        while self._seen and next(iter(self._seen.values())) <= oldest:
+            self._seen.popitem(last=False)
+
+    def _prune_candidates(self) -> None:
+        """Keep the heaviest half of the candidates (amortized O(1) per insert)."""
+        window = self._window(self.retention_hours, max(self._buckets, default=0))
+        if window is None:
+            self._candidates.clear()
+            return
+        counts = {term: self._estimate(window, term)[COUNT] for term in self._candidates}
+        keep = sorted(counts, key=counts.get, reverse=True)[:self.capacity // 2]
+        self._candidates = {term: self._candidates[term] for term in keep}
+
+    def _window(self, hours_back: int, current_hour: int) -> Optional[np.ndarray]:
+        tables = [t for h, t in self._buckets.items() if h > current_hour - hours_back]
+        return np.sum(tables, axis=0) if tables else None
+
+    def _estimate(self, window: np.ndarray, term: str) -> np.ndarray:
+        """Channels of term from the sketch row with the smallest count (count-min)."""
+        cells = window[:, self._rows, self._columns(term)]
+        return cells[:, int(np.argmin(cells[COUNT]))]
+
+    def top_k(self, k: int, hours_back: int, min_tweets: int, now: float) -> List[Dict[str, Any]]:
+        """Top k terms by engagement within the last hours_back hours."""
+        current = int(now // 3600)
+        with self._lock:
+            window = self._window(hours_back, current)
+            if window is None:
+                return []
+            oldest = current - hours_back
+            scored = []
+            for term, last_hour in self._candidates.items():
+                if last_hour <= oldest:
+                    continue
+                estimate = self._estimate(window, term)
+                if estimate[COUNT] >= min_tweets:
+                    scored.append((term, estimate))
+            scored.sort(key=lambda item: item[1][ENGAGEMENT], reverse=True)
+            scored = scored[:k]
+            recent = [entry for entry in self._recent if entry[0] > oldest]
+
+        topics = []
+        for term, estimate in scored:
+            count = float(estimate[COUNT])
+            sentiment_sum = float(estimate[POSITIVE] + estimate[NEGATIVE] + estimate[NEUTRAL]) or 1.0
+            matching = [entry for entry in recent if term in entry[3]]
+            matching.sort(key=lambda entry: entry[1], reverse=True)
+            related = Counter(t for entry in matching for t in entry[3] if t != term and not t.startswith('#'))
+            topics.append({
+                'topic': term,
+                'tweet_count': int(round(count)),
+                'engagement_score': float(estimate[ENGAGEMENT]),
+                'sentiment_positive': float(estimate[POSITIVE]) / sentiment_sum,
+                'sentiment_negative': float(estimate[NEGATIVE]) / sentiment_sum,
+                'sentiment_neutral': float(estimate[NEUTRAL]) / sentiment_sum,
+                'keywords': [word for word, _ in related.most_common(5)],
+                'sample_tweets': [entry[2][:200] for entry in matching[:5]],
+            })
+        return topics
+
+
+class TrendingEngine:
+    """Per-location sliding windows shared by every TrendingService in the process."""
+
+    def __init__(
+        self,
+        width: Optional[int] = None,
+        depth: Optional[int] = None,
+        retention_hours: Optional[int] = None,
+        capacity: Optional[int] = None,
+        recent_size: Optional[int] = None,
+    ):
+        self.width = width or Config.TRENDING_SKETCH_WIDTH
+        self.depth = depth or Config.TRENDING_SKETCH_DEPTH
+        self.retention_hours = retention_hours or Config.TRENDING_WINDOW_HOURS
+        self.capacity = capacity or Config.TRENDING_CANDIDATES
+        self.recent_size = recent_size or Config.TRENDING_RECENT_TWEETS
+        self._windows: Dict[str, LocationWindow] = {}
+        self._lock = threading.Lock()
+
+    def _window(self, location: str) -> LocationWindow:
+        key = location.lower()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None:
+                window = self._windows[key] = LocationWindow(
+                    self.width, self.depth, self.retention_hours, self.capacity, self.recent_size
+                )
+            return window
+
+    def ingest(
+        self,
+        location: str,
+        tweets: Iterable[Dict[str, Any]],
+        sentiment_fn: Optional[SentimentFn] = None,
+        now: Optional[float] = None,
+    ) -> int:
+        """
+        Add tweets to the location's window; returns how many were new.
+
+        sentiment_fn (e.g. SentimentService.analyze_batch) is called once,
+        on the new tweets only.
+        """
+        now = now if now is not None else time.time()
+        window = self._window(location)
+        batch_ids = set()
+        new_tweets = []
+        for tweet in tweets:
+            tweet_id = tweet.get('id')
+            if window.is_new(tweet_id) and tweet_id not in batch_ids:
+                new_tweets.append(tweet)
+                if tweet_id is not None:
+                    batch_ids.add(tweet_id)
+        if not new_tweets:
+            return 0
+        sentiments = sentiment_fn([t.get('text', '') for t in new_tweets]) if sentiment_fn else [None] * len(new_tweets)
+        return sum(window.add(tweet, sentiment, now) for tweet, sentiment in zip(new_tweets, sentiments))
+
+    def top_k(
+        self,
+        location: str,
+        k: int = 10,
+        hours_back: int = 24,
+        min_tweets: int = 10,
+        now: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """Current top-k topics of a location, highest engagement first."""
+        hours_back = min(hours_back, self.retention_hours)
+        now = now if now is not None else time.time()
+        return self._window(location).top_k(k, hours_back, min_tweets, now)
+
+
+_engine: Optional[TrendingEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_trending_engine() -> TrendingEngine:
+    """Process-wide trending engine."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = TrendingEngine()
+        return _engine
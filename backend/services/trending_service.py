@@ -1,16 +1,19 @@
 """
 Trending topics detection service.
 Detects what's trending in real-time to inform campaign speeches.
+
+Tweets feed the process-wide TrendingEngine incrementally; a refresh only
+fetches and scores tweets the engine has not seen, then reads the top-k
+from its sliding window and persists it with one bulk upsert.
 """
 import logging
 from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
-from collections import Counter
-import re
+from datetime import datetime
 from services.twitter_service import TwitterService
 from services.sentiment_service import SentimentService
 from services.database_service import DatabaseService
 from config import Config
+from services.trending_engine import get_trending_engine
 from utils.cache import TTLCache, background_tasks
 
 logger = logging.getLogger(__name__)
@@ -24,6 +27,7 @@ class TrendingService:
         self.twitter_service = TwitterService()
         self.sentiment_service = SentimentService()
         self.db_service = DatabaseService()
+        self.engine = get_trending_engine()
         self._cache = TTLCache(
             ttl_seconds=Config.TRENDING_CACHE_TTL,
             stale_ttl_seconds=Config.TRENDING_CACHE_STALE_TTL,
@@ -84,185 +88,57 @@ class TrendingService:
         except Exception as exc:
             logger.error(f"Background trending refresh failed for {location}: {exc}", exc_info=True)
 
+    def ingest_tweets(self, location: str, tweets: List[Dict[str, Any]]) -> int:
+        """
+        Feed tweets (e.g. from a stream or another search) into the trending window.
+
+        Only tweets not seen before are sentiment-scored, in one batch.
+
+        Returns:
+            Number of new tweets counted
+        """
+        return self.engine.ingest(location, tweets, self.sentiment_service.analyze_batch)
+
+    def current_trending(
+        self,
+        location: str,
+        hours_back: int = 24,
+        min_tweets: int = 10,
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """Top trending topics from the in-memory window, without fetching or persisting."""
+        topics = self.engine.top_k(location, k=limit, hours_back=hours_back, min_tweets=min_tweets)
+        detected_at = datetime.utcnow()
+        for topic in topics:
+            topic.update(location=location, detected_at=detected_at, is_active=True)
+        return topics
+
     def _compute_trending_topics(
         self,
         location: str,
         hours_back: int,
         min_tweets: int
     ) -> List[Dict[str, Any]]:
-        """Compute trending topics without consulting cache."""
-        # Search for recent tweets in location
-        # Use broad queries to capture trending topics
-        queries = [
-            f"{location}",
-            f"{location} OR {location.lower()}",
-            f"#{location.replace(' ', '')}"
-        ]
-        
-        all_tweets = []
-        for query in queries:
-            tweets = self.twitter_service.search_tweets(
-                query=query,
-                location=location,
-                max_results=200,
-                days_back=1
-            )
-            all_tweets.extend(tweets)
-        
-        # Remove duplicates
-        seen_ids = set()
-        unique_tweets = []
-        for tweet in all_tweets:
-            if tweet['id'] not in seen_ids:
-                seen_ids.add(tweet['id'])
-                unique_tweets.append(tweet)
-        
-        logger.info(f"Found {len(unique_tweets)} unique tweets")
+        """Fetch new tweets into the window, then read and persist the top topics."""
+        # One broad query; location mentions and the location hashtag
+        tweets = self.twitter_service.search_tweets(
+            query=f"{location} OR #{location.replace(' ', '')}",
+            location=location,
+            max_results=500,
+            days_back=1
+        )
+        new_count = self.ingest_tweets(location, tweets)
+        logger.info(f"Ingested {new_count} new of {len(tweets)} fetched tweets")
         
-        # Extract keywords and hashtags
-        keywords = self._extract_keywords(unique_tweets)
-        hashtags = self._extract_hashtags(unique_tweets)
+        trending_topics = self.current_trending(location, hours_back, min_tweets)
         
-        # Group tweets by topic
-        topics = self._group_tweets_by_topic(unique_tweets, keywords, hashtags)
+        # Save to database in one transaction
+        topic_ids = self.db_service.save_trending_topics(location, trending_topics)
+        for topic, topic_id in zip(trending_topics, topic_ids):
+            topic['id'] = topic_id
         
-        # Analyze sentiment for each topic
-        trending_topics = []
-        for topic_name, topic_tweets in topics.items():
-            if len(topic_tweets) < min_tweets:
-                continue
-            
-            # Calculate engagement score
-            engagement = sum(
-                t.get('public_metrics', {}).get('like_count', 0) +
-                t.get('public_metrics', {}).get('retweet_count', 0) * 2 +
-                t.get('public_metrics', {}).get('reply_count', 0)
-                for t in topic_tweets
-            )
-            
-            # Analyze sentiment
-            texts = [t['text'] for t in topic_tweets]
-            sentiments = self.sentiment_service.analyze_batch(texts)
-            aggregated = self.sentiment_service.aggregate_sentiment(sentiments)
-            
-            # Get sample tweets
-            sorted_tweets = sorted(
-                topic_tweets,
-                key=lambda x: (
-                    x.get('public_metrics', {}).get('retweet_count', 0) +
-                    x.get('public_metrics', {}).get('like_count', 0)
-                ),
-                reverse=True
-            )
-            sample_tweets = [t['text'][:200] for t in sorted_tweets[:5]]
-            
-            trending_topic = {
-                'topic': topic_name,
-                'location': location,
-                'tweet_count': len(topic_tweets),
-                'engagement_score': engagement,
-                'sentiment_positive': aggregated.positive,
-                'sentiment_negative': aggregated.negative,
-                'sentiment_neutral': aggregated.neutral,
-                'keywords': list(keywords.get(topic_name, [])),
-                'sample_tweets': sample_tweets,
-                'detected_at': datetime.utcnow(),
-                'is_active': True
-            }
-            
-            # Save to database
-            topic_id = self.db_service.save_trending_topic(trending_topic)
-            if topic_id:
-                trending_topic['id'] = topic_id
-            
-            trending_topics.append(trending_topic)
-        
-        # Sort by engagement score
-        trending_topics.sort(key=lambda x: x['engagement_score'], reverse=True)
         logger.info(f"Detected {len(trending_topics)} trending topics")
-        return trending_topics[:10]
-    
-    def _extract_keywords(self, tweets: List[Dict[str, Any]]) -> Counter:
-        """Extract keywords from tweets."""
-        # Common stopwords in Spanish
-        stopwords = {
-            'el', 'la', 'de', 'que', 'y', 'a', 'en', 'un', 'ser', 'se',
-            'no', 'haber', 'por', 'con', 'su', 'para', 'como', 'estar',
-            'tener', 'le', 'lo', 'todo', 'pero', 'más', 'hacer', 'o',
-            'poder', 'decir', 'este', 'ir', 'otro', 'ese', 'la', 'si',
-            'me', 'ya', 'ver', 'porque', 'dar', 'cuando', 'él', 'muy',
-            'sin', 'vez', 'mucho', 'saber', 'qué', 'sobre', 'mi', 'alguno'
-        }
-        
-        all_words = []
-        for tweet in tweets:
-            text = tweet.get('text', '').lower()
-            # Remove URLs, mentions, hashtags
-            text = re.sub(r'http\S+|@\w+|#\w+', '', text)
-            # Extract words
-            words = re.findall(r'\b[a-záéíóúñ]+\b', text)
-            # Filter stopwords and short words
-            words = [w for w in words if len(w) > 3 and w not in stopwords]
-            all_words.extend(words)
-        
-        return Counter(all_words)
-    
-    def _extract_hashtags(self, tweets: List[Dict[str, Any]]) -> Counter:
-        """Extract hashtags from tweets."""
-        all_hashtags = []
-        for tweet in tweets:
-            text = tweet.get('text', '')
-            hashtags = re.findall(r'#(\w+)', text)
-            all_hashtags.extend([h.lower() for h in hashtags])
-        
-        return Counter(all_hashtags)
-    
-    def _group_tweets_by_topic(
-        self,
-        tweets: List[Dict[str, Any]],
-        keywords: Counter,
-        hashtags: Counter
-    ) -> Dict[str, List[Dict[str, Any]]]:
-        """Group tweets by topic."""
-        # Get top keywords and hashtags
-        top_keywords = [word for word, count in keywords.most_common(20)]
-        top_hashtags = [tag for tag, count in hashtags.most_common(10)]
-        
-        topics = {}
-        
-        for tweet in tweets:
-            text = tweet.get('text', '').lower()
-            
-            # Check hashtags first (more reliable)
-            tweet_hashtags = [h.lower() for h in re.findall(r'#(\w+)', tweet.get('text', ''))]
-            matching_hashtag = None
-            for hashtag in top_hashtags:
-                if hashtag in tweet_hashtags:
-                    matching_hashtag = hashtag
-                    break
-            
-            if matching_hashtag:
-                topic_name = f"#{matching_hashtag}"
-                if topic_name not in topics:
-                    topics[topic_name] = []
-                topics[topic_name].append(tweet)
-                continue
-            
-            # Check keywords
-            matching_keywords = [kw for kw in top_keywords if kw in text]
-            if matching_keywords:
-                # Use the most specific keyword
-                topic_name = matching_keywords[0]
-                if topic_name not in topics:
-                    topics[topic_name] = []
-                topics[topic_name].append(tweet)
-            else:
-                # Default topic
-                if 'general' not in topics:
-                    topics['general'] = []
-                topics['general'].append(tweet)
-        
-        return topics
+        return trending_topics
     
     def get_trending_for_speech(
         self,
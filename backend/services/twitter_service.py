@@ -8,7 +8,7 @@ from typing import List, Dict, Optional, Any
 from datetime import datetime, timedelta
 
 from config import Config
-from utils.cache import get_cache_key, get, set
+from utils.cache import get_cache_key, get_or_compute
 from utils.twitter_rate_tracker import can_make_twitter_request, record_twitter_usage, get_twitter_usage_stats
 from utils.circuit_breaker import (
     get_twitter_circuit_breaker,
@@ -256,7 +256,8 @@ class TwitterService:
         days_back: int = 7
     ) -> List[Dict[str, Any]]:
         """
-        Search for tweets with caching.
+        Search for tweets with caching (single-flight: concurrent misses for
+        the same search make one API call).
         
         Args:
             query: Search query string
@@ -268,19 +269,12 @@ class TwitterService:
         Returns:
             List of tweet dictionaries
         """
-        # Check cache first
         cache_key = get_cache_key("twitter_search", query, location, max_results, lang, days_back)
-        cached_result = get(cache_key)
-        if cached_result is not None:
-            logger.debug(f"Cache hit for Twitter search: {query}")
-            return cached_result
-        
-        # Call implementation
-        result = self._search_tweets_impl(query, location, max_results, lang, days_back)
-        
-        # Cache result
-        set(cache_key, result, Config.CACHE_TTL_TWITTER)
-        return result
+        return get_or_compute(
+            cache_key,
+            lambda: self._search_tweets_impl(query, location, max_results, lang, days_back),
+            Config.CACHE_TTL_TWITTER,
+        )
     
     def search_by_pnd_topic(
         self,
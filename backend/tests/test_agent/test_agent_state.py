@@ -0,0 +1,102 @@
+"""
+Tests for AgentState storage (action list, HITL hash + pending queue,
+metric counters, capped briefings) in memory and, when fakeredis is
+installed, against Redis.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from services.agent import state as state_module
+from services.agent.state import ActionRecord, AgentState, HITLRequest
+
+
+@pytest.fixture(params=["memory", "redis"])
+def state(request):
+    if request.param == "memory":
+        return AgentState()
+    fakeredis = pytest.importorskip("fakeredis")
+    return AgentState(fakeredis.FakeRedis())
+
+
+def _action(i):
+    return ActionRecord(
+        action_id=f"a{i}",
+        action_type="create_incident",
+        timestamp=(datetime(2026, 3, 8, 12) + timedelta(seconds=i)).isoformat(),
+        trigger_rule="auto_incident_arithmetic",
+    )
+
+
+def _hitl(request_id, priority, minutes_ago):
+    created = datetime.utcnow() - timedelta(minutes=minutes_ago)
+    return HITLRequest(
+        request_id=request_id,
+        action_type="classify_cpaca",
+        created_at=created.isoformat(),
+        expires_at=(created + timedelta(hours=24)).isoformat(),
+        priority=priority,
+        title=request_id,
+        description="",
+    )
+
+
+def test_action_log_is_capped_and_chronological(state, monkeypatch):
+    monkeypatch.setattr(state_module, "MAX_ACTIONS", 5)
+    if state._use_memory:
+        state._memory_actions = state_module.deque(maxlen=5)
+
+    for i in range(3):
+        state.record_action(_action(i))
+    state.record_actions([_action(i) for i in range(3, 8)])
+
+    assert [a.action_id for a in state.get_recent_actions(limit=50)] == ["a3", "a4", "a5", "a6", "a7"]
+    assert [a.action_id for a in state.get_recent_actions(limit=2)] == ["a6", "a7"]
+    since = datetime(2026, 3, 8, 12) + timedelta(seconds=6)
+    assert [a.action_id for a in state.get_actions_since(since)] == ["a6", "a7"]
+    assert state.get_metrics().actions_total == 8
+
+
+def test_hitl_queue_orders_by_priority_then_age(state):
+    state.add_hitl_request(_hitl("p2-old", "P2", 30))
+    state.add_hitl_request(_hitl("p0-new", "P0", 1))
+    state.add_hitl_request(_hitl("p0-old", "P0", 10))
+
+    assert [r.request_id for r in state.get_pending_hitl_requests()] == ["p0-old", "p0-new", "p2-old"]
+    assert state.get_metrics().hitl_pending == 3
+
+    updated = state.update_hitl_request("p0-old", "approved", "validator-1", "ok")
+    assert updated.status == "approved" and updated.reviewed_by == "validator-1"
+    # A second review does not decrement the pending counter again
+    state.update_hitl_request("p0-old", "rejected", "validator-2")
+
+    assert [r.request_id for r in state.get_pending_hitl_requests()] == ["p0-new", "p2-old"]
+    assert state.get_hitl_request("p0-old").status == "rejected"
+    assert state.get_metrics().hitl_pending == 2
+    assert state.update_hitl_request("missing", "approved", "x") is None
+
+
+def test_metrics_increment_and_update(state):
+    assert state.increment_metric("incidents_auto_created", 3) == 3
+    assert state.increment_metric("incidents_auto_created") == 4
+    assert state.increment_metric("not_a_metric") == 0
+
+    metrics = state.update_metrics(e14_throughput_forms_per_second=12.5, e14_backlog=40)
+    assert metrics.incidents_auto_created == 4
+    assert metrics.e14_throughput_forms_per_second == 12.5
+    assert state.get_metrics().e14_backlog == 40
+
+
+def test_briefings_are_capped(state, monkeypatch):
+    monkeypatch.setattr(state_module, "MAX_BRIEFINGS", 3)
+    if state._use_memory:
+        state._memory_briefings = state_module.deque(maxlen=3)
+
+    for i in range(5):
+        state.store_briefing({"n": i})
+
+    assert [b["n"] for b in state.get_briefings()] == [2, 3, 4]
+    assert state.get_latest_briefing()["n"] == 4
+    metrics = state.get_metrics()
+    assert metrics.briefings_generated == 5
+    assert metrics.last_briefing_at == state.get_latest_briefing()["stored_at"]
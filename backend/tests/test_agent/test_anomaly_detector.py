@@ -0,0 +1,109 @@
+"""
+Tests for the column-wise batch mode of AnomalyDetector (same anomalies,
+in the same order, as analyze_e14 form by form).
+"""
+import random
+from decimal import Decimal
+
+import pytest
+
+from services.agent.analyzers.anomaly_detector import AnomalyDetector
+from services.agent.config import AgentConfig
+
+RULE_KEYS = ['ARITHMETIC_SUM', 'E11_VS_URNA', 'SUFRAGANTES_SUM', 'OCR_CONFIDENCE', 'SIGNATURES', 'TURNOUT']
+
+
+def _form(rng, i):
+    validations = []
+    for _ in range(rng.randrange(4)):
+        expected = rng.randrange(200)
+        validations.append({
+            'rule_key': rng.choice(RULE_KEYS),
+            'passed': rng.random() < 0.3,
+            'severity': rng.choice(['CRITICAL', 'HIGH', 'LOW', 'INFO']),
+            'details': {
+                'expected': expected,
+                'actual': expected - rng.choice([0, 1, 3, 12]),
+                'e11_count': rng.randrange(50),
+                'urna_count': rng.randrange(50),
+            },
+        })
+    ocr_fields = []
+    for k in range(rng.randrange(6)):
+        field = {
+            'field_key': rng.choice([f'CANDIDATE_VOTES_{k:04d}', 'VOTOS_BLANCOS', 'TOTAL_VOTOS']),
+            'confidence': rng.choice([0.2, 0.55, 0.69, 0.7, 0.95, 1]),
+        }
+        if rng.random() < 0.8:
+            field['value_int'] = rng.choice([-2, 0, 40, 1000, 1500])
+        ocr_fields.append(field)
+    return {
+        'document_header_extracted': {
+            'dept_code': '05',
+            'muni_code': rng.choice(['001', '002']),
+            'table_number': i,
+        },
+        'validations': validations,
+        'ocr_fields': ocr_fields,
+    }
+
+
+def _comparable(anomalies):
+    return [
+        {k: v for k, v in a.to_dict().items() if k != 'detected_at'}
+        for a in anomalies
+    ]
+
+
+def test_columnar_batch_matches_per_form_checks():
+    rng = random.Random(3)
+    forms = [_form(rng, i) for i in range(400)]
+    forms[5]['validations'].append({
+        'rule_key': 'ARITHMETIC_SUM',
+        'passed': False,
+        'details': {'expected': Decimal('40'), 'actual': Decimal('12.5')},
+    })
+    forms[9]['ocr_fields'].append({'field_key': 'TOTAL_VOTOS', 'value_int': Decimal('-3'), 'confidence': 0.9})
+    forms[11]['ocr_fields'] = [{'field_key': 'CANDIDATE_VOTES_0001', 'value_int': 5000.0, 'confidence': 0.1}]
+
+    per_form = AnomalyDetector(AgentConfig())
+    expected = [a for form in forms for a in per_form.analyze_e14(form)]
+    actual = AnomalyDetector(AgentConfig()).analyze_columns(forms)
+
+    assert _comparable(actual) == _comparable(expected)
+    assert {a['anomaly_type'] for a in _comparable(actual)} == {
+        'ARITHMETIC_MISMATCH', 'OCR_LOW_CONFIDENCE', 'E11_URNA_MISMATCH',
+        'IMPOSSIBLE_VALUE', 'STATISTICAL_OUTLIER',
+    }
+
+
+def test_analyze_batch_uses_columns_and_keeps_statistics():
+    rng = random.Random(11)
+    forms = [_form(rng, i) for i in range(60)]
+    config = AgentConfig()
+    config.GEOGRAPHIC_CLUSTER_THRESHOLD = 5
+
+    anomalies, stats = AnomalyDetector(config).analyze_batch(forms)
+
+    detector = AnomalyDetector(config)
+    per_form = [a for form in forms for a in detector.analyze_e14(form)]
+    clusters = detector._detect_geographic_clusters(forms, per_form)
+    assert _comparable(anomalies) == _comparable(per_form + clusters)
+    assert stats['anomalies_found'] == len(anomalies)
+    assert stats['by_type']['GEOGRAPHIC_CLUSTER'] == 2
+    assert AnomalyDetector(config).analyze_columns([]) == []
+
+
+def test_forms_the_arrays_cannot_hold_go_through_analyze_e14():
+    rng = random.Random(5)
+    forms = [_form(rng, i) for i in range(20)]
+    forms[4]['ocr_fields'] = [{'field_key': 7, 'value_int': 1500, 'confidence': 0.9}]
+    forms[6]['validations'] = [{'rule_key': None, 'passed': True}]
+    columns = AnomalyDetector(AgentConfig()).build_columns(forms)
+    assert columns.irregular_forms == [4, 6]
+
+    forms[8]['ocr_fields'] = [{'field_key': 'TOTAL_VOTOS', 'value_int': 3, 'confidence': None}]
+    with pytest.raises(TypeError):
+        AnomalyDetector(AgentConfig()).analyze_e14(forms[8])
+    with pytest.raises(TypeError):
+        AnomalyDetector(AgentConfig()).analyze_columns(forms)
@@ -0,0 +1,146 @@
+"""
+Tests for batch E-14 processing (keyset batches, bulk incidents, one mark per batch).
+"""
+import asyncio
+import sqlite3
+
+import pytest
+
+from services import incident_store
+from services.agent import agent_store
+from services.agent.config import AgentConfig
+from services.agent.e14_data_service import E14DataService
+from services.agent.electoral_intelligence_agent import ElectoralIntelligenceAgent
+from services.agent.state import AgentStatus
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "castor.db")
+    monkeypatch.setattr(agent_store, "DB_PATH", path)
+    monkeypatch.setattr(incident_store, "DB_PATH", path)
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE e14_scraper_forms (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            mesa_id TEXT UNIQUE NOT NULL,
+            filename TEXT NOT NULL,
+            corporacion TEXT NOT NULL,
+            departamento TEXT NOT NULL,
+            municipio TEXT NOT NULL,
+            zona_cod TEXT,
+            puesto_cod TEXT,
+            mesa_num TEXT,
+            ocr_processed INTEGER DEFAULT 0,
+            ocr_confidence REAL DEFAULT 0,
+            total_votos INTEGER DEFAULT 0,
+            votos_blancos INTEGER DEFAULT 0,
+            votos_nulos INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE TABLE e14_scraper_votes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            form_id INTEGER,
+            party_name TEXT NOT NULL,
+            party_code TEXT,
+            votes INTEGER DEFAULT 0,
+            confidence REAL DEFAULT 0,
+            needs_review INTEGER DEFAULT 0
+        );
+    """)
+    for form_id in range(1, 13):
+        conn.execute(
+            "INSERT INTO e14_scraper_forms (id, mesa_id, filename, corporacion, departamento, municipio, "
+            "ocr_processed, ocr_confidence, total_votos) VALUES (?, ?, ?, 'SEN', 'ANTIOQUIA', 'MEDELLIN', 1, 0.9, 10)",
+            (form_id, f"SEN-ANTIOQUIA-MEDELLIN-01-001-{form_id}", f"{form_id}.pdf"),
+        )
+    conn.commit()
+    conn.close()
+    return path
+
+
+def _incident_rows(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT incident_type, mesa_id FROM incidents ORDER BY id").fetchall()
+    conn.close()
+    return rows
+
+
+def _form(form_id, delta=0):
+    validations = []
+    if delta:
+        validations.append({
+            'rule_key': 'ARITHMETIC_SUM',
+            'passed': False,
+            'details': {'expected': 100, 'actual': 100 - delta},
+        })
+    return {
+        'id': form_id,
+        'document_header_extracted': {'mesa_id': f"05-001-01-01-{form_id:03d}"},
+        'ocr_fields': [],
+        'validations': validations,
+    }
+
+
+def test_unprocessed_forms_keyset_and_backlog(db_path):
+    service = E14DataService(db_path=db_path)
+    agent_store.mark_batch_processed([2, 3], {2: 1})
+
+    assert service.count_unprocessed_forms() == 10
+    first = service.get_unprocessed_forms(limit=4)
+    assert [f['id'] for f in first] == [1, 4, 5, 6]
+    rest = service.get_unprocessed_forms(limit=100, after_id=first[-1]['id'])
+    assert [f['id'] for f in rest] == list(range(7, 13))
+
+    conn = sqlite3.connect(db_path)
+    counts = dict(conn.execute("SELECT form_id, incidents_created FROM agent_e14_processed").fetchall())
+    conn.close()
+    assert counts == {2: 1, 3: 0}
+
+
+def test_bulk_incidents_dedupe_against_store_and_batch(db_path):
+    existing = incident_store.create_incident(
+        {'incident_type': 'ARITHMETIC_FAIL', 'mesa_id': 'm-1', 'description': 'delta 5'}
+    )
+    items = [
+        {'incident_type': 'ARITHMETIC_FAIL', 'mesa_id': 'm-1', 'description': 'delta 5'},
+        {'incident_type': 'OCR_LOW_CONF', 'mesa_id': 'm-2', 'description': 'ocr'},
+        {'incident_type': 'OCR_LOW_CONF', 'mesa_id': 'm-2', 'description': 'ocr'},
+        {'incident_type': 'OCR_LOW_CONF', 'mesa_id': 'm-3', 'description': 'ocr'},
+    ]
+
+    results = incident_store.create_incidents_bulk(items)
+
+    assert results[0]['id'] == existing['id']
+    assert results[1]['id'] == results[2]['id']
+    assert len({r['id'] for r in results}) == 3
+    assert _incident_rows(db_path) == [
+        ('ARITHMETIC_FAIL', 'm-1'), ('OCR_LOW_CONF', 'm-2'), ('OCR_LOW_CONF', 'm-3'),
+    ]
+
+
+def test_process_batch_creates_incidents_in_bulk(db_path):
+    config = AgentConfig()
+    config.ACTION_CONCURRENCY = 2
+    agent = ElectoralIntelligenceAgent(config=config)
+    agent.state.set_status(AgentStatus.RUNNING)
+    forms = [_form(i, delta=5 if i % 2 else 0) for i in range(1, 7)]
+
+    incidents_created = asyncio.run(agent.process_e14_batch(forms))
+
+    assert incidents_created == {1: 1, 2: 0, 3: 1, 4: 0, 5: 1, 6: 0}
+    assert [mesa for _, mesa in _incident_rows(db_path)] == [
+        "05-001-01-01-001", "05-001-01-01-003", "05-001-01-01-005",
+    ]
+    actions = agent.get_recent_actions()
+    assert [a['action_type'] for a in actions] == ['create_incident', 'classify_cpaca'] * 3
+    assert all(a['result'] == 'success' for a in actions)
+    metrics = agent.state.get_metrics()
+    assert metrics.incidents_auto_created == 3
+    assert metrics.actions_total == 6
+
+
+def test_batch_skipped_when_agent_not_running(db_path):
+    agent = ElectoralIntelligenceAgent(config=AgentConfig())
+    assert asyncio.run(agent.process_e14_batch([_form(1, delta=5)])) is None
+    assert agent.state.get_recent_actions() == []
@@ -0,0 +1,132 @@
+"""
+Tests for the compiled rule table of the DecisionEngine (per-event
+evaluation, column-wise evaluate_many, rules-file hot reload).
+"""
+import json
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from services.agent.config import AgentAction, AgentConfig, RuleConfig
+from services.agent.decision_engine import DecisionEngine
+from services.agent.rule_compiler import RuleColumns, RuleCompileError, compile_condition
+
+
+def _form(i):
+    validations = []
+    if i % 3 == 0:
+        validations.append({
+            'rule_key': 'ARITHMETIC_SUM',
+            'passed': False,
+            'details': {'expected': 100, 'actual': 100 - i % 7},
+        })
+    ocr_fields = [
+        {'field_key': f'party_{k}', 'confidence': ((i * 7 + k * 13) % 100) / 100}
+        for k in range(i % 4)
+    ]
+    return {
+        'document_header_extracted': {'dept_code': '05', 'muni_code': '001', 'table_number': i},
+        'ocr_fields': ocr_fields,
+        'validations': validations,
+        'normalized_tallies': [{'party_total': i}],
+    }
+
+
+def _summary(decisions):
+    return [(d.rule_name, d.action, d.priority, d.hitl_required, d.context, d.rationale) for d in decisions]
+
+
+def test_evaluate_many_matches_per_form_evaluation():
+    engine = DecisionEngine(AgentConfig())
+    forms = [_form(i) for i in range(200)]
+
+    batch = engine.evaluate_many(forms)
+
+    assert [_summary(d) for d in batch] == [_summary(engine.evaluate_e14_form(f)) for f in forms]
+    fired = {d.rule_name for decisions in batch for d in decisions}
+    assert fired == {'auto_incident_arithmetic', 'auto_incident_low_ocr', 'auto_classify_cpaca'}
+    assert engine.evaluate_many([]) == []
+
+
+def test_incident_and_deadline_rules():
+    engine = DecisionEngine(AgentConfig())
+    now = datetime.utcnow()
+    incident = {
+        'id': 7,
+        'severity': 'P0',
+        'status': 'OPEN',
+        'created_at': (now - timedelta(minutes=120)).isoformat(),
+        'sla_deadline': (now + timedelta(minutes=5)).isoformat(),
+        'escalated_to_legal': False,
+    }
+
+    assert [d.rule_name for d in engine.evaluate_incident(incident)] == ['sla_warning_p0', 'escalate_to_legal']
+    assert engine.evaluate_incident({**incident, 'status': 'RESOLVED'}) == []
+    legal = engine.evaluate_incident({**incident, 'escalated_to_legal': True, 'delta_value': 900})
+    assert [(d.rule_name, d.action) for d in legal] == [
+        ('sla_warning_p0', AgentAction.DISPATCH_SLA_ALERT),
+        ('nullity_recommendation', AgentAction.RECOMMEND_NULLITY),
+    ]
+
+    recount = engine.evaluate_deadline({
+        'deadline_type': 'RECOUNT', 'deadline': (now + timedelta(days=1, hours=1)).isoformat(),
+    })
+    assert [(d.rule_name, d.rationale) for d in recount] == [('recount_deadline', 'Recount deadline in 1 days')]
+
+
+def test_rules_file_hot_reload(tmp_path):
+    rules_file = tmp_path / "rules.json"
+    rules_file.write_text(json.dumps([{
+        'name': 'auto_incident_low_ocr', 'condition': 'ocr_confidence < 0.7',
+        'action': 'create_incident', 'enabled': False,
+    }]))
+    config = AgentConfig()
+    config.RULES_FILE = str(rules_file)
+    config.RULES_RELOAD_INTERVAL = 0
+    engine = DecisionEngine(config)
+    low_ocr_form = {'ocr_fields': [{'field_key': 'a', 'confidence': 0.2}], 'validations': []}
+
+    assert engine.evaluate_e14_form(low_ocr_form) == []
+
+    rules_file.write_text(json.dumps([
+        {'name': 'auto_incident_low_ocr', 'condition': 'ocr_confidence < 0.5',
+         'action': 'create_incident', 'priority': 'P1'},
+        {'name': 'broken', 'condition': 'ocr_confidence <', 'action': 'create_incident'},
+    ]))
+    stat = os.stat(rules_file)
+    os.utime(rules_file, (stat.st_atime, stat.st_mtime + 10))
+
+    decisions = engine.evaluate_e14_form(low_ocr_form)
+    assert [d.rule_name for d in decisions] == ['auto_incident_low_ocr', 'auto_classify_cpaca']
+    assert 'broken' not in {r.rule.name for rules in engine._table.values() for r in rules}
+
+    engine.reload_rules([RuleConfig(name='custom', condition='ocr_confidence < 0.3',
+                                    action=AgentAction.CREATE_INCIDENT, priority='P1')])
+    custom = engine.evaluate_many([low_ocr_form])[0]
+    assert [(d.rule_name, d.rationale) for d in custom] == [('custom', 'ocr_confidence < 0.3')]
+
+
+def test_condition_semantics_for_contexts_and_columns():
+    condition = compile_condition(
+        "(severity == P0 OR score >= LIMIT) AND NOT closed AND info.kind != 'x'",
+        constants=type('Constants', (), {'LIMIT': 5})
+    )
+    contexts = [
+        {'severity': 'P0', 'score': None, 'closed': False, 'info': {'kind': 'y'}},
+        {'severity': 'P1', 'score': 5, 'closed': False},
+        {'severity': 'P1', 'score': None, 'closed': False},
+        {'severity': 'P0', 'score': 9, 'closed': True},
+        {'severity': 'P1', 'score': 6.5, 'closed': False, 'info': {'kind': 'x'}},
+    ]
+    expected = [True, True, False, False, False]
+
+    assert [condition.test(c) for c in contexts] == expected
+    columns = RuleColumns(len(contexts), {
+        name: [c.get(name) for c in contexts] for name in ('severity', 'score', 'closed', 'info')
+    })
+    assert condition.test_columns(columns).tolist() == expected
+
+    for text in ("", "a ==", "(a == 1", "a == 1 b", "a $ 1"):
+        with pytest.raises(RuleCompileError):
+            compile_condition(text)
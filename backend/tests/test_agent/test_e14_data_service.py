@@ -0,0 +1,97 @@
+"""
+Tests for E14DataService batch loading (one votes query per page, keyset iteration).
+"""
+import sqlite3
+
+import pytest
+
+from services.agent.e14_data_service import E14DataService
+
+
+@pytest.fixture
+def service(tmp_path):
+    db_path = str(tmp_path / "scraper.db")
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE TABLE e14_scraper_forms (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            mesa_id TEXT UNIQUE NOT NULL,
+            filename TEXT NOT NULL,
+            corporacion TEXT NOT NULL,
+            departamento TEXT NOT NULL,
+            municipio TEXT NOT NULL,
+            zona_cod TEXT,
+            puesto_cod TEXT,
+            mesa_num TEXT,
+            ocr_processed INTEGER DEFAULT 0,
+            ocr_confidence REAL DEFAULT 0,
+            total_votos INTEGER DEFAULT 0,
+            votos_blancos INTEGER DEFAULT 0,
+            votos_nulos INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE TABLE e14_scraper_votes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            form_id INTEGER,
+            party_name TEXT NOT NULL,
+            party_code TEXT,
+            votes INTEGER DEFAULT 0,
+            confidence REAL DEFAULT 0,
+            needs_review INTEGER DEFAULT 0
+        );
+    """)
+    for form_id in range(1, 26):
+        conn.execute(
+            "INSERT INTO e14_scraper_forms (id, mesa_id, filename, corporacion, departamento, municipio, "
+            "ocr_processed, ocr_confidence, total_votos) VALUES (?, ?, ?, 'SEN', 'ANTIOQUIA', 'MEDELLIN', ?, 0.9, ?)",
+            (form_id, f"SEN-ANTIOQUIA-MEDELLIN-01-001-{form_id}", f"{form_id}.pdf",
+             0 if form_id % 5 == 0 else 1, form_id * 3),
+        )
+        conn.executemany(
+            "INSERT INTO e14_scraper_votes (form_id, party_name, party_code, votes, confidence) "
+            "VALUES (?, ?, ?, ?, 0.9)",
+            [(form_id, f"PARTIDO {i}", f"{i:04d}", form_id) for i in range(3)],
+        )
+    conn.commit()
+    conn.close()
+
+    svc = E14DataService(db_path=db_path)
+    svc.statements = []
+    original = svc._get_connection
+
+    def traced_connection():
+        conn = original()
+        conn.set_trace_callback(svc.statements.append)
+        return conn
+
+    svc._get_connection = traced_connection
+    return svc
+
+
+def test_votes_loaded_with_one_query_per_page(service):
+    forms = service.get_forms_batch(limit=10)
+
+    votes_queries = [s for s in service.statements if "e14_scraper_votes" in s]
+    assert len(votes_queries) == 1
+    assert len(forms) == 10
+    for form in forms:
+        party_fields = [f for f in form['ocr_fields'] if f['field_key'].startswith('CANDIDATE_VOTES_')]
+        assert [f['value_int'] for f in party_fields] == [form['id']] * 3
+        assert form['validations'][0]['passed'] is True
+
+
+def test_iterate_all_forms_uses_keyset_pages(service):
+    batches = list(service.iterate_all_forms(batch_size=7))
+
+    ids = [form['id'] for batch in batches for form in batch]
+    assert ids == [i for i in range(1, 26) if i % 5 != 0]
+    assert [len(b) for b in batches] == [7, 7, 6]
+    assert not any("OFFSET" in s for s in service.statements)
+
+
+def test_form_with_votes_and_unknown_id(service):
+    form = service.get_form_with_votes(3)
+
+    assert form['id'] == 3
+    assert len(form['ocr_fields']) == 6
+    assert service.get_form_with_votes(999) is None
@@ -0,0 +1,110 @@
+"""
+Tests for the incremental PatternRecognizer (windowed buffers, dirty-key detectors).
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from services.agent.analyzers.pattern_recognizer import PatternRecognizer, PatternType
+from services.agent.analyzers.pattern_windows import TimeWindow, to_epoch
+from services.agent.config import AgentConfig
+
+
+@pytest.fixture
+def recognizer():
+    config = AgentConfig()
+    config.GEOGRAPHIC_CLUSTER_THRESHOLD = 5
+    return PatternRecognizer(config)
+
+
+def _anomaly(i, at, muni='05001', atype='ARITHMETIC', delta=None):
+    return {
+        'mesa_id': f"mesa-{i}",
+        'muni_code': muni,
+        'type': atype,
+        'delta': delta,
+        'detected_at': at.isoformat(),
+    }
+
+
+def _types(patterns):
+    return [p.pattern_type for p in patterns]
+
+
+def test_geographic_cluster_fires_once_at_threshold(recognizer):
+    now = datetime.utcnow()
+    found = []
+    for i in range(8):
+        found.append(_types(recognizer.add_anomaly(_anomaly(i, now, atype=f"T{i}"))))
+
+    assert all(PatternType.GEOGRAPHIC_CLUSTER not in f for f in found[:4])
+    assert PatternType.GEOGRAPHIC_CLUSTER in found[4]
+    assert all(PatternType.GEOGRAPHIC_CLUSTER not in f for f in found[5:])
+
+
+def test_temporal_spike_against_hourly_average(recognizer):
+    now = datetime.utcnow().replace(minute=30)
+    batch = [_anomaly(i, now - timedelta(hours=h), muni=f"M{i}-{h}", atype=f"T{i}-{h}")
+             for h in (1, 2, 3) for i in range(2)]
+    batch += [_anomaly(100 + i, now, muni=f"S{i}", atype=f"S{i}") for i in range(30)]
+
+    patterns = recognizer.analyze_batch(batch, [])
+    spikes = [p for p in patterns if p.pattern_type == PatternType.TEMPORAL_SPIKE]
+    assert len(spikes) == 1
+    assert spikes[0].time_window[0].hour == now.hour
+
+
+def test_systematic_error_needs_similar_deltas(recognizer):
+    now = datetime.utcnow()
+    dissimilar = [_anomaly(i, now, muni=f"A{i}", atype='SUM_MISMATCH', delta=10 ** (i % 4)) for i in range(12)]
+    assert PatternType.SYSTEMATIC_ERROR not in _types(recognizer.analyze_batch(dissimilar, []))
+
+    similar = [_anomaly(i, now, muni=f"B{i}", atype='OVERVOTE', delta=100 + i) for i in range(10)]
+    patterns = recognizer.analyze_batch(similar, [])
+    systematic = [p for p in patterns if p.pattern_type == PatternType.SYSTEMATIC_ERROR]
+    assert len(systematic) == 1
+    assert "OVERVOTE" in systematic[0].description
+
+
+def test_coordination_waits_for_buffer_size(recognizer):
+    at = datetime.utcnow().replace(minute=10, second=0, microsecond=0)
+    coordinated = [_anomaly(i, at + timedelta(seconds=i), muni=f"C{i}", atype=f"C{i}") for i in range(6)]
+    assert PatternType.COORDINATION_SIGNAL not in _types(recognizer.analyze_batch(coordinated, []))
+
+    # Window stays pending until the buffer holds 20 anomalies
+    filler = [_anomaly(100 + i, at - timedelta(hours=2, minutes=7 * i), muni='F', atype=f"F{i}")
+              for i in range(14)]
+    patterns = recognizer.analyze_batch(filler, [])
+    coordination = [p for p in patterns if p.pattern_type == PatternType.COORDINATION_SIGNAL]
+    assert len(coordination) == 1
+    assert sorted(coordination[0].affected_areas) == [f"C{i}" for i in range(6)]
+
+
+def test_old_anomalies_expire_from_counters(recognizer):
+    now = datetime.utcnow()
+    old = [_anomaly(i, now - timedelta(hours=7), atype=f"O{i}") for i in range(4)]
+    recognizer.analyze_batch(old, [])
+    assert recognizer.get_stats()['buffer_sizes']['anomalies'] == 0
+
+    # The expired anomalies do not count toward the cluster
+    patterns = recognizer.add_anomaly(_anomaly(99, now))
+    assert PatternType.GEOGRAPHIC_CLUSTER not in _types(patterns)
+
+
+def test_time_window_expiry_and_size_cap():
+    window = TimeWindow(max_age_seconds=3600, max_size=3)
+    base = datetime(2026, 3, 8, 12, 0, 0)
+    entries = [window.add({'i': i}, base + timedelta(minutes=20 * i)) for i in range(4)]
+
+    removed = window.expire(to_epoch(base + timedelta(minutes=30)) + 3600)
+    # size cap drops the first arrival, age drops the one at 12:20 (cutoff 12:30)
+    assert {e.data['i'] for e in removed} == {0, 1}
+    assert len(window) == 2
+    assert all(e.alive for e in entries[2:])
+
+    # Entries without a timestamp only leave through the size cap
+    window.add({'i': 'no-ts'}, None)
+    window.add({'i': 'no-ts-2'}, None)
+    removed = window.expire(to_epoch(base + timedelta(days=1)))
+    assert {e.data['i'] for e in removed} == {2, 3}
+    assert len(window) == 2
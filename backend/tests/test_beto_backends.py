@@ -0,0 +1,50 @@
+"""
+Parity of the BETO CPU backends (int8, onnx) with fp32 on a tiny BERT.
+"""
+from unittest.mock import patch
+
+import pytest
+
+from services import beto_backends, model_singleton
+
+TEXTS = ["hola todo bien", "muy mal", "no es bien de la mal", "el la de que y en un es", ""]
+
+
+@pytest.fixture
+def tiny_beto(tmp_path):
+    transformers = pytest.importorskip("transformers")
+    words = "[PAD] [UNK] [CLS] [SEP] [MASK] hola todo bien muy mal el la de que y en un es no".split()
+    model_dir = tmp_path / "model"
+    model_dir.mkdir()
+    (model_dir / "vocab.txt").write_text("\n".join(words))
+    transformers.BertTokenizer(str(model_dir / "vocab.txt")).save_pretrained(str(model_dir))
+    config = transformers.BertConfig(vocab_size=len(words), hidden_size=32, num_hidden_layers=2,
+                                     num_attention_heads=2, intermediate_size=64, num_labels=3)
+    transformers.BertForSequenceClassification(config).save_pretrained(str(model_dir))
+
+    with patch.object(model_singleton.Config, "BETO_MODEL_PATH", str(model_dir)), \
+            patch.object(beto_backends.Config, "BETO_ONNX_DIR", str(tmp_path / "onnx")):
+        yield
+    model_singleton._model_cache.clear()
+
+
+def test_int8_matches_fp32(tiny_beto):
+    report = beto_backends.compare_backends(TEXTS, ("int8",))
+
+    assert report["int8"]["max_abs_diff"] < 0.05
+    assert report["int8"]["label_agreement"] >= 0.8
+
+
+def test_onnx_matches_fp32(tiny_beto):
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("onnx")
+
+    report = beto_backends.compare_backends(TEXTS, ("onnx",))
+
+    assert report["onnx"]["max_abs_diff"] < 1e-4
+    assert report["onnx"]["label_agreement"] == 1.0
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError, match="Unknown BETO backend"):
+        beto_backends.load_backend("fp16", "unused")
@@ -0,0 +1,93 @@
+"""
+Tests for the shared BETO inference sidecar (server, client, fallback and
+supervisor).
+"""
+import sys
+import threading
+import time
+
+import pytest
+
+from services.beto_sidecar import BetoSidecarClient, BetoSidecarServer, SidecarSupervisor, SidecarUnavailable
+
+
+def fake_predict(texts):
+    return [[0.1, 0.2, 0.7] if "bien" in text else [0.6, 0.3, 0.1] for text in texts]
+
+
+@pytest.fixture
+def sidecar(tmp_path):
+    loaded = threading.Event()
+    server = BetoSidecarServer(
+        address=str(tmp_path / "beto.sock"),
+        authkey="secret",
+        predict=fake_predict,
+        load_model=loaded.wait,
+    )
+    server.bind()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.loaded = loaded
+    yield server
+    server.close()
+
+
+def test_predict_waits_for_model_load(sidecar):
+    client = BetoSidecarClient(address=sidecar.address, authkey="secret", timeout=5)
+
+    assert client.ping()['ready'] is False
+    sidecar.loaded.set()
+
+    assert client.predict(["todo bien", "muy mal"]) == [[0.1, 0.2, 0.7], [0.6, 0.3, 0.1]]
+    assert client.ping()['ready'] is True
+    client.close()
+
+
+def test_wrong_authkey_is_rejected(sidecar):
+    client = BetoSidecarClient(address=sidecar.address, authkey="other", timeout=1)
+
+    assert client.available() is False
+
+
+def test_unavailable_sidecar_is_not_retried_until_backoff(tmp_path):
+    client = BetoSidecarClient(address=str(tmp_path / "missing.sock"), authkey="secret", retry_seconds=60)
+
+    with pytest.raises(SidecarUnavailable):
+        client.predict(["hola"])
+    with pytest.raises(SidecarUnavailable, match="marked down"):
+        client.predict(["hola"])
+
+
+def test_server_reports_load_errors(tmp_path):
+    def failing_load():
+        raise RuntimeError("no weights")
+
+    server = BetoSidecarServer(address=str(tmp_path / "beto.sock"), authkey="secret",
+                               predict=fake_predict, load_model=failing_load)
+    server.bind()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = BetoSidecarClient(address=server.address, authkey="secret", timeout=5)
+
+    with pytest.raises(SidecarUnavailable, match="no weights"):
+        client.predict(["hola"])
+    server.close()
+
+
+def test_supervisor_respawns_exited_sidecar():
+    supervisor = SidecarSupervisor(
+        command=[sys.executable, "-c", "import time; time.sleep(30)"], poll_interval=0.05, max_backoff=0.2
+    )
+    first = supervisor.start()
+
+    first.kill()
+    deadline = time.monotonic() + 10
+    while supervisor.restarts == 0 and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    second = supervisor.process
+    assert supervisor.restarts >= 1
+    assert second.pid != first.pid and second.poll() is None
+    supervisor.stop(timeout=5)
+    assert second.poll() is not None
+    time.sleep(0.3)
+    assert supervisor.process is second
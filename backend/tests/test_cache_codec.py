@@ -0,0 +1,48 @@
+"""
+Tests for the cached payload codec.
+"""
+import json
+
+import pytest
+
+from utils import codec
+
+
+def test_roundtrip_keeps_header_and_value():
+    value = {"party": "Partido Liberal", "votes": [120, 98], "ok": True, "score": 0.5}
+    payload = codec.encode(value)
+
+    assert payload[0] == codec.MAGIC
+    assert payload[1] == codec.FORMAT_VERSION
+    assert codec.decode(payload) == value
+
+
+def test_legacy_json_entries_still_decode():
+    value = {"cached": "data", "n": 3}
+    assert codec.decode(json.dumps(value)) == value
+    assert codec.decode(json.dumps(value).encode("utf-8")) == value
+    assert codec.decode(None) is None
+
+
+def test_large_payloads_compress_when_a_compressor_is_installed(monkeypatch):
+    monkeypatch.setattr(codec.Config, "CACHE_COMPRESS_MIN_BYTES", 256)
+    value = {"forms": [{"mesa": i, "departamento": "ANTIOQUIA"} for i in range(500)]}
+    payload = codec.encode(value)
+
+    assert codec.decode(payload) == value
+    if codec.codec_name().endswith("+none"):
+        assert payload[3] == ord("n")
+    else:
+        assert payload[3] != ord("n")
+        assert len(payload) < len(json.dumps(value))
+
+
+def test_small_payloads_are_not_compressed():
+    assert codec.encode({"a": 1})[3] == ord("n")
+
+
+def test_unknown_header_raises_codec_error():
+    with pytest.raises(codec.CodecError):
+        codec.decode(bytes((codec.MAGIC, 99, ord("j"), ord("n"))) + b"{}")
+    with pytest.raises(codec.CodecError):
+        codec.decode(bytes((codec.MAGIC, codec.FORMAT_VERSION, ord("x"), ord("n"))) + b"{}")
@@ -78,3 +78,135 @@ def test_cached_decorator():
     assert result3 == 5
     assert call_count[0] == 2
 
+
+def test_cached_single_flight_in_process():
+    """Concurrent misses on one key compute once."""
+    import threading
+    import time
+
+    init_cache()
+    call_count = [0]
+    release = threading.Event()
+
+    @cached("test_single_flight", ttl=60)
+    def slow_function(x):
+        call_count[0] += 1
+        release.wait(2)
+        return x * 2
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(slow_function(21))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == [42] * 8
+    assert call_count[0] == 1
+
+
+def test_cached_serves_stale_while_revalidating():
+    """A stale entry is returned immediately and refreshed in the background."""
+    import time
+
+    init_cache()
+    calls = [0]
+
+    @cached("test_stale", ttl=1, stale_ttl_seconds=30, jitter=0)
+    def counter():
+        calls[0] += 1
+        return calls[0]
+
+    assert counter() == 1
+    time.sleep(1.1)
+    assert counter() == 1  # stale value, refresh scheduled
+
+    deadline = time.time() + 2
+    while calls[0] < 2 and time.time() < deadline:
+        time.sleep(0.05)
+    time.sleep(0.05)
+    assert counter() == 2
+
+
+def test_cached_jitter_shortens_ttl():
+    """Jittered TTLs stay within [ttl * (1 - jitter), ttl]."""
+    from utils.cache import _jittered
+
+    ttls = [_jittered(100, 0.2) for _ in range(200)]
+    assert all(80 <= ttl <= 100 for ttl in ttls)
+    assert len({round(ttl, 3) for ttl in ttls}) > 1
+
+
+def test_invalidate_prefix_in_memory():
+    """Prefix invalidation also clears the in-memory fallback."""
+    from utils.cache import invalidate_prefix
+
+    init_cache()
+    set(get_cache_key("inv_a", 1), {"v": 1}, ttl=60)
+    set(get_cache_key("inv_a", 2), {"v": 2}, ttl=60)
+    set(get_cache_key("inv_b", 1), {"v": 3}, ttl=60)
+
+    assert invalidate_prefix("inv_a") == 2
+    assert get(get_cache_key("inv_a", 1)) is None
+    assert get(get_cache_key("inv_b", 1)) == {"v": 3}
+
+
+def test_invalidate_uses_tag_set_for_prefix_patterns():
+    """Whole-prefix patterns delete tag members; other patterns SCAN."""
+    from utils import cache
+
+    client = Mock()
+    client.exists.return_value = True
+    client.sscan_iter.return_value = iter(["castor:inv:1", "castor:inv:2"])
+    client.scan_iter.return_value = iter(["castor:inv:x1"])
+    client.unlink.side_effect = lambda *keys: len(keys)
+
+    with patch.object(cache, "redis_client", client):
+        assert cache.invalidate("castor:inv:*") == 2
+        client.keys.assert_not_called()
+        client.rename.assert_called_once()
+        assert client.rename.call_args[0][0] == "castor:tags:inv"
+
+        assert cache.invalidate("castor:inv:x*") == 1
+        client.scan_iter.assert_called_once()
+
+
+def test_twitter_search_single_flight():
+    """Concurrent identical Twitter searches make one API call and share it."""
+    import threading
+    import time
+    import uuid
+    from services.twitter_service import TwitterService
+
+    init_cache()
+    service = TwitterService.__new__(TwitterService)
+    calls = []
+    release = threading.Event()
+
+    def search_impl(query, location, max_results, lang, days_back):
+        calls.append(query)
+        release.wait(2)
+        return [{"tweet_id": "1", "content": query}]
+
+    service._search_tweets_impl = search_impl
+    query = f"seguridad {uuid.uuid4().hex}"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(service.search_tweets(query, location="Bogotá")))
+        for _ in range(6)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == [[{"tweet_id": "1", "content": query}]] * 6
+    assert service.search_tweets(query, location="Bogotá") == results[0]
+    assert len(calls) == 1
+    service.search_tweets(query, location="Medellín")
+    assert len(calls) == 2
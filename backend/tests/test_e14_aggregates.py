@@ -0,0 +1,148 @@
+"""
+Tests for the trigger-maintained E-14 aggregate tables.
+Random inserts, corrections and deletes must leave the aggregates equal
+to a fresh GROUP BY over the base tables.
+"""
+import random
+import sqlite3
+
+import pytest
+
+from services.e14_aggregates import aggregates_available, check_consistency, init_aggregates, rebuild
+
+SCHEMA = """
+    CREATE TABLE e14_scraper_forms (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        mesa_id TEXT UNIQUE NOT NULL,
+        corporacion TEXT NOT NULL,
+        departamento TEXT NOT NULL,
+        municipio TEXT NOT NULL,
+        ocr_processed INTEGER DEFAULT 0,
+        ocr_confidence REAL DEFAULT 0,
+        total_votos INTEGER DEFAULT 0,
+        votos_blancos INTEGER DEFAULT 0,
+        votos_nulos INTEGER DEFAULT 0
+    );
+    CREATE TABLE e14_scraper_votes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        form_id INTEGER REFERENCES e14_scraper_forms(id) ON DELETE CASCADE,
+        party_name TEXT NOT NULL,
+        party_code TEXT,
+        votes INTEGER DEFAULT 0,
+        confidence REAL DEFAULT 0,
+        needs_review INTEGER DEFAULT 0
+    );
+    CREATE INDEX idx_scraper_votes_form ON e14_scraper_votes(form_id);
+"""
+
+CORPS = ["SEN", "CAM"]
+DEPTS = ["ANTIOQUIA", "BOGOTA", "VALLE"]
+MUNIS = ["A", "B"]
+PARTIES = ["LIBERAL", "CONSERVADOR", "VERDE", "PACTO"]
+
+
+@pytest.fixture(params=[False, True], ids=["no_fk", "fk_cascade"])
+def conn(request):
+    connection = sqlite3.connect(":memory:")
+    if request.param:
+        connection.execute("PRAGMA foreign_keys = ON")
+    connection.executescript(SCHEMA)
+    yield connection
+    connection.close()
+
+
+def _insert_form(conn, rng, n):
+    cur = conn.execute(
+        "INSERT INTO e14_scraper_forms (mesa_id, corporacion, departamento, municipio, ocr_processed, "
+        "ocr_confidence, total_votos, votos_blancos, votos_nulos) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (f"m{n}", rng.choice(CORPS), rng.choice(DEPTS), rng.choice(MUNIS), rng.choice([0, 1]),
+         rng.choice([None, rng.random()]), rng.randint(0, 300), rng.randint(0, 5), rng.randint(0, 5)),
+    )
+    return cur.lastrowid
+
+
+def _random_operations(conn, rng, steps):
+    form_ids = []
+    for n in range(steps):
+        op = rng.random()
+        vote_ids = [r[0] for r in conn.execute("SELECT id FROM e14_scraper_votes")]
+        if op < 0.25 or not form_ids:
+            form_ids.append(_insert_form(conn, rng, n))
+        elif op < 0.6:
+            conn.execute(
+                "INSERT INTO e14_scraper_votes (form_id, party_name, votes, confidence) VALUES (?, ?, ?, ?)",
+                (rng.choice(form_ids), rng.choice(PARTIES), rng.choice([None, rng.randint(0, 100)]),
+                 rng.choice([None, rng.random()])),
+            )
+        elif op < 0.7 and vote_ids:
+            conn.execute(
+                "UPDATE e14_scraper_votes SET votes = ?, party_name = ? WHERE id = ?",
+                (rng.randint(0, 100), rng.choice(PARTIES), rng.choice(vote_ids)),
+            )
+        elif op < 0.75 and vote_ids:
+            conn.execute("UPDATE e14_scraper_votes SET form_id = ? WHERE id = ?",
+                         (rng.choice(form_ids), rng.choice(vote_ids)))
+        elif op < 0.82 and vote_ids:
+            conn.execute("DELETE FROM e14_scraper_votes WHERE id = ?", (rng.choice(vote_ids),))
+        elif op < 0.9:
+            conn.execute(
+                "UPDATE e14_scraper_forms SET ocr_processed = 1, total_votos = ?, ocr_confidence = ? WHERE id = ?",
+                (rng.randint(0, 300), rng.random(), rng.choice(form_ids)),
+            )
+        elif op < 0.95:
+            conn.execute("UPDATE e14_scraper_forms SET departamento = ?, municipio = ? WHERE id = ?",
+                         (rng.choice(DEPTS), rng.choice(MUNIS), rng.choice(form_ids)))
+        else:
+            form_id = rng.choice(form_ids)
+            form_ids.remove(form_id)
+            conn.execute("DELETE FROM e14_scraper_forms WHERE id = ?", (form_id,))
+    conn.commit()
+
+
+def test_init_populates_existing_rows(conn):
+    _random_operations(conn, random.Random(1), 100)
+
+    assert init_aggregates(conn)
+
+    assert check_consistency(conn) == []
+    assert conn.execute("SELECT COUNT(*) FROM e14_agg_forms").fetchone()[0] > 0
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_triggers_keep_aggregates_consistent(conn, seed):
+    init_aggregates(conn)
+
+    _random_operations(conn, random.Random(seed), 400)
+
+    assert check_consistency(conn) == []
+
+
+def test_check_reports_drift_and_rebuild_repairs_it(conn):
+    init_aggregates(conn)
+    _random_operations(conn, random.Random(7), 100)
+    conn.execute("UPDATE e14_agg_party SET total_votes = total_votes + 1")
+    conn.execute("DELETE FROM e14_agg_forms WHERE rowid = (SELECT MIN(rowid) FROM e14_agg_forms)")
+
+    problems = check_consistency(conn)
+    assert {p["table"] for p in problems} == {"e14_agg_party", "e14_agg_forms"}
+
+    rebuild(conn)
+    assert check_consistency(conn) == []
+
+
+def test_missing_base_tables():
+    assert init_aggregates(sqlite3.connect(":memory:")) is False
+
+
+def test_availability_check_is_read_only(conn):
+    _random_operations(conn, random.Random(3), 50)
+
+    assert aggregates_available(conn) is False
+    assert conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE name LIKE 'e14_agg%'").fetchone()[0] == 0
+
+    init_aggregates(conn)
+    assert aggregates_available(conn) is True
+
+    # Tables without their triggers would drift, so they do not count as available
+    conn.execute("DROP TRIGGER trg_e14_agg_vote_update")
+    assert aggregates_available(conn) is False
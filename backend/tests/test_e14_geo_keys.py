@@ -0,0 +1,86 @@
+"""
+Tests for the normalized E-14 geography keys (dept_key/muni_key).
+"""
+import sqlite3
+
+import pytest
+
+from services.e14_geo_keys import geo_key, geo_key_sql, migrate_geo_keys
+
+SCHEMA = """
+    CREATE TABLE e14_scraper_forms (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        mesa_id TEXT UNIQUE NOT NULL,
+        corporacion TEXT NOT NULL,
+        departamento TEXT NOT NULL,
+        municipio TEXT NOT NULL,
+        puesto_cod TEXT,
+        mesa_num TEXT,
+        ocr_processed INTEGER DEFAULT 0
+    );
+"""
+
+NAMES = [" Bogotá D.C. ", "NARIÑO", "nariño", "Quindío", "san andrés", "CÚCUTA", "Güicán", "MEDELLIN"]
+
+
+@pytest.fixture
+def conn():
+    connection = sqlite3.connect(":memory:")
+    connection.executescript(SCHEMA)
+    yield connection
+    connection.close()
+
+
+def _insert(conn, mesa_id, departamento, municipio):
+    conn.execute(
+        "INSERT INTO e14_scraper_forms (mesa_id, corporacion, departamento, municipio, puesto_cod, mesa_num) "
+        "VALUES (?, 'SEN', ?, ?, '01', '1')",
+        (mesa_id, departamento, municipio),
+    )
+
+
+def test_geo_key_normalizes_case_accents_and_spaces():
+    assert geo_key(" Bogotá d.c. ") == "BOGOTA D.C."
+    assert geo_key("nariño") == geo_key("NARIÑO") == "NARINO"
+    assert geo_key(None) is None
+
+
+@pytest.mark.parametrize("name", NAMES)
+def test_sql_expression_matches_python(conn, name):
+    assert conn.execute(f"SELECT {geo_key_sql('?')}", (name,)).fetchone()[0] == geo_key(name)
+
+
+def test_migration_backfills_existing_rows(conn):
+    for i, name in enumerate(NAMES):
+        _insert(conn, f"m{i}", name, name)
+
+    assert migrate_geo_keys(conn) == len(NAMES)
+    assert migrate_geo_keys(conn) == 0
+
+    rows = conn.execute("SELECT departamento, dept_key, muni_key FROM e14_scraper_forms").fetchall()
+    assert all(dept_key == muni_key == geo_key(name) for name, dept_key, muni_key in rows)
+
+
+def test_triggers_fill_keys_for_other_writers(conn):
+    migrate_geo_keys(conn)
+
+    _insert(conn, "m1", "Nariño", "Pasto")
+    conn.execute("UPDATE e14_scraper_forms SET municipio = 'Túquerres' WHERE mesa_id = 'm1'")
+
+    assert conn.execute("SELECT dept_key, muni_key FROM e14_scraper_forms").fetchone() == ("NARINO", "TUQUERRES")
+
+
+def test_filters_use_geo_index(conn):
+    migrate_geo_keys(conn)
+
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM e14_scraper_forms "
+        "WHERE ocr_processed = 1 AND dept_key = ? AND muni_key = ?",
+        ("NARINO", "PASTO"),
+    ).fetchall()
+
+    assert "idx_scraper_forms_ocr_geo" in " ".join(row[-1] for row in plan)
+
+
+def test_missing_table():
+    assert migrate_geo_keys(sqlite3.connect(":memory:")) is None
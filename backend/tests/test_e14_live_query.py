@@ -0,0 +1,137 @@
+"""
+Tests for the single-pass E-14 live dashboard engine and its response cache.
+"""
+import random
+import sqlite3
+
+import pytest
+
+from services.e14_geo_keys import migrate_geo_keys
+from services.e14_live_query import LiveFilters, compute_live_data, get_live_data
+
+DEPTS = ["ANTIOQUIA", "BOGOTA", "NARIÑO", "VALLE"]
+MUNIS = ["A", "B", "C"]
+PARTIES = ["LIBERAL", "CONSERVADOR", "VERDE", "PACTO", "MIRA"]
+
+
+@pytest.fixture
+def db(tmp_path):
+    db_path = str(tmp_path / "scraper.db")
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE TABLE e14_scraper_forms (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            mesa_id TEXT UNIQUE NOT NULL,
+            filename TEXT NOT NULL,
+            corporacion TEXT NOT NULL,
+            departamento TEXT NOT NULL,
+            municipio TEXT NOT NULL,
+            zona_cod TEXT,
+            puesto_cod TEXT,
+            mesa_num TEXT,
+            ocr_processed INTEGER DEFAULT 0,
+            ocr_confidence REAL DEFAULT 0,
+            total_votos INTEGER DEFAULT 0,
+            votos_blancos INTEGER DEFAULT 0,
+            votos_nulos INTEGER DEFAULT 0,
+            ocr_at TIMESTAMP
+        );
+        CREATE TABLE e14_scraper_votes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            form_id INTEGER,
+            party_name TEXT NOT NULL,
+            party_code TEXT,
+            votes INTEGER DEFAULT 0,
+            confidence REAL DEFAULT 0,
+            needs_review INTEGER DEFAULT 0
+        );
+    """)
+    rng = random.Random(3)
+    for form_id in range(1, 301):
+        conn.execute(
+            "INSERT INTO e14_scraper_forms (id, mesa_id, filename, corporacion, departamento, municipio, "
+            "puesto_cod, mesa_num, ocr_processed, ocr_confidence, total_votos, votos_blancos, votos_nulos) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (form_id, f"m{form_id}", f"{form_id}.pdf", rng.choice(["SEN", "CAM"]), rng.choice(DEPTS),
+             rng.choice(MUNIS), f"{rng.randint(1, 3):02d}", str(rng.randint(1, 5)), rng.choice([0, 1, 1]),
+             rng.choice([None, rng.random()]), rng.randint(0, 300), rng.randint(0, 5), rng.randint(0, 5)),
+        )
+        conn.executemany(
+            "INSERT INTO e14_scraper_votes (form_id, party_name, votes, confidence) VALUES (?, ?, ?, ?)",
+            [(form_id, party, rng.randint(0, 100), rng.random()) for party in rng.sample(PARTIES, 3)],
+        )
+    conn.commit()
+    migrate_geo_keys(conn)
+    conn.close()
+    return db_path
+
+
+def _legacy(conn, filters):
+    """The four independent queries the endpoint used to run."""
+    where_sql, params = filters.where()
+    stats = conn.execute(
+        f"SELECT COUNT(*), SUM(total_votos), SUM(votos_blancos), SUM(votos_nulos), AVG(ocr_confidence) "
+        f"FROM e14_scraper_forms f WHERE {where_sql}", params).fetchone()
+    parties = conn.execute(
+        f"SELECT v.party_name, SUM(v.votes), COUNT(DISTINCT v.form_id) FROM e14_scraper_votes v "
+        f"JOIN e14_scraper_forms f ON f.id = v.form_id WHERE {where_sql} GROUP BY v.party_name", params).fetchall()
+    form_ids = [r[0] for r in conn.execute(
+        f"SELECT id FROM e14_scraper_forms f WHERE {where_sql} ORDER BY id DESC LIMIT ?",
+        params + [filters.limit])]
+    depts = conn.execute(
+        f"SELECT departamento, COUNT(*), SUM(total_votos) FROM e14_scraper_forms f WHERE {where_sql} "
+        f"GROUP BY departamento", params).fetchall()
+    return stats, parties, form_ids, depts
+
+
+@pytest.mark.parametrize("args", [
+    {},
+    {"departamento": "nariño"},
+    {"departamento": "Antioquia", "municipio": "a", "corporacion": "SEN"},
+    {"puesto": "02", "mesa": "3"},
+    {"risk": "HIGH", "limit": 5},
+    {"departamento": "NOWHERE"},
+])
+def test_matches_separate_queries(db, args):
+    filters = LiveFilters.from_args(**args)
+    conn = sqlite3.connect(db)
+
+    data = compute_live_data(conn, filters)
+    stats, parties, form_ids, depts = _legacy(conn, filters)
+
+    assert data['stats']['total_forms'] == stats[0]
+    assert data['stats']['total_votes'] == (stats[1] or 0)
+    assert data['stats']['total_blancos'] == (stats[2] or 0)
+    assert data['stats']['total_nulos'] == (stats[3] or 0)
+    assert data['stats']['avg_confidence'] == round(stats[4] or 0, 3)
+    assert sorted((p['party_name'], p['total_votes'], p['mesas_count']) for p in data['party_summary']) == \
+        sorted(tuple(row) for row in parties)
+    assert [f['id'] for f in data['forms']] == form_ids
+    assert sorted((d['departamento'], d['mesas'], d['votos']) for d in data['top_departamentos']) == \
+        sorted((row[0], row[1], row[2] or 0) for row in depts)
+    assert conn.execute("SELECT name FROM temp.sqlite_master").fetchall() == []
+
+
+def test_cache_hit_until_new_ocr_results(db):
+    filters = LiveFilters.from_args(departamento="Valle")
+    conn = sqlite3.connect(db)
+
+    first = get_live_data(conn, db, filters)
+    statements = []
+    conn.set_trace_callback(statements.append)
+    assert get_live_data(conn, db, filters) == first
+    assert not any("e14_live_forms" in s for s in statements)
+
+    pending = conn.execute(
+        "SELECT id FROM e14_scraper_forms WHERE ocr_processed = 0 AND dept_key = 'VALLE'").fetchone()[0]
+    conn.execute("UPDATE e14_scraper_forms SET ocr_processed = 1 WHERE id = ?", (pending,))
+    conn.commit()
+
+    refreshed = get_live_data(conn, db, filters)
+    assert refreshed['stats']['total_forms'] == first['stats']['total_forms'] + 1
+
+
+def test_filter_normalization():
+    assert LiveFilters.from_args(departamento=" Nariño", risk="Low", puesto="") == \
+        LiveFilters(dept_key="NARINO", risk="low")
+    assert LiveFilters.from_args(risk="unknown").risk is None
@@ -0,0 +1,68 @@
+"""
+Tests for the parallel E-14 page rasterizer (page order, worker failures,
+temp-file cleanup). Rendering is replaced by a fake so no poppler/PIL is
+needed, and the process pool by a thread pool with the same interface.
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from services import e14_page_rasterizer
+from services.e14_page_rasterizer import iter_pdf_pages, pdf_to_images
+
+
+@pytest.fixture
+def fake_pdf(monkeypatch):
+    """Five-page PDF whose later pages render faster, so they finish first."""
+    calls = []
+    state = {"fail_on": None, "pages": 5}
+
+    def render(pdf_path, pdf_data, page_number, dpi, encoder):
+        calls.append((pdf_path, page_number))
+        if pdf_path:
+            assert os.path.exists(pdf_path)
+        time.sleep(0.02 * (state["pages"] - page_number))
+        if page_number == state["fail_on"]:
+            raise RuntimeError(f"pdftoppm failed on page {page_number}")
+        return page_number, f"page-{page_number}-{encoder}", {"rasterize": 0.0}
+
+    pool = ThreadPoolExecutor(max_workers=4)
+    monkeypatch.setattr(e14_page_rasterizer, "count_pdf_pages", lambda data: state["pages"])
+    monkeypatch.setattr(e14_page_rasterizer, "_render_page", render)
+    monkeypatch.setattr(e14_page_rasterizer, "_get_pool", lambda workers: pool)
+    monkeypatch.setattr(e14_page_rasterizer, "_track_timings", lambda timings, encoder: None)
+    yield state, calls
+    pool.shutdown(wait=True)
+
+
+def test_pages_are_returned_in_page_order(fake_pdf):
+    state, calls = fake_pdf
+
+    streamed = list(iter_pdf_pages(b"%PDF", workers=4, encoder="fast"))
+    assert sorted(streamed) == [(i, f"page-{i + 1}-fast") for i in range(5)]
+    assert [index for index, _ in streamed] != sorted(index for index, _ in streamed)
+
+    assert pdf_to_images(b"%PDF", workers=4) == [f"page-{i}-lossless" for i in range(1, 6)]
+    assert pdf_to_images(b"%PDF", workers=1, max_pages=3) == [f"page-{i}-lossless" for i in range(1, 4)]
+
+    # Every worker read the same temp copy of the PDF, which is gone afterwards
+    paths = {path for path, _ in calls if path}
+    assert paths and not any(os.path.exists(path) for path in paths)
+    assert {path for path, _ in calls[-3:]} == {None}
+
+
+def test_worker_failure_propagates_and_cleans_up(fake_pdf):
+    state, calls = fake_pdf
+    state["fail_on"] = 2
+
+    with pytest.raises(RuntimeError, match="page 2"):
+        pdf_to_images(b"%PDF", workers=4)
+    assert not any(os.path.exists(path) for path, _ in calls if path)
+
+    with pytest.raises(RuntimeError, match="page 2"):
+        pdf_to_images(b"%PDF", workers=1)
+
+    with pytest.raises(ValueError):
+        pdf_to_images(b"%PDF", encoder="webp")
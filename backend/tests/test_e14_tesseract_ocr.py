@@ -0,0 +1,78 @@
+"""
+Tests for the Tesseract E-14 OCR page pool (page order, bounded concurrency)
+and the lookup-table binarization. Page rendering and tesseract are replaced
+by fakes; PIL and pytesseract must be importable.
+"""
+import os
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("pytesseract")
+Image = pytest.importorskip("PIL.Image")
+
+from services import e14_tesseract_ocr  # noqa: E402
+from services.e14_tesseract_ocr import BINARIZE_LUT, BINARIZE_THRESHOLD, E14TesseractOCR  # noqa: E402
+
+
+@pytest.fixture
+def make_ocr(monkeypatch):
+    monkeypatch.setattr(e14_tesseract_ocr.pytesseract, "get_tesseract_version", lambda: "5.3.0")
+    monkeypatch.setattr(e14_tesseract_ocr, "pdfinfo_from_bytes", lambda data: {"Pages": 7})
+    monkeypatch.delenv("OMP_THREAD_LIMIT", raising=False)
+
+    def make(workers):
+        ocr = E14TesseractOCR(workers=workers)
+        ocr.active = ocr.peak = 0
+        lock = threading.Lock()
+
+        def ocr_page(page, pdf_path, pdf_bytes):
+            with lock:
+                ocr.active += 1
+                ocr.peak = max(ocr.peak, ocr.active)
+            # Later pages finish first
+            time.sleep(0.01 * (8 - page))
+            with lock:
+                ocr.active -= 1
+            return f"texto pagina {page}"
+
+        ocr._ocr_page = ocr_page
+        return ocr
+
+    return make
+
+
+@pytest.mark.parametrize("workers", [1, 3, 16])
+def test_ocr_pages_keeps_page_order(make_ocr, workers):
+    ocr = make_ocr(workers)
+
+    pages = ocr._ocr_pages(pdf_bytes=b"%PDF")
+
+    assert pages == [f"texto pagina {page}" for page in range(1, 8)]
+    assert ocr.peak <= min(workers, 7)
+    assert "OMP_THREAD_LIMIT" not in os.environ
+
+
+def test_binarize_lut_matches_threshold():
+    assert len(BINARIZE_LUT) == 256
+    assert BINARIZE_LUT[BINARIZE_THRESHOLD] == 0
+    assert BINARIZE_LUT[BINARIZE_THRESHOLD + 1] == 255
+
+    gradient = Image.new("L", (256, 1))
+    gradient.putdata(list(range(256)))
+    binary = gradient.point(BINARIZE_LUT, "1")
+    assert binary.mode == "1"
+    assert [bool(v) for v in binary.getdata()] == [x > BINARIZE_THRESHOLD for x in range(256)]
+
+
+def test_preprocess_image_returns_binary_page(make_ocr):
+    ocr = make_ocr(1)
+    page = Image.new("RGB", (40, 20), "white")
+    page.paste((0, 0, 0), (10, 5, 30, 15))
+
+    binary = ocr._preprocess_image(page)
+
+    assert binary.mode == "1"
+    assert binary.getpixel((2, 2)) == 255
+    assert binary.getpixel((20, 10)) == 0
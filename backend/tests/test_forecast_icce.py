@@ -0,0 +1,89 @@
+"""
+Tests for the batch ICCE engine in ForecastService.
+"""
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.services.forecast_service import ForecastService, clear_icce_cache
+
+POSITIVE = SimpleNamespace(positive=0.8, negative=0.1, neutral=0.1)
+NEGATIVE = SimpleNamespace(positive=0.1, negative=0.8, neutral=0.1)
+
+
+def _day(days_ago):
+    return (datetime.utcnow() - timedelta(days=days_ago)).strftime('%Y-%m-%dT12:00:00.000Z')
+
+
+@pytest.fixture
+def service():
+    clear_icce_cache()
+    candidate = [
+        {"text": "bien", "created_at": _day(2)},
+        {"text": "mal", "created_at": _day(2)},
+        {"text": "bien", "created_at": _day(2)},
+        {"text": "bien", "created_at": _day(6)},
+    ]
+    total = candidate + [{"text": "otro", "created_at": _day(2)}] * 3
+
+    twitter = MagicMock()
+    twitter.search_by_pnd_topic.side_effect = (
+        lambda candidate_name=None, **kwargs: candidate if candidate_name else total
+    )
+    sentiment = MagicMock()
+    sentiment.analyze_batch.side_effect = lambda texts: [POSITIVE if t == "bien" else NEGATIVE for t in texts]
+    yield ForecastService(twitter, sentiment)
+    clear_icce_cache()
+
+
+def test_icce_uses_one_sentiment_batch_and_fills_every_day(service):
+    values = service.calculate_icce("Bogotá", candidate_name="Candidata", days_back=10)
+
+    service.sentiment_service.analyze_batch.assert_called_once()
+    service.sentiment_service.analyze_sentiment.assert_not_called()
+    assert len(values) == 11
+    assert [v.date for v in values] == sorted(v.date for v in values)
+
+    day = values[-3]  # two days ago: 2 positive, 1 negative out of 7 tweets
+    assert day.volume == 3
+    assert day.sentiment_score == pytest.approx(1 / 3)
+    assert day.conversation_share == pytest.approx(3 / 6)
+    assert day.value == pytest.approx((0.5 * (1 / 3 + 1) / 2 + 0.5 * 0.5) * 100)
+
+
+def test_missing_days_copy_nearest_day_with_decay(service):
+    values = service.calculate_icce("Bogotá", candidate_name="Candidata", days_back=10)
+    two_days_ago, six_days_ago = values[-3], values[-7]
+
+    # Four days ago is equidistant: the earlier day wins
+    assert values[-5].value == pytest.approx(six_days_ago.value * 0.8)
+    assert values[-4].value == pytest.approx(two_days_ago.value * 0.8)
+    assert values[-4].volume == two_days_ago.volume - 1
+    assert values[-4].conversation_share == pytest.approx(two_days_ago.conversation_share * 0.9)
+    assert values[0].value == pytest.approx(six_days_ago.value * 0.8)
+
+
+def test_results_are_memoized_per_parameters(service):
+    first = service.calculate_icce("Bogotá", candidate_name="Candidata", days_back=10)
+    again = service.calculate_icce("Bogotá", candidate_name="Candidata", days_back=10)
+    assert again == first
+    assert service.twitter_service.search_by_pnd_topic.call_count == 2
+
+    service.calculate_icce("Bogotá", candidate_name="Candidata", days_back=10, alpha=0.7)
+    assert service.twitter_service.search_by_pnd_topic.call_count == 4
+
+
+def test_ema_and_momentum_follow_recursive_definition(service):
+    values = service.calculate_icce("Bogotá", candidate_name="Candidata", days_back=10)
+    raw = [v.value / 100 for v in values]
+
+    expected = [raw[0]]
+    for x in raw[1:]:
+        expected.append(0.3 * x + 0.7 * expected[-1])
+
+    assert service.calculate_ema_smooth(values, 0.3) == pytest.approx(expected)
+    momentum = service.calculate_momentum(values, 0.3)
+    assert [m.momentum for m in momentum] == pytest.approx([b - a for a, b in zip(expected, expected[1:])])
+    assert len(service.forecast_icce(values, forecast_days=7)) == 7
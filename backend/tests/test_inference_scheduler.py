@@ -0,0 +1,100 @@
+"""
+Tests for dynamic micro-batching of BETO inference.
+"""
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from services import model_singleton
+from services.inference_scheduler import MicroBatchScheduler
+from utils.metrics import get_metrics_registry
+
+
+class RecordingPredict:
+    def __init__(self, delay=0.0):
+        self.batches = []
+        self.delay = delay
+
+    def __call__(self, texts):
+        self.batches.append(list(texts))
+        time.sleep(self.delay)
+        return [[float(len(text)), 0.0, 0.0] for text in texts]
+
+
+def test_concurrent_requests_are_merged():
+    predict = RecordingPredict()
+    scheduler = MicroBatchScheduler(predict, max_batch_size=64, max_wait_ms=200, name="test")
+    results = {}
+
+    def call(i):
+        results[i] = scheduler.predict(["x" * i])
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(1, 21)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    scheduler.close()
+
+    assert all(results[i] == [[float(i), 0.0, 0.0]] for i in range(1, 21))
+    assert len(predict.batches) < 20
+    assert get_metrics_registry().get_histogram_percentile(
+        "castor_sentiment_queue_wait_seconds", 50, {"scheduler": "test"}) is not None
+
+
+def test_full_batch_does_not_wait():
+    predict = RecordingPredict()
+    scheduler = MicroBatchScheduler(predict, max_batch_size=4, max_wait_ms=5000)
+
+    started = time.perf_counter()
+    assert len(scheduler.predict(["a", "b", "c", "d", "e"])) == 5
+    assert time.perf_counter() - started < 1
+    scheduler.close()
+
+
+def test_errors_reach_every_caller():
+    def failing(texts):
+        raise ValueError("boom")
+
+    scheduler = MicroBatchScheduler(failing, max_wait_ms=1)
+    with pytest.raises(ValueError, match="boom"):
+        scheduler.predict(["hola"])
+    scheduler.close()
+
+
+@pytest.fixture
+def tiny_beto(tmp_path):
+    transformers = pytest.importorskip("transformers")
+    words = "[PAD] [UNK] [CLS] [SEP] [MASK] hola todo bien muy mal el la de que y en un es no".split()
+    vocab = tmp_path / "vocab.txt"
+    vocab.write_text("\n".join(words))
+    transformers.BertTokenizer(str(vocab)).save_pretrained(str(tmp_path))
+    config = transformers.BertConfig(vocab_size=len(words), hidden_size=32, num_hidden_layers=2,
+                                     num_attention_heads=2, intermediate_size=64, num_labels=3)
+    transformers.BertForSequenceClassification(config).save_pretrained(str(tmp_path))
+
+    with patch.object(model_singleton.Config, "BETO_MODEL_PATH", str(tmp_path)):
+        yield
+    model_singleton._model_cache.clear()
+
+
+def test_length_sorted_batches_match_single_text_inference(tiny_beto):
+    texts = ["hola", "todo bien muy bien el la de que y en un es", "mal", "", "no es bien de la mal"]
+
+    batched = model_singleton.predict_probabilities(texts, batch_size=2)
+    single = [model_singleton.predict_probabilities([text])[0] for text in texts]
+
+    for row, expected in zip(batched, single):
+        assert row == pytest.approx(expected, abs=1e-5)
+
+
+def test_length_batches_limit_padding_and_size():
+    lengths = [120, 5, 6, 5, 7, 118, 6, 5]
+
+    batches = model_singleton._length_batches(lengths, batch_size=3)
+
+    assert sorted(i for batch in batches for i in batch) == list(range(len(lengths)))
+    assert all(len(batch) <= 3 for batch in batches)
+    assert [0, 5] in [sorted(batch) for batch in batches]
@@ -0,0 +1,131 @@
+"""
+Tests for the RAG embedding pipeline (dedupe, persistent cache, batching, retry).
+Runs offline with a deterministic fake embedder.
+"""
+import hashlib
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from services.rag_embedder import EmbeddingPipeline
+from services.rag_service import Document, SQLiteVectorStore
+
+
+class FakeEmbedder:
+    """Deterministic embedder: the vector is derived from sha256(text)."""
+
+    def __init__(self, dim=16, failures=0):
+        self.dim = dim
+        self.failures = failures
+        self.calls = []
+
+    def vector(self, text):
+        seed = int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:8], 16)
+        return np.random.default_rng(seed).standard_normal(self.dim).tolist()
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        if self.failures > 0:
+            self.failures -= 1
+            raise RuntimeError("rate limited")
+        return [self.vector(text) for text in texts]
+
+
+class FakeOpenAIClient:
+    """Minimal stand-in for openai.OpenAI().embeddings."""
+
+    def __init__(self, embedder):
+        self.embeddings = self
+        self.embedder = embedder
+
+    def create(self, model, input):
+        return SimpleNamespace(data=[SimpleNamespace(embedding=v) for v in self.embedder(input)])
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "rag_store.sqlite3")
+
+
+def test_duplicates_are_embedded_once(db_path):
+    """Identical texts share one API input and one vector."""
+    fake = FakeEmbedder()
+    pipeline = EmbeddingPipeline(fake, db_path, "fake-model")
+
+    vectors = pipeline.embed(["a", "b", "a", "a"])
+
+    assert sum(len(call) for call in fake.calls) == 2
+    assert np.allclose(vectors[0], vectors[2])
+    assert np.allclose(vectors[1], fake.vector("b"))
+    assert pipeline.stats["unique"] == 2
+
+
+def test_cache_persists_across_instances(db_path):
+    """A new pipeline on the same file never re-embeds cached text."""
+    EmbeddingPipeline(FakeEmbedder(), db_path, "fake-model").embed(["uno", "dos"])
+
+    fake = FakeEmbedder()
+    pipeline = EmbeddingPipeline(fake, db_path, "fake-model")
+    vectors = pipeline.embed(["dos", "tres"])
+
+    assert fake.calls == [["tres"]]
+    assert pipeline.stats["cache_hits"] == 1
+    assert np.allclose(vectors[0], fake.vector("dos"))
+
+
+def test_cache_is_keyed_by_model(db_path):
+    """Switching embedding model does not reuse another model's vectors."""
+    EmbeddingPipeline(FakeEmbedder(), db_path, "model-a").embed(["texto"])
+
+    fake = FakeEmbedder()
+    EmbeddingPipeline(fake, db_path, "model-b").embed(["texto"])
+
+    assert fake.calls == [["texto"]]
+
+
+def test_batches_respect_size_limit(db_path):
+    """Missing texts are packed into as few requests as the batch size allows."""
+    fake = FakeEmbedder()
+    pipeline = EmbeddingPipeline(fake, db_path, "fake-model", batch_size=4, max_concurrency=2)
+
+    texts = [f"chunk {i}" for i in range(10)]
+    vectors = pipeline.embed(texts)
+
+    assert sorted(len(call) for call in fake.calls) == [2, 4, 4]
+    for text, vec in zip(texts, vectors):
+        assert np.allclose(vec, fake.vector(text))
+
+
+def test_failed_batch_is_retried(db_path):
+    """Transient API errors are retried with backoff."""
+    fake = FakeEmbedder(failures=2)
+    pipeline = EmbeddingPipeline(fake, db_path, "fake-model", max_retries=3, backoff_seconds=0)
+
+    pipeline.embed(["x"])
+
+    assert len(fake.calls) == 3
+    assert pipeline.stats["retries"] == 2
+
+
+def test_failure_after_retries_raises(db_path):
+    """A batch that keeps failing surfaces the error."""
+    pipeline = EmbeddingPipeline(FakeEmbedder(failures=5), db_path, "fake-model", max_retries=1,
+                                 backoff_seconds=0)
+
+    with pytest.raises(RuntimeError):
+        pipeline.embed(["x"])
+
+
+def test_store_resync_does_not_reembed(db_path):
+    """Re-indexing unchanged documents is served from the cache."""
+    fake = FakeEmbedder()
+    store = SQLiteVectorStore(db_path=db_path, openai_client=FakeOpenAIClient(fake), embedding_model="fake")
+    docs = [Document(id=f"doc{i}", content=f"contenido {i % 3}") for i in range(6)]
+
+    store.add_documents(docs)
+    assert sum(len(call) for call in fake.calls) == 3
+
+    store.add_documents(docs)
+    assert sum(len(call) for call in fake.calls) == 3
+    assert store.count() == 6
@@ -0,0 +1,227 @@
+"""
+Tests for SQLiteVectorStore on disk: schema migration of existing stores,
+vector index backfill, ranked search and metadata filters. Runs offline with
+a deterministic fake embedder.
+"""
+import json
+import sqlite3
+
+import numpy as np
+import pytest
+
+from services.rag_service import Document, SQLiteVectorStore
+from services.rag_vector_index import decode_embedding
+from tests.test_rag_embeddings import FakeEmbedder, FakeOpenAIClient
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "rag_store.sqlite3")
+
+
+def _legacy_store(db_path, docs):
+    """Create a pre-index store: JSON-text embeddings, no vector tables, user_version 0."""
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            """
+            CREATE TABLE rag_documents (
+                id TEXT PRIMARY KEY,
+                content TEXT NOT NULL,
+                metadata TEXT NOT NULL,
+                embedding TEXT NOT NULL,
+                created_at TEXT NOT NULL
+            )
+            """
+        )
+        conn.executemany(
+            "INSERT INTO rag_documents (id, content, metadata, embedding, created_at) VALUES (?, ?, ?, ?, ?)",
+            [
+                (doc_id, content, json.dumps(metadata), json.dumps(embedding), "2024-01-01T00:00:00")
+                for doc_id, content, metadata, embedding in docs
+            ]
+        )
+
+
+def _metadata(i):
+    metadata = {
+        "type": ["e14", "analysis", "tweet"][i % 3],
+        "departamento": ["ANTIOQUIA", "CUNDINAMARCA", "VALLE"][i % 4 % 3],
+        "municipio": i % 5,
+        "corporacion": "SENADO" if i % 2 else "CAMARA",
+        "topic": ["seguridad", "salud"][i % 2],
+    }
+    if i % 7:
+        metadata["party_name"] = f"PARTIDO {i % 3}"
+    return metadata
+
+
+def _open(db_path, fake=None, **kwargs):
+    return SQLiteVectorStore(
+        db_path=db_path, openai_client=FakeOpenAIClient(fake or FakeEmbedder()), embedding_model="fake", **kwargs
+    )
+
+
+def test_index_backfill_spans_several_batches(db_path):
+    """Opening a legacy store larger than one backfill batch indexes every row."""
+    fake = FakeEmbedder()
+    _legacy_store(db_path, [
+        (f"doc{i}", f"texto {i}", {}, fake.vector(f"texto {i}")) for i in range(2300)
+    ])
+
+    store = _open(db_path, fake)
+
+    with sqlite3.connect(db_path) as conn:
+        assert store.index.count(conn) == 2300
+        conn.execute("DELETE FROM rag_vector_slots WHERE slot % 3 = 0")
+        conn.commit()
+    store._backfill_index(batch_size=100)
+    with sqlite3.connect(db_path) as conn:
+        assert store.index.count(conn) == 2300
+    assert [r.document.id for r in store.search("texto 1234", top_k=1)] == ["doc1234"]
+
+
+def test_search_ranks_by_cosine_similarity(db_path):
+    fake = FakeEmbedder()
+    store = _open(db_path, fake)
+    texts = [f"documento {i}" for i in range(30)]
+    store.add_documents([Document(id=f"d{i}", content=text) for i, text in enumerate(texts)])
+
+    results = store.search("documento 7", top_k=5)
+
+    vectors = np.array([fake.vector(text) for text in texts])
+    query = np.array(fake.vector("documento 7"))
+    scores = vectors @ query / (np.linalg.norm(vectors, axis=1) * np.linalg.norm(query))
+    expected = [f"d{i}" for i in np.argsort(-scores)[:5]]
+    assert [r.document.id for r in results] == expected
+    assert [r.rank for r in results] == [1, 2, 3, 4, 5]
+    assert [r.score for r in results] == pytest.approx(sorted(scores, reverse=True)[:5], abs=1e-5)
+    assert results[0].document.content == "documento 7"
+
+
+@pytest.mark.parametrize("precision, blob_bytes, max_error", [
+    ("float32", 64, 1e-6),
+    ("float16", 32, 1e-5),
+    ("int8", 20, 1e-3),
+])
+def test_migrate_legacy_json_embeddings(db_path, precision, blob_bytes, max_error):
+    """JSON-text embeddings are rewritten as BLOBs and the store is stamped with SCHEMA_VERSION."""
+    fake = FakeEmbedder()
+    originals = {f"doc{i}": fake.vector(f"texto {i}") for i in range(40)}
+    _legacy_store(db_path, [(doc_id, doc_id, {}, vec) for doc_id, vec in originals.items()])
+
+    store = _open(db_path, fake, embedding_precision=precision)
+
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SQLiteVectorStore.SCHEMA_VERSION
+        rows = conn.execute(
+            "SELECT id, embedding, embedding_dtype, typeof(embedding), LENGTH(embedding) FROM rag_documents"
+        ).fetchall()
+    assert {(dtype, kind, size) for _, _, dtype, kind, size in rows} == {(precision, "blob", blob_bytes)}
+    for doc_id, blob, dtype, _, _ in rows:
+        stored = decode_embedding(blob, dtype)
+        original = np.array(originals[doc_id], dtype=np.float32)
+        error = 1 - stored @ original / (np.linalg.norm(stored) * np.linalg.norm(original))
+        assert error < max_error
+
+    # Migrated rows have no cached original to compare against; freshly embedded ones do
+    assert store.storage_stats()["quantization_error"]["sampled"] == 0
+    assert store.migrate() == SQLiteVectorStore.SCHEMA_VERSION
+
+
+def test_storage_stats_measures_error_against_original_vectors(db_path):
+    fake = FakeEmbedder()
+    docs = [Document(id=f"d{i}", content=f"documento {i}") for i in range(20)]
+    exact, quantized = _open(db_path, fake), _open(db_path + ".int8", fake, embedding_precision="int8")
+    exact.add_documents(docs)
+    quantized.add_documents(docs)
+
+    exact_error = exact.storage_stats()["quantization_error"]
+    int8_stats = quantized.storage_stats()
+
+    assert exact_error["sampled"] == 20
+    assert exact_error["max"] == pytest.approx(0.0, abs=1e-6)
+    assert int8_stats["quantization_error"]["sampled"] == 20
+    assert 0 < int8_stats["quantization_error"]["mean"] < 1e-3
+    assert int8_stats["documents_by_precision"] == {"int8": 20}
+    assert int8_stats["embedding_bytes_per_document"] == 20
+
+
+def _filtered_store(db_path):
+    store = _open(db_path)
+    store.add_documents([
+        Document(id=f"d{i}", content=f"documento {i}", metadata=_metadata(i)) for i in range(60)
+    ])
+    return store
+
+
+WHERE_CLAUSES = [
+    {"type": "e14"},
+    {"type": "e14", "departamento": "ANTIOQUIA"},
+    {"municipio": 3},
+    {"municipio": "3"},
+    {"party_name": None},
+    {"departamento": {"$in": ["VALLE", "CUNDINAMARCA"]}},
+    {"departamento": {"$in": []}},
+    {"$or": [{"type": "tweet"}, {"municipio": {"$in": [0, 1]}}]},
+    {"$and": [{"corporacion": "SENADO"}, {"$or": [{"type": "e14"}, {"$and": [{"type": "tweet"}, {"municipio": 4}]}]}]},
+    {"$or": []},
+    {"topic": "salud"},
+    {"topic": "salud", "type": {"$in": ["e14", "tweet"]}},
+    {"$or": [{"topic": "seguridad"}, {"departamento": "VALLE"}]},
+]
+
+
+def test_compile_where_grammar(db_path):
+    store = _open(db_path)
+
+    assert store._compile_where({"type": "e14", "municipio": {"$in": [1, 2]}}) == (
+        "meta_type = ? AND meta_municipio IN (?,?)", ["e14", 1, 2]
+    )
+    assert store._compile_where({"$or": [{"type": "e14"}, {"$and": [{"type": "tweet"}, {"party_name": None}]}]}) == (
+        "(meta_type = ? OR meta_type = ? AND meta_party_name IS NULL)", ["e14", "tweet"]
+    )
+    assert store._compile_where({"departamento": {"$in": []}}) == ("0", [])
+    assert store._compile_where({"$or": []}) == ("0", [])
+    assert store._compile_where({}) == ("1", [])
+    # Unknown keys and operators cannot be answered from the meta_ columns
+    assert store._compile_where({"topic": "salud"}) is None
+    assert store._compile_where({"$or": [{"type": "e14"}, {"topic": "salud"}]}) is None
+    assert store._compile_where({"municipio": {"$gt": 3}}) is None
+
+
+@pytest.mark.parametrize("where", WHERE_CLAUSES)
+def test_sql_filter_matches_python_filter(db_path, where):
+    """Search with a where clause returns exactly the documents the in-Python filter accepts."""
+    store = _filtered_store(db_path)
+    expected = {f"d{i}" for i in range(60) if store._matches_where(_metadata(i), where)}
+
+    found = {r.document.id for r in store.search("documento 1", top_k=100, where=where)}
+
+    assert found == expected
+    if store._compile_where(where) is None:
+        with sqlite3.connect(db_path) as conn:
+            assert set(store._candidate_ids(conn, where)) == expected
+
+
+def test_migration_backfills_filter_columns(db_path):
+    """Rows written before the meta_<key> columns existed are filterable after opening the store."""
+    fake = FakeEmbedder()
+    _legacy_store(db_path, [
+        (f"d{i}", f"documento {i}", _metadata(i), fake.vector(f"documento {i}")) for i in range(60)
+    ])
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("INSERT INTO rag_documents VALUES ('broken', 'x', 'not json', '[]', '2024-01-01')")
+
+    store = _open(db_path, fake)
+
+    columns = ", ".join(f"meta_{key}" for key in SQLiteVectorStore.FILTER_KEYS)
+    with sqlite3.connect(db_path) as conn:
+        rows = dict(
+            (row[0], row[1:]) for row in conn.execute(f"SELECT id, {columns} FROM rag_documents")
+        )
+    assert rows["broken"] == (None,) * len(SQLiteVectorStore.FILTER_KEYS)
+    for i in range(60):
+        assert rows[f"d{i}"] == tuple(_metadata(i).get(key) for key in SQLiteVectorStore.FILTER_KEYS)
+    assert {r.document.id for r in store.search("documento 1", top_k=100, where={"municipio": 3})} == {
+        f"d{i}" for i in range(60) if i % 5 == 3
+    }
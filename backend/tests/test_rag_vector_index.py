@@ -0,0 +1,141 @@
+"""
+Tests for the memory-mapped vector index (slot bookkeeping, cross-instance
+sync, IVF recall against brute force).
+"""
+import sqlite3
+
+import numpy as np
+import pytest
+
+from services.rag_vector_index import VectorIndex, normalize_rows
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "rag_store.sqlite3")
+    with sqlite3.connect(path) as conn:
+        VectorIndex.init_schema(conn)
+    return path
+
+
+def _vectors(n, dim=16, seed=0):
+    return np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+
+
+def _slots(conn):
+    return dict(conn.execute("SELECT doc_id, slot FROM rag_vector_slots").fetchall())
+
+
+def test_add_delete_and_free_slot_reuse(db_path):
+    index = VectorIndex(db_path)
+    vectors = _vectors(5)
+    with sqlite3.connect(db_path) as conn:
+        index.add(conn, [f"d{i}" for i in range(5)], vectors)
+        conn.commit()
+        assert index.count(conn) == 5
+        assert _slots(conn) == {f"d{i}": i for i in range(5)}
+
+        index.delete(conn, ["d1", "d3", "missing"])
+        conn.commit()
+        assert index.count(conn) == 3
+        assert sorted(row[0] for row in conn.execute("SELECT slot FROM rag_vector_free")) == [1, 3]
+        assert {"d0", "d2", "d4"} == {doc_id for doc_id, _ in index.search(conn, vectors[1], top_k=5)}
+
+        index.add(conn, ["n1", "n2", "n3"], _vectors(3, seed=1))
+        conn.commit()
+        slots = _slots(conn)
+        assert {slots["n1"], slots["n2"], slots["n3"]} == {1, 3, 5}
+        assert conn.execute("SELECT COUNT(1) FROM rag_vector_free").fetchone()[0] == 0
+        assert conn.execute("SELECT value FROM rag_vector_meta WHERE key = 'high_water'").fetchone()[0] == "6"
+
+        # Replacing an existing id moves it to a fresh slot and frees the old one
+        index.add(conn, ["d0"], vectors[4:5])
+        conn.commit()
+        assert _slots(conn)["d0"] == 6
+        assert [row[0] for row in conn.execute("SELECT slot FROM rag_vector_free")] == [0]
+        assert np.allclose(index.get_vectors(conn, ["d0"])["d0"], normalize_rows(vectors[4:5])[0])
+        assert index.search(conn, vectors[4], top_k=2)[0][1] == pytest.approx(1.0, abs=1e-5)
+
+
+def test_rolled_back_add_leaves_committed_vectors_intact(db_path):
+    index = VectorIndex(db_path)
+    vectors = _vectors(4)
+    with sqlite3.connect(db_path) as conn:
+        index.add(conn, ["a", "b"], vectors[:2])
+        conn.commit()
+
+        index.add(conn, ["a", "c"], vectors[2:])
+        conn.rollback()
+
+        reader = VectorIndex(db_path)
+        assert _slots(conn) == {"a": 0, "b": 1}
+        assert np.allclose(reader.get_vectors(conn, ["a"])["a"], normalize_rows(vectors[:1])[0])
+        assert reader.search(conn, vectors[0], top_k=1) == [("a", pytest.approx(1.0, abs=1e-5))]
+        assert {doc_id for doc_id, _ in index.search(conn, vectors[3], top_k=10)} == {"a", "b"}
+
+        index.add(conn, ["c"], vectors[3:])
+        conn.commit()
+        assert index.search(conn, vectors[3], top_k=1)[0][0] == "c"
+
+
+def test_sync_picks_up_writes_from_another_instance(db_path):
+    reader, writer = VectorIndex(db_path), VectorIndex(db_path)
+    vectors = _vectors(4)
+    with sqlite3.connect(db_path) as conn:
+        writer.add(conn, ["a", "b"], vectors[:2])
+        conn.commit()
+        assert reader.search(conn, vectors[0], top_k=1)[0][0] == "a"
+
+        writer.delete(conn, ["a"])
+        writer.add(conn, ["c", "d"], vectors[2:])
+        conn.commit()
+        assert {doc_id for doc_id, _ in reader.search(conn, vectors[0], top_k=10)} == {"b", "c", "d"}
+        assert reader.search(conn, vectors[3], top_k=1)[0][0] == "d"
+
+        # clear() starts a new epoch: the reader drops its state instead of patching it
+        writer.clear(conn)
+        writer.add(conn, ["e"], vectors[:1])
+        conn.commit()
+        assert reader.search(conn, vectors[0], top_k=10) == [("e", pytest.approx(1.0, abs=1e-5))]
+
+
+def test_ivf_search_recall_against_brute_force(db_path):
+    rng = np.random.default_rng(7)
+    centers = normalize_rows(rng.standard_normal((20, 32)))
+    data = centers[rng.integers(0, 20, 2000)] + 0.15 * rng.standard_normal((2000, 32))
+    queries = centers[rng.integers(0, 20, 50)] + 0.15 * rng.standard_normal((50, 32))
+    ids = [f"v{i}" for i in range(len(data))]
+
+    exact = VectorIndex(db_path)
+    ivf = VectorIndex(db_path, mode="ivf", nprobe=8)
+    with sqlite3.connect(db_path) as conn:
+        exact.add(conn, ids, data)
+        conn.commit()
+        assert ivf.train(conn, nlist=32) == 32
+        assert conn.execute("SELECT COUNT(1) FROM rag_vector_slots WHERE list_id < 0").fetchone()[0] == 0
+
+        truth = exact.search_batch(conn, queries, top_k=10)
+        approx = ivf.search_batch(conn, queries, top_k=10)
+
+    brute = np.argsort(-(normalize_rows(queries) @ normalize_rows(data).T), axis=1)[:, :10]
+    assert [[doc_id for doc_id, _ in hits] for hits in truth] == [[ids[i] for i in row] for row in brute]
+    recall = np.mean([
+        len({doc_id for doc_id, _ in a} & {doc_id for doc_id, _ in t}) / 10
+        for a, t in zip(approx, truth)
+    ])
+    assert recall >= 0.9
+    for hits in approx:
+        scores = [score for _, score in hits]
+        assert scores == sorted(scores, reverse=True)
+
+
+def test_search_restricted_to_candidates(db_path):
+    index = VectorIndex(db_path)
+    vectors = _vectors(10)
+    with sqlite3.connect(db_path) as conn:
+        index.add(conn, [f"d{i}" for i in range(10)], vectors)
+        conn.commit()
+        hits = index.search(conn, vectors[0], top_k=5, candidates=["d2", "d4", "d6"])
+        assert {doc_id for doc_id, _ in hits} == {"d2", "d4", "d6"}
+        hits = index.search(conn, vectors[0], top_k=5, candidate_slots=np.array([0, 9]))
+        assert [doc_id for doc_id, _ in hits] == ["d0", "d9"]
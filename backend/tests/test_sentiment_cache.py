@@ -0,0 +1,93 @@
+"""
+Tests for the persistent cross-process sentiment cache.
+"""
+from unittest.mock import patch
+
+from services import sentiment_cache
+from services.sentiment_cache import PersistentSentimentCache, cache_key, normalize_text
+from utils.metrics import get_metrics_registry
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+        self.mget_calls = 0
+
+    def mget(self, keys):
+        self.mget_calls += 1
+        return [self.store.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def setex(self, key, ttl, value):
+        self.commands.append((key, value))
+
+    def execute(self):
+        self.redis.store.update(self.commands)
+
+
+def test_retweets_and_reshares_share_a_key():
+    original = "Excelente debate anoche https://t.co/abc123"
+    assert normalize_text("RT @castor: Excelente   debate anoche") == "excelente debate anoche"
+    assert cache_key(original) == cache_key("RT @otro_usuario: EXCELENTE debate anoche")
+    assert cache_key(original) != cache_key("Pésimo debate anoche")
+
+
+def test_model_version_changes_the_key():
+    text = "Hoy votamos con esperanza"
+    before = cache_key(text)
+    with patch.object(sentiment_cache.Config, "SENTIMENT_MODEL_VERSION", "2"):
+        assert cache_key(text) != before
+    with patch.object(sentiment_cache.Config, "BETO_BACKEND", "int8"):
+        assert cache_key(text) != before
+
+
+def test_sqlite_round_trip_and_expiry(tmp_path):
+    db_path = str(tmp_path / "sentiment.db")
+    cache = PersistentSentimentCache(db_path=db_path, ttl_seconds=60)
+    keys = [cache_key(f"texto {i}") for i in range(1200)]
+
+    with patch.object(sentiment_cache.cache, "redis_client", None):
+        cache.set_many({key: [0.1, 0.2, 0.7] for key in keys[:1000]})
+        # A second process sees the same entries
+        found = PersistentSentimentCache(db_path=db_path).get_many(keys)
+        assert len(found) == 1000
+        assert found[keys[0]] == [0.1, 0.2, 0.7]
+
+        with patch.object(sentiment_cache.time, "time", return_value=10 ** 12):
+            assert cache.get_many(keys[:10]) == {}
+
+
+def test_redis_uses_one_mget_per_lookup():
+    redis = FakeRedis()
+    cache = PersistentSentimentCache(ttl_seconds=60)
+    keys = [cache_key(text) for text in ("uno", "dos", "tres")]
+
+    with patch.object(sentiment_cache.cache, "redis_client", redis):
+        cache.set_many({keys[0]: [0.6, 0.3, 0.1], keys[1]: [0.2, 0.2, 0.6]})
+        found = cache.get_many(keys)
+
+    assert found == {keys[0]: [0.6, 0.3, 0.1], keys[1]: [0.2, 0.2, 0.6]}
+    assert redis.mget_calls == 1
+
+
+def test_lookups_record_hit_rate(tmp_path):
+    cache = PersistentSentimentCache(db_path=str(tmp_path / "sentiment.db"))
+    registry = get_metrics_registry()
+    labels = {"tier": "persistent"}
+    hits = registry.get_counter("castor_sentiment_cache_hits_total", labels)
+    misses = registry.get_counter("castor_sentiment_cache_misses_total", labels)
+
+    with patch.object(sentiment_cache.cache, "redis_client", None):
+        cache.set_many({cache_key("hola"): [0.1, 0.1, 0.8]})
+        cache.get_many([cache_key("hola"), cache_key("chao")])
+
+    assert registry.get_counter("castor_sentiment_cache_hits_total", labels) == hits + 1
+    assert registry.get_counter("castor_sentiment_cache_misses_total", labels) == misses + 1
@@ -0,0 +1,118 @@
+"""
+Tests for the incremental trending engine and bulk trending-topic upsert.
+"""
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from services.trending_engine import TrendingEngine, extract_terms
+
+POSITIVE = SimpleNamespace(positive=0.8, negative=0.1, neutral=0.1)
+NEGATIVE = SimpleNamespace(positive=0.1, negative=0.8, neutral=0.1)
+NOW = 1_750_000_000.0
+
+
+def _tweet(tweet_id, text, hours_ago=0, likes=0, retweets=0):
+    created = time.strftime('%Y-%m-%dT%H:%M:%S+00:00', time.gmtime(NOW - hours_ago * 3600))
+    return {
+        'id': str(tweet_id),
+        'text': text,
+        'created_at': created,
+        'public_metrics': {'like_count': likes, 'retweet_count': retweets, 'reply_count': 0},
+    }
+
+
+class BatchSentiment:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(len(texts))
+        return [NEGATIVE if 'fraude' in text else POSITIVE for text in texts]
+
+
+def test_extract_terms_skips_stopwords_urls_and_mentions():
+    terms = extract_terms("RT @alcaldia: Movilidad en #Bogota, que la movilidad mejore https://t.co/x")
+    assert set(terms) == {'#bogota', 'movilidad', 'mejore'}
+
+
+def test_top_k_ranks_by_engagement_with_sentiment_and_samples():
+    engine = TrendingEngine(width=256, depth=4, retention_hours=24, capacity=64, recent_size=100)
+    tweets = (
+        [_tweet(i, f"Debate sobre seguridad #DebateBogota {i}", likes=10) for i in range(12)]
+        + [_tweet(100 + i, "Denuncian fraude electoral en mesas", likes=1) for i in range(11)]
+        + [_tweet(200 + i, "Concierto gratis parque", likes=50) for i in range(3)]
+    )
+    sentiment = BatchSentiment()
+
+    assert engine.ingest("Bogotá", tweets, sentiment, now=NOW) == len(tweets)
+    topics = engine.top_k("bogotá", k=3, hours_back=24, min_tweets=10, now=NOW)
+
+    assert sentiment.calls == [len(tweets)]
+    assert {t['topic'] for t in topics} == {'debate', 'seguridad', '#debatebogota'}
+    top = topics[0]
+    assert top['tweet_count'] >= 12
+    assert top['engagement_score'] >= 120
+    assert top['sentiment_positive'] == pytest.approx(0.8)
+    assert len(top['sample_tweets']) == 5
+    assert all(t['topic'] != 'parque' for t in topics)  # below min_tweets
+
+    fraude = engine.top_k("Bogotá", k=10, hours_back=24, min_tweets=10, now=NOW)
+    fraude = next(t for t in fraude if t['topic'] == 'fraude')
+    assert fraude['sentiment_negative'] == pytest.approx(0.8)
+    assert 'electoral' in fraude['keywords']
+
+
+def test_duplicates_are_ignored_and_scored_once():
+    engine = TrendingEngine(width=256, depth=4, retention_hours=24, capacity=64, recent_size=100)
+    tweets = [_tweet(i, "Marcha estudiantil hoy") for i in range(10)]
+    sentiment = BatchSentiment()
+
+    engine.ingest("Cali", tweets, sentiment, now=NOW)
+    assert engine.ingest("Cali", tweets + tweets[:3], sentiment, now=NOW) == 0
+    assert sentiment.calls == [10]
+    assert engine.top_k("Cali", min_tweets=1, now=NOW)[0]['tweet_count'] == 10
+
+
+def test_window_slides_by_tweet_hour():
+    engine = TrendingEngine(width=256, depth=4, retention_hours=24, capacity=64, recent_size=100)
+    engine.ingest("Medellín", [_tweet(i, "Metro cerrado", hours_ago=5) for i in range(10)], now=NOW)
+    engine.ingest("Medellín", [_tweet(50 + i, "Lluvias fuertes", hours_ago=0) for i in range(10)], now=NOW)
+    engine.ingest("Medellín", [_tweet(90, "Noticia vieja", hours_ago=30)], now=NOW)
+
+    recent = {t['topic'] for t in engine.top_k("Medellín", hours_back=2, min_tweets=5, now=NOW)}
+    day = {t['topic'] for t in engine.top_k("Medellín", hours_back=24, min_tweets=5, now=NOW)}
+    assert recent == {'lluvias', 'fuertes'}
+    assert day == {'lluvias', 'fuertes', 'metro', 'cerrado'}
+    assert engine.top_k("Medellín", hours_back=24, min_tweets=5, now=NOW + 24 * 3600) == []
+
+
+def test_candidate_set_stays_bounded():
+    engine = TrendingEngine(width=512, depth=4, retention_hours=24, capacity=32, recent_size=10)
+    tweets = [_tweet(i, f"palabra{chr(97 + i % 26)}{chr(97 + i // 26)}x") for i in range(500)]
+    tweets += [_tweet(1000 + i, "Paro camionero") for i in range(20)]
+
+    engine.ingest("Cali", tweets, now=NOW)
+
+    window = engine._window("Cali")
+    assert len(window._candidates) <= 32
+    assert {t['topic'] for t in engine.top_k("Cali", k=2, min_tweets=15, now=NOW)} == {'paro', 'camionero'}
+
+
+def test_save_trending_topics_upserts_in_one_transaction(tmp_path, monkeypatch):
+    from services import database_service
+    monkeypatch.setattr(database_service.Config, "DATABASE_URL", f"sqlite:///{tmp_path / 'trending.db'}")
+    db = database_service.DatabaseService()
+    db.init_db()
+
+    def topic(name, count):
+        return {'topic': name, 'location': 'Bogotá', 'tweet_count': count, 'engagement_score': float(count),
+                'keywords': [], 'sample_tweets': [], 'is_active': True}
+
+    first = db.save_trending_topics('Bogotá', [topic('paro', 10), topic('lluvias', 5)])
+    second = db.save_trending_topics('Bogotá', [topic('paro', 30), topic('metro', 12)])
+
+    assert second[0] == first[0]
+    active = {t.topic: t.tweet_count for t in db.get_active_trending_topics('Bogotá')}
+    assert active == {'paro': 30, 'metro': 12}
@@ -0,0 +1,108 @@
+"""
+Tests for the bulk tweet upsert and the single-transaction analysis save.
+"""
+import pytest
+from sqlalchemy import text
+
+from models.database import ApiCall, ForecastSnapshot, PndAxisMetric, Tweet
+from services import database_service, tweet_bulk_writer
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database_service.Config, "DATABASE_URL", f"sqlite:///{tmp_path / 'castor.db'}")
+    monkeypatch.setattr(tweet_bulk_writer.Config, "DB_BULK_CHUNK_SIZE", 7)
+    service = database_service.DatabaseService()
+    service.init_db()
+    with service.session_scope() as session:
+        session.add(ApiCall(id="call-1", location="Bogotá"))
+    return service
+
+
+def _tweets(n, likes=0):
+    return [
+        {'tweet_id': str(i), 'content': f"tweet {i}", 'like_count': likes, 'hashtags': ['elecciones'],
+         'sentiment_label': 'positivo'}
+        for i in range(n)
+    ]
+
+
+def test_save_tweets_chunks_and_applies_orm_defaults(db):
+    assert db.save_tweets("call-1", _tweets(20)) == 20
+
+    with db.session_scope() as session:
+        rows = session.query(Tweet).filter(Tweet.api_call_id == "call-1").all()
+        assert len(rows) == 20
+        row = next(r for r in rows if r.tweet_id == "3")
+        assert row.hashtags == ['elecciones']
+        assert row.mentions == []
+        assert row.is_retweet is False
+        assert row.bot_score == 0.0
+        assert len(row.id) == 36
+
+
+def test_save_tweets_upserts_on_api_call_and_tweet_id(db):
+    db.save_tweets("call-1", _tweets(5))
+    assert db.save_tweets("call-1", _tweets(8, likes=3) + _tweets(2, likes=9)) == 8
+
+    with db.session_scope() as session:
+        likes = dict(session.query(Tweet.tweet_id, Tweet.like_count).filter(Tweet.api_call_id == "call-1"))
+    assert len(likes) == 8
+    assert likes["0"] == 9 and likes["1"] == 9 and likes["7"] == 3
+
+
+def test_analysis_results_commit_in_one_transaction(db):
+    result = db.save_analysis_results(
+        "call-1",
+        tweets_data=_tweets(10),
+        snapshot_data={'icce': 61.5},
+        pnd_metrics=[{'pnd_axis': 'seguridad', 'tweet_count': 4}, {'pnd_axis': 'salud'}],
+        forecast_data={'icce_values': [50.0, 52.0]},
+    )
+    assert result['tweets'] == 10
+    assert result['pnd_metrics'] == 2
+    assert result['snapshot_id'] and result['forecast_id']
+
+    # A failing part rolls back everything written with it
+    failed = db.save_analysis_results(
+        "call-1",
+        tweets_data=_tweets(15, likes=1),
+        pnd_metrics=[{'pnd_axis': None}],  # NOT NULL column
+    )
+    assert failed is None
+    with db.session_scope() as session:
+        assert session.query(Tweet).count() == 10
+        assert session.query(Tweet).filter(Tweet.like_count == 1).count() == 0
+        assert session.query(PndAxisMetric).count() == 2
+        assert session.query(ForecastSnapshot).count() == 1
+
+
+def test_tweets_without_id_are_not_collapsed(db):
+    tweets = _tweets(3) + [{'content': "sin id"}, {'tweet_id': '', 'content': "vacío"}, {'tweet_id': None}]
+    assert db.save_tweets("call-1", tweets) == 6
+    assert db.save_tweets("call-1", tweets[3:]) == 3
+
+    with db.session_scope() as session:
+        assert session.query(Tweet).filter(Tweet.tweet_id == '').count() == 6
+        assert session.query(Tweet).count() == 9
+
+
+def test_migration_dedupes_existing_rows_before_creating_index(db):
+    with db.engine.begin() as connection:
+        connection.execute(text(f"DROP INDEX {tweet_bulk_writer.UPSERT_INDEX}"))
+        connection.execute(text(
+            "INSERT INTO tweets (id, api_call_id, tweet_id, content, like_count, processed_at) VALUES "
+            "('a', 'call-1', '1', 'x', 1, '2024-01-01 00:00:00'), "
+            "('b', 'call-1', '1', 'x', 2, '2024-01-02 00:00:00'), "
+            "('c', 'call-1', '1', 'x', 3, NULL), "
+            "('d', 'call-1', '', 'x', 0, NULL), ('e', 'call-1', '', 'x', 0, NULL)"
+        ))
+
+    assert tweet_bulk_writer.migrate_upsert_index(db.engine) == 2
+    assert tweet_bulk_writer.migrate_upsert_index(db.engine) == 0
+
+    with db.session_scope() as session:
+        assert sorted(session.query(Tweet.id)) == [('b',), ('d',), ('e',)]
+    db.save_tweets("call-1", [{'tweet_id': '1', 'content': "x", 'like_count': 7}])
+    with db.session_scope() as session:
+        assert session.query(Tweet.id, Tweet.like_count).filter(Tweet.tweet_id == '1').all() == [('b', 7)]
@@ -0,0 +1,156 @@
+"""
+Binary codec for cached payloads.
+
+Payloads are a 4-byte header followed by the body:
+
+    MAGIC (0xCA) | FORMAT_VERSION | serializer id | compression id
+
+Serializers: msgpack (preferred), orjson, json. Compression (zstd or lz4)
+only applies to bodies of at least Config.CACHE_COMPRESS_MIN_BYTES. The
+decoder reads the ids from the header, so entries written with another
+configuration still decode; payloads without the magic byte are the
+plain JSON strings written before this module existed.
+
+msgpack, orjson, zstandard and lz4 are optional; whatever is missing is
+skipped when choosing the codec.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+try:
+    import msgpack  # type: ignore
+except ImportError:  # pragma: no cover
+    msgpack = None  # type: ignore
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+try:
+    import zstandard  # type: ignore
+except ImportError:  # pragma: no cover
+    zstandard = None  # type: ignore
+
+try:
+    import lz4.frame as lz4_frame  # type: ignore
+except ImportError:  # pragma: no cover
+    lz4_frame = None  # type: ignore
+
+from config import Config
+from utils.metrics import CacheMetrics
+
+logger = logging.getLogger(__name__)
+
+MAGIC = 0xCA  # never the first byte of UTF-8 JSON text
+FORMAT_VERSION = 1
+HEADER_SIZE = 4
+
+
+class CodecError(ValueError):
+    """Payload cannot be decoded (unknown header or codec not installed)."""
+
+
+def _json_dumps(value: Any) -> bytes:
+    return json.dumps(value, default=str, ensure_ascii=False).encode("utf-8")
+
+
+def _orjson_dumps(value: Any) -> bytes:
+    return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _msgpack_dumps(value: Any) -> bytes:
+    return msgpack.packb(value, default=str, use_bin_type=True)
+
+
+def _msgpack_loads(body: bytes) -> Any:
+    return msgpack.unpackb(body, raw=False, strict_map_key=False)
+
+
+# id -> (name, dumps, loads, available)
+_SERIALIZERS: Dict[int, Tuple[str, Callable[[Any], bytes], Callable[[bytes], Any], bool]] = {
+    ord("j"): ("json", _json_dumps, json.loads, True),
+    ord("o"): ("orjson", _orjson_dumps, lambda body: orjson.loads(body), orjson is not None),
+    ord("m"): ("msgpack", _msgpack_dumps, _msgpack_loads, msgpack is not None),
+}
+
+# id -> (name, compress, decompress, available)
+_COMPRESSORS: Dict[int, Tuple[str, Callable[[bytes], bytes], Callable[[bytes], bytes], bool]] = {
+    ord("n"): ("none", lambda body: body, lambda body: body, True),
+    ord("z"): (
+        "zstd",
+        lambda body: zstandard.ZstdCompressor(level=3).compress(body),
+        lambda body: zstandard.ZstdDecompressor().decompress(body),
+        zstandard is not None,
+    ),
+    ord("l"): (
+        "lz4",
+        lambda body: lz4_frame.compress(body),
+        lambda body: lz4_frame.decompress(body),
+        lz4_frame is not None,
+    ),
+}
+
+_SERIALIZER_PREFERENCE = ("msgpack", "orjson", "json")
+_COMPRESSOR_PREFERENCE = ("zstd", "lz4", "none")
+
+
+def _select(table: Dict[int, tuple], preference: Tuple[str, ...], wanted: str) -> int:
+    """Id of the configured codec, or the first available one for 'auto' / if it is missing."""
+    ids = {entry[0]: codec_id for codec_id, entry in table.items() if entry[3]}
+    if wanted != "auto":
+        if wanted in ids:
+            return ids[wanted]
+        logger.warning(f"Cache codec '{wanted}' not installed, picking the best available")
+    return next(ids[name] for name in preference if name in ids)
+
+
+_serializer_id = _select(_SERIALIZERS, _SERIALIZER_PREFERENCE, Config.CACHE_SERIALIZER)
+_compressor_id = _select(_COMPRESSORS, _COMPRESSOR_PREFERENCE, Config.CACHE_COMPRESSION)
+
+
+def codec_name() -> str:
+    """Active 'serializer+compression' pair, e.g. 'msgpack+zstd'."""
+    return f"{_SERIALIZERS[_serializer_id][0]}+{_COMPRESSORS[_compressor_id][0]}"
+
+
+def encode(value: Any, cache_type: str = "default") -> bytes:
+    """Serialize (and, above the size threshold, compress) value for the cache."""
+    serializer, dumps, _, _ = _SERIALIZERS[_serializer_id]
+    body = dumps(value)
+    raw_size = len(body)
+    compressor_id = ord("n")
+    if _compressor_id != ord("n") and raw_size >= Config.CACHE_COMPRESS_MIN_BYTES:
+        compressed = _COMPRESSORS[_compressor_id][1](body)
+        if len(compressed) < raw_size:
+            body, compressor_id = compressed, _compressor_id
+    payload = bytes((MAGIC, FORMAT_VERSION, _serializer_id, compressor_id)) + body
+    CacheMetrics.track_encode(
+        cache_type, serializer, _COMPRESSORS[compressor_id][0], raw_size, len(payload)
+    )
+    return payload
+
+
+def decode(payload: Optional[Union[bytes, str]], cache_type: str = "default") -> Any:
+    """Inverse of encode(); also reads legacy plain-JSON payloads."""
+    if payload is None:
+        return None
+    start = time.perf_counter()
+    if isinstance(payload, str) or not payload or payload[0] != MAGIC:
+        value = json.loads(payload)
+        codec = "legacy-json"
+    else:
+        if len(payload) < HEADER_SIZE or payload[1] != FORMAT_VERSION:
+            raise CodecError(f"Unsupported cache payload header {bytes(payload[:HEADER_SIZE])!r}")
+        serializer = _SERIALIZERS.get(payload[2])
+        compressor = _COMPRESSORS.get(payload[3])
+        if serializer is None or compressor is None or not (serializer[3] and compressor[3]):
+            raise CodecError(f"Cache payload codec not available: {bytes(payload[:HEADER_SIZE])!r}")
+        value = serializer[2](compressor[2](bytes(payload[HEADER_SIZE:])))
+        codec = f"{serializer[0]}+{compressor[0]}"
+    CacheMetrics.track_decode(cache_type, codec, time.perf_counter() - start)
+    return value
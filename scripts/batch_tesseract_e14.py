@@ -9,6 +9,12 @@ Usage:
     python scripts/batch_tesseract_e14.py                    # Process all
     python scripts/batch_tesseract_e14.py --limit 10         # Process 10
     python scripts/batch_tesseract_e14.py --resume           # Resume
+    python scripts/batch_tesseract_e14.py --workers 8        # 8 PDFs in parallel
+
+With --workers N, N PDFs are OCR'd concurrently, one tesseract process per
+worker. Each worker renders a single page at a time, so at most N page
+images are held in memory regardless of PDF size, and only 2*N PDFs are
+queued ahead of the workers.
 """
 import argparse
 import glob
@@ -17,10 +23,11 @@ import logging
 import os
 import sys
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from dataclasses import asdict
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 # Add backend to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
@@ -47,10 +54,16 @@ PROGRESS_FILE = os.path.expanduser("~/Downloads/Code/Proyectos/castor/output/tes
 class BatchTesseractProcessor:
     """Batch processor for E-14 PDFs using Tesseract."""
 
-    def __init__(self, pdf_dir: str, output_dir: str):
+    def __init__(self, pdf_dir: str, output_dir: str, workers: int = 1):
         self.pdf_dir = pdf_dir
         self.output_dir = output_dir
-        self.ocr = E14TesseractOCR()
+        self.workers = max(1, workers)
+        # With several PDFs in flight, parallelism comes from the file pool:
+        # each PDF is OCR'd one page at a time to keep one tesseract per worker.
+        if self.workers > 1:
+            self.ocr = E14TesseractOCR(workers=1)
+        else:
+            self.ocr = E14TesseractOCR()
 
         # Create output directory
         Path(self.output_dir).mkdir(parents=True, exist_ok=True)
@@ -87,6 +100,42 @@ class BatchTesseractProcessor:
         """Process a single PDF."""
         return self.ocr.process_pdf(pdf_path)
 
+    def _iter_results(self, pdf_files: List[str]) -> Iterator[Tuple[str, Optional[TesseractOCRResult], Optional[Exception]]]:
+        """
+        Yield (pdf_path, result, error) as PDFs finish.
+
+        Keeps at most 2 * workers PDFs submitted at a time so the queue (and
+        pending results) stays bounded on very large directories.
+        """
+        if self.workers == 1:
+            for pdf_path in pdf_files:
+                try:
+                    yield pdf_path, self.process_single(pdf_path), None
+                except Exception as e:
+                    yield pdf_path, None, e
+            return
+
+        files = iter(pdf_files)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            in_flight = {}
+            for pdf_path in files:
+                in_flight[pool.submit(self.process_single, pdf_path)] = pdf_path
+                if len(in_flight) >= 2 * self.workers:
+                    break
+
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pdf_path = in_flight.pop(future)
+                    try:
+                        yield pdf_path, future.result(), None
+                    except Exception as e:
+                        yield pdf_path, None, e
+
+                    next_path = next(files, None)
+                    if next_path is not None:
+                        in_flight[pool.submit(self.process_single, next_path)] = next_path
+
     def process_batch(
         self,
         limit: Optional[int] = None,
@@ -119,25 +168,34 @@ class BatchTesseractProcessor:
             logger.info("No files to process")
             return {"processed": 0}
 
-        logger.info(f"Processing {total_files} PDFs with Tesseract...")
+        logger.info(f"Processing {total_files} PDFs with Tesseract ({self.workers} workers)...")
         self.progress["started_at"] = datetime.now().isoformat()
+        batch_start = time.time()
 
         results = []
         success_count = 0
         failed_count = 0
         total_time = 0
+        done_count = 0
+
+        processed_set = set(self.progress.get("processed", []))
+        pending_files = [f for f in pdf_files if os.path.basename(f) not in processed_set]
 
-        for i, pdf_path in enumerate(pdf_files):
+        for pdf_path, result, error in self._iter_results(pending_files):
+            done_count += 1
             filename = os.path.basename(pdf_path)
 
-            # Skip already processed
-            if filename in self.progress.get("processed", []):
-                continue
+            logger.info(f"[{done_count}/{total_files}] Processed: {filename}")
 
-            logger.info(f"[{i+1}/{total_files}] Processing: {filename}")
+            if error is not None:
+                failed_count += 1
+                self.progress["failed"].append({
+                    "filename": filename,
+                    "error": str(error)
+                })
+                logger.error(f"  ✗ Error: {error}")
 
-            try:
-                result = self.process_single(pdf_path)
+            else:
                 results.append(result)
 
                 if result.success:
@@ -167,21 +225,13 @@ class BatchTesseractProcessor:
 
                 total_time += result.processing_time_ms / 1000
 
-            except Exception as e:
-                failed_count += 1
-                self.progress["failed"].append({
-                    "filename": filename,
-                    "error": str(e)
-                })
-                logger.error(f"  ✗ Error: {e}")
-
             # Save progress every 10 files
-            if (i + 1) % 10 == 0:
+            if done_count % 10 == 0:
                 self._save_progress()
-                avg_time = total_time / (i + 1)
-                remaining = total_files - (i + 1)
-                eta_min = (remaining * avg_time) / 60
-                logger.info(f"Progress: {i+1}/{total_files} | ETA: {eta_min:.1f} min")
+                elapsed = time.time() - batch_start
+                remaining = total_files - done_count
+                eta_min = (remaining * elapsed / done_count) / 60
+                logger.info(f"Progress: {done_count}/{total_files} | ETA: {eta_min:.1f} min")
 
         # Final save
         self.progress["completed_at"] = datetime.now().isoformat()
@@ -194,6 +244,8 @@ class BatchTesseractProcessor:
             "failed": failed_count,
             "total_time_seconds": total_time,
             "avg_time_per_pdf": total_time / max(len(results), 1),
+            "wall_time_seconds": time.time() - batch_start,
+            "workers": self.workers,
         }
 
         # Confidence stats
@@ -235,9 +287,14 @@ def main():
     parser.add_argument("--output-dir", default=OUTPUT_DIR)
     parser.add_argument("--limit", type=int, help="Max PDFs to process")
     parser.add_argument("--resume", action="store_true", help="Resume from last")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="PDFs processed in parallel (e.g. number of cores)")
 
     args = parser.parse_args()
 
+    # Pages or PDFs run one tesseract per worker: one core each, no OpenMP threads
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
     if not os.path.isdir(args.pdf_dir):
         logger.error(f"PDF directory not found: {args.pdf_dir}")
         sys.exit(1)
@@ -245,6 +302,7 @@ def main():
     processor = BatchTesseractProcessor(
         pdf_dir=args.pdf_dir,
         output_dir=args.output_dir,
+        workers=args.workers,
     )
 
     try:
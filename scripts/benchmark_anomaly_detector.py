@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark AnomalyDetector over the full E-14 scraper DB.
+
+All OCR-processed forms are loaded through E14DataService first (not
+timed), then each page is analyzed with the previous per-form path
+(analyze_e14 on every form) and with the column-wise path
+(analyze_columns). Both runs must produce the same anomalies.
+
+Usage:
+    python scripts/benchmark_anomaly_detector.py                        # Default scraper DB
+    python scripts/benchmark_anomaly_detector.py --db path/to/castor.db
+    python scripts/benchmark_anomaly_detector.py --synthetic 225000     # Generated DB
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from benchmark_e14_data_service import build_synthetic_db
+from services.agent.analyzers.anomaly_detector import AnomalyDetector, DetectedAnomaly
+from services.agent.e14_data_service import DB_PATH, E14DataService
+
+
+def run(
+    label: str,
+    pages: List[List[Dict[str, Any]]],
+    analyze: Callable[[List[Dict[str, Any]]], List[DetectedAnomaly]]
+) -> Dict[str, Any]:
+    forms = sum(len(page) for page in pages)
+    anomalies = []
+    start = time.perf_counter()
+    for page in pages:
+        anomalies.extend(analyze(page))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<22} {forms:>9,} forms  {len(anomalies):>9,} anomalies  {elapsed:8.2f}s  "
+          f"{forms / elapsed if elapsed else 0:>10,.0f} forms/s")
+    return {"anomalies": anomalies, "seconds": elapsed}
+
+
+def fingerprint(anomalies: List[DetectedAnomaly]) -> List[tuple]:
+    return [
+        (a.anomaly_type, a.severity, a.mesa_id, a.description, a.confidence, repr(a.details), a.affected_fields)
+        for a in anomalies
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-form vs column-wise anomaly detection")
+    parser.add_argument("--db", default=DB_PATH, help="Scraper SQLite DB")
+    parser.add_argument("--synthetic", type=int, help="Generate a temporary DB with N forms instead")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    # Scraper mesa_ids are not QR strings; keep per-form parse warnings out of the output
+    logging.getLogger("services.qr_parser").setLevel(logging.ERROR)
+
+    db_path = args.db
+    tmp_dir = None
+    if args.synthetic:
+        tmp_dir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(tmp_dir.name, "e14_bench.db")
+        print(f"Building synthetic DB with {args.synthetic:,} forms...")
+        build_synthetic_db(db_path, args.synthetic)
+    elif not os.path.exists(db_path):
+        print(f"DB not found: {db_path}")
+        sys.exit(1)
+
+    service = E14DataService(db_path=db_path)
+    print(f"DB: {db_path} | OCR forms: {service.count_forms():,} | batch size: {args.batch_size}")
+    pages = list(service.iterate_all_forms(batch_size=args.batch_size))
+
+    per_form_detector = AnomalyDetector()
+    before = run(
+        "before (per form)",
+        pages,
+        lambda page: [a for form in page for a in per_form_detector.analyze_e14(form)],
+    )
+    after = run("after (columns)", pages, AnomalyDetector().analyze_columns)
+
+    if fingerprint(before["anomalies"]) != fingerprint(after["anomalies"]):
+        print("WARNING: implementations returned different anomalies")
+    print(f"by type: {dict(Counter(a.anomaly_type.value for a in after['anomalies']))}")
+    print(f"Speedup: {before['seconds'] / after['seconds']:.1f}x")
+
+    if tmp_dir:
+        tmp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
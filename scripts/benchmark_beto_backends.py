@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Accuracy parity and CPU throughput of the BETO inference backends.
+
+Parity compares each backend's probabilities with fp32 on a fixed corpus
+of Spanish political tweets. The throughput run scores the corpus
+(repeated to --texts) through model_singleton.predict_probabilities, the
+path used by SentimentService.
+
+Usage:
+    python scripts/benchmark_beto_backends.py
+    python scripts/benchmark_beto_backends.py --backends fp32 int8 --texts 2000 --threads 16
+    python scripts/benchmark_beto_backends.py --model path/to/beto --max-diff 0.05
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+PARITY_CORPUS = [
+    "Excelente debate anoche, por fin propuestas claras sobre empleo y educación",
+    "Qué vergüenza otra vez los mismos corruptos pidiendo el voto",
+    "Mañana es la jornada electoral, recuerden llevar la cédula",
+    "La reforma tributaria va a golpear a la clase media, así no",
+    "Gracias a todos los que salieron a votar, la democracia se construye entre todos",
+    "No creo en ninguno de los candidatos, todos prometen lo mismo",
+    "Felicitaciones al nuevo alcalde de Medellín, mucha suerte en su gestión",
+    "Los jurados de la mesa 12 no llegaron y nadie da razón",
+    "El transporte público en Bogotá es un desastre y nadie hace nada",
+    "Hoy se publicaron los resultados del preconteo en la Registraduría",
+    "Me encantó la propuesta de seguridad rural, ojalá la cumplan",
+    "Denuncian compra de votos en varios municipios del Cauca",
+    "La participación en Antioquia superó el 60 por ciento",
+    "Estoy cansado de la polarización, necesitamos acuerdos",
+    "Gran noticia: más inversión en salud para los hospitales públicos",
+    "Otra promesa incumplida, la vía al mar sigue sin terminar",
+    "El candidato presentó su plan de gobierno en Cali",
+    "Qué orgullo ver a tantos jóvenes votando por primera vez",
+    "Esto es un fraude, exigimos reconteo de los votos",
+    "La Registraduría informó que el 95% de las mesas ya fueron informadas",
+    "Muy buena la iniciativa de presupuestos participativos",
+    "Nos siguen matando líderes sociales y el gobierno en silencio",
+    "El debate de hoy será a las 8 pm por televisión nacional",
+    "Apoyo total a la paz total, es el camino",
+    "La inflación nos está ahogando, el mercado cada vez más caro",
+    "Se instalaron las mesas de votación sin contratiempos",
+    "Terrible la gestión del concejo, ni un parque arreglaron",
+    "Agradecido con los testigos electorales que cuidaron cada voto",
+    "El Senado aprobó en primer debate el proyecto de ley",
+    "Nadie me representa en estas elecciones",
+    "Buenísima la propuesta de energías limpias para La Guajira",
+    "Los escrutinios avanzan con normalidad en Barranquilla",
+    "Indignante que usen recursos públicos para hacer campaña",
+    "Hoy votamos con esperanza por un país más justo",
+    "El formulario E-14 de mi mesa tiene tachones, ¿a quién reporto?",
+    "Seguimos a la espera del boletín número 10",
+    "Qué alegría el triunfo, ahora a trabajar por la región",
+    "Sin agua potable en pleno 2026, qué abandono",
+    "La encuesta muestra un empate técnico entre los dos primeros",
+    "Mi voto es secreto pero mi apoyo a la educación pública no",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark BETO CPU backends")
+    parser.add_argument("--model", help="BETO model path (default: Config.BETO_MODEL_PATH)")
+    parser.add_argument("--backends", nargs="+", default=["fp32", "int8", "onnx"])
+    parser.add_argument("--texts", type=int, default=1000, help="Texts scored per backend in the throughput run")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--threads", type=int, default=0, help="Intra-op threads (0 = library default)")
+    parser.add_argument("--max-diff", type=float, default=0.05, help="Max probability difference allowed vs fp32")
+    args = parser.parse_args()
+
+    if args.model:
+        os.environ["BETO_MODEL_PATH"] = args.model
+    if args.threads:
+        os.environ["BETO_TORCH_THREADS"] = str(args.threads)
+
+    from services.beto_backends import compare_backends
+    from services.model_singleton import get_beto_model, predict_probabilities
+
+    print("Parity vs fp32 on", len(PARITY_CORPUS), "tweets")
+    report = compare_backends(PARITY_CORPUS, tuple(args.backends))
+    failed = []
+    for backend, stats in report.items():
+        ok = stats["max_abs_diff"] <= args.max_diff
+        if not ok:
+            failed.append(backend)
+        print(f"  {backend:<5} max diff {stats['max_abs_diff']:.4f}  mean diff {stats['mean_abs_diff']:.5f}  "
+              f"label agreement {stats['label_agreement']:.1%}  {'OK' if ok else 'FAIL'}")
+
+    corpus = (PARITY_CORPUS * (args.texts // len(PARITY_CORPUS) + 1))[:args.texts]
+    print(f"\nThroughput on {len(corpus):,} texts (batch size {args.batch_size})")
+    baseline = None
+    for backend in args.backends:
+        get_beto_model(backend)
+        predict_probabilities(corpus[:args.batch_size], batch_size=args.batch_size, backend=backend)  # warm-up
+
+        single_start = time.perf_counter()
+        for text in corpus[:100]:
+            predict_probabilities([text], backend=backend)
+        single_latency = (time.perf_counter() - single_start) / 100
+
+        start = time.perf_counter()
+        predict_probabilities(corpus, batch_size=args.batch_size, backend=backend)
+        throughput = len(corpus) / (time.perf_counter() - start)
+        baseline = baseline or throughput
+        print(f"  {backend:<5} {throughput:8.1f} texts/s ({throughput / baseline:.2f}x)  "
+              f"single-text latency {single_latency * 1000:.1f} ms")
+
+    if failed:
+        print(f"\nParity check failed for: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Benchmark full iteration of the E-14 scraper DB through E14DataService.
+
+Compares the previous access pattern (LIMIT/OFFSET pages plus one votes
+query per form) with the current one (keyset pages on id plus one votes
+query per page).
+
+Usage:
+    python scripts/benchmark_e14_data_service.py                        # Default scraper DB
+    python scripts/benchmark_e14_data_service.py --db path/to/castor.db
+    python scripts/benchmark_e14_data_service.py --synthetic 225000     # Generated DB
+"""
+import argparse
+import logging
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from services.agent.e14_data_service import DB_PATH, E14DataService
+
+PARTIES = [
+    "PARTIDO LIBERAL", "PARTIDO CONSERVADOR", "CAMBIO RADICAL", "CENTRO DEMOCRATICO",
+    "PARTIDO DE LA U", "ALIANZA VERDE", "PACTO HISTORICO", "MIRA",
+    "COALICION ESPERANZA", "NUEVO LIBERALISMO",
+]
+
+
+def build_synthetic_db(db_path: str, forms: int, votes_per_form: int = 10) -> None:
+    """Create a scraper-shaped DB with `forms` OCR-processed forms."""
+    rng = random.Random(42)
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE TABLE e14_scraper_forms (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            mesa_id TEXT UNIQUE NOT NULL,
+            pdf_path TEXT NOT NULL,
+            filename TEXT NOT NULL,
+            corporacion TEXT NOT NULL,
+            departamento TEXT NOT NULL,
+            municipio TEXT NOT NULL,
+            zona_cod TEXT,
+            puesto_cod TEXT,
+            mesa_num TEXT,
+            ocr_processed INTEGER DEFAULT 0,
+            ocr_confidence REAL DEFAULT 0,
+            total_votos INTEGER DEFAULT 0,
+            votos_blancos INTEGER DEFAULT 0,
+            votos_nulos INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            ocr_at TIMESTAMP
+        );
+        CREATE TABLE e14_scraper_votes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            form_id INTEGER REFERENCES e14_scraper_forms(id) ON DELETE CASCADE,
+            party_name TEXT NOT NULL,
+            party_code TEXT,
+            votes INTEGER DEFAULT 0,
+            confidence REAL DEFAULT 0,
+            needs_review INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE INDEX idx_scraper_forms_ocr ON e14_scraper_forms(ocr_processed);
+        CREATE INDEX idx_scraper_votes_form ON e14_scraper_votes(form_id);
+    """)
+    for form_id in range(1, forms + 1):
+        votes = [rng.randint(0, 120) for _ in range(votes_per_form)]
+        conn.execute(
+            """
+            INSERT INTO e14_scraper_forms
+                (id, mesa_id, pdf_path, filename, corporacion, departamento, municipio,
+                 zona_cod, puesto_cod, mesa_num, ocr_processed, ocr_confidence,
+                 total_votos, votos_blancos, votos_nulos)
+            VALUES (?, ?, '', ?, 'SENADO', 'ANTIOQUIA', 'MEDELLIN', '01', '02', ?, 1, 0.9, ?, 3, 2)
+            """,
+            (form_id, f"SEN-ANTIOQUIA-MEDELLIN-01-{form_id // 40:03d}-{form_id % 40}", f"{form_id}.pdf",
+             str(form_id % 40), sum(votes) + 5),
+        )
+        conn.executemany(
+            "INSERT INTO e14_scraper_votes (form_id, party_name, party_code, votes, confidence) "
+            "VALUES (?, ?, ?, ?, 0.9)",
+            [(form_id, PARTIES[i % len(PARTIES)], f"{i:04d}", v) for i, v in enumerate(votes)],
+        )
+    conn.commit()
+    conn.close()
+
+
+def iterate_offset_n_plus_one(service: E14DataService, batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Previous implementation: OFFSET pagination and a votes query per form."""
+    offset = 0
+    while True:
+        conn = service._get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT
+                f.id, f.mesa_id, f.filename, f.corporacion, f.departamento,
+                f.municipio, f.zona_cod, f.puesto_cod, f.mesa_num,
+                f.ocr_processed, f.ocr_confidence, f.total_votos,
+                f.votos_blancos, f.votos_nulos, f.created_at
+            FROM e14_scraper_forms f
+            WHERE f.ocr_processed = 1
+            ORDER BY f.id
+            LIMIT ? OFFSET ?
+            """,
+            (batch_size, offset),
+        )
+        batch = []
+        for row in cursor.fetchall():
+            cursor.execute(
+                """
+                SELECT party_name, party_code, votes, confidence, needs_review
+                FROM e14_scraper_votes
+                WHERE form_id = ?
+                """,
+                (row['id'],),
+            )
+            batch.append(service._convert_to_agent_format(dict(row), cursor.fetchall()))
+        conn.close()
+        if not batch:
+            break
+        yield batch
+        offset += batch_size
+
+
+def run(label: str, batches: Iterator[List[Dict[str, Any]]]) -> Dict[str, float]:
+    start = time.perf_counter()
+    forms = 0
+    votes = 0
+    for batch in batches:
+        forms += len(batch)
+        votes += sum(len(f['ocr_fields']) for f in batch)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {forms:>9,} forms  {votes:>10,} fields  {elapsed:8.2f}s  "
+          f"{forms / elapsed if elapsed else 0:>10,.0f} forms/s")
+    return {"forms": forms, "fields": votes, "seconds": elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark E14DataService full-DB iteration")
+    parser.add_argument("--db", default=DB_PATH, help="Scraper SQLite DB")
+    parser.add_argument("--synthetic", type=int, help="Generate a temporary DB with N forms instead")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--skip-before", action="store_true", help="Only time the current implementation")
+    args = parser.parse_args()
+
+    # Scraper mesa_ids are not QR strings; keep per-form parse warnings out of the timings
+    logging.getLogger("services.qr_parser").setLevel(logging.ERROR)
+
+    db_path = args.db
+    tmp_dir = None
+    if args.synthetic:
+        tmp_dir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(tmp_dir.name, "e14_bench.db")
+        print(f"Building synthetic DB with {args.synthetic:,} forms...")
+        build_synthetic_db(db_path, args.synthetic)
+    elif not os.path.exists(db_path):
+        print(f"DB not found: {db_path}")
+        sys.exit(1)
+
+    service = E14DataService(db_path=db_path)
+    print(f"DB: {db_path} | OCR forms: {service.count_forms():,} | batch size: {args.batch_size}")
+
+    after = run("after (keyset + IN)", service.iterate_all_forms(batch_size=args.batch_size))
+    if not args.skip_before:
+        before = run("before (OFFSET + N+1)", iterate_offset_n_plus_one(service, args.batch_size))
+        if before["fields"] != after["fields"]:
+            print("WARNING: implementations returned different field counts")
+        print(f"Speedup: {before['seconds'] / after['seconds']:.1f}x")
+
+    if tmp_dir:
+        tmp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark ForecastService.calculate_icce on a synthetic tweet corpus.
+
+The Twitter and sentiment services are replaced by in-memory generators
+(sentiment is a hash of the text), so the timings cover date parsing,
+day bucketing, gap filling, EMA/momentum and the Holt-Winters forecast,
+not BETO or the Twitter API.
+
+Usage:
+    python scripts/benchmark_forecast_icce.py
+    python scripts/benchmark_forecast_icce.py --tweets 200000 --days 90
+"""
+import argparse
+import random
+import sys
+import time
+import zlib
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from app.services.forecast_service import ForecastService, clear_icce_cache
+
+SENTIMENTS = [
+    SimpleNamespace(positive=0.7, negative=0.1, neutral=0.2),
+    SimpleNamespace(positive=0.1, negative=0.7, neutral=0.2),
+    SimpleNamespace(positive=0.3, negative=0.3, neutral=0.4),
+]
+
+
+class SyntheticTwitterService:
+    """Returns the candidate or the full corpus regardless of max_results."""
+
+    def __init__(self, candidate: List[Dict[str, Any]], total: List[Dict[str, Any]]):
+        self.candidate = candidate
+        self.total = total
+
+    def search_by_pnd_topic(self, candidate_name=None, politician=None, **kwargs):
+        return self.candidate if candidate_name or politician else self.total
+
+
+class HashSentimentService:
+    """Deterministic sentiment that counts calls per entry point."""
+
+    def __init__(self):
+        self.calls = {"analyze_sentiment": 0, "analyze_batch": 0}
+
+    def analyze_sentiment(self, text: str):
+        self.calls["analyze_sentiment"] += 1
+        return SENTIMENTS[zlib.crc32(text.encode("utf-8")) % 3]
+
+    def analyze_batch(self, texts: List[str]):
+        self.calls["analyze_batch"] += 1
+        return [SENTIMENTS[zlib.crc32(text.encode("utf-8")) % 3] for text in texts]
+
+
+def build_corpus(tweets: int, days: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """Tweets spread over the last `days` days with ISO-8601 created_at strings."""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    corpus = []
+    for i in range(tweets):
+        created = now - timedelta(seconds=rng.randrange(days * 86400))
+        corpus.append({
+            "text": f"Tweet {i} sobre el candidato {rng.randrange(2000)}",
+            "created_at": created.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        })
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the ICCE engine")
+    parser.add_argument("--tweets", type=int, default=50000, help="Tweets in the total conversation")
+    parser.add_argument("--candidate-share", type=float, default=0.4, help="Share of tweets about the candidate")
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    total = build_corpus(args.tweets, args.days)
+    candidate = total[:int(args.tweets * args.candidate_share)]
+    sentiment = HashSentimentService()
+    service = ForecastService(SyntheticTwitterService(candidate, total), sentiment)
+    print(f"Corpus: {len(total):,} tweets over {args.days} days, {len(candidate):,} about the candidate")
+
+    timings = []
+    for _ in range(args.repeat):
+        clear_icce_cache()
+        start = time.perf_counter()
+        icce = service.calculate_icce("Bogotá", candidate_name="Candidato", days_back=args.days)
+        timings.append(time.perf_counter() - start)
+    print(f"  calculate_icce (cold)     {min(timings) * 1000:8.1f} ms  ({len(icce)} days)")
+    print(f"  sentiment calls per run   analyze_batch={sentiment.calls['analyze_batch'] // args.repeat} "
+          f"analyze_sentiment={sentiment.calls['analyze_sentiment'] // args.repeat}")
+
+    start = time.perf_counter()
+    for _ in range(100):
+        service.calculate_icce("Bogotá", candidate_name="Candidato", days_back=args.days)
+    print(f"  calculate_icce (memoized) {(time.perf_counter() - start) * 10:8.3f} ms")
+
+    start = time.perf_counter()
+    for _ in range(100):
+        service.calculate_momentum(icce)
+        service.forecast_icce(icce, forecast_days=14)
+    print(f"  momentum + forecast       {(time.perf_counter() - start) * 10:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
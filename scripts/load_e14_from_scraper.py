@@ -29,6 +29,8 @@ from typing import Any, Dict, List, Optional, Tuple
 # Add backend to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
 
+from services.e14_geo_keys import geo_key, migrate_geo_keys
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
@@ -173,7 +175,9 @@ def init_database(db_path: str):
             votos_blancos INTEGER DEFAULT 0,
             votos_nulos INTEGER DEFAULT 0,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            ocr_at TIMESTAMP
+            ocr_at TIMESTAMP,
+            dept_key TEXT,
+            muni_key TEXT
         );
 
         -- E-14 Party Votes from scraper
@@ -218,8 +222,15 @@ def init_database(db_path: str):
         GROUP BY party_name
         ORDER BY total_votes DESC;
     """)
-
     conn.commit()
+
+    # Backfill dept_key/muni_key and create the drill-down indexes
+    migrate_geo_keys(conn)
+
+    # Trigger-maintained aggregates read by /api/e14-data
+    from services.e14_aggregates import init_aggregates
+    init_aggregates(conn)
+
     conn.close()
     logger.info(f"Database initialized: {db_path}")
 
@@ -243,8 +254,8 @@ def load_forms_to_db(forms: List[E14Form], db_path: str, batch_size: int = 1000)
                 cursor.execute("""
                     INSERT OR IGNORE INTO e14_scraper_forms
                     (mesa_id, pdf_path, filename, corporacion, departamento,
-                     municipio, zona_cod, puesto_cod, mesa_num)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                     municipio, zona_cod, puesto_cod, mesa_num, dept_key, muni_key)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """, (
                     form.mesa_id,
                     form.pdf_path,
@@ -255,6 +266,8 @@ def load_forms_to_db(forms: List[E14Form], db_path: str, batch_size: int = 1000)
                     form.zona_cod,
                     form.puesto_cod,
                     form.mesa_num,
+                    geo_key(form.departamento),
+                    geo_key(form.municipio),
                 ))
 
                 if cursor.rowcount > 0:
@@ -1063,10 +1063,13 @@ def rag_e14_search():
         "query": "votos Vicky Dávila",
         "top_k": 10,
         "departamento": "ANTIOQUIA",
-        "municipio": null,
+        "municipio": ["MEDELLIN", "ENVIGADO"],
         "corporacion": "PRESIDENCIA",
-        "party_name": "Valientes"
+        "party_name": "Valientes",
+        "mesa_id": null
     }
+
+    Los filtros aceptan un valor o una lista de valores.
     """
     try:
         payload = request.get_json() or {}
@@ -1083,6 +1086,7 @@ def rag_e14_search():
         municipio = payload.get("municipio")
         corporacion = payload.get("corporacion")
         party_name = payload.get("party_name")
+        mesa_id = payload.get("mesa_id")
 
         rag = get_rag()
         if rag is None:
@@ -1098,7 +1102,8 @@ def rag_e14_search():
             departamento=departamento,
             municipio=municipio,
             corporacion=corporacion,
-            party_name=party_name
+            party_name=party_name,
+            mesa_id=mesa_id
         )
 
         documents = [
@@ -1119,7 +1124,8 @@ def rag_e14_search():
                 "departamento": departamento,
                 "municipio": municipio,
                 "corporacion": corporacion,
-                "party_name": party_name
+                "party_name": party_name,
+                "mesa_id": mesa_id
             },
             "results": documents,
             "total_found": len(documents)
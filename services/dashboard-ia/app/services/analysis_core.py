@@ -212,10 +212,7 @@ class AnalysisCorePipeline:
                         tweet_copy['sentiment_label'] = tweet_copy['dominant_sentiment']
                     tweets_to_save.append(tweet_copy)
 
-                # Guardar tweets
-                self.db_service.save_tweets(api_call.id, tweets_to_save)
-
-                # Guardar analysis snapshot
+                # Analysis snapshot
                 snapshot_data = {
                     'icce': narrative_metrics_result.get('icce', 50) if narrative_metrics_result else 50,
                     'sov': narrative_metrics_result.get('sov', 0) if narrative_metrics_result else 0,
@@ -228,11 +225,10 @@ class AnalysisCorePipeline:
                     'executive_summary': f"Análisis de {len(tweets_with_sentiment)} tweets sobre {candidate_name or 'tema general'}",
                     'trending_topics': [trending_topic.get("topic")] if trending_topic and isinstance(trending_topic, dict) else []
                 }
-                self.db_service.save_analysis_snapshot(api_call.id, snapshot_data)
 
-                # Guardar PND metrics (métricas por eje temático)
+                # PND metrics (métricas por eje temático)
+                pnd_metrics_to_save = []
                 if topics_analysis:
-                    pnd_metrics_to_save = []
                     for topic_data in topics_analysis:
                         # topic_data puede ser TopicAnalysis o dict
                         if hasattr(topic_data, 'model_dump'):
@@ -280,9 +276,13 @@ class AnalysisCorePipeline:
                             'sample_tweets': [t.get('content', '')[:200] for t in topic_tweets[:3]]
                         })
 
-                    if pnd_metrics_to_save:
-                        self.db_service.save_pnd_metrics(api_call.id, pnd_metrics_to_save)
-                        logger.info(f"Saved {len(pnd_metrics_to_save)} PND metrics for API call {api_call.id}")
+                # Tweets, snapshot y PND metrics en una sola transacción
+                self.db_service.save_analysis_results(
+                    api_call.id,
+                    tweets_data=tweets_to_save,
+                    snapshot_data=snapshot_data,
+                    pnd_metrics=pnd_metrics_to_save
+                )
 
                 # Actualizar status
                 self.db_service.update_api_call_status(
@@ -47,6 +47,9 @@ class Config:
     DB_POOL_SIZE: int = int(os.getenv('DB_POOL_SIZE', '10'))
     DB_MAX_OVERFLOW: int = int(os.getenv('DB_MAX_OVERFLOW', '20'))
     DB_POOL_TIMEOUT: int = int(os.getenv('DB_POOL_TIMEOUT', '30'))
+    # Bulk tweet writes (services/tweet_bulk_writer.py)
+    DB_BULK_CHUNK_SIZE: int = int(os.getenv('DB_BULK_CHUNK_SIZE', '500'))
+    DB_COPY_MIN_ROWS: int = int(os.getenv('DB_COPY_MIN_ROWS', '1000'))  # PostgreSQL COPY threshold
 
     # Redis
     REDIS_URL: Optional[str] = os.getenv('REDIS_URL', 'redis://localhost:6379/2')
@@ -72,6 +75,15 @@ class Config:
     OPENAI_EMBEDDING_MODEL: str = os.getenv('OPENAI_EMBEDDING_MODEL', 'text-embedding-3-small')
     OPENAI_TIMEOUT_SECONDS: int = int(os.getenv('OPENAI_TIMEOUT_SECONDS', '60'))
 
+    # RAG vector index (exact = brute-force matmul, ivf = approximate; nprobe is the recall knob)
+    RAG_INDEX_MODE: str = os.getenv('RAG_INDEX_MODE', 'exact')
+    RAG_IVF_NLIST: int = int(os.getenv('RAG_IVF_NLIST', '0'))  # 0 = sqrt(documents)
+    RAG_IVF_NPROBE: int = int(os.getenv('RAG_IVF_NPROBE', '8'))
+    RAG_EMBEDDING_PRECISION: str = os.getenv('RAG_EMBEDDING_PRECISION', 'float32')  # float32 | float16 | int8
+    RAG_EMBED_BATCH_SIZE: int = int(os.getenv('RAG_EMBED_BATCH_SIZE', '512'))  # texts per embeddings request
+    RAG_EMBED_CONCURRENCY: int = int(os.getenv('RAG_EMBED_CONCURRENCY', '4'))
+    RAG_EMBED_MAX_RETRIES: int = int(os.getenv('RAG_EMBED_MAX_RETRIES', '3'))
+
     # Anthropic Claude (fallback)
     ANTHROPIC_API_KEY: Optional[str] = os.getenv('ANTHROPIC_API_KEY')
     CLAUDE_MODEL: str = os.getenv('CLAUDE_MODEL', 'claude-3-5-sonnet-20241022')
@@ -95,6 +107,20 @@ class Config:
     OPENAI_CACHE_TTL: int = int(os.getenv('OPENAI_CACHE_TTL', '1800'))
     TRENDING_CACHE_TTL: int = int(os.getenv('TRENDING_CACHE_TTL', '600'))
     TRENDING_CACHE_STALE_TTL: int = int(os.getenv('TRENDING_CACHE_STALE_TTL', '300'))
+    # Incremental trending engine (hourly count-min sketches per location)
+    TRENDING_WINDOW_HOURS: int = int(os.getenv('TRENDING_WINDOW_HOURS', '24'))
+    TRENDING_SKETCH_WIDTH: int = int(os.getenv('TRENDING_SKETCH_WIDTH', '1024'))
+    TRENDING_SKETCH_DEPTH: int = int(os.getenv('TRENDING_SKETCH_DEPTH', '4'))
+    TRENDING_CANDIDATES: int = int(os.getenv('TRENDING_CANDIDATES', '512'))
+    TRENDING_RECENT_TWEETS: int = int(os.getenv('TRENDING_RECENT_TWEETS', '2000'))
+    FORECAST_ICCE_CACHE_TTL: int = int(os.getenv('FORECAST_ICCE_CACHE_TTL', '120'))
+    # @cached single-flight: lock lease / max wait for another worker's result, TTL jitter fraction
+    CACHE_LOCK_TIMEOUT: float = float(os.getenv('CACHE_LOCK_TIMEOUT', '60'))
+    CACHE_TTL_JITTER: float = float(os.getenv('CACHE_TTL_JITTER', '0.1'))
+    # Cached payload codec (utils/codec.py): auto picks msgpack > orjson > json, zstd > lz4 > none
+    CACHE_SERIALIZER: str = os.getenv('CACHE_SERIALIZER', 'auto')
+    CACHE_COMPRESSION: str = os.getenv('CACHE_COMPRESSION', 'auto')
+    CACHE_COMPRESS_MIN_BYTES: int = int(os.getenv('CACHE_COMPRESS_MIN_BYTES', '1024'))
 
     # Cache Settings
     CACHE_MAX_SIZE: int = int(os.getenv('CACHE_MAX_SIZE', '1000'))
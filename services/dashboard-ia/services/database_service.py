@@ -5,6 +5,7 @@ Main service delegating to domain-specific repositories.
 import logging
 from typing import Optional, Dict, Any, List, Generator
 
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from models.database import User, TrendingTopic, CampaignAction, Lead, ApiCall
@@ -17,6 +18,7 @@ from .db_campaign_repository import CampaignRepository
 from .db_api_call_repository import ApiCallRepository
 from .db_tweet_repository import TweetRepository
 from .db_snapshot_repository import SnapshotRepository
+from .tweet_bulk_writer import bulk_upsert_tweets
 
 logger = logging.getLogger(__name__)
 
@@ -154,6 +156,10 @@ class DatabaseService(DatabaseBase):
         """Save trending topic."""
         return self._campaigns.save_trending_topic(topic_data)
 
+    def save_trending_topics(self, location: str, topics: List[Dict[str, Any]]) -> List[str]:
+        """Upsert the current trending topics of a location in one transaction."""
+        return self._campaigns.save_trending_topics(location, topics)
+
     def get_active_trending_topics(self, location: Optional[str] = None, limit: int = 10) -> List[TrendingTopic]:
         """Get active trending topics."""
         return self._campaigns.get_active_trending_topics(location, limit)
@@ -250,6 +256,47 @@ class DatabaseService(DatabaseBase):
         """Save multiple tweets to database. Returns count of tweets saved."""
         return self._tweets.save_tweets(api_call_id, tweets_data)
 
+    def save_analysis_results(
+        self,
+        api_call_id: str,
+        tweets_data: Optional[List[Dict[str, Any]]] = None,
+        snapshot_data: Optional[Dict[str, Any]] = None,
+        pnd_metrics: Optional[List[Dict[str, Any]]] = None,
+        forecast_data: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Save tweets, analysis snapshot, PND metrics and forecast of an API call
+        in one transaction; nothing is written if any part fails.
+
+        Returns:
+            Dict with 'tweets' and 'pnd_metrics' counts and 'snapshot_id' /
+            'forecast_id', or None on error
+        """
+        session = self.get_session()
+        try:
+            result: Dict[str, Any] = {'tweets': 0, 'snapshot_id': None, 'pnd_metrics': 0, 'forecast_id': None}
+            if tweets_data:
+                result['tweets'] = bulk_upsert_tweets(session.connection(), api_call_id, tweets_data)
+            snapshots = self._snapshots
+            snapshot = snapshots.build_analysis_snapshot(api_call_id, snapshot_data) if snapshot_data else None
+            metrics = snapshots.build_pnd_metrics(api_call_id, pnd_metrics or [])
+            forecast = snapshots.build_forecast_snapshot(api_call_id, forecast_data) if forecast_data else None
+            session.add_all([obj for obj in (snapshot, forecast) if obj is not None] + metrics)
+            session.flush()
+
+            result['snapshot_id'] = snapshot.id if snapshot else None
+            result['pnd_metrics'] = len(metrics)
+            result['forecast_id'] = forecast.id if forecast else None
+            session.commit()
+            logger.info(f"Saved analysis results for API call {api_call_id}: {result}")
+            return result
+        except SQLAlchemyError as e:
+            session.rollback()
+            logger.error(f"Error saving analysis results: {e}", exc_info=True)
+            return None
+        finally:
+            session.close()
+
     def get_tweets_by_api_call(
         self,
         api_call_id: str,
@@ -12,6 +12,8 @@ from sqlalchemy.orm import sessionmaker, Session
 from config import Config
 from models.database import Base
 
+from .tweet_bulk_writer import migrate_upsert_index
+
 logger = logging.getLogger(__name__)
 
 
@@ -42,9 +44,10 @@ class DatabaseBase:
         self.SessionLocal = sessionmaker(bind=self.engine, autocommit=False, autoflush=False)
 
     def init_db(self):
-        """Initialize database tables."""
+        """Initialize database tables (and the tweet upsert index on existing tables)."""
         try:
             Base.metadata.create_all(bind=self.engine)
+            migrate_upsert_index(self.engine)
             logger.info("Database tables created")
         except Exception as e:
             logger.error(f"Error initializing database: {e}", exc_info=True)
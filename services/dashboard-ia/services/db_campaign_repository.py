@@ -39,6 +39,51 @@ class CampaignRepository:
         finally:
             session.close()
 
+    def save_trending_topics(self, location: str, topics: List[Dict[str, Any]]) -> List[str]:
+        """
+        Upsert the current trending topics of a location in one transaction.
+
+        Active rows with the same (location, topic) are updated in place, new
+        topics are inserted and active topics no longer trending are
+        deactivated. Returns the ids in the order of topics.
+        """
+        session = self._db.get_session()
+        try:
+            active: Dict[str, TrendingTopic] = {}
+            for row in session.query(TrendingTopic).filter(
+                TrendingTopic.location == location,
+                TrendingTopic.is_active.is_(True)
+            ):
+                if row.topic in active:
+                    row.is_active = False  # Duplicate from per-topic inserts
+                else:
+                    active[row.topic] = row
+
+            rows = []
+            for topic_data in topics:
+                row = active.pop(topic_data['topic'], None)
+                if row is None:
+                    row = TrendingTopic(**topic_data)
+                    session.add(row)
+                else:
+                    for field, value in topic_data.items():
+                        setattr(row, field, value)
+                rows.append(row)
+            for row in active.values():
+                row.is_active = False
+
+            session.flush()
+            topic_ids = [str(row.id) for row in rows]
+            session.commit()
+            logger.info(f"Trending topics saved for {location}: {len(topic_ids)}")
+            return topic_ids
+        except SQLAlchemyError as e:
+            session.rollback()
+            logger.error(f"Error saving trending topics: {e}", exc_info=True)
+            return []
+        finally:
+            session.close()
+
     def get_active_trending_topics(
         self,
         location: Optional[str] = None,
@@ -27,25 +27,7 @@ class SnapshotRepository:
         """Save analysis snapshot (aggregated metrics)."""
         session = self._db.get_session()
         try:
-            snapshot = AnalysisSnapshot(
-                api_call_id=api_call_id,
-                icce=snapshot_data.get('icce', 0.0),
-                sov=snapshot_data.get('sov', 0.0),
-                sna=snapshot_data.get('sna', 0.0),
-                momentum=snapshot_data.get('momentum', 0.0),
-                sentiment_positive=snapshot_data.get('sentiment_positive', 0.0),
-                sentiment_negative=snapshot_data.get('sentiment_negative', 0.0),
-                sentiment_neutral=snapshot_data.get('sentiment_neutral', 0.0),
-                executive_summary=snapshot_data.get('executive_summary'),
-                key_findings=snapshot_data.get('key_findings', []),
-                key_stats=snapshot_data.get('key_stats', []),
-                recommendations=snapshot_data.get('recommendations', []),
-                trending_topics=snapshot_data.get('trending_topics', []),
-                geo_distribution=snapshot_data.get('geo_distribution', []),
-                opportunity=snapshot_data.get('opportunity'),
-                risk_level=snapshot_data.get('risk_level'),
-                risk_description=snapshot_data.get('risk_description')
-            )
+            snapshot = self.build_analysis_snapshot(api_call_id, snapshot_data)
             session.add(snapshot)
             session.commit()
             session.refresh(snapshot)
@@ -65,27 +47,10 @@ class SnapshotRepository:
     ) -> int:
         """Save PND axis metrics. Returns count saved."""
         session = self._db.get_session()
-        saved_count = 0
         try:
-            for metric_data in pnd_metrics:
-                metric = PndAxisMetric(
-                    api_call_id=api_call_id,
-                    pnd_axis=metric_data.get('pnd_axis', ''),
-                    pnd_axis_display=metric_data.get('pnd_axis_display'),
-                    icce=metric_data.get('icce', 0.0),
-                    sov=metric_data.get('sov', 0.0),
-                    sna=metric_data.get('sna', 0.0),
-                    tweet_count=metric_data.get('tweet_count', 0),
-                    trend=metric_data.get('trend'),
-                    trend_change=metric_data.get('trend_change', 0.0),
-                    sentiment_positive=metric_data.get('sentiment_positive', 0.0),
-                    sentiment_negative=metric_data.get('sentiment_negative', 0.0),
-                    sentiment_neutral=metric_data.get('sentiment_neutral', 0.0),
-                    key_insights=metric_data.get('key_insights', []),
-                    sample_tweets=metric_data.get('sample_tweets', [])
-                )
-                session.add(metric)
-                saved_count += 1
+            metrics = self.build_pnd_metrics(api_call_id, pnd_metrics)
+            session.add_all(metrics)
+            saved_count = len(metrics)
 
             session.commit()
             logger.info(f"Saved {saved_count} PND metrics for API call {api_call_id}")
@@ -105,24 +70,7 @@ class SnapshotRepository:
         """Save forecast snapshot."""
         session = self._db.get_session()
         try:
-            forecast = ForecastSnapshot(
-                api_call_id=api_call_id,
-                historical_dates=forecast_data.get('historical_dates', []),
-                icce_values=forecast_data.get('icce_values', []),
-                icce_smooth=forecast_data.get('icce_smooth', []),
-                momentum_values=forecast_data.get('momentum_values', []),
-                forecast_dates=forecast_data.get('forecast_dates', []),
-                icce_pred=forecast_data.get('icce_pred', []),
-                pred_low=forecast_data.get('pred_low', []),
-                pred_high=forecast_data.get('pred_high', []),
-                model_type=forecast_data.get('model_type', 'holt_winters'),
-                model_confidence=forecast_data.get('model_confidence', 0.0),
-                days_back=forecast_data.get('days_back', 30),
-                forecast_days=forecast_data.get('forecast_days', 14),
-                icce_current=forecast_data.get('icce_current', 0.0),
-                icce_predicted_end=forecast_data.get('icce_predicted_end', 0.0),
-                icce_change_predicted=forecast_data.get('icce_change_predicted', 0.0)
-            )
+            forecast = self.build_forecast_snapshot(api_call_id, forecast_data)
             session.add(forecast)
             session.commit()
             session.refresh(forecast)
@@ -135,6 +83,74 @@ class SnapshotRepository:
         finally:
             session.close()
 
+    @staticmethod
+    def build_analysis_snapshot(api_call_id: str, snapshot_data: Dict[str, Any]) -> AnalysisSnapshot:
+        """Unsaved AnalysisSnapshot for snapshot_data."""
+        return AnalysisSnapshot(
+            api_call_id=api_call_id,
+            icce=snapshot_data.get('icce', 0.0),
+            sov=snapshot_data.get('sov', 0.0),
+            sna=snapshot_data.get('sna', 0.0),
+            momentum=snapshot_data.get('momentum', 0.0),
+            sentiment_positive=snapshot_data.get('sentiment_positive', 0.0),
+            sentiment_negative=snapshot_data.get('sentiment_negative', 0.0),
+            sentiment_neutral=snapshot_data.get('sentiment_neutral', 0.0),
+            executive_summary=snapshot_data.get('executive_summary'),
+            key_findings=snapshot_data.get('key_findings', []),
+            key_stats=snapshot_data.get('key_stats', []),
+            recommendations=snapshot_data.get('recommendations', []),
+            trending_topics=snapshot_data.get('trending_topics', []),
+            geo_distribution=snapshot_data.get('geo_distribution', []),
+            opportunity=snapshot_data.get('opportunity'),
+            risk_level=snapshot_data.get('risk_level'),
+            risk_description=snapshot_data.get('risk_description')
+        )
+
+    @staticmethod
+    def build_pnd_metrics(api_call_id: str, pnd_metrics: List[Dict[str, Any]]) -> List[PndAxisMetric]:
+        """Unsaved PndAxisMetric rows for pnd_metrics."""
+        return [
+            PndAxisMetric(
+                api_call_id=api_call_id,
+                pnd_axis=metric_data.get('pnd_axis', ''),
+                pnd_axis_display=metric_data.get('pnd_axis_display'),
+                icce=metric_data.get('icce', 0.0),
+                sov=metric_data.get('sov', 0.0),
+                sna=metric_data.get('sna', 0.0),
+                tweet_count=metric_data.get('tweet_count', 0),
+                trend=metric_data.get('trend'),
+                trend_change=metric_data.get('trend_change', 0.0),
+                sentiment_positive=metric_data.get('sentiment_positive', 0.0),
+                sentiment_negative=metric_data.get('sentiment_negative', 0.0),
+                sentiment_neutral=metric_data.get('sentiment_neutral', 0.0),
+                key_insights=metric_data.get('key_insights', []),
+                sample_tweets=metric_data.get('sample_tweets', [])
+            )
+            for metric_data in pnd_metrics
+        ]
+
+    @staticmethod
+    def build_forecast_snapshot(api_call_id: str, forecast_data: Dict[str, Any]) -> ForecastSnapshot:
+        """Unsaved ForecastSnapshot for forecast_data."""
+        return ForecastSnapshot(
+            api_call_id=api_call_id,
+            historical_dates=forecast_data.get('historical_dates', []),
+            icce_values=forecast_data.get('icce_values', []),
+            icce_smooth=forecast_data.get('icce_smooth', []),
+            momentum_values=forecast_data.get('momentum_values', []),
+            forecast_dates=forecast_data.get('forecast_dates', []),
+            icce_pred=forecast_data.get('icce_pred', []),
+            pred_low=forecast_data.get('pred_low', []),
+            pred_high=forecast_data.get('pred_high', []),
+            model_type=forecast_data.get('model_type', 'holt_winters'),
+            model_confidence=forecast_data.get('model_confidence', 0.0),
+            days_back=forecast_data.get('days_back', 30),
+            forecast_days=forecast_data.get('forecast_days', 14),
+            icce_current=forecast_data.get('icce_current', 0.0),
+            icce_predicted_end=forecast_data.get('icce_predicted_end', 0.0),
+            icce_change_predicted=forecast_data.get('icce_change_predicted', 0.0)
+        )
+
     def save_campaign_strategy(
         self,
         api_call_id: str,
@@ -2,13 +2,16 @@
 RAG (Retrieval Augmented Generation) Service for CASTOR ELECCIONES.
 Main service combining retrieval and generation with SQLite storage.
 """
+import json
 import logging
-from typing import Any, Dict, List, Optional
+import sqlite3
+import uuid
+from typing import Any, Dict, List, Optional, Union
 
 import openai
 
 from config import Config
-from .rag_models import RetrievalResult
+from .rag_models import Document, RetrievalResult
 from .rag_vector_store import SQLiteVectorStore
 from .rag_indexer import RAGIndexer
 from .rag_sync import RAGDatabaseSync
@@ -200,7 +203,8 @@ Responde basándote en los datos históricos proporcionados. Si no hay suficient
             "documents_indexed": self.vector_store.count(),
             "embedding_model": getattr(Config, "OPENAI_EMBEDDING_MODEL", "text-embedding-3-small"),
             "generation_model": self.model,
-            "sqlite_path": self.vector_store.db_path
+            "sqlite_path": self.vector_store.db_path,
+            "storage": self.vector_store.storage_stats()
         }
 
     def clear_index(self) -> None:
@@ -230,6 +234,35 @@ Responde basándote en los datos históricos proporcionados. Si no hay suficient
         Returns:
             Número de documentos indexados
         """
+        documents = self._build_e14_documents(extraction_id, extraction_data, metadata)
+
+        # Indexar todos los documentos
+        if documents:
+            self.vector_store.add_documents(documents)
+            logger.info(
+                f"Indexed E-14 form {extraction_id}: {len(documents)} documents, "
+                f"mesa {documents[0].metadata.get('mesa_id')}"
+            )
+
+        return len(documents)
+
+    def _build_e14_documents(
+        self,
+        extraction_id: str,
+        extraction_data: Dict[str, Any],
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> List[Document]:
+        """
+        Construir los documentos (chunks) de un formulario E-14 sin embeberlos.
+
+        Args:
+            extraction_id: ID único de la extracción OCR
+            extraction_data: Datos completos del E-14
+            metadata: Metadatos adicionales
+
+        Returns:
+            Lista de documentos listos para indexar
+        """
         meta = metadata or {}
         documents = []
 
@@ -484,12 +517,7 @@ INDICADORES DE RIESGO:
                 }
             ))
 
-        # Indexar todos los documentos
-        if documents:
-            self.vector_store.add_documents(documents)
-            logger.info(f"Indexed E-14 form {extraction_id}: {len(documents)} documents, mesa {mesa_id}")
-
-        return len(documents)
+        return documents
 
     def index_e14_batch(
         self,
@@ -499,6 +527,10 @@ INDICADORES DE RIESGO:
         """
         Indexar múltiples formularios E-14 en batch.
 
+        Todos los formularios se dividen en chunks primero; los textos idénticos
+        se embeben una sola vez (y los ya embebidos salen del caché persistente),
+        en lotes máximos, y todo se escribe en una sola transacción.
+
         Args:
             extractions: Lista de extracciones E-14
             metadata: Metadatos adicionales compartidos
@@ -506,16 +538,16 @@ INDICADORES DE RIESGO:
         Returns:
             Resumen del indexado
         """
-        total_indexed = 0
         successful = 0
         failed = 0
         errors = []
+        documents: Dict[str, Document] = {}
 
         for extraction in extractions:
             try:
                 extraction_id = extraction.get('extraction_id', str(uuid.uuid4()))
-                count = self.index_e14_form(extraction_id, extraction, metadata)
-                total_indexed += count
+                for doc in self._build_e14_documents(extraction_id, extraction, metadata):
+                    documents[doc.id] = doc
                 successful += 1
             except Exception as e:
                 failed += 1
@@ -525,6 +557,17 @@ INDICADORES DE RIESGO:
                 })
                 logger.warning(f"Error indexing E-14: {e}")
 
+        total_indexed = 0
+        if documents:
+            try:
+                self.vector_store.add_documents(list(documents.values()))
+                total_indexed = len(documents)
+            except Exception as e:
+                logger.error(f"Error writing E-14 batch: {e}", exc_info=True)
+                errors.append({"extraction_id": "batch", "error": str(e)})
+                failed += successful
+                successful = 0
+
         logger.info(f"E-14 batch indexing complete: {successful} success, {failed} failed, {total_indexed} docs")
 
         return {
@@ -532,28 +575,34 @@ INDICADORES DE RIESGO:
             "successful": successful,
             "failed": failed,
             "documents_indexed": total_indexed,
-            "errors": errors
+            "errors": errors,
+            "embedding_stats": dict(self.vector_store.embedder.stats)
         }
 
     def search_e14(
         self,
         query: str,
         top_k: int = 10,
-        departamento: str = None,
-        municipio: str = None,
-        corporacion: str = None,
-        party_name: str = None
+        departamento: Union[str, List[str]] = None,
+        municipio: Union[str, List[str]] = None,
+        corporacion: Union[str, List[str]] = None,
+        party_name: Union[str, List[str]] = None,
+        mesa_id: Union[str, List[str]] = None
     ) -> List[RetrievalResult]:
         """
         Búsqueda especializada en datos E-14.
 
+        Cada filtro acepta un valor o una lista de valores (se evalúa como $in),
+        p. ej. varios municipios en una sola consulta.
+
         Args:
             query: Consulta de búsqueda
             top_k: Número de resultados
-            departamento: Filtrar por departamento
-            municipio: Filtrar por municipio
-            corporacion: Filtrar por corporación
-            party_name: Filtrar por nombre de partido
+            departamento: Filtrar por departamento(s)
+            municipio: Filtrar por municipio(s)
+            corporacion: Filtrar por corporación(es)
+            party_name: Filtrar por nombre(s) de partido
+            mesa_id: Filtrar por mesa(s)
 
         Returns:
             Lista de resultados relevantes
@@ -561,14 +610,20 @@ INDICADORES DE RIESGO:
         # Construir filtros
         conditions = [{"type": "e14_form"}]
 
-        if departamento:
-            conditions.append({"departamento": departamento})
-        if municipio:
-            conditions.append({"municipio": municipio})
-        if corporacion:
-            conditions.append({"corporacion": corporacion})
-        if party_name:
-            conditions.append({"party_name": party_name})
+        filters = {
+            "departamento": departamento,
+            "municipio": municipio,
+            "corporacion": corporacion,
+            "party_name": party_name,
+            "mesa_id": mesa_id
+        }
+        for key, value in filters.items():
+            if not value:
+                continue
+            if isinstance(value, (list, tuple, set)):
+                conditions.append({key: {"$in": list(value)}})
+            else:
+                conditions.append({key: value})
 
         where = {"$and": conditions} if len(conditions) > 1 else conditions[0]
 
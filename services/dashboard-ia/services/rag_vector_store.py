@@ -7,9 +7,19 @@ import logging
 import os
 import sqlite3
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from .rag_models import Document, RetrievalResult, cosine_similarity
+import numpy as np
+
+from config import Config
+from .rag_embedder import EmbeddingPipeline
+from .rag_models import Document, RetrievalResult
+from .rag_vector_index import (
+    EMBEDDING_PRECISIONS,
+    VectorIndex,
+    decode_embedding,
+    encode_embedding,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -18,9 +28,27 @@ class SQLiteVectorStore:
     """
     Persistent vector store using SQLite.
     Stores documents and embeddings locally.
+
+    Schema versions (PRAGMA user_version):
+        0/1: embeddings as JSON text
+        2:   embeddings as binary BLOBs, precision recorded per row in embedding_dtype
+        3:   filterable metadata keys promoted to indexed meta_<key> columns
     """
 
-    def __init__(self, db_path: str = None, openai_client=None, embedding_model: str = None):
+    SCHEMA_VERSION = 3
+
+    # Metadata keys copied into indexed columns so `where` filters run in SQL
+    FILTER_KEYS = ("type", "departamento", "municipio", "corporacion", "party_name", "mesa_id")
+
+    def __init__(
+        self,
+        db_path: str = None,
+        openai_client=None,
+        embedding_model: str = None,
+        index_mode: str = None,
+        ivf_nprobe: int = None,
+        embedding_precision: str = None
+    ):
         """
         Initialize SQLite vector store.
 
@@ -28,13 +56,35 @@ class SQLiteVectorStore:
             db_path: SQLite file path
             openai_client: OpenAI client for embeddings
             embedding_model: Embedding model name
+            index_mode: Vector index mode, "exact" or "ivf" (default: Config.RAG_INDEX_MODE)
+            ivf_nprobe: IVF lists probed per query (default: Config.RAG_IVF_NPROBE)
+            embedding_precision: float32, float16 or int8 (default: Config.RAG_EMBEDDING_PRECISION)
         """
         self.db_path = db_path or self._default_db_path()
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
 
         self.openai_client = openai_client
         self.embedding_model = embedding_model or "text-embedding-3-small"
+        self.embedding_precision = embedding_precision or getattr(Config, "RAG_EMBEDDING_PRECISION", "float32")
+        if self.embedding_precision not in EMBEDDING_PRECISIONS:
+            raise ValueError(f"Unknown embedding precision: {self.embedding_precision}")
+        self.index = VectorIndex(
+            self.db_path,
+            mode=index_mode or getattr(Config, "RAG_INDEX_MODE", "exact"),
+            nlist=getattr(Config, "RAG_IVF_NLIST", 0),
+            nprobe=ivf_nprobe or getattr(Config, "RAG_IVF_NPROBE", 8)
+        )
+        self.embedder = EmbeddingPipeline(
+            self._request_embeddings,
+            self.db_path,
+            self.embedding_model,
+            batch_size=getattr(Config, "RAG_EMBED_BATCH_SIZE", 512),
+            max_concurrency=getattr(Config, "RAG_EMBED_CONCURRENCY", 4),
+            max_retries=getattr(Config, "RAG_EMBED_MAX_RETRIES", 3)
+        )
         self._init_db()
+        self.migrate()
+        self._backfill_index()
         logger.info(f"SQLite RAG store initialized at {self.db_path}")
 
     def _default_db_path(self) -> str:
@@ -54,12 +104,166 @@ class SQLiteVectorStore:
                     id TEXT PRIMARY KEY,
                     content TEXT NOT NULL,
                     metadata TEXT NOT NULL,
-                    embedding TEXT NOT NULL,
+                    embedding BLOB NOT NULL,
+                    embedding_dtype TEXT NOT NULL DEFAULT 'json',
                     created_at TEXT NOT NULL
                 )
                 """
             )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(rag_documents)")}
+            for key in self.FILTER_KEYS:
+                # No declared type: values keep their original storage class (text/int)
+                if f"meta_{key}" not in columns:
+                    conn.execute(f"ALTER TABLE rag_documents ADD COLUMN meta_{key}")
             conn.execute("CREATE INDEX IF NOT EXISTS idx_rag_created_at ON rag_documents(created_at)")
+            if "embedding_dtype" not in columns:
+                # Pre-BLOB store: existing rows keep their JSON text until migrate_embeddings() runs
+                conn.execute("ALTER TABLE rag_documents ADD COLUMN embedding_dtype TEXT NOT NULL DEFAULT 'json'")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_rag_embedding_dtype ON rag_documents(embedding_dtype)"
+            )
+            for key in self.FILTER_KEYS:
+                conn.execute(f"CREATE INDEX IF NOT EXISTS idx_rag_meta_{key} ON rag_documents(meta_{key})")
+            conn.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_rag_meta_geo
+                ON rag_documents(meta_type, meta_departamento, meta_municipio, meta_corporacion)
+                """
+            )
+            VectorIndex.init_schema(conn)
+
+    def migrate(self, batch_size: int = 1000, vacuum: bool = False) -> int:
+        """
+        Bring an existing store up to SCHEMA_VERSION.
+
+        Each step works in small committed batches, so other workers keep
+        serving while it runs, and can resume after an interruption.
+
+        Args:
+            batch_size: Rows processed per committed batch
+            vacuum: Run VACUUM afterwards to return freed pages to the OS
+                (blocks the database while it runs)
+
+        Returns:
+            Schema version before migrating
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= self.SCHEMA_VERSION:
+            return version
+        if version < 2:
+            self.migrate_embeddings(batch_size)
+        if version < 3:
+            self._backfill_filter_columns(batch_size)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+            if vacuum:
+                conn.execute("VACUUM")
+        logger.info(f"RAG store migrated from schema v{version} to v{self.SCHEMA_VERSION}")
+        return version
+
+    def _backfill_filter_columns(self, batch_size: int = 1000) -> int:
+        """Populate meta_<key> columns from the JSON metadata of existing rows."""
+        updated = 0
+        last_rowid = 0
+        with sqlite3.connect(self.db_path) as conn:
+            while True:
+                rows = conn.execute(
+                    "SELECT rowid, metadata FROM rag_documents WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                    (last_rowid, batch_size)
+                ).fetchall()
+                if not rows:
+                    break
+                updates = []
+                for rowid, metadata_json in rows:
+                    try:
+                        metadata = json.loads(metadata_json) if metadata_json else {}
+                    except ValueError:
+                        metadata = {}
+                    updates.append((*self._filter_values(metadata), rowid))
+                assignments = ", ".join(f"meta_{key} = ?" for key in self.FILTER_KEYS)
+                conn.executemany(f"UPDATE rag_documents SET {assignments} WHERE rowid = ?", updates)
+                conn.commit()
+                updated += len(updates)
+                last_rowid = rows[-1][0]
+        return updated
+
+    def migrate_embeddings(self, batch_size: int = 1000) -> int:
+        """
+        Convert JSON-text embeddings to BLOBs in the configured precision.
+
+        Other workers keep reading while it progresses: rows are decoded
+        according to their own embedding_dtype.
+
+        Returns:
+            Number of rows converted
+        """
+        converted = 0
+        with sqlite3.connect(self.db_path) as conn:
+            while True:
+                rows = conn.execute(
+                    "SELECT id, embedding FROM rag_documents WHERE embedding_dtype = 'json' LIMIT ?",
+                    (batch_size,)
+                ).fetchall()
+                if not rows:
+                    break
+                updates = []
+                for doc_id, embedding_json in rows:
+                    try:
+                        embedding = decode_embedding(embedding_json, "json")
+                    except ValueError:
+                        embedding = decode_embedding(None, "json")
+                    updates.append((
+                        encode_embedding(embedding, self.embedding_precision),
+                        self.embedding_precision,
+                        doc_id
+                    ))
+                conn.executemany(
+                    "UPDATE rag_documents SET embedding = ?, embedding_dtype = ? "
+                    "WHERE id = ? AND embedding_dtype = 'json'",
+                    updates
+                )
+                conn.commit()
+                converted += len(updates)
+        if converted:
+            logger.info(f"Migrated {converted} RAG embeddings to {self.embedding_precision} BLOBs")
+        return converted
+
+    def _backfill_index(self, batch_size: int = 2000) -> None:
+        """Load embeddings of documents not yet in the vector index (stores created before it existed)."""
+        with sqlite3.connect(self.db_path) as conn:
+            total = int(conn.execute("SELECT COUNT(1) FROM rag_documents").fetchone()[0])
+            if total == self.index.count(conn):
+                return
+            # Keyset pages read in full before writing on the same connection:
+            # an open read cursor would keep the commit from taking the write lock
+            loaded = 0
+            last_rowid = 0
+            while True:
+                rows = conn.execute(
+                    """
+                    SELECT rowid, id, embedding, embedding_dtype FROM rag_documents
+                    WHERE rowid > ? AND id NOT IN (SELECT doc_id FROM rag_vector_slots)
+                    ORDER BY rowid LIMIT ?
+                    """,
+                    (last_rowid, batch_size)
+                ).fetchall()
+                if not rows:
+                    break
+                last_rowid = rows[-1][0]
+                ids, embeddings = [], []
+                for _, doc_id, blob, dtype in rows:
+                    try:
+                        embedding = decode_embedding(blob, dtype)
+                    except ValueError:
+                        continue
+                    if embedding.size:
+                        ids.append(doc_id)
+                        embeddings.append(embedding)
+                self.index.add(conn, ids, embeddings)
+                conn.commit()
+                loaded += len(ids)
+        logger.info(f"Vector index backfilled with {loaded} documents")
 
     def _normalize_metadata(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
         """Normalize metadata values for JSON serialization."""
@@ -75,8 +279,12 @@ class SQLiteVectorStore:
                 normalized[key] = json.dumps(value, ensure_ascii=False)
         return normalized
 
-    def _embed_texts(self, texts: List[str]) -> List[List[float]]:
-        """Get embeddings for texts via OpenAI."""
+    def _filter_values(self, metadata: Dict[str, Any]) -> Tuple[Any, ...]:
+        """Values for the meta_<key> columns, in FILTER_KEYS order (None when absent)."""
+        return tuple(metadata.get(key) for key in self.FILTER_KEYS)
+
+    def _request_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Get embeddings for texts via OpenAI (one request)."""
         if not self.openai_client:
             raise RuntimeError("OpenAI client not configured for embeddings")
         response = self.openai_client.embeddings.create(
@@ -85,6 +293,10 @@ class SQLiteVectorStore:
         )
         return [item.embedding for item in response.data]
 
+    def _embed_texts(self, texts: List[str]) -> List[np.ndarray]:
+        """Get embeddings through the deduplicating, cached pipeline."""
+        return self.embedder.embed(texts)
+
     def add_document(self, doc: Document, embedding: List[float] = None) -> None:
         """Add single document to store."""
         self.add_documents([doc], embeddings=[embedding] if embedding else None)
@@ -97,20 +309,26 @@ class SQLiteVectorStore:
         if embeddings is None:
             embeddings = self._embed_texts([doc.content for doc in docs])
 
+        filter_columns = ", ".join(f"meta_{key}" for key in self.FILTER_KEYS)
+        filter_placeholders = ", ".join("?" * len(self.FILTER_KEYS))
         with sqlite3.connect(self.db_path) as conn:
+            self.index.add(conn, [doc.id for doc in docs], embeddings)
             for doc, emb in zip(docs, embeddings):
                 metadata = self._normalize_metadata(doc.metadata)
                 conn.execute(
-                    """
-                    INSERT OR REPLACE INTO rag_documents (id, content, metadata, embedding, created_at)
-                    VALUES (?, ?, ?, ?, ?)
+                    f"""
+                    INSERT OR REPLACE INTO rag_documents
+                        (id, content, metadata, embedding, embedding_dtype, created_at, {filter_columns})
+                    VALUES (?, ?, ?, ?, ?, ?, {filter_placeholders})
                     """,
                     (
                         doc.id,
                         doc.content,
                         json.dumps(metadata, ensure_ascii=False),
-                        json.dumps(emb),
-                        doc.created_at.isoformat()
+                        encode_embedding(emb, self.embedding_precision),
+                        self.embedding_precision,
+                        doc.created_at.isoformat(),
+                        *self._filter_values(metadata)
                     )
                 )
             conn.commit()
@@ -119,13 +337,101 @@ class SQLiteVectorStore:
         """Check if metadata matches where clause."""
         if not where:
             return True
-        if "$and" in where:
-            return all(self._matches_where(metadata, cond) for cond in where["$and"])
         for key, value in where.items():
-            if metadata.get(key) != value:
+            if key == "$and":
+                if not all(self._matches_where(metadata, cond) for cond in value):
+                    return False
+            elif key == "$or":
+                if not any(self._matches_where(metadata, cond) for cond in value):
+                    return False
+            elif isinstance(value, dict) and "$in" in value:
+                if metadata.get(key) not in value["$in"]:
+                    return False
+            elif metadata.get(key) != value:
                 return False
         return True
 
+    def _split_conjunction(self, where: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Flatten a where clause into single-key conditions that are ANDed together."""
+        conditions = []
+        for key, value in (where or {}).items():
+            if key == "$and":
+                for cond in value:
+                    conditions.extend(self._split_conjunction(cond))
+            else:
+                conditions.append({key: value})
+        return conditions
+
+    def _compile_where(self, where: Optional[Dict[str, Any]]) -> Optional[Tuple[str, List[Any]]]:
+        """
+        Translate a where clause into SQL over the meta_<key> columns.
+
+        Supports equality, {"key": {"$in": [...]}}, "$and" and "$or".
+        Returns None when the clause references a key that is not in FILTER_KEYS.
+        """
+        clauses: List[str] = []
+        params: List[Any] = []
+        for cond in self._split_conjunction(where):
+            (key, value), = cond.items()
+            if key == "$or":
+                parts = [self._compile_where(sub) for sub in value]
+                if any(part is None for part in parts):
+                    return None
+                clauses.append("(" + " OR ".join(sql for sql, _ in parts) + ")" if parts else "0")
+                for _, part_params in parts:
+                    params.extend(part_params)
+            elif key in self.FILTER_KEYS:
+                column = f"meta_{key}"
+                if isinstance(value, dict):
+                    if set(value) != {"$in"}:
+                        return None
+                    options = list(value["$in"])
+                    clauses.append(f"{column} IN ({','.join('?' * len(options))})" if options else "0")
+                    params.extend(options)
+                elif value is None:
+                    clauses.append(f"{column} IS NULL")
+                else:
+                    clauses.append(f"{column} = ?")
+                    params.append(value)
+            else:
+                return None
+        return (" AND ".join(clauses) if clauses else "1"), params
+
+    def _candidate_slots(self, conn: sqlite3.Connection, sql: str, params: List[Any]) -> np.ndarray:
+        """Vector index slots of the documents matching a compiled where clause."""
+        cursor = conn.execute(
+            f"""
+            SELECT s.slot FROM rag_documents d
+            JOIN rag_vector_slots s ON s.doc_id = d.id
+            WHERE {sql}
+            """,
+            params
+        )
+        return np.fromiter((row[0] for row in cursor), dtype=np.int64)
+
+    def _candidate_ids(self, conn: sqlite3.Connection, where: Dict[str, Any]) -> List[str]:
+        """
+        Evaluate a where clause that uses non-indexed keys.
+
+        The indexed part of the clause narrows rows in SQL; only those rows have
+        their JSON metadata parsed and checked in Python.
+        """
+        indexed = [
+            compiled for compiled in (self._compile_where(cond) for cond in self._split_conjunction(where))
+            if compiled is not None
+        ]
+        sql = " AND ".join(part for part, _ in indexed) or "1"
+        params = [param for _, part_params in indexed for param in part_params]
+        candidates = []
+        for doc_id, metadata_json in conn.execute(f"SELECT id, metadata FROM rag_documents WHERE {sql}", params):
+            try:
+                metadata = json.loads(metadata_json) if metadata_json else {}
+            except ValueError:
+                continue
+            if self._matches_where(metadata, where):
+                candidates.append(doc_id)
+        return candidates
+
     def search(self, query_text: str, top_k: int = 5, where: Dict[str, Any] = None) -> List[RetrievalResult]:
         """Search for similar documents."""
         try:
@@ -134,48 +440,68 @@ class SQLiteVectorStore:
             logger.error(f"Embedding error: {e}")
             return []
 
-        results = self._search_by_embedding(query_embedding, where)
-        return self._rank_results(results, top_k)
-
-    def _search_by_embedding(
-        self,
-        query_embedding: List[float],
-        where: Optional[Dict[str, Any]]
-    ) -> List[RetrievalResult]:
-        """Search documents by embedding similarity."""
-        results: List[RetrievalResult] = []
-
         with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("SELECT id, content, metadata, embedding, created_at FROM rag_documents")
-            rows = cursor.fetchall()
+            candidates = candidate_slots = None
+            compiled = self._compile_where(where) if where else None
+            if compiled is not None:
+                candidate_slots = self._candidate_slots(conn, *compiled)
+                if candidate_slots.size == 0:
+                    return []
+            elif where:
+                candidates = self._candidate_ids(conn, where)
+                if not candidates:
+                    return []
+            hits = self.index.search(
+                conn,
+                query_embedding,
+                top_k=top_k,
+                candidates=candidates,
+                candidate_slots=candidate_slots
+            )
+            documents = self._fetch_documents(conn, [doc_id for doc_id, _ in hits])
 
-        for row in rows:
-            doc_id, content, metadata_json, embedding_json, created_at = row
+        return self._rank_results(hits, documents)
+
+    def _fetch_documents(self, conn: sqlite3.Connection, doc_ids: List[str]) -> Dict[str, Document]:
+        """Load the documents for the given ids."""
+        if not doc_ids:
+            return {}
+        placeholders = ",".join("?" * len(doc_ids))
+        rows = conn.execute(
+            f"SELECT id, content, metadata, created_at FROM rag_documents WHERE id IN ({placeholders})",
+            doc_ids
+        ).fetchall()
+        documents = {}
+        for doc_id, content, metadata_json, created_at in rows:
             try:
                 metadata = json.loads(metadata_json) if metadata_json else {}
-                if not self._matches_where(metadata, where):
-                    continue
-                embedding = json.loads(embedding_json) if embedding_json else []
-            except Exception:
-                continue
-
-            score = cosine_similarity(query_embedding, embedding)
-            doc = Document(
+            except ValueError:
+                metadata = {}
+            documents[doc_id] = Document(
                 id=doc_id,
                 content=content,
                 metadata=metadata,
                 created_at=datetime.fromisoformat(created_at) if created_at else datetime.now(timezone.utc)
             )
-            results.append(RetrievalResult(document=doc, score=score, rank=0))
+        return documents
 
+    def _rank_results(
+        self,
+        hits: List[Tuple[str, float]],
+        documents: Dict[str, Document]
+    ) -> List[RetrievalResult]:
+        """Turn index hits (already sorted by score) into ranked results."""
+        results: List[RetrievalResult] = []
+        for doc_id, score in hits:
+            doc = documents.get(doc_id)
+            if doc is not None:
+                results.append(RetrievalResult(document=doc, score=score, rank=len(results) + 1))
         return results
 
-    def _rank_results(self, results: List[RetrievalResult], top_k: int) -> List[RetrievalResult]:
-        """Sort and rank results by score."""
-        results.sort(key=lambda r: r.score, reverse=True)
-        for idx, result in enumerate(results[:top_k], start=1):
-            result.rank = idx
-        return results[:top_k]
+    def train_index(self, nlist: int = None) -> int:
+        """Train IVF centroids for approximate search."""
+        with sqlite3.connect(self.db_path) as conn:
+            return self.index.train(conn, nlist=nlist)
 
     def count(self) -> int:
         """Count total documents in store."""
@@ -183,16 +509,73 @@ class SQLiteVectorStore:
             cursor = conn.execute("SELECT COUNT(1) FROM rag_documents")
             return int(cursor.fetchone()[0])
 
+    def storage_stats(self, sample_size: int = 500) -> Dict[str, Any]:
+        """
+        Report storage footprint and quantization error.
+
+        Quantization error compares a sample of stored (possibly float16/int8)
+        embeddings with the original float32 vectors in the embedding cache,
+        as 1 - cosine similarity. Rows whose text is not cached (e.g. migrated
+        from a legacy store) are not sampled.
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            schema_version = conn.execute("PRAGMA user_version").fetchone()[0]
+            count, embedding_bytes, row_bytes = conn.execute(
+                """
+                SELECT COUNT(1), AVG(LENGTH(embedding)),
+                       AVG(LENGTH(embedding) + LENGTH(content) + LENGTH(metadata))
+                FROM rag_documents
+                """
+            ).fetchone()
+            by_precision = dict(conn.execute(
+                "SELECT embedding_dtype, COUNT(1) FROM rag_documents GROUP BY embedding_dtype"
+            ).fetchall())
+            stride = max(1, (count or 0) // max(1, sample_size))
+            sample = conn.execute(
+                "SELECT content, embedding, embedding_dtype FROM rag_documents WHERE rowid % ? = 0 LIMIT ?",
+                (stride, sample_size)
+            ).fetchall()
+        originals = self.embedder.cached([row[0] for row in sample])
+
+        errors = []
+        for content, blob, dtype in sample:
+            original = originals.get(content)
+            if original is None:
+                continue
+            stored = decode_embedding(blob, dtype)
+            norm = float(np.linalg.norm(stored) * np.linalg.norm(original))
+            if stored.shape != original.shape or norm == 0:
+                continue
+            errors.append(max(0.0, 1.0 - float(np.dot(stored, original)) / norm))
+
+        file_bytes = os.path.getsize(self.db_path) if os.path.exists(self.db_path) else 0
+        return {
+            "schema_version": schema_version,
+            "embedding_precision": self.embedding_precision,
+            "documents_by_precision": by_precision,
+            "file_bytes": file_bytes,
+            "bytes_per_document": round(file_bytes / count, 1) if count else 0,
+            "row_bytes_per_document": round(row_bytes or 0, 1),
+            "embedding_bytes_per_document": round(embedding_bytes or 0, 1),
+            "quantization_error": {
+                "sampled": len(errors),
+                "mean": float(np.mean(errors)) if errors else 0.0,
+                "max": float(np.max(errors)) if errors else 0.0
+            }
+        }
+
     def delete(self, doc_ids: List[str]) -> None:
         """Delete documents by ID."""
         if not doc_ids:
             return
         with sqlite3.connect(self.db_path) as conn:
+            self.index.delete(conn, doc_ids)
             conn.executemany("DELETE FROM rag_documents WHERE id = ?", [(doc_id,) for doc_id in doc_ids])
             conn.commit()
 
     def clear(self) -> None:
         """Clear all documents from store."""
         with sqlite3.connect(self.db_path) as conn:
+            self.index.clear(conn)
             conn.execute("DELETE FROM rag_documents")
             conn.commit()
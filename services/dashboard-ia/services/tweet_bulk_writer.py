@@ -0,0 +1,250 @@
+"""
+Bulk write path for the tweets table.
+
+Rows are built as plain dicts with the same defaults as the ORM model and
+upserted with Core multi-row INSERT ... ON CONFLICT (api_call_id,
+tweet_id) DO UPDATE, in chunks. On PostgreSQL, batches of at least
+Config.DB_COPY_MIN_ROWS rows are streamed with COPY into a temporary
+table and merged with the same upsert. Other dialects get a plain
+chunked INSERT.
+
+The conflict target is a partial unique index over rows with a
+tweet_id, so tweets without one are plain inserts. The index is created
+by migrate_upsert_index() at deploy (DatabaseService.init_db,
+scripts/init_tweet_tables.py), never on the write path.
+
+Everything runs on the caller's connection, so the tweets commit (or
+roll back) together with whatever else the caller writes.
+"""
+import csv
+import io
+import json
+import logging
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert, inspect, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection, Engine
+
+from config import Config
+from models.database import Tweet, _generate_uuid
+
+logger = logging.getLogger(__name__)
+
+# Column -> default when the tweet dict does not have it (mirrors the ORM path)
+TWEET_FIELDS: Dict[str, Any] = {
+    'tweet_id': '',
+    'author_id': None,
+    'author_username': None,
+    'author_name': None,
+    'author_verified': False,
+    'author_followers_count': 0,
+    'content': '',
+    'content_cleaned': None,
+    'tweet_created_at': None,
+    'language': None,
+    'source': None,
+    'retweet_count': 0,
+    'like_count': 0,
+    'reply_count': 0,
+    'quote_count': 0,
+    'impression_count': 0,
+    'is_retweet': False,
+    'is_reply': False,
+    'is_quote': False,
+    'replied_to_tweet_id': None,
+    'quoted_tweet_id': None,
+    'hashtags': [],
+    'mentions': [],
+    'urls': [],
+    'geo_country': None,
+    'geo_city': None,
+    'geo_coordinates': None,
+    'sentiment_positive': 0.0,
+    'sentiment_negative': 0.0,
+    'sentiment_neutral': 0.0,
+    'sentiment_label': None,
+    'sentiment_confidence': 0.0,
+    'pnd_topic': None,
+    'pnd_confidence': 0.0,
+    'pnd_secondary_topic': None,
+    'is_potential_bot': False,
+    'bot_score': 0.0,
+}
+JSON_FIELDS = ('hashtags', 'mentions', 'urls', 'geo_coordinates')
+CONFLICT_COLUMNS = ('api_call_id', 'tweet_id')
+COLUMNS = ('id', 'api_call_id') + tuple(TWEET_FIELDS)
+UPDATE_COLUMNS = tuple(TWEET_FIELDS)[1:]  # everything except the conflict key
+
+UPSERT_DIALECTS = ('postgresql', 'sqlite')
+
+# Must match the uq_tweets_api_call_tweet_id Index on models.database.Tweet
+UPSERT_INDEX = 'uq_tweets_api_call_tweet_id'
+UPSERT_INDEX_WHERE = "tweet_id <> ''"
+UPSERT_INDEX_SQL = (
+    f"CREATE UNIQUE INDEX {UPSERT_INDEX} "
+    f"ON tweets ({', '.join(CONFLICT_COLUMNS)}) WHERE {UPSERT_INDEX_WHERE}"
+)
+# Full (non-partial) index of the first bulk writer, replaced by UPSERT_INDEX
+LEGACY_UPSERT_INDEX = 'uq_tweets_api_call_tweet'
+
+# Keep the most recently processed row of each (api_call_id, tweet_id)
+DEDUPE_SQL = f"""
+    DELETE FROM tweets WHERE id IN (
+        SELECT id FROM (
+            SELECT id, ROW_NUMBER() OVER (
+                PARTITION BY api_call_id, tweet_id
+                ORDER BY processed_at IS NULL, processed_at DESC, id DESC
+            ) AS position
+            FROM tweets
+            WHERE {UPSERT_INDEX_WHERE}
+        ) AS ranked
+        WHERE position > 1
+    )
+"""
+
+
+def tweet_rows(api_call_id: str, tweets_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Insert rows for tweets_data. A tweet_id repeated in the batch keeps its
+    last version; tweets without a tweet_id are all kept.
+    """
+    rows: Dict[str, Dict[str, Any]] = {}
+    without_id: List[Dict[str, Any]] = []
+    for tweet_data in tweets_data:
+        row = {'id': _generate_uuid(), 'api_call_id': api_call_id}
+        for field, default in TWEET_FIELDS.items():
+            row[field] = tweet_data.get(field, default)
+        row['tweet_id'] = row['tweet_id'] or ''
+        if row['tweet_id']:
+            rows[row['tweet_id']] = row
+        else:
+            without_id.append(row)
+    return list(rows.values()) + without_id
+
+
+def _chunk_size(dialect: str) -> int:
+    size = Config.DB_BULK_CHUNK_SIZE
+    if dialect == 'sqlite':
+        # Bound parameters per statement: 999 before SQLite 3.32, 32766 after
+        max_params = 32766 if sqlite3.sqlite_version_info >= (3, 32, 0) else 999
+        size = min(size, max_params // len(COLUMNS))
+    return max(1, size)
+
+
+def migrate_upsert_index(engine: Engine) -> int:
+    """
+    Create the partial unique index the upsert conflicts on (deploy step).
+
+    Tables created by create_all() already have it. On older tables the
+    duplicate (api_call_id, tweet_id) rows left by plain inserts are
+    deleted first, keeping the most recently processed one, all in one
+    transaction. Any error is raised: the write path relies on the index.
+
+    Returns:
+        Number of duplicate rows deleted
+    """
+    if engine.dialect.name not in UPSERT_DIALECTS:
+        return 0
+    with engine.begin() as connection:
+        if UPSERT_INDEX in {index['name'] for index in inspect(connection).get_indexes('tweets')}:
+            return 0
+        removed = connection.execute(text(DEDUPE_SQL)).rowcount
+        connection.execute(text(f"DROP INDEX IF EXISTS {LEGACY_UPSERT_INDEX}"))
+        connection.execute(text(UPSERT_INDEX_SQL))
+    if removed:
+        logger.warning(f"Deleted {removed} duplicate tweet rows before creating {UPSERT_INDEX}")
+    logger.info(f"Created tweet upsert index {UPSERT_INDEX}")
+    return removed
+
+
+def _insert_statement(dialect: str, upsert: bool):
+    """
+    Parameterless INSERT; executed with a list of rows it compiles once and
+    goes out as batched multi-row VALUES (SQLAlchemy insertmanyvalues).
+    """
+    table = Tweet.__table__
+    if upsert:
+        stmt = (postgresql.insert if dialect == 'postgresql' else sqlite.insert)(table)
+        return stmt.on_conflict_do_update(
+            index_elements=list(CONFLICT_COLUMNS),
+            index_where=text(UPSERT_INDEX_WHERE),
+            set_={column: stmt.excluded[column] for column in UPDATE_COLUMNS},
+        )
+    return insert(table)
+
+
+def _copy_value(value: Any, field: str) -> Any:
+    if value is None:
+        return r'\N'
+    if field in JSON_FIELDS:
+        return json.dumps(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _copy_upsert(connection: Connection, rows: List[Dict[str, Any]]) -> None:
+    """COPY rows into a temp table, then merge them into tweets with one upsert."""
+    columns = ', '.join(COLUMNS)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([_copy_value(row[column], column) for column in COLUMNS])
+    buffer.seek(0)
+
+    connection.execute(text(
+        "CREATE TEMP TABLE IF NOT EXISTS tweets_bulk_load "
+        "(LIKE tweets INCLUDING DEFAULTS) ON COMMIT DROP"
+    ))
+    connection.execute(text("TRUNCATE tweets_bulk_load"))
+    cursor = connection.connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY tweets_bulk_load ({columns}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+            buffer,
+        )
+    finally:
+        cursor.close()
+    updates = ', '.join(f"{column} = EXCLUDED.{column}" for column in UPDATE_COLUMNS)
+    connection.execute(text(
+        f"INSERT INTO tweets ({columns}) SELECT {columns} FROM tweets_bulk_load "
+        f"ON CONFLICT ({', '.join(CONFLICT_COLUMNS)}) WHERE {UPSERT_INDEX_WHERE} DO UPDATE SET {updates}"
+    ))
+
+
+def bulk_upsert_tweets(
+    connection: Connection,
+    api_call_id: str,
+    tweets_data: List[Dict[str, Any]],
+    use_copy: Optional[bool] = None,
+) -> int:
+    """
+    Upsert tweets_data for api_call_id on connection (no commit).
+
+    Args:
+        use_copy: Force (True) or disable (False) COPY on PostgreSQL;
+            default is COPY for batches of at least Config.DB_COPY_MIN_ROWS
+
+    Returns:
+        Number of rows written (tweets with a tweet_id counted once)
+    """
+    rows = tweet_rows(api_call_id, tweets_data)
+    if not rows:
+        return 0
+    dialect = connection.dialect.name
+    upsert = dialect in UPSERT_DIALECTS
+
+    if use_copy is None:
+        use_copy = len(rows) >= Config.DB_COPY_MIN_ROWS
+    if upsert and use_copy and dialect == 'postgresql' and connection.dialect.driver == 'psycopg2':
+        _copy_upsert(connection, rows)
+        return len(rows)
+
+    stmt = _insert_statement(dialect, upsert)
+    size = _chunk_size(dialect)
+    for start in range(0, len(rows), size):
+        connection.execute(stmt, rows[start:start + size])
+    return len(rows)
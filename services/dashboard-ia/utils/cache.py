@@ -1,17 +1,28 @@
 """
 Caching utilities for CASTOR ELECCIONES.
 Supports Redis (preferred) with in-memory fallback and exposes a TTL cache helper.
+
+The @cached decorator is single-flight: on a miss one caller per key
+computes (a per-key lock in-process, a Redis SET NX lock across workers)
+while the others wait for its result on a Redis pub/sub channel. Entries
+can be served stale while a background refresh runs, and TTLs are
+jittered so keys written together do not expire together.
 """
 from __future__ import annotations
 
+import fnmatch
+import functools
 import hashlib
-import json
 import logging
+import math
+import random
 import threading
 import time
+import uuid
 from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor, Future
-from typing import Any, Callable, Dict, Optional, Tuple
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 try:
     import redis  # type: ignore
@@ -19,11 +30,26 @@ except ImportError:  # pragma: no cover
     redis = None  # type: ignore
 
 from config import Config
+from utils import codec
 
 logger = logging.getLogger(__name__)
 
 redis_client: Optional[Any] = None
 
+# Every castor:<prefix>:* entry is also a member of castor:tags:<prefix>, so
+# invalidating a prefix deletes that set's members instead of walking the keyspace.
+TAG_PREFIX = "castor:tags"
+DELETE_CHUNK_SIZE = 500
+
+# SETEX + tag registration; the tag set lives at least as long as its newest member
+_SET_TAGGED_SCRIPT = (
+    "redis.call('setex', KEYS[1], ARGV[1], ARGV[2]) "
+    "redis.call('sadd', KEYS[2], KEYS[1]) "
+    "if redis.call('ttl', KEYS[2]) < tonumber(ARGV[1]) then "
+    "redis.call('expire', KEYS[2], ARGV[1]) end "
+    "return 1"
+)
+
 
 class TTLCache:
     """Thread-safe TTL cache with optional per-entry TTL and stale window."""
@@ -76,6 +102,17 @@ class TTLCache:
             self._data.pop(key, None)
             return None, False
 
+    def delete_matching(self, pattern: str) -> int:
+        """Remove entries whose (string) key matches a glob pattern."""
+        with self._lock:
+            keys = [
+                key for key in self._data
+                if isinstance(key, str) and fnmatch.fnmatchcase(key, pattern)
+            ]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+
     def clear(self) -> None:
         with self._lock:
             self._data.clear()
@@ -130,16 +167,19 @@ def init_cache() -> None:
     logger.info("Using in-memory cache backend")
 
 
-def _serialize(value: Any) -> str:
-    return json.dumps(value, default=str)
+def _serialize(value: Any) -> bytes:
+    return codec.encode(value, cache_type="castor")
 
 
 def _deserialize(value: Any) -> Any:
     if value is None:
         return None
-    if isinstance(value, bytes):
-        value = value.decode("utf-8")
-    return json.loads(value)
+    try:
+        return codec.decode(value, cache_type="castor")
+    except Exception as exc:
+        # Unreadable entry (e.g. written by a codec not installed here): a miss
+        logger.warning(f"Discarding undecodable cache payload: {exc}")
+        return None
 
 
 def get_cache_key(prefix: str, *args, **kwargs) -> str:
@@ -151,11 +191,23 @@ def get_cache_key(prefix: str, *args, **kwargs) -> str:
     return f"castor:{prefix}:{hashed}"
 
 
+def _tag_key(key: str) -> Optional[str]:
+    """Tag set of a castor:<prefix>:<hash> key, None for keys outside the namespace."""
+    parts = key.split(":", 2)
+    if len(parts) == 3 and parts[0] == "castor" and parts[1] != "tags":
+        return f"{TAG_PREFIX}:{parts[1]}"
+    return None
+
+
 def set(key: str, value: Any, ttl: int) -> None:
     """Store value in cache."""
     payload = _serialize(value)
     if redis_client and hasattr(redis_client, "setex"):
-        redis_client.setex(key, ttl, payload)
+        tag_key = _tag_key(key)
+        if tag_key and hasattr(redis_client, "eval"):
+            redis_client.eval(_SET_TAGGED_SCRIPT, 2, key, tag_key, int(ttl), payload)
+        else:
+            redis_client.setex(key, ttl, payload)
     else:
         _local_cache.set(key, payload, ttl_seconds=ttl)
 
@@ -206,42 +258,282 @@ def get_with_info(key: str) -> tuple:
         return None, False, None
 
 
-def cached(prefix: str, ttl: int = 60) -> Callable:
-    """Decorator to cache function results."""
+class _KeyLocks:
+    """Per-key in-process locks, dropped once no thread holds or waits on them."""
+
+    def __init__(self):
+        self._locks: Dict[str, List[Any]] = {}  # key -> [lock, users]
+        self._guard = threading.Lock()
+
+    @contextmanager
+    def hold(self, key: str, blocking: bool = True) -> Iterator[bool]:
+        with self._guard:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        acquired = entry[0].acquire(blocking)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                entry[0].release()
+            with self._guard:
+                entry[1] -= 1
+                if not entry[1]:
+                    self._locks.pop(key, None)
+
+
+_key_locks = _KeyLocks()
+
+# Compare-and-delete, so a holder whose lock expired cannot drop a newer one
+_RELEASE_LOCK_SCRIPT = (
+    "if redis.call('get', KEYS[1]) == ARGV[1] then "
+    "return redis.call('del', KEYS[1]) end return 0"
+)
+_ENVELOPE_MARK = "__cached__"
+
+
+def _jittered(ttl: int, jitter: float) -> float:
+    """TTL shortened by up to `jitter` (fraction) so expiries spread out."""
+    return ttl * (1 - random.uniform(0, max(0.0, min(jitter, 1.0))))
+
+
+def _get_entry(key: str) -> Optional[Tuple[Any, bool]]:
+    """(value, is_stale) of a @cached entry, or None on a miss."""
+    envelope = get(key)
+    if not isinstance(envelope, dict) or not envelope.get(_ENVELOPE_MARK):
+        return None
+    now = time.time()
+    if now >= envelope["stale_until"]:
+        return None
+    return envelope["value"], now >= envelope["fresh_until"]
+
+
+def _set_entry(key: str, value: Any, ttl: float, stale_ttl: int) -> None:
+    now = time.time()
+    envelope = {
+        _ENVELOPE_MARK: 1,
+        "value": value,
+        "fresh_until": now + ttl,
+        "stale_until": now + ttl + stale_ttl,
+    }
+    set(key, envelope, max(1, math.ceil(ttl + stale_ttl)))
+
+
+def _acquire_shared_lock(key: str) -> Optional[str]:
+    """
+    Take the cross-process lock for key.
+
+    Returns the lock token, "" when there is no Redis to coordinate through
+    (the caller proceeds alone), or None when another worker holds it.
+    """
+    if not (redis_client and hasattr(redis_client, "set")):
+        return ""
+    token = uuid.uuid4().hex
+    try:
+        timeout_ms = int(Config.CACHE_LOCK_TIMEOUT * 1000)
+        if redis_client.set(f"{key}:lock", token, nx=True, px=timeout_ms):
+            return token
+        return None
+    except Exception as exc:
+        logger.debug(f"Single-flight lock unavailable for {key}: {exc}")
+        return ""
+
+
+def _release_shared_lock(key: str, token: Optional[str]) -> None:
+    """Release the lock and wake the workers waiting on the result."""
+    if not token:
+        return
+    try:
+        redis_client.eval(_RELEASE_LOCK_SCRIPT, 1, f"{key}:lock", token)
+        redis_client.publish(f"{key}:ready", "1")
+    except Exception as exc:
+        logger.debug(f"Error releasing single-flight lock for {key}: {exc}")
+
+
+def _wait_for_result(key: str) -> Optional[Tuple[Any, bool]]:
+    """Wait (up to CACHE_LOCK_TIMEOUT) for the lock holder in another worker to publish."""
+    try:
+        pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+    except Exception as exc:
+        logger.debug(f"Single-flight wait unavailable for {key}: {exc}")
+        return None
+    try:
+        pubsub.subscribe(f"{key}:ready")
+        deadline = time.time() + Config.CACHE_LOCK_TIMEOUT
+        # The holder may have finished before we subscribed
+        entry = _get_entry(key)
+        while entry is None:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            if pubsub.get_message(timeout=min(remaining, 1.0)):
+                return _get_entry(key)
+            entry = _get_entry(key)
+        return entry
+    except Exception as exc:
+        logger.debug(f"Error waiting for single-flight result of {key}: {exc}")
+        return _get_entry(key)
+    finally:
+        pubsub.close()
+
+
+def _compute(key: str, func: Callable, args, kwargs, ttl: int, stale_ttl: int, jitter: float) -> Any:
+    result = func(*args, **kwargs)
+    if result is not None:
+        _set_entry(key, result, _jittered(ttl, jitter), stale_ttl)
+    return result
+
+
+def _load(key: str, func: Callable, args, kwargs, ttl: int, stale_ttl: int, jitter: float) -> Any:
+    """Miss path: one caller per key computes, the rest reuse its result."""
+    with _key_locks.hold(key):
+        entry = _get_entry(key)
+        if entry is not None:
+            return entry[0]
+        token = _acquire_shared_lock(key)
+        if token is None:
+            entry = _wait_for_result(key)
+            if entry is not None:
+                return entry[0]
+            # Holder failed or timed out: compute without the lock
+        try:
+            return _compute(key, func, args, kwargs, ttl, stale_ttl, jitter)
+        finally:
+            _release_shared_lock(key, token)
+
+
+def _refresh(key: str, func: Callable, args, kwargs, ttl: int, stale_ttl: int, jitter: float) -> None:
+    """Background revalidation of a stale entry; skipped if someone is already on it."""
+    with _key_locks.hold(key, blocking=False) as acquired:
+        if not acquired:
+            return
+        entry = _get_entry(key)
+        if entry is not None and not entry[1]:
+            return
+        token = _acquire_shared_lock(key)
+        if token is None:
+            return
+        try:
+            _compute(key, func, args, kwargs, ttl, stale_ttl, jitter)
+        except Exception as exc:
+            logger.warning(f"Background refresh of {key} failed: {exc}")
+        finally:
+            _release_shared_lock(key, token)
+
+
+def cached(
+    prefix: str,
+    ttl: int = 60,
+    stale_ttl_seconds: int = 0,
+    jitter: Optional[float] = None,
+) -> Callable:
+    """
+    Decorator to cache function results.
+
+    Args:
+        prefix: Cache key prefix
+        ttl: Seconds a result is fresh
+        stale_ttl_seconds: Seconds after `ttl` during which the old result is
+            still returned while one background task recomputes it
+        jitter: Fraction of `ttl` randomly shaved off each entry
+            (default Config.CACHE_TTL_JITTER)
+
+    None results are not cached.
+    """
+    ttl_jitter = Config.CACHE_TTL_JITTER if jitter is None else jitter
 
     def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
         def wrapper(*args, **kwargs):
             cache_key = get_cache_key(prefix, *args, **kwargs)
-            cached_value = get(cache_key)
-            if cached_value is not None:
-                return cached_value
-            result = func(*args, **kwargs)
-            set(cache_key, result, ttl)
-            return result
+            entry = _get_entry(cache_key)
+            if entry is not None:
+                value, is_stale = entry
+                if is_stale:
+                    background_tasks.submit(
+                        _refresh, cache_key, func, args, kwargs, ttl, stale_ttl_seconds, ttl_jitter
+                    )
+                return value
+            return _load(cache_key, func, args, kwargs, ttl, stale_ttl_seconds, ttl_jitter)
 
         return wrapper
 
     return decorator
 
 
+def delete_keys(client: Any, keys: Iterable[Any], chunk_size: int = DELETE_CHUNK_SIZE) -> int:
+    """UNLINK keys in chunks (memory is reclaimed off the Redis main thread)."""
+    deleted = 0
+    chunk: List[Any] = []
+    for key in keys:
+        chunk.append(key)
+        if len(chunk) >= chunk_size:
+            deleted += client.unlink(*chunk)
+            chunk = []
+    if chunk:
+        deleted += client.unlink(*chunk)
+    return deleted
+
+
+def scan_delete(client: Any, pattern: str) -> int:
+    """Delete keys matching pattern with incremental SCAN instead of KEYS."""
+    return delete_keys(client, client.scan_iter(match=pattern, count=DELETE_CHUNK_SIZE))
+
+
+def delete_tagged(client: Any, tag_key: str) -> Optional[int]:
+    """
+    Delete every key registered in a tag set, then the set itself.
+
+    The set is renamed first, so entries written meanwhile register in a
+    fresh set instead of being dropped unseen. Returns None if the tag set
+    does not exist (nothing tagged yet, or written before tagging).
+    """
+    purge_key = f"{tag_key}:purge:{uuid.uuid4().hex}"
+    if not client.exists(tag_key):
+        return None
+    try:
+        client.rename(tag_key, purge_key)
+    except Exception:
+        # Expired or purged by someone else between EXISTS and RENAME
+        return None
+    try:
+        return delete_keys(client, client.sscan_iter(purge_key, count=DELETE_CHUNK_SIZE))
+    finally:
+        client.unlink(purge_key)
+
+
+def _pattern_tag_key(key_pattern: str) -> Optional[str]:
+    """Tag set for a whole-prefix pattern ('castor:<prefix>:*'), else None."""
+    if not (key_pattern.startswith("castor:") and key_pattern.endswith(":*")):
+        return None
+    prefix = key_pattern[len("castor:"):-2]
+    if not prefix or any(char in prefix for char in ":*?[]"):
+        return None
+    return f"{TAG_PREFIX}:{prefix}"
+
+
 def invalidate(key_pattern: str) -> int:
     """
     Invalidate cache entries matching pattern.
 
+    Whole-prefix patterns delete the members of the prefix tag set; other
+    patterns (or prefixes with no tag set) fall back to SCAN.
+
     Args:
         key_pattern: Pattern to match (e.g., 'castor:twitter:*')
 
     Returns:
         Number of keys deleted
     """
-    if redis_client and hasattr(redis_client, "keys"):
+    deleted = _local_cache.delete_matching(key_pattern)
+    if redis_client and hasattr(redis_client, "scan_iter"):
         try:
-            keys = redis_client.keys(key_pattern)
-            if keys:
-                return redis_client.delete(*keys)
+            tag_key = _pattern_tag_key(key_pattern)
+            tagged = delete_tagged(redis_client, tag_key) if tag_key else None
+            deleted += tagged if tagged is not None else scan_delete(redis_client, key_pattern)
         except Exception as exc:
             logger.warning(f"Error invalidating cache pattern {key_pattern}: {exc}")
-    return 0
+    return deleted
 
 
 def invalidate_prefix(prefix: str) -> int:
@@ -249,13 +541,23 @@ def invalidate_prefix(prefix: str) -> int:
     return invalidate(f"castor:{prefix}:*")
 
 
-def clear_all() -> None:
-    """Clear all cache entries."""
-    if redis_client and hasattr(redis_client, "flushdb"):
+def clear_all() -> int:
+    """
+    Clear all cache entries in the castor: namespace.
+
+    Other data sharing the Redis DB (agent state, rate limits, E-14 cache)
+    is left alone.
+
+    Returns:
+        Number of Redis keys deleted
+    """
+    deleted = 0
+    if redis_client and hasattr(redis_client, "scan_iter"):
         try:
-            redis_client.flushdb()
-            logger.info("Redis cache cleared")
+            deleted = scan_delete(redis_client, "castor:*")
+            logger.info(f"Redis cache cleared ({deleted} keys)")
         except Exception as exc:
             logger.warning(f"Error clearing Redis cache: {exc}")
     _local_cache.clear()
     logger.info("Local cache cleared")
+    return deleted
@@ -332,6 +332,32 @@ class DashboardMetrics:
         })
 
 
+# =============================================================================
+# Métricas de Serialización de Caché
+# =============================================================================
+
+class CacheMetrics:
+    """Helper para métricas del codec de payloads en caché."""
+
+    @staticmethod
+    def track_encode(cache_type: str, serializer: str, compression: str, raw_bytes: int, encoded_bytes: int):
+        """Registra tamaño serializado y codificado (con header/compresión) de un payload."""
+        registry = get_metrics_registry()
+        labels = {"cache_type": cache_type, "serializer": serializer, "compression": compression}
+        registry.observe("castor_cache_payload_raw_bytes", raw_bytes, labels)
+        registry.observe("castor_cache_payload_encoded_bytes", encoded_bytes, labels)
+        registry.inc("castor_cache_encoded_bytes_total", encoded_bytes, labels)
+
+    @staticmethod
+    def track_decode(cache_type: str, codec: str, duration_seconds: float):
+        """Registra tiempo de decodificación de un hit de caché."""
+        registry = get_metrics_registry()
+        registry.observe("castor_cache_decode_seconds", duration_seconds, {
+            "cache_type": cache_type,
+            "codec": codec
+        })
+
+
 # =============================================================================
 # Métricas de Base de Datos (QAS A3, S2)
 # =============================================================================
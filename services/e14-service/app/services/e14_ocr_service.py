@@ -9,18 +9,21 @@ Version 2.0 - Soporte para payload v2 con:
 - Estructura normalizada para BD v2
 - Métricas integradas (QAS L2, S1)
 """
-import base64
 import hashlib
 import json
 import logging
+import os
 import re
 import time
 import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple, Union
 import httpx
 
+if TYPE_CHECKING:
+    from PIL import Image
+
 from config import Config
 from utils.metrics import (
     get_metrics_registry,
@@ -28,6 +31,12 @@ from utils.metrics import (
     ValidationMetrics,
     track_ocr_processing,
 )
+from services.e14_page_rasterizer import (
+    DEFAULT_DPI,
+    image_media_type,
+    iter_pdf_pages,
+    preprocess_page_image,
+)
 from services.qr_parser import (
     parse_qr_barcode,
     validate_qr_against_ocr,
@@ -551,6 +560,10 @@ class E14OCRService:
         self.max_tokens = 16000  # E-14 puede ser largo
         self.timeout = 300  # 5 minutos para PDFs grandes con muchas páginas
 
+        # Rasterizado paralelo de páginas (ver services/e14_page_rasterizer.py)
+        self.raster_workers = Config.E14_OCR_RASTER_WORKERS or min(4, os.cpu_count() or 1)
+        self.image_encoder = Config.E14_OCR_IMAGE_ENCODER
+
         logger.info(f"E14OCRService inicializado con modelo: {self.model}")
 
     # ============================================================
@@ -603,7 +616,9 @@ class E14OCRService:
             # 2. Calcular hash
             sha256 = hashlib.sha256(pdf_data).hexdigest()
 
-            # 3. Convertir PDF a imágenes
+            # 3. Convertir PDF a imágenes. Las páginas se rasterizan en paralelo, pero
+            # Claude Vision recibe el documento completo en una sola petición, así
+            # que se espera a la última página antes de continuar.
             images = self._pdf_to_images(pdf_data)
             total_pages = len(images)
             logger.info(f"PDF convertido a {total_pages} imágenes")
@@ -684,7 +699,7 @@ class E14OCRService:
                 "type": "image",
                 "source": {
                     "type": "base64",
-                    "media_type": "image/png",
+                    "media_type": image_media_type(img_base64),
                     "data": img_base64
                 }
             })
@@ -1309,7 +1324,9 @@ class E14OCRService:
             # 2. Calcular hash
             sha256 = hashlib.sha256(pdf_data).hexdigest()
 
-            # 3. Convertir PDF a imágenes
+            # 3. Convertir PDF a imágenes. Las páginas se rasterizan en paralelo, pero
+            # Claude Vision recibe el documento completo en una sola petición, así
+            # que se espera a la última página antes de continuar.
             images = self._pdf_to_images(pdf_data)
             logger.info(f"PDF convertido a {len(images)} imágenes")
 
@@ -1365,42 +1382,26 @@ class E14OCRService:
             response.raise_for_status()
             return response.content
 
-    def _pdf_to_images(self, pdf_data: bytes) -> List[str]:
+    def _iter_pdf_images(self, pdf_data: bytes) -> Iterator[Tuple[int, str]]:
         """
-        Convierte PDF a lista de imágenes en base64 con preprocesamiento.
+        Rasteriza el PDF en paralelo y entrega (índice de página, base64)
+        a medida que cada página termina (en orden de finalización).
 
-        Pipeline mejorado basado en TySE:
-        1. PDF → Imagen con DPI optimizado
-        2. Preprocesamiento: contraste, brillo, nitidez, edge enhance
-        3. Conversión a base64
+        Solo sirve a consumidores que trabajan página a página: los flujos
+        de Claude Vision usan ``_pdf_to_images``, que espera todas las páginas.
 
-        Returns:
-            Lista de strings base64 (una por página)
+        Pipeline basado en TySE, por página y en un pool de procesos:
+        1. PDF → Imagen con alta resolución
+        2. Preprocesamiento: contraste, brillo, nitidez, edge enhance
+        3. Codificación a base64 (PNG optimizado o JPEG rápido)
         """
         try:
-            from pdf2image import convert_from_bytes
-            import io
-
-            # Convertir PDF a imágenes PIL con DPI optimizado
-            pil_images = convert_from_bytes(
+            yield from iter_pdf_pages(
                 pdf_data,
-                dpi=200,  # Optimizado para OCR de dígitos manuscritos
-                fmt='PNG'
+                dpi=DEFAULT_DPI,
+                workers=self.raster_workers,
+                encoder=self.image_encoder,
             )
-
-            # Convertir a base64 con preprocesamiento
-            base64_images = []
-            for img in pil_images:
-                # Aplicar preprocesamiento
-                processed_img = self._preprocess_image(img)
-
-                buffer = io.BytesIO()
-                processed_img.save(buffer, format='PNG', optimize=True)
-                base64_str = base64.b64encode(buffer.getvalue()).decode('utf-8')
-                base64_images.append(base64_str)
-
-            return base64_images
-
         except ImportError:
             logger.error("pdf2image no instalado. Ejecutar: pip install pdf2image")
             raise
@@ -1408,44 +1409,19 @@ class E14OCRService:
             logger.error(f"Error convirtiendo PDF a imágenes: {e}")
             raise
 
-    def _preprocess_image(self, img) -> 'Image.Image':
+    def _pdf_to_images(self, pdf_data: bytes) -> List[str]:
         """
-        Preprocesamiento de imagen para mejorar OCR de dígitos manuscritos.
-
-        Pipeline basado en TySE:
-        - Contraste +30% (dígitos más definidos)
-        - Brillo +10% (fondo más claro)
-        - Nitidez +50% (bordes más nítidos)
-        - Edge enhance (definir trazos)
-
-        Args:
-            img: PIL Image
+        Convierte PDF a lista de imágenes en base64 con preprocesamiento.
 
         Returns:
-            PIL Image preprocesada
+            Lista de strings base64 (una por página, en orden)
         """
-        from PIL import Image, ImageEnhance, ImageFilter
-
-        # 1. Convertir a RGB si es necesario
-        if img.mode != 'RGB':
-            img = img.convert('RGB')
-
-        # 2. Aumentar contraste (30%) - hace los dígitos más oscuros
-        enhancer = ImageEnhance.Contrast(img)
-        img = enhancer.enhance(1.3)
-
-        # 3. Aumentar brillo (10%) - aclara el fondo
-        enhancer = ImageEnhance.Brightness(img)
-        img = enhancer.enhance(1.1)
-
-        # 4. Aumentar nitidez (50%) - define bordes de dígitos
-        enhancer = ImageEnhance.Sharpness(img)
-        img = enhancer.enhance(1.5)
-
-        # 5. Edge enhance - resalta trazos manuscritos
-        img = img.filter(ImageFilter.EDGE_ENHANCE)
+        pages = dict(self._iter_pdf_images(pdf_data))
+        return [pages[i] for i in range(len(pages))]
 
-        return img
+    def _preprocess_image(self, img: 'Image.Image') -> 'Image.Image':
+        """Preprocesamiento TySE de una página (ver preprocess_page_image)."""
+        return preprocess_page_image(img)
 
     def _call_claude_vision(self, images: List[str]) -> Dict[str, Any]:
         """
@@ -1465,7 +1441,7 @@ class E14OCRService:
                 "type": "image",
                 "source": {
                     "type": "base64",
-                    "media_type": "image/png",
+                    "media_type": image_media_type(img_base64),
                     "data": img_base64
                 }
             })
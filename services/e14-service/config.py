@@ -60,6 +60,8 @@ class Config:
     E14_OCR_MAX_PAGES: int = int(os.getenv('E14_OCR_MAX_PAGES', '20'))
     E14_OCR_TIMEOUT: int = int(os.getenv('E14_OCR_TIMEOUT', '120'))
     E14_OCR_DPI: int = int(os.getenv('E14_OCR_DPI', '150'))
+    E14_OCR_RASTER_WORKERS: int = int(os.getenv('E14_OCR_RASTER_WORKERS', '0'))  # 0 = min(4, CPUs)
+    E14_OCR_IMAGE_ENCODER: str = os.getenv('E14_OCR_IMAGE_ENCODER', 'lossless')  # lossless | fast
 
     # E-14 Cost Limits
     E14_COST_PER_PROCESS: float = float(os.getenv('E14_COST_PER_PROCESS', '0.10'))
@@ -0,0 +1,2 @@
+# Re-export from app.services.e14_page_rasterizer
+from app.services.e14_page_rasterizer import *
@@ -262,6 +262,55 @@ class OCRMetrics:
             "reason": reason
         })
 
+    @staticmethod
+    def track_page_stage(stage: str, duration_seconds: float, encoder: str = "lossless"):
+        """Registra duración de una etapa de rasterizado (rasterize/preprocess/encode/total)."""
+        registry = get_metrics_registry()
+        registry.observe("castor_ocr_page_stage_seconds", duration_seconds, {
+            "stage": stage,
+            "encoder": encoder
+        })
+
+
+# =============================================================================
+# Métricas de Inferencia de Sentimiento (BETO)
+# =============================================================================
+
+class SentimentMetrics:
+    """Helper para métricas del scheduler de inferencia de sentimiento."""
+
+    @staticmethod
+    def track_queue_wait(wait_seconds: float, scheduler: str = "beto"):
+        """Registra tiempo de espera en cola de una solicitud."""
+        registry = get_metrics_registry()
+        registry.observe("castor_sentiment_queue_wait_seconds", wait_seconds, {"scheduler": scheduler})
+
+    @staticmethod
+    def track_batch(batch_size: int, requests: int, duration_seconds: float, scheduler: str = "beto"):
+        """Registra un batch de inferencia: tamaño, solicitudes fusionadas y throughput (textos/s)."""
+        registry = get_metrics_registry()
+        labels = {"scheduler": scheduler}
+        registry.observe("castor_sentiment_batch_size", batch_size, labels)
+        registry.observe("castor_sentiment_batch_requests", requests, labels)
+        registry.observe("castor_sentiment_inference_seconds", duration_seconds, labels)
+        registry.inc("castor_sentiment_texts_total", batch_size, labels)
+        if duration_seconds > 0:
+            throughput = batch_size / duration_seconds
+            registry.observe("castor_sentiment_throughput_texts_per_second", throughput, labels)
+            registry.set("castor_sentiment_throughput_texts_per_second_last", throughput, labels)
+
+    @staticmethod
+    def track_cache(tier: str, hits: int, misses: int):
+        """Registra hits/misses de caché de sentimiento (local/persistent) y actualiza el hit ratio."""
+        registry = get_metrics_registry()
+        labels = {"tier": tier}
+        registry.inc("castor_sentiment_cache_hits_total", hits, labels)
+        registry.inc("castor_sentiment_cache_misses_total", misses, labels)
+        total_hits = registry.get_counter("castor_sentiment_cache_hits_total", labels)
+        total = total_hits + registry.get_counter("castor_sentiment_cache_misses_total", labels)
+        if total:
+            registry.set("castor_sentiment_cache_hit_ratio", total_hits / total, labels)
+
 
 # =============================================================================
 # Métricas de Validación (QAS I2, I3)